@@ -16,7 +16,15 @@ Compliance:
 
 from .registry_manager import PlatformRegistryManager
 from .validator import RegistryValidator, ValidationResult, ValidationStatus
-from .cache import CacheEntry, CacheLevel, MultiLayerCache
+from .cache import (
+    CacheEntry,
+    CacheLevel,
+    CacheTier,
+    EvictionPolicy,
+    MemoryTier,
+    MultiLayerCache,
+    SQLiteTier,
+)
 from .schema_validator import (
     SchemaValidationResult,
     SchemaValidationStatus,
@@ -31,7 +39,11 @@ __all__ = [
     'ValidationStatus',
     'CacheEntry',
     'CacheLevel',
+    'CacheTier',
+    'EvictionPolicy',
+    'MemoryTier',
     'MultiLayerCache',
+    'SQLiteTier',
     'SchemaValidationResult',
     'SchemaValidationStatus',
     'SchemaValidator',
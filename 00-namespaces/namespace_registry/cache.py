@@ -3,16 +3,35 @@ Multi-Layer Cache - INSTANT 執行標準
 
 多層緩存系統：Local → Redis → Database
 延遲目標：<50ms (p99) 查找
+
+- Local / Redis 層為有界記憶體緩存（LRU 或 LFU 淘汰），TTL 由時間輪清理
+- Database 層默認為 SQLite 替身，可替換為任意 CacheTier 實現
+- get_or_load 對同一 key 的並發未命中只執行一次載入（single-flight）
+- 前綴失效透過有序 key 索引完成，無需掃描全部 key
 """
 
-from typing import Any, Optional, Dict, List
-from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
+from collections import OrderedDict, deque
 import asyncio
+import bisect
+import heapq
+import inspect
+import logging
+import pickle
+import sqlite3
+import threading
 import time
-from datetime import datetime, timedelta
-import hashlib
-import json
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+# 前綴範圍查詢的上界字符
+_PREFIX_END = "\U0010ffff"
+
+Loader = Callable[[str], Union[Any, Awaitable[Any]]]
 
 
 class CacheLevel(Enum):
@@ -22,6 +41,12 @@ class CacheLevel(Enum):
     DATABASE = "database"
 
 
+class EvictionPolicy(Enum):
+    """淘汰策略"""
+    LRU = "lru"
+    LFU = "lfu"
+
+
 @dataclass
 class CacheEntry:
     """緩存條目"""
@@ -30,11 +55,17 @@ class CacheEntry:
     level: CacheLevel
     created_at: datetime
     ttl: int = 3600  # 默認 1 小時
-    
-    def is_expired(self) -> bool:
+    expires_at: float = field(default=0.0, compare=False)
+    hits: int = field(default=0, compare=False)
+
+    def __post_init__(self):
+        if not self.expires_at:
+            self.expires_at = self.created_at.timestamp() + self.ttl
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """檢查是否過期"""
-        return datetime.now() > self.created_at + timedelta(seconds=self.ttl)
-    
+        return (time.time() if now is None else now) > self.expires_at
+
     def to_dict(self) -> Dict[str, Any]:
         """轉換為字典"""
         return {
@@ -46,27 +77,512 @@ class CacheEntry:
         }
 
 
+class TimingWheel:
+    """
+    TTL 時間輪
+
+    key 按到期 tick 分桶；推進時只觸及已經過的桶，
+    過期清理成本與到期的 key 數成正比，而非緩存大小。
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 3600):
+        self.resolution = resolution
+        self._slots: List[set] = [set() for _ in range(slots)]
+        self._ticks: Dict[str, int] = {}
+        self._tick = int(time.time() / resolution)
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+    def schedule(self, key: str, expires_at: float) -> None:
+        """登記 key 的到期時間"""
+        self.cancel(key)
+        tick = max(int(expires_at / self.resolution), self._tick + 1)
+        self._slots[tick % len(self._slots)].add(key)
+        self._ticks[key] = tick
+
+    def cancel(self, key: str) -> None:
+        """取消 key 的到期登記"""
+        tick = self._ticks.pop(key, None)
+        if tick is not None:
+            self._slots[tick % len(self._slots)].discard(key)
+
+    def advance(self, now: float) -> List[str]:
+        """推進到 now，返回已到期的 key"""
+        target = int(now / self.resolution)
+        if target <= self._tick:
+            return []
+
+        slot_count = len(self._slots)
+        if target - self._tick >= slot_count:
+            slots = range(slot_count)
+        else:
+            slots = (t % slot_count for t in range(self._tick + 1, target + 1))
+        self._tick = target
+
+        expired = []
+        for index in slots:
+            slot = self._slots[index]
+            # 超過一圈的 key 留在桶中，等待其真正的 tick
+            due = [key for key in slot if self._ticks[key] <= target]
+            for key in due:
+                slot.discard(key)
+                del self._ticks[key]
+            expired.extend(due)
+        return expired
+
+    def clear(self) -> None:
+        for slot in self._slots:
+            slot.clear()
+        self._ticks.clear()
+
+
+class PrefixIndex:
+    """有序 key 索引，支持按前綴範圍查找"""
+
+    def __init__(self):
+        self._keys: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def add(self, key: str) -> None:
+        index = bisect.bisect_left(self._keys, key)
+        if index == len(self._keys) or self._keys[index] != key:
+            self._keys.insert(index, key)
+
+    def discard(self, key: str) -> None:
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + _PREFIX_END, lo)
+        return self._keys[lo:hi]
+
+    def clear(self) -> None:
+        self._keys.clear()
+
+
+class _LRUStore:
+    """最近最少使用淘汰"""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.pop(key, None)
+
+    def victim(self) -> str:
+        return next(iter(self._entries))
+
+    def values(self):
+        return self._entries.values()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class _LFUStore:
+    """最不經常使用淘汰（O(1)，同頻率按 LRU）"""
+
+    def __init__(self):
+        self._entries: Dict[str, CacheEntry] = {}
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _touch(self, key: str) -> None:
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._touch(key)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        if key in self._entries:
+            self._entries[key] = entry
+            self._touch(key)
+            return
+        self._entries[key] = entry
+        self._freq[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_freq = 1
+
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        freq = self._freq.pop(key)
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = min(self._buckets, default=0)
+        return entry
+
+    def victim(self) -> str:
+        return next(iter(self._buckets[self._min_freq]))
+
+    def values(self):
+        return self._entries.values()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+
+class CacheTier:
+    """
+    緩存層接口
+
+    讀寫與失效為 async，以便接入遠端存儲（Redis、數據庫）；
+    clear / purge_expired 為管理操作，保持同步。
+    """
+
+    def __init__(self, level: CacheLevel):
+        self.level = level
+        self.stats = {'evictions': 0, 'expirations': 0}
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    async def get(self, key: str, now: Optional[float] = None) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    async def set(self, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        raise NotImplementedError
+
+    async def delete_matching(self, pattern: str) -> List[str]:
+        raise NotImplementedError
+
+    def purge_expired(self, now: float) -> int:
+        return 0
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryTier(CacheTier):
+    """
+    有界記憶體緩存層
+
+    - LRU / LFU 淘汰
+    - 時間輪 TTL 清理
+    - 有序前綴索引
+    """
+
+    def __init__(
+        self,
+        level: CacheLevel,
+        max_entries: Optional[int] = None,
+        eviction: EvictionPolicy = EvictionPolicy.LRU,
+        wheel_resolution: float = 1.0
+    ):
+        super().__init__(level)
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self._store = _LFUStore() if eviction == EvictionPolicy.LFU else _LRUStore()
+        self._wheel = TimingWheel(resolution=wheel_resolution)
+        self._index = PrefixIndex()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, key: str) -> bool:
+        return self.lookup(key) is not None
+
+    def lookup(self, key: str, now: Optional[float] = None) -> Optional[CacheEntry]:
+        """同步查找（命中時更新淘汰順序）"""
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired(now):
+            self._remove(key)
+            self.stats['expirations'] += 1
+            return None
+        return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        """同步寫入，必要時淘汰"""
+        key = entry.key
+        if self.max_entries is not None and key not in self._store:
+            # 先淘汰再插入，新條目不會成為自身的淘汰對象
+            while self._store and len(self._store) >= self.max_entries:
+                self._remove(self._store.victim())
+                self.stats['evictions'] += 1
+
+        self._store.put(key, entry)
+        self._index.add(key)
+        self._wheel.schedule(key, entry.expires_at)
+
+    def _remove(self, key: str) -> bool:
+        if self._store.pop(key) is None:
+            return False
+        self._index.discard(key)
+        self._wheel.cancel(key)
+        return True
+
+    def entries(self) -> List[CacheEntry]:
+        return list(self._store.values())
+
+    async def get(self, key: str, now: Optional[float] = None) -> Optional[CacheEntry]:
+        return self.lookup(key, now)
+
+    async def set(self, entry: CacheEntry) -> None:
+        self.put(entry)
+
+    async def delete(self, key: str) -> bool:
+        return self._remove(key)
+
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        keys = self._index.with_prefix(prefix)
+        for key in keys:
+            self._remove(key)
+        return keys
+
+    async def delete_matching(self, pattern: str) -> List[str]:
+        keys = [key for key in self._index if pattern in key]
+        for key in keys:
+            self._remove(key)
+        return keys
+
+    def purge_expired(self, now: float) -> int:
+        count = 0
+        for key in self._wheel.advance(now):
+            entry = self._store.pop(key)
+            if entry is not None:
+                self._index.discard(key)
+                count += 1
+        self.stats['expirations'] += count
+        return count
+
+    def clear(self) -> None:
+        self._store.clear()
+        self._wheel.clear()
+        self._index.clear()
+
+
+class SQLiteTier(CacheTier):
+    """
+    SQLite 持久化緩存層（Database 層替身）
+
+    key 為主鍵，前綴失效使用主鍵範圍刪除；
+    過期條目按 purge_interval 批量清理。
+    """
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        purge_interval: float = 60.0
+    ):
+        super().__init__(CacheLevel.DATABASE)
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self._last_purge = time.time()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                level TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                ttl INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_expires "
+            "ON cache_entries(expires_at)"
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    async def get(self, key: str, now: Optional[float] = None) -> Optional[CacheEntry]:
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, level, created_at, ttl, expires_at "
+                "FROM cache_entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        value, level, created_at, ttl, expires_at = row
+        if now > expires_at:
+            self._execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self.stats['expirations'] += 1
+            return None
+
+        return CacheEntry(
+            key=key,
+            value=pickle.loads(value),
+            level=CacheLevel(level),
+            created_at=datetime.fromtimestamp(created_at),
+            ttl=ttl,
+            expires_at=expires_at
+        )
+
+    async def set(self, entry: CacheEntry) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO cache_entries "
+            "(key, value, level, created_at, ttl, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                entry.key,
+                pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL),
+                entry.level.value,
+                entry.created_at.timestamp(),
+                entry.ttl,
+                entry.expires_at
+            )
+        )
+
+    async def delete(self, key: str) -> bool:
+        return self._execute(
+            "DELETE FROM cache_entries WHERE key = ?", (key,)
+        ).rowcount > 0
+
+    def _delete_where(self, where: str, params: tuple) -> List[str]:
+        with self._lock:
+            keys = [
+                row[0] for row in self._conn.execute(
+                    f"SELECT key FROM cache_entries WHERE {where}", params
+                )
+            ]
+            self._conn.execute(f"DELETE FROM cache_entries WHERE {where}", params)
+            self._conn.commit()
+        return keys
+
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        return self._delete_where(
+            "key >= ? AND key < ?", (prefix, prefix + _PREFIX_END)
+        )
+
+    async def delete_matching(self, pattern: str) -> List[str]:
+        return self._delete_where("instr(key, ?) > 0", (pattern,))
+
+    def purge_expired(self, now: float) -> int:
+        if now - self._last_purge < self.purge_interval:
+            return 0
+        self._last_purge = now
+        count = self._execute(
+            "DELETE FROM cache_entries WHERE expires_at < ?", (now,)
+        ).rowcount
+        self.stats['expirations'] += count
+        return count
+
+    def clear(self) -> None:
+        self._execute("DELETE FROM cache_entries")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class MultiLayerCache:
     """
     多層緩存系統 - INSTANT 模式
-    
+
     緩存層級：
     1. Local (記憶體) - <1ms
     2. Redis (分散式) - <10ms
     3. Database (持久化) - <50ms
-    
+
     核心特性：
     - 延遲 <50ms (p99)
-    - 自動失效
-    - 層級穿透
-    - 熱點預熱
+    - 有界容量，LRU / LFU 淘汰
+    - 時間輪 TTL 失效
+    - 層級穿透與回填
+    - single-flight 載入
+    - 前綴索引失效
+    - 命中 / 未命中 / 延遲統計
     """
-    
-    def __init__(self):
-        self.local_cache: Dict[str, CacheEntry] = {}
-        self.redis_simulator: Dict[str, CacheEntry] = {}  # 模擬 Redis
-        self.database_simulator: Dict[str, CacheEntry] = {}  # 模擬 Database
-        
+
+    def __init__(
+        self,
+        local_max_entries: int = 10_000,
+        redis_max_entries: int = 100_000,
+        eviction: EvictionPolicy = EvictionPolicy.LRU,
+        redis_tier: Optional[CacheTier] = None,
+        database_tier: Optional[CacheTier] = None,
+        loader: Optional[Loader] = None,
+        latency_window: int = 1024
+    ):
+        self.local_cache = MemoryTier(CacheLevel.LOCAL, local_max_entries, eviction)
+        self.redis_simulator: CacheTier = redis_tier or MemoryTier(
+            CacheLevel.REDIS, redis_max_entries, eviction
+        )  # 模擬 Redis
+        self.database_simulator: CacheTier = database_tier or SQLiteTier()  # 模擬 Database
+        self.tiers: List[CacheTier] = [
+            self.local_cache, self.redis_simulator, self.database_simulator
+        ]
+
+        # 未命中時的默認載入器
+        self.loader = loader
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 失效計數：載入期間發生失效時不回填過期數據
+        self._generation = 0
+
         # 統計
         self.stats = {
             'local_hits': 0,
@@ -74,83 +590,132 @@ class MultiLayerCache:
             'database_hits': 0,
             'misses': 0
         }
-        
-        # 熱點追蹤
-        self.hot_keys: Dict[str, int] = {}
-    
+        self.load_stats = {
+            'loads': 0,
+            'load_errors': 0,
+            'coalesced': 0
+        }
+        self._latencies: deque = deque(maxlen=latency_window)
+
     async def get(self, key: str) -> Optional[Any]:
         """
         獲取緩存值
-        
+
         延遲目標：<50ms (p99)
         - Local: <1ms
         - Redis: <10ms
         - Database: <50ms
         """
-        start_time = time.time()
-        
+        start_time = time.perf_counter()
+        now = time.time()
+        self._purge_expired(now)
+
         # 1. 檢查 Local Cache
-        if key in self.local_cache:
-            entry = self.local_cache[key]
-            if not entry.is_expired():
-                self.stats['local_hits'] += 1
-                self._track_hot_key(key)
-                latency = (time.time() - start_time) * 1000
-                print(f"✅ Cache HIT (Local): {key}, 延遲: {latency:.2f}ms")
-                return entry.value
-            else:
-                # 過期，刪除
-                del self.local_cache[key]
-        
-        # 2. 檢查 Redis Cache
-        if key in self.redis_simulator:
-            entry = self.redis_simulator[key]
-            if not entry.is_expired():
-                self.stats['redis_hits'] += 1
-                # 回填 Local Cache
-                self.local_cache[key] = entry
-                self._track_hot_key(key)
-                latency = (time.time() - start_time) * 1000
-                print(f"✅ Cache HIT (Redis): {key}, 延遲: {latency:.2f}ms")
-                return entry.value
-            else:
-                del self.redis_simulator[key]
-        
-        # 3. 檢查 Database
-        if key in self.database_simulator:
-            entry = self.database_simulator[key]
-            if not entry.is_expired():
-                self.stats['database_hits'] += 1
-                # 回填 Redis 和 Local Cache
-                self.redis_simulator[key] = entry
-                self.local_cache[key] = entry
-                self._track_hot_key(key)
-                latency = (time.time() - start_time) * 1000
-                print(f"✅ Cache HIT (Database): {key}, 延遲: {latency:.2f}ms")
-                return entry.value
-            else:
-                del self.database_simulator[key]
-        
+        entry = self.local_cache.lookup(key, now)
+        if entry is not None:
+            entry.hits += 1
+            self.stats['local_hits'] += 1
+            self._latencies.append(time.perf_counter() - start_time)
+            return entry.value
+
+        # 2. 檢查下層，命中後回填上層
+        for depth, tier in enumerate(self.tiers[1:], start=1):
+            entry = await tier.get(key, now)
+            if entry is None:
+                continue
+            entry.hits += 1
+            self.stats[f'{tier.level.value}_hits'] += 1
+            for upper in self.tiers[:depth]:
+                await upper.set(entry)
+            self._latencies.append(time.perf_counter() - start_time)
+            return entry.value
+
         # Cache Miss
         self.stats['misses'] += 1
-        latency = (time.time() - start_time) * 1000
-        print(f"❌ Cache MISS: {key}, 延遲: {latency:.2f}ms")
+        self._latencies.append(time.perf_counter() - start_time)
+        logger.debug("Cache MISS: %s", key)
         return None
-    
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Optional[Loader] = None,
+        ttl: int = 3600,
+        level: CacheLevel = CacheLevel.DATABASE
+    ) -> Optional[Any]:
+        """
+        獲取緩存值，未命中時透過 loader 載入並寫入緩存
+
+        同一 key 的並發未命中共享一次載入；載入返回 None 時不緩存，
+        載入失敗時異常傳遞給所有等待者且不緩存。
+        """
+        value, _ = await self.get_or_load_with_source(key, loader, ttl=ttl, level=level)
+        return value
+
+    async def get_or_load_with_source(
+        self,
+        key: str,
+        loader: Optional[Loader] = None,
+        ttl: int = 3600,
+        level: CacheLevel = CacheLevel.DATABASE
+    ) -> Tuple[Optional[Any], str]:
+        """
+        同 get_or_load，另返回值的來源
+
+        來源為 'cache'（緩存命中）、'load'（本次調用載入）、
+        'coalesced'（等待其他調用的載入）或 'miss'（未命中且無 loader）。
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value, 'cache'
+
+        loader = loader or self.loader
+        if loader is None:
+            return None, 'miss'
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.load_stats['coalesced'] += 1
+            return await asyncio.shield(pending), 'coalesced'
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            value = loader(key)
+            if inspect.isawaitable(value):
+                value = await value
+            self.load_stats['loads'] += 1
+
+            if value is not None and generation == self._generation:
+                await self.set(key, value, ttl=ttl, level=level)
+
+            future.set_result(value)
+            return value, 'load'
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self.load_stats['load_errors'] += 1
+            future.set_exception(e)
+            # 標記異常已讀取，無等待者時避免 "never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
     async def set(
-        self, 
-        key: str, 
-        value: Any, 
+        self,
+        key: str,
+        value: Any,
         ttl: int = 3600,
         level: CacheLevel = CacheLevel.DATABASE
     ) -> bool:
         """
         設置緩存值
-        
+
         延遲目標：<50ms (p99)
         """
-        start_time = time.time()
-        
         entry = CacheEntry(
             key=key,
             value=value,
@@ -158,98 +723,97 @@ class MultiLayerCache:
             created_at=datetime.now(),
             ttl=ttl
         )
-        
+
         # 根據層級設置緩存
         if level in [CacheLevel.DATABASE, CacheLevel.REDIS]:
-            self.database_simulator[key] = entry
-        
-        if level in [CacheLevel.DATABASE, CacheLevel.REDIS]:
-            self.redis_simulator[key] = entry
-        
-        if level == CacheLevel.LOCAL:
-            self.local_cache[key] = entry
-        else:
-            # 回填 Local Cache
-            self.local_cache[key] = entry
-        
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache SET: {key} (level: {level.value}), 延遲: {latency:.2f}ms")
+            await self.database_simulator.set(entry)
+            await self.redis_simulator.set(entry)
+
+        # Local Cache 總是寫入（或回填）
+        self.local_cache.put(entry)
+
+        logger.debug("Cache SET: %s (level: %s)", key, level.value)
         return True
-    
+
     async def delete(self, key: str) -> bool:
         """
         刪除緩存值
-        
+
         延遲目標：<50ms (p99)
         """
-        start_time = time.time()
-        
+        self._generation += 1
+
         # 從所有層級刪除
         deleted = False
-        if key in self.local_cache:
-            del self.local_cache[key]
-            deleted = True
-        
-        if key in self.redis_simulator:
-            del self.redis_simulator[key]
-            deleted = True
-        
-        if key in self.database_simulator:
-            del self.database_simulator[key]
-            deleted = True
-        
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache DELETE: {key}, 延遲: {latency:.2f}ms")
+        for tier in self.tiers:
+            if await tier.delete(key):
+                deleted = True
+
+        logger.debug("Cache DELETE: %s", key)
         return deleted
-    
+
     async def invalidate(self, pattern: str) -> int:
         """
         批量失效緩存
-        
+
+        以 "*" 結尾的模式按前綴失效（使用有序索引）；
+        其他模式按子字符串匹配失效。
+
         延遲目標：<100ms (p99)
+
+        Returns:
+            被失效的不同 key 數量
         """
-        start_time = time.time()
-        
-        count = 0
-        
-        # Local Cache
-        keys_to_delete = [k for k in self.local_cache.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.local_cache[key]
-            count += 1
-        
-        # Redis Cache
-        keys_to_delete = [k for k in self.redis_simulator.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.redis_simulator[key]
-        
-        # Database Cache
-        keys_to_delete = [k for k in self.database_simulator.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.database_simulator[key]
-        
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache INVALIDATE: {pattern}, 刪除 {count} 個條目, 延遲: {latency:.2f}ms")
-        return count
-    
+        self._generation += 1
+
+        removed = set()
+        if pattern.endswith("*"):
+            prefix = pattern[:-1]
+            for tier in self.tiers:
+                removed.update(await tier.delete_prefix(prefix))
+        else:
+            for tier in self.tiers:
+                removed.update(await tier.delete_matching(pattern))
+
+        logger.debug("Cache INVALIDATE: %s, removed %d entries", pattern, len(removed))
+        return len(removed)
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """按前綴批量失效緩存"""
+        return await self.invalidate(prefix + "*")
+
     async def warmup(self, keys: List[str], values: List[Any]):
         """
         熱點預熱
-        
+
         延遲目標：<100ms (p99) 每個 key
         """
-        start_time = time.time()
-        
         tasks = [
             self.set(key, value, ttl=7200)  # 2 小時 TTL
             for key, value in zip(keys, values)
         ]
-        
+
         await asyncio.gather(*tasks)
-        
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache WARMUP: 預熱 {len(keys)} 個條目, 延遲: {latency:.2f}ms")
-    
+
+        logger.debug("Cache WARMUP: %d entries", len(keys))
+
+    def _purge_expired(self, now: float) -> None:
+        """推進各層的過期清理"""
+        for tier in self.tiers:
+            tier.purge_expired(now)
+
+    def _latency_percentiles(self) -> Dict[str, float]:
+        """最近請求的延遲分位數（毫秒）"""
+        if not self._latencies:
+            return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+        samples = sorted(self._latencies)
+        last = len(samples) - 1
+        return {
+            'p50': samples[int(last * 0.50)] * 1000,
+            'p99': samples[int(last * 0.99)] * 1000,
+            'max': samples[last] * 1000
+        }
+
     def get_stats(self) -> Dict[str, Any]:
         """獲取緩存統計"""
         total_requests = sum(self.stats.values())
@@ -257,7 +821,7 @@ class MultiLayerCache:
             (self.stats['local_hits'] + self.stats['redis_hits'] + self.stats['database_hits']) / total_requests * 100
             if total_requests > 0 else 0
         )
-        
+
         return {
             'total_requests': total_requests,
             'local_hits': self.stats['local_hits'],
@@ -267,59 +831,73 @@ class MultiLayerCache:
             'hit_rate': f"{hit_rate:.2f}%",
             'local_cache_size': len(self.local_cache),
             'redis_cache_size': len(self.redis_simulator),
-            'database_cache_size': len(self.database_simulator)
+            'database_cache_size': len(self.database_simulator),
+            **self.load_stats,
+            'inflight_loads': len(self._inflight),
+            'evictions': {tier.level.value: tier.stats['evictions'] for tier in self.tiers},
+            'expirations': {tier.level.value: tier.stats['expirations'] for tier in self.tiers},
+            'latency_ms': self._latency_percentiles()
         }
-    
-    def _track_hot_key(self, key: str):
-        """追蹤熱點 key"""
-        self.hot_keys[key] = self.hot_keys.get(key, 0) + 1
-    
+
     def get_hot_keys(self, top_n: int = 10) -> List[tuple]:
-        """獲取熱點 keys"""
-        sorted_keys = sorted(
-            self.hot_keys.items(),
-            key=lambda x: x[1],
-            reverse=True
+        """獲取熱點 keys（Local 層中命中次數最多的 key）"""
+        hottest = heapq.nlargest(
+            top_n,
+            self.local_cache.entries(),
+            key=lambda entry: entry.hits
         )
-        return sorted_keys[:top_n]
-    
+        return [(entry.key, entry.hits) for entry in hottest if entry.hits]
+
     def clear_all(self):
         """清空所有緩存"""
-        self.local_cache.clear()
-        self.redis_simulator.clear()
-        self.database_simulator.clear()
+        self._generation += 1
+        for tier in self.tiers:
+            tier.clear()
         self.stats = {
             'local_hits': 0,
             'redis_hits': 0,
             'database_hits': 0,
             'misses': 0
         }
-        self.hot_keys.clear()
+        self.load_stats = {
+            'loads': 0,
+            'load_errors': 0,
+            'coalesced': 0
+        }
+        self._latencies.clear()
 
 
 # 使用範例
 async def main():
     """測試 Multi-Layer Cache"""
     cache = MultiLayerCache()
-    
+
     print("\n=== 測試 Multi-Layer Cache ===\n")
-    
+
     # 1. 設置緩存
     await cache.set("namespace:platform-registry-service", {"data": "value1"})
     await cache.set("namespace:platform-agent-service", {"data": "value2"})
     await cache.set("namespace:platform-gateway-service", {"data": "value3"})
-    
+
     # 2. 獲取緩存（應該命中）
     await cache.get("namespace:platform-registry-service")
     await cache.get("namespace:platform-registry-service")  # 第二次，應該命中 Local
-    
+
     # 3. Cache Miss
     await cache.get("namespace:nonexistent")
-    
+
     # 4. 批量失效
     await cache.invalidate("platform-registry")
-    
-    # 5. 獲取統計
+    await cache.invalidate("namespace:platform-agent*")
+
+    # 5. single-flight 載入
+    async def load(key):
+        await asyncio.sleep(0.01)
+        return {"data": key}
+
+    await asyncio.gather(*(cache.get_or_load("namespace:loaded", load) for _ in range(10)))
+
+    # 6. 獲取統計
     stats = cache.get_stats()
     print(f"\n📊 緩存統計:")
     print(f"  總請求數: {stats['total_requests']}")
@@ -328,14 +906,16 @@ async def main():
     print(f"  Redis 命中: {stats['redis_hits']}")
     print(f"  Database 命中: {stats['database_hits']}")
     print(f"  Misses: {stats['misses']}")
-    
-    # 6. 熱點預熱
+    print(f"  載入次數: {stats['loads']}（合併 {stats['coalesced']} 次）")
+    print(f"  延遲 p99: {stats['latency_ms']['p99']:.3f}ms")
+
+    # 7. 熱點預熱
     print("\n=== 熱點預熱 ===")
     hot_keys = ["hot1", "hot2", "hot3"]
     hot_values = [{"data": f"hot{i}"} for i in range(1, 4)]
     await cache.warmup(hot_keys, hot_values)
-    
-    # 7. 獲取熱點 keys
+
+    # 8. 獲取熱點 keys
     top_hot = cache.get_hot_keys(3)
     print(f"\n🔥 熱點 Keys:")
     for key, count in top_hot:
@@ -343,4 +923,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -54,6 +54,7 @@ class RegistryManagerInstant:
             'total_operations': 0,
             'cache_hits': 0,
             'cache_misses': 0,
+            'coalesced_loads': 0,
             'validation_passes': 0,
             'validation_failures': 0
         }
@@ -140,34 +141,33 @@ class RegistryManagerInstant:
         start_time = time.time()
         self.stats['total_operations'] += 1
         
-        # 1. 嘗試從緩存獲取
-        cached = await self.cache.get(f"namespace:{namespace}")
+        # 1. 從緩存獲取，未命中時由存儲載入（並發未命中只載入一次）
+        def load(key: str) -> Optional[Dict[str, Any]]:
+            entry = self.namespaces.get(namespace)
+            return entry.to_dict() if entry else None
         
-        if cached:
+        result, source = await self.cache.get_or_load_with_source(
+            f"namespace:{namespace}",
+            load,
+            ttl=3600
+        )
+        
+        if source == 'cache':
             self.stats['cache_hits'] += 1
-            latency = (time.time() - start_time) * 1000
-            print(f"✅ 從緩存獲取 {namespace}，延遲: {latency:.2f}ms")
-            return cached
-        
-        # 2. 從存儲獲取
-        self.stats['cache_misses'] += 1
-        
-        if namespace in self.namespaces:
-            entry = self.namespaces[namespace]
-            
-            # 回填緩存
-            await self.cache.set(
-                f"namespace:{namespace}",
-                entry.to_dict(),
-                ttl=3600
-            )
-            
-            latency = (time.time() - start_time) * 1000
-            print(f"✅ 從存儲獲取 {namespace}，延遲: {latency:.2f}ms")
-            return entry.to_dict()
+        else:
+            # 2. 從存儲獲取（等待並發載入的調用同樣計為未命中）
+            self.stats['cache_misses'] += 1
+            if source == 'coalesced':
+                self.stats['coalesced_loads'] += 1
+        
+        if result is None:
+            print(f"❌ Namespace 不存在: {namespace}")
+            return None
         
-        print(f"❌ Namespace 不存在: {namespace}")
-        return None
+        latency = (time.time() - start_time) * 1000
+        source = "緩存" if source == 'cache' else "存儲"
+        print(f"✅ 從{source}獲取 {namespace}，延遲: {latency:.2f}ms")
+        return result
     
     async def update_namespace(
         self, 
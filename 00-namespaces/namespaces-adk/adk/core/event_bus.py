@@ -3,11 +3,18 @@ Event Bus: Internal event system for decoupled communication.
 
 This module implements a publish-subscribe event bus for communication
 between runtime components.
+
+Event names are dot-separated topics. Subscriptions may use wildcard
+patterns: ``*`` matches exactly one segment and ``**`` matches zero or
+more segments (a bare ``"*"`` subscribes to every event).
 """
 
 import asyncio
+import bisect
+import itertools
 import logging
-from typing import Dict, Any, Callable, Optional, List, Set
+from collections import deque
+from typing import Dict, Any, Callable, Iterable, Optional, List, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -59,15 +66,22 @@ class Subscription:
     once: bool = False  # Unsubscribe after first event
     async_handler: bool = False
     id: str = ""
+    timeout: Optional[float] = None  # Per-handler timeout (seconds)
+    sequence: int = 0  # Registration order, breaks priority ties
     
     def __post_init__(self):
         if not self.id:
             import uuid
             self.id = str(uuid.uuid4())
     
+    @property
+    def sort_key(self) -> Tuple[int, int]:
+        """Dispatch order: highest priority first, then registration order."""
+        return (-self.priority.value, self.sequence)
+    
     def matches(self, event: Event) -> bool:
         """Check if subscription matches event."""
-        if self.event_name != "*" and event.name != self.event_name:
+        if not _topic_matches(self.event_name, event.name):
             return False
         
         if self.filter_func and not self.filter_func(event):
@@ -76,35 +90,198 @@ class Subscription:
         return True
 
 
+def _is_pattern(event_name: str) -> bool:
+    """Whether an event name contains wildcard segments."""
+    return "*" in event_name
+
+
+def _pattern_segments(pattern: str) -> Tuple[str, ...]:
+    """Split a wildcard pattern into trie segments."""
+    if pattern == "*":
+        # Historical meaning: a bare "*" receives every event
+        return ("**",)
+    return tuple(pattern.split("."))
+
+
+def _topic_matches(pattern: str, event_name: str) -> bool:
+    """Match one pattern against an event name with the trie's semantics."""
+    if not _is_pattern(pattern):
+        return pattern == event_name
+    
+    segments = event_name.split(".")
+    count = len(segments)
+    positions = {0}
+    for part in _pattern_segments(pattern):
+        if part == "**":
+            positions = set(range(min(positions), count + 1))
+        else:
+            positions = {
+                index + 1 for index in positions
+                if index < count and part in (segments[index], "*")
+            }
+        if not positions:
+            return False
+    return count in positions
+
+
+class _TopicTrie:
+    """
+    Trie of wildcard subscriptions keyed by dot-separated segments.
+    
+    Matching walks only the branches an event name can reach, so the cost
+    depends on the number of segments rather than the number of patterns.
+    """
+    
+    class _Node:
+        __slots__ = ("children", "subscriptions")
+        
+        def __init__(self):
+            self.children: Dict[str, "_TopicTrie._Node"] = {}
+            self.subscriptions: List[Subscription] = []
+    
+    def __init__(self):
+        self._root = self._Node()
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, subscription: Subscription) -> None:
+        node = self._root
+        for segment in _pattern_segments(subscription.event_name):
+            node = node.children.setdefault(segment, self._Node())
+        node.subscriptions.append(subscription)
+        self._size += 1
+    
+    def remove(self, subscription: Subscription) -> bool:
+        path = [self._root]
+        segments = _pattern_segments(subscription.event_name)
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return False
+            path.append(child)
+        
+        try:
+            path[-1].subscriptions.remove(subscription)
+        except ValueError:
+            return False
+        self._size -= 1
+        
+        # Prune empty branches
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.subscriptions or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+        return True
+    
+    def match(self, event_name: str) -> List[Subscription]:
+        """Return all subscriptions whose pattern matches the event name."""
+        segments = event_name.split(".")
+        count = len(segments)
+        matched: Dict[str, Subscription] = {}
+        visited: Set[Tuple[int, int]] = set()
+        stack = [(self._root, 0)]
+        
+        while stack:
+            node, index = stack.pop()
+            key = (id(node), index)
+            if key in visited:
+                continue
+            visited.add(key)
+            
+            if index == count:
+                for sub in node.subscriptions:
+                    matched[sub.id] = sub
+            
+            deep = node.children.get("**")
+            if deep is not None:
+                # "**" consumes zero or more remaining segments
+                for skip in range(index, count + 1):
+                    stack.append((deep, skip))
+            
+            if index < count:
+                for segment in (segments[index], "*"):
+                    child = node.children.get(segment)
+                    if child is not None:
+                        stack.append((child, index + 1))
+        
+        return list(matched.values())
+    
+    def clear(self) -> None:
+        self._root = self._Node()
+        self._size = 0
+
+
 class EventBus:
     """
     Internal event bus for decoupled component communication.
     
     Features:
     - Publish-subscribe pattern
-    - Wildcard event matching
+    - Wildcard topic matching ("*" and "**" segments)
     - Event filtering
     - Async and sync event handlers
     - Event prioritization
     - One-time subscriptions
+    - Bounded concurrent fan-out with per-handler timeouts
+    - Batched publishing
     - Event history and replay
+    
+    Subscription lists are kept in dispatch order on subscribe and
+    unsubscribe, and the resolved handler list for each event name is
+    cached until the subscriptions affecting it change, so publishing
+    does no sorting or pattern scanning on the hot path.
+    
+    Handlers of the same priority run concurrently; priority tiers run in
+    order, so a higher-priority handler always completes before a
+    lower-priority one starts.
     """
     
-    def __init__(self, max_history: int = 1000):
+    # Upper bound on cached event-name resolutions
+    _RESOLVED_CACHE_SIZE = 4096
+    
+    def __init__(
+        self,
+        max_history: int = 1000,
+        max_concurrency: int = 64,
+        handler_timeout: Optional[float] = None
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
         self.max_history = max_history
+        self.max_concurrency = max_concurrency
+        self.handler_timeout = handler_timeout
         self.logger = Logger(name="event.bus")
         
-        # Subscriptions by event name
+        # Exact subscriptions by event name, kept in dispatch order
         self._subscriptions: Dict[str, List[Subscription]] = {}
         
         # Wildcard subscriptions
-        self._wildcard_subscriptions: List[Subscription] = []
+        self._wildcard_subscriptions = _TopicTrie()
+        
+        # All subscriptions by ID
+        self._by_id: Dict[str, Subscription] = {}
+        
+        # Event name -> matching subscriptions in dispatch order
+        self._resolved: Dict[str, Tuple[Subscription, ...]] = {}
+        
+        self._sequence = itertools.count()
         
         # Event history
-        self._history: List[Event] = []
+        self._history: deque = deque(maxlen=max_history)
         
         # Lock for thread safety
         self._lock = asyncio.Lock()
+        
+        self._stats = {
+            "published": 0,
+            "delivered": 0,
+            "errors": 0,
+            "timeouts": 0,
+        }
     
     async def publish(
         self,
@@ -141,62 +318,178 @@ class EventBus:
         # Add to history
         self._add_to_history(event)
         
-        # Get matching subscriptions
-        subscriptions = await self._get_matching_subscriptions(event)
+        notified_count = await self._dispatch(event)
         
-        # Sort by priority
-        subscriptions.sort(key=lambda s: s.priority.value, reverse=True)
+        self.logger.debug(
+            f"Published event {event_name} to {notified_count} subscribers"
+        )
         
-        # Execute handlers
-        notified_count = 0
-        once_subscriptions: List[str] = []
+        return notified_count
+    
+    async def publish_batch(
+        self,
+        events: Iterable[Any]
+    ) -> List[int]:
+        """
+        Publish several events in order.
         
-        for subscription in subscriptions:
-            try:
-                if subscription.async_handler:
-                    await subscription.handler(event)
-                else:
-                    subscription.handler(event)
-                
-                notified_count += 1
-                
-                if subscription.once:
-                    once_subscriptions.append(subscription.id)
-                    
-            except Exception as e:
-                self.logger.error(
-                    f"Error in event handler for {event_name}: {e}",
-                    exc_info=True,
-                    extra={"subscription_id": subscription.id}
-                )
+        Each item is either an Event or a (event_name, data) tuple. Events
+        are recorded in history together and delivered one after another,
+        reusing the resolved subscriber lists across the batch.
         
-        # Remove one-time subscriptions
-        for sub_id in once_subscriptions:
-            await self.unsubscribe(sub_id)
+        Args:
+            events: Events to publish
+            
+        Returns:
+            Number of subscribers notified for each event
+        """
+        batch: List[Event] = []
+        for item in events:
+            if isinstance(item, Event):
+                batch.append(item)
+            else:
+                event_name, data = item
+                batch.append(Event(name=event_name, data=data or {}))
+        
+        self._history.extend(batch)
+        
+        counts = [await self._dispatch(event) for event in batch]
         
         self.logger.debug(
-            f"Published event {event_name} to {notified_count} subscribers"
+            f"Published batch of {len(batch)} events to {sum(counts)} subscribers"
+        )
+        
+        return counts
+    
+    async def _dispatch(self, event: Event) -> int:
+        """Deliver an event to its subscribers, one priority tier at a time."""
+        self._stats["published"] += 1
+        
+        subscriptions = self._claim(
+            event, self._get_matching_subscriptions(event)
         )
+        if not subscriptions:
+            return 0
         
+        notified_count = 0
+        tier: List[Subscription] = []
+        for subscription in subscriptions:
+            if tier and subscription.priority is not tier[0].priority:
+                notified_count += await self._run_tier(event, tier)
+                tier = []
+            tier.append(subscription)
+        notified_count += await self._run_tier(event, tier)
+        
+        self._stats["delivered"] += notified_count
         return notified_count
     
+    def _claim(
+        self,
+        event: Event,
+        subscriptions: Tuple[Subscription, ...]
+    ) -> List[Subscription]:
+        """
+        Filter subscriptions for an event and detach one-time ones.
+        
+        One-time subscriptions are removed before their handler runs, so a
+        concurrent publish cannot deliver to them a second time.
+        """
+        claimed = []
+        for subscription in subscriptions:
+            if subscription.once and subscription.id not in self._by_id:
+                continue
+            if subscription.filter_func:
+                try:
+                    if not subscription.filter_func(event):
+                        continue
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    self.logger.error(
+                        f"Error in event filter for {event.name}: {e}",
+                        exc_info=True,
+                        extra={"subscription_id": subscription.id}
+                    )
+                    continue
+            if subscription.once:
+                self._remove(subscription)
+            claimed.append(subscription)
+        return claimed
+    
+    async def _run_tier(self, event: Event, tier: List[Subscription]) -> int:
+        """Run handlers of one priority concurrently."""
+        if len(tier) == 1:
+            return int(await self._invoke(event, tier[0]))
+        
+        # Per-dispatch limit, so handlers publishing nested events can
+        # never wait on slots held by their own caller
+        semaphore = (
+            asyncio.Semaphore(self.max_concurrency)
+            if len(tier) > self.max_concurrency else None
+        )
+        
+        async def run(subscription: Subscription) -> bool:
+            if semaphore is None:
+                return await self._invoke(event, subscription)
+            async with semaphore:
+                return await self._invoke(event, subscription)
+        
+        results = await asyncio.gather(*(run(sub) for sub in tier))
+        return sum(results)
+    
+    async def _invoke(self, event: Event, subscription: Subscription) -> bool:
+        """Run a single handler, isolating its errors and timeout."""
+        timeout = (
+            subscription.timeout
+            if subscription.timeout is not None else self.handler_timeout
+        )
+        
+        try:
+            if subscription.async_handler:
+                if timeout is None:
+                    await subscription.handler(event)
+                else:
+                    await asyncio.wait_for(subscription.handler(event), timeout)
+            else:
+                subscription.handler(event)
+            return True
+            
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            self.logger.error(
+                f"Event handler for {event.name} timed out after {timeout}s",
+                extra={"subscription_id": subscription.id}
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            self.logger.error(
+                f"Error in event handler for {event.name}: {e}",
+                exc_info=True,
+                extra={"subscription_id": subscription.id}
+            )
+        
+        return False
+    
     async def subscribe(
         self,
         event_name: str,
         handler: Callable,
         priority: EventPriority = EventPriority.NORMAL,
         filter_func: Optional[Callable[[Event], bool]] = None,
-        once: bool = False
+        once: bool = False,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Subscribe to events.
         
         Args:
-            event_name: Name of the event (use "*" for all events)
+            event_name: Name of the event, or a wildcard pattern such as
+                "workflow.*" or "agent.**" (use "*" for all events)
             handler: Event handler function
             priority: Subscription priority
             filter_func: Optional filter function
             once: Whether to unsubscribe after first event
+            timeout: Handler timeout in seconds (defaults to the bus-wide
+                handler_timeout)
             
         Returns:
             Subscription ID
@@ -210,16 +503,23 @@ class EventBus:
             priority=priority,
             filter_func=filter_func,
             once=once,
-            async_handler=async_handler
+            async_handler=async_handler,
+            timeout=timeout,
+            sequence=next(self._sequence)
         )
         
         async with self._lock:
-            if event_name == "*":
-                self._wildcard_subscriptions.append(subscription)
+            if _is_pattern(event_name):
+                self._wildcard_subscriptions.add(subscription)
+                self._resolved.clear()
             else:
-                if event_name not in self._subscriptions:
-                    self._subscriptions[event_name] = []
-                self._subscriptions[event_name].append(subscription)
+                subs = self._subscriptions.setdefault(event_name, [])
+                index = bisect.bisect_right(
+                    [s.sort_key for s in subs], subscription.sort_key
+                )
+                subs.insert(index, subscription)
+                self._resolved.pop(event_name, None)
+            self._by_id[subscription.id] = subscription
         
         self.logger.debug(f"Subscribed to {event_name}: {subscription.id}")
         return subscription.id
@@ -235,48 +535,66 @@ class EventBus:
             True if unsubscribed, False if not found
         """
         async with self._lock:
-            # Check wildcard subscriptions
-            for sub in self._wildcard_subscriptions:
-                if sub.id == subscription_id:
-                    self._wildcard_subscriptions.remove(sub)
-                    return True
-            
-            # Check regular subscriptions
-            for event_name, subs in self._subscriptions.items():
-                for sub in subs:
-                    if sub.id == subscription_id:
-                        subs.remove(sub)
-                        return True
-        
-        return False
+            subscription = self._by_id.get(subscription_id)
+            if subscription is None:
+                return False
+            self._remove(subscription)
+            return True
     
-    async def _get_matching_subscriptions(
+    def _remove(self, subscription: Subscription) -> None:
+        """Detach a subscription and invalidate affected resolutions."""
+        del self._by_id[subscription.id]
+        
+        if _is_pattern(subscription.event_name):
+            self._wildcard_subscriptions.remove(subscription)
+            self._resolved.clear()
+            return
+        
+        subs = self._subscriptions.get(subscription.event_name)
+        if subs is not None:
+            subs.remove(subscription)
+            if not subs:
+                del self._subscriptions[subscription.event_name]
+        self._resolved.pop(subscription.event_name, None)
+    
+    def _get_matching_subscriptions(
         self,
         event: Event
-    ) -> List[Subscription]:
-        """Get all subscriptions matching an event."""
-        async with self._lock:
-            matching = []
-            
-            # Add wildcard subscriptions
-            for sub in self._wildcard_subscriptions:
-                if sub.matches(event):
-                    matching.append(sub)
-            
-            # Add specific event subscriptions
-            for sub in self._subscriptions.get(event.name, []):
-                if sub.matches(event):
-                    matching.append(sub)
-            
-            return matching
+    ) -> Tuple[Subscription, ...]:
+        """Get all subscriptions for an event name, in dispatch order."""
+        resolved = self._resolved.get(event.name)
+        if resolved is not None:
+            return resolved
+        
+        exact = self._subscriptions.get(event.name, ())
+        if len(self._wildcard_subscriptions):
+            wildcard = self._wildcard_subscriptions.match(event.name)
+            if wildcard:
+                wildcard.sort(key=lambda s: s.sort_key)
+                # Both inputs are already in dispatch order
+                merged: List[Subscription] = []
+                i = j = 0
+                while i < len(exact) and j < len(wildcard):
+                    if exact[i].sort_key <= wildcard[j].sort_key:
+                        merged.append(exact[i])
+                        i += 1
+                    else:
+                        merged.append(wildcard[j])
+                        j += 1
+                merged.extend(exact[i:])
+                merged.extend(wildcard[j:])
+                exact = merged
+        
+        resolved = tuple(exact)
+        if len(self._resolved) >= self._RESOLVED_CACHE_SIZE:
+            self._resolved.clear()
+        self._resolved[event.name] = resolved
+        return resolved
     
     def _add_to_history(self, event: Event) -> None:
         """Add event to history."""
+        # The deque drops the oldest entries beyond max_history
         self._history.append(event)
-        
-        # Maintain max history size
-        if len(self._history) > self.max_history:
-            self._history = self._history[-self.max_history:]
     
     def get_history(
         self,
@@ -295,7 +613,7 @@ class EventBus:
         Returns:
             List of events
         """
-        history = self._history
+        history = list(self._history)
         
         if event_name:
             history = [e for e in history if e.name == event_name]
@@ -352,27 +670,38 @@ class EventBus:
         Returns:
             Number of subscribers
         """
-        count = 0
-        
         if event_name:
-            count = len(self._subscriptions.get(event_name, []))
-        else:
-            for subs in self._subscriptions.values():
-                count += len(subs)
-            count += len(self._wildcard_subscriptions)
+            return len(self._subscriptions.get(event_name, []))
         
-        return count
+        return len(self._by_id)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get event bus statistics.
+        
+        Returns:
+            Dictionary of counters and sizes
+        """
+        return {
+            **self._stats,
+            "subscriptions": len(self._by_id),
+            "wildcard_subscriptions": len(self._wildcard_subscriptions),
+            "resolved_cache_size": len(self._resolved),
+            "history_size": len(self._history),
+        }
     
     async def clear_history(self) -> None:
         """Clear event history."""
-        self._history = []
+        self._history.clear()
         self.logger.debug("Event history cleared")
     
     async def shutdown(self) -> None:
         """Shutdown the event bus."""
         async with self._lock:
             self._subscriptions = {}
-            self._wildcard_subscriptions = []
-            self._history = []
+            self._wildcard_subscriptions.clear()
+            self._by_id = {}
+            self._resolved = {}
+            self._history.clear()
         
-        self.logger.info("Event bus shutdown")
\ No newline at end of file
+        self.logger.info("Event bus shutdown")
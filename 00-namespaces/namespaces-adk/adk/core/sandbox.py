@@ -7,10 +7,15 @@ and untrusted plugins using containers and microVMs.
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from collections import deque
+from typing import Dict, Any, Deque, Optional
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+import math
+import os
+import signal
+import sys
 import uuid
 import json
 import subprocess
@@ -74,6 +79,157 @@ class SandboxExecution:
         return self.exit_code == 0
 
 
+# Largest result line read back from a warm worker
+_WORKER_STREAM_LIMIT = 64 * 1024 * 1024
+
+
+# Warm worker loop, run with ``python -c``. Each job is one JSON line on
+# stdin; the worker forks, applies the job's resource limits in the child,
+# runs the code there and writes one JSON result line to stdout. The
+# parent interpreter stays clean, so module imports are paid once per
+# worker rather than once per execution.
+_WORKER_SOURCE = r'''
+import io, json, os, resource, sys, tempfile, traceback
+
+def run(job):
+    cwd = job.get("cwd")
+    if cwd and not os.path.isdir(cwd):
+        return {"exit_code": -1, "stdout": "", "stderr": "No such directory: %r" % cwd}
+
+    stdin = tempfile.TemporaryFile()
+    stdin.write((job.get("input") or "").encode())
+    stdin.seek(0)
+    stdout = tempfile.TemporaryFile()
+    stderr = tempfile.TemporaryFile()
+
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.dup2(stdin.fileno(), 0)
+            os.dup2(stdout.fileno(), 1)
+            os.dup2(stderr.fileno(), 2)
+            sys.stdin = io.TextIOWrapper(io.FileIO(0, "r", closefd=False))
+            sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False), write_through=True)
+            sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False), write_through=True)
+
+            memory = job.get("max_memory_bytes")
+            if memory:
+                resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+            cpu = job.get("max_cpu_seconds")
+            if cpu:
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+            if cwd:
+                os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(job.get("env") or {})
+
+            try:
+                exec(compile(job["code"], "<string>", "exec"), {"__name__": "__main__"})
+                code = 0
+            except SystemExit as e:
+                if e.code is None:
+                    code = 0
+                elif isinstance(e.code, int):
+                    code = e.code
+                else:
+                    print(e.code, file=sys.stderr)
+                    code = 1
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    if os.WIFSIGNALED(status):
+        exit_code = -os.WTERMSIG(status)
+    else:
+        exit_code = os.WEXITSTATUS(status)
+
+    result = {"exit_code": exit_code}
+    for name, handle in (("stdout", stdout), ("stderr", stderr)):
+        handle.seek(0)
+        result[name] = handle.read().decode(errors="replace")
+        handle.close()
+    stdin.close()
+    return result
+
+protocol = sys.stdout.buffer
+for line in sys.stdin.buffer:
+    try:
+        result = run(json.loads(line))
+    except Exception as e:
+        result = {"exit_code": -1, "stdout": "", "stderr": str(e)}
+    protocol.write(json.dumps(result).encode() + b"\n")
+    protocol.flush()
+'''
+
+
+class _WarmWorker:
+    """A pre-started interpreter that runs Python jobs in forked children."""
+    
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.executions = 0
+    
+    @classmethod
+    async def spawn(cls) -> "_WarmWorker":
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", _WORKER_SOURCE,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+            limit=_WORKER_STREAM_LIMIT
+        )
+        return cls(process)
+    
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+    
+    async def run(
+        self,
+        code: str,
+        config: "SandboxConfig",
+        input_data: Optional[str],
+        timeout: float
+    ) -> Dict[str, Any]:
+        limits = config.resource_limits
+        job = {
+            "code": code,
+            "input": input_data,
+            "env": config.environment,
+            "cwd": config.working_dir,
+            "max_memory_bytes": limits.max_memory_mb * 1024 * 1024,
+            "max_cpu_seconds": max(1, math.ceil(timeout))
+        }
+        self.executions += 1
+        self.process.stdin.write(json.dumps(job).encode() + b"\n")
+        
+        async def exchange() -> bytes:
+            await self.process.stdin.drain()
+            return await self.process.stdout.readline()
+        
+        line = await asyncio.wait_for(exchange(), timeout=timeout)
+        if not line:
+            raise RuntimeError("Sandbox worker exited unexpectedly")
+        return json.loads(line)
+    
+    async def stop(self) -> None:
+        """Kill the worker and any job it is running."""
+        if self.alive:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        await self.process.wait()
+
+
 class Sandbox:
     """
     Provides secure, isolated execution environments.
@@ -85,27 +241,52 @@ class Sandbox:
     - Network isolation
     - Execution logging
     - Pool management for performance
+    
+    Sandboxes are handed out in FIFO order: a released sandbox goes
+    directly to the longest-waiting caller, and callers can bound how long
+    they wait. With ``warm_workers`` enabled, Python executions run on
+    pre-started interpreters that fork per job (resource limits are applied
+    in each forked child) and are replaced after
+    ``worker_max_executions`` jobs.
     """
     
     def __init__(
         self,
         pool_size: int = 5,
-        default_config: Optional[SandboxConfig] = None
+        default_config: Optional[SandboxConfig] = None,
+        acquire_timeout: Optional[float] = None,
+        warm_workers: bool = False,
+        worker_max_executions: int = 100
     ):
         self.pool_size = pool_size
         self.default_config = default_config or SandboxConfig()
+        self.acquire_timeout = acquire_timeout
+        self.warm_workers = warm_workers and hasattr(os, "fork")
+        self.worker_max_executions = worker_max_executions
         
         self.logger = logging.getLogger(__name__)
         
         # Available sandbox pool
-        self._pool: List[str] = []
+        self._pool: Deque[str] = deque()
+        
+        # Callers waiting for a sandbox, oldest first
+        self._waiters: Deque[asyncio.Future] = deque()
         
         # Active sandboxes
         self._sandboxes: Dict[str, Dict[str, Any]] = {}
         
+        # Warm interpreters by sandbox ID
+        self._workers: Dict[str, _WarmWorker] = {}
+        
         # Execution history
         self._executions: Dict[str, SandboxExecution] = {}
         
+        self._stats = {
+            "acquire_timeouts": 0,
+            "worker_spawns": 0,
+            "worker_recycles": 0
+        }
+        
         # Initialize pool
         self._initialize_pool()
     
@@ -123,26 +304,58 @@ class Sandbox:
                 "execution_count": 0
             }
     
+    async def warm_up(self) -> None:
+        """Start warm workers for every idle sandbox ahead of use."""
+        if not self.warm_workers:
+            return
+        await asyncio.gather(*(
+            self._ensure_worker(sandbox_id)
+            for sandbox_id in list(self._pool)
+        ))
+    
     async def acquire_sandbox(
         self,
-        config: Optional[SandboxConfig] = None
+        config: Optional[SandboxConfig] = None,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Acquire a sandbox from the pool.
         
         Args:
             config: Sandbox configuration
+            timeout: Seconds to wait for a free sandbox (defaults to the
+                pool's acquire_timeout; None waits indefinitely)
             
         Returns:
             Sandbox ID
+            
+        Raises:
+            asyncio.TimeoutError: If no sandbox became free in time
         """
         config = config or self.default_config
+        timeout = timeout if timeout is not None else self.acquire_timeout
         
-        # Wait for available sandbox
-        while not self._pool:
-            await asyncio.sleep(0.1)
+        if self._pool and not self._waiters:
+            sandbox_id = self._pool.popleft()
+        else:
+            # Wait for available sandbox
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                sandbox_id = await asyncio.wait_for(waiter, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if waiter.done() and not waiter.cancelled():
+                    # Handed a sandbox just as we gave up
+                    self.release_sandbox(waiter.result())
+                else:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                if isinstance(e, asyncio.TimeoutError):
+                    self._stats["acquire_timeouts"] += 1
+                raise
         
-        sandbox_id = self._pool.pop(0)
         sandbox = self._sandboxes[sandbox_id]
         
         sandbox["state"] = SandboxState.RUNNING
@@ -163,6 +376,14 @@ class Sandbox:
             sandbox["state"] = SandboxState.READY
             sandbox["last_used"] = datetime.now()
             
+            # Hand off to the longest-waiting caller, if any
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(sandbox_id)
+                    self.logger.debug(f"Handed off sandbox: {sandbox_id}")
+                    return
+            
             self._pool.append(sandbox_id)
             self.logger.debug(f"Released sandbox: {sandbox_id}")
     
@@ -188,12 +409,21 @@ class Sandbox:
         config = config or self.default_config
         timeout = timeout or config.resource_limits.max_runtime_seconds
         
-        # Acquire sandbox
-        sandbox_id = await self.acquire_sandbox(config)
-        
         execution = SandboxExecution()
         execution.started_at = datetime.now()
         
+        # Acquire sandbox
+        try:
+            sandbox_id = await self.acquire_sandbox(config)
+        except asyncio.TimeoutError:
+            execution.error = f"No sandbox available after {self.acquire_timeout}s"
+            execution.completed_at = datetime.now()
+            execution.duration_seconds = (
+                execution.completed_at - execution.started_at
+            ).total_seconds()
+            self._executions[execution.execution_id] = execution
+            return execution
+        
         try:
             # Execute command
             result = await self._execute_command(
@@ -252,6 +482,10 @@ class Sandbox:
                 command, config, input_data, timeout
             )
         elif config.sandbox_type == SandboxType.PYTHON:
+            if self.warm_workers:
+                return await self._execute_in_worker(
+                    sandbox_id, command, config, input_data, timeout
+                )
             return await self._execute_in_python(
                 command, config, input_data, timeout
             )
@@ -316,6 +550,45 @@ class Sandbox:
             python_command, config, input_data, timeout
         )
     
+    async def _ensure_worker(self, sandbox_id: str) -> _WarmWorker:
+        """Return the sandbox's warm worker, starting one if needed."""
+        worker = self._workers.get(sandbox_id)
+        if worker is not None and worker.alive:
+            return worker
+        
+        worker = await _WarmWorker.spawn()
+        self._workers[sandbox_id] = worker
+        self._stats["worker_spawns"] += 1
+        return worker
+    
+    async def _retire_worker(self, sandbox_id: str) -> None:
+        worker = self._workers.pop(sandbox_id, None)
+        if worker is not None:
+            await worker.stop()
+    
+    async def _execute_in_worker(
+        self,
+        sandbox_id: str,
+        command: str,
+        config: SandboxConfig,
+        input_data: Optional[str],
+        timeout: int
+    ) -> Dict[str, Any]:
+        """Execute Python code on the sandbox's warm interpreter."""
+        worker = await self._ensure_worker(sandbox_id)
+        try:
+            result = await worker.run(command, config, input_data, timeout)
+        except BaseException:
+            # The worker may still be running the job; never reuse it
+            await self._retire_worker(sandbox_id)
+            raise
+        
+        if worker.executions >= self.worker_max_executions:
+            self._stats["worker_recycles"] += 1
+            await self._retire_worker(sandbox_id)
+        
+        return result
+    
     def get_execution(
         self,
         execution_id: str
@@ -329,6 +602,9 @@ class Sandbox:
             "pool_size": self.pool_size,
             "available": len(self._pool),
             "active": self.pool_size - len(self._pool),
+            "waiting": sum(1 for w in self._waiters if not w.done()),
+            "warm_workers": sum(1 for w in self._workers.values() if w.alive),
+            **self._stats,
             "total_executions": len(self._executions),
             "successful_executions": sum(
                 1 for e in self._executions.values() if e.success
@@ -341,4 +617,6 @@ class Sandbox:
     async def cleanup(self) -> None:
         """Cleanup resources."""
         self.logger.info("Cleaning up sandbox...")
-        # Would cleanup containers/microVMs here
\ No newline at end of file
+        for sandbox_id in list(self._workers):
+            await self._retire_worker(sandbox_id)
+        # Would cleanup containers/microVMs here
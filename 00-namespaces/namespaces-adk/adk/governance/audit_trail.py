@@ -3,19 +3,70 @@ Audit Trail: Maintains comprehensive, tamper-evident audit trails.
 
 This module records all agent actions, tool invocations, and
 governance events for compliance and forensic analysis.
+
+Entries are appended to rolling JSON-lines segment files and fsynced in
+batches. Every ``checkpoint_interval`` entries a Merkle root over the
+block's entry hashes is recorded, so routine verification only rehashes
+entries after the last verified checkpoint.
 """
 
+import bisect
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import time
+from typing import Dict, Any, IO, Iterator, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 import hashlib
+import threading
 
 from ..observability.logging import Logger
 
 
+def _compute_hash(
+    timestamp: datetime,
+    event_type: str,
+    agent_id: str,
+    action: str,
+    details: Dict[str, Any],
+    previous_hash: str
+) -> str:
+    """Hash the tamper-evident fields of an entry."""
+    entry_data = json.dumps({
+        "timestamp": timestamp.isoformat(),
+        "event_type": event_type,
+        "agent_id": agent_id,
+        "action": action,
+        "details": details,
+        "previous_hash": previous_hash
+    }, sort_keys=True)
+    return hashlib.sha256(entry_data.encode()).hexdigest()
+
+
+def merkle_root(hashes: List[str]) -> str:
+    """
+    Compute the Merkle root of a list of hex digests.
+
+    Leaves and interior nodes are domain-separated; an odd node at the end
+    of a level is promoted unchanged.
+    """
+    if not hashes:
+        return hashlib.sha256(b"").hexdigest()
+
+    level = [hashlib.sha256(b"\x00" + bytes.fromhex(h)).digest() for h in hashes]
+    while len(level) > 1:
+        next_level = [
+            hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0].hex()
+
+
 @dataclass
 class AuditEntry:
     """An audit log entry."""
@@ -29,7 +80,18 @@ class AuditEntry:
     details: Dict[str, Any]
     hash: str
     previous_hash: str
-    
+
+    def compute_hash(self) -> str:
+        """Recalculate this entry's hash from its contents."""
+        return _compute_hash(
+            self.timestamp,
+            self.event_type,
+            self.agent_id,
+            self.action,
+            self.details,
+            self.previous_hash
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -45,28 +107,292 @@ class AuditEntry:
             "previous_hash": self.previous_hash
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditEntry":
+        """Create from dictionary."""
+        return cls(
+            entry_id=data["entry_id"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            event_type=data["event_type"],
+            agent_id=data["agent_id"],
+            user_id=data.get("user_id"),
+            action=data["action"],
+            resource=data.get("resource"),
+            details=data.get("details", {}),
+            hash=data["hash"],
+            previous_hash=data["previous_hash"]
+        )
+
+
+@dataclass
+class AuditCheckpoint:
+    """Merkle checkpoint over a block of consecutive entries."""
+    start: int  # Index of the first entry in the block
+    end: int  # Index one past the last entry in the block
+    root: str
+    last_hash: str
+    created_at: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "start": self.start,
+            "end": self.end,
+            "root": self.root,
+            "last_hash": self.last_hash,
+            "created_at": self.created_at.isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditCheckpoint":
+        """Create from dictionary."""
+        return cls(
+            start=data["start"],
+            end=data["end"],
+            root=data["root"],
+            last_hash=data["last_hash"],
+            created_at=datetime.fromisoformat(data["created_at"])
+        )
+
+
+class _SegmentWriter:
+    """Append-only JSON-lines segment files with batched fsync."""
+
+    SEGMENT_PATTERN = "audit-*.jsonl"
+
+    def __init__(
+        self,
+        directory: Path,
+        max_entries: int,
+        max_bytes: int,
+        fsync_batch: int,
+        fsync_interval: float
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        self._file: Optional[IO[str]] = None
+        self._sequence = 0
+        self._entries = 0
+        self._bytes = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def segments(self) -> List[Path]:
+        """Segment files in append order."""
+        return sorted(self.directory.glob(self.SEGMENT_PATTERN))
+
+    def open(self) -> int:
+        """
+        Resume appending to the newest segment.
+
+        A torn final record left by a crash is cut off first, so new
+        entries start on a line of their own. Returns the bytes removed.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self.segments()
+        removed = 0
+        if segments:
+            newest = segments[-1]
+            removed = self._truncate_torn_tail(newest)
+            self._sequence = int(newest.stem.split("-")[1])
+            with open(newest, "r", encoding="utf-8") as f:
+                self._entries = sum(1 for _ in f)
+            self._bytes = newest.stat().st_size
+        else:
+            self._sequence = 1
+        self._file = open(self._path(), "a", encoding="utf-8")
+        return removed
+
+    @staticmethod
+    def _truncate_torn_tail(path: Path, chunk_size: int = 64 * 1024) -> int:
+        """Truncate ``path`` after its last newline; return the bytes removed."""
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                chunk_start = max(0, end - chunk_size)
+                f.seek(chunk_start)
+                newline = f.read(end - chunk_start).rfind(b"\n")
+                if newline >= 0:
+                    end = chunk_start + newline + 1
+                    break
+                end = chunk_start
+            if end < size:
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+        return size - end
+
+    def _path(self) -> Path:
+        return self.directory / f"audit-{self._sequence:08d}.jsonl"
+
+    def append(self, line: str) -> None:
+        if self._file is None:
+            self.open()
+        if self._entries and (
+            self._entries >= self.max_entries or self._bytes >= self.max_bytes
+        ):
+            self._roll()
+
+        self._file.write(line)
+        self._file.write("\n")
+        self._entries += 1
+        self._bytes += len(line) + 1
+        self._unsynced += 1
+
+        if (
+            self._unsynced >= self.fsync_batch
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def _roll(self) -> None:
+        self.sync()
+        self._file.close()
+        self._sequence += 1
+        self._entries = 0
+        self._bytes = 0
+        self._file = open(self._path(), "a", encoding="utf-8")
+
+    def sync(self) -> None:
+        """Flush buffered entries and fsync the active segment."""
+        if self._file is None:
+            return
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
 
 class AuditTrail:
     """
     Maintains tamper-evident audit trails.
-    
+
     Features:
     - Immutable log entries with hashing
     - Chain of integrity verification
-    - Search and export
+    - Merkle checkpoints for incremental verification
+    - Append-only segment files with batched fsync
+    - Indexed search by agent, event type and time
+    - Streaming export
     - Compliance reporting
     """
-    
-    def __init__(self, storage_path: Optional[str] = None):
+
+    CHECKPOINT_FILE = "checkpoints.jsonl"
+
+    def __init__(
+        self,
+        storage_path: Optional[str] = None,
+        checkpoint_interval: int = 1024,
+        segment_max_entries: int = 100_000,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        fsync_batch: int = 256,
+        fsync_interval: float = 1.0
+    ):
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+
         self.storage_path = Path(storage_path) if storage_path else None
+        self.checkpoint_interval = checkpoint_interval
         self.logger = Logger(name="governance.audit")
-        
+
         # In-memory storage
         self._entries: List[AuditEntry] = []
-        
+
+        # Secondary indexes (positions into _entries, ascending)
+        self._by_agent: Dict[str, List[int]] = {}
+        self._by_event_type: Dict[str, List[int]] = {}
+        self._timestamps: List[datetime] = []
+        # False once the wall clock has gone backwards between entries
+        self._time_ordered = True
+
         # Hash chain
         self._last_hash = ""
-    
+
+        # Merkle checkpoints and verification progress
+        self._checkpoints: List[AuditCheckpoint] = []
+        self._verified_upto = 0
+
+        self._lock = threading.RLock()
+
+        self._writer: Optional[_SegmentWriter] = None
+        if self.storage_path:
+            self._writer = _SegmentWriter(
+                self.storage_path,
+                max_entries=segment_max_entries,
+                max_bytes=segment_max_bytes,
+                fsync_batch=fsync_batch,
+                fsync_interval=fsync_interval
+            )
+            removed = self._writer.open()
+            if removed:
+                self.logger.warning(
+                    f"Removed {removed} bytes of a torn audit record"
+                )
+            self._load()
+
+    def _load(self) -> None:
+        """Rebuild state from existing segments and checkpoints."""
+        for segment in self._writer.segments():
+            with open(segment, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = AuditEntry.from_dict(json.loads(line))
+                    except (ValueError, KeyError) as e:
+                        # Torn tails are cut on open, so this is corruption
+                        self.logger.error(
+                            f"Skipping unreadable audit record in {segment.name}: {e}"
+                        )
+                        continue
+                    self._index(entry)
+
+        if self._entries:
+            self._last_hash = self._entries[-1].hash
+
+        checkpoint_file = self.storage_path / self.CHECKPOINT_FILE
+        if checkpoint_file.exists():
+            # A crash while appending a checkpoint leaves a torn last line
+            removed = _SegmentWriter._truncate_torn_tail(checkpoint_file)
+            if removed:
+                self.logger.warning(
+                    f"Removed {removed} bytes of a torn audit checkpoint"
+                )
+            with open(checkpoint_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        checkpoint = AuditCheckpoint.from_dict(json.loads(line))
+                    except (ValueError, KeyError) as e:
+                        self.logger.error(
+                            f"Skipping unreadable audit checkpoint: {e}"
+                        )
+                        continue
+                    self._checkpoints.append(checkpoint)
+
+    def _index(self, entry: AuditEntry) -> None:
+        position = len(self._entries)
+        self._entries.append(entry)
+        self._by_agent.setdefault(entry.agent_id, []).append(position)
+        self._by_event_type.setdefault(entry.event_type, []).append(position)
+        if self._timestamps and entry.timestamp < self._timestamps[-1]:
+            self._time_ordered = False
+        self._timestamps.append(entry.timestamp)
+
     def log(
         self,
         event_type: str,
@@ -77,55 +403,80 @@ class AuditTrail:
         resource: Optional[str] = None
     ) -> AuditEntry:
         """Log an audit event."""
-        entry_id = f"{datetime.now().timestamp()}_{action}_{agent_id}"
-        
-        # Create entry
-        entry = AuditEntry(
-            entry_id=entry_id,
-            timestamp=datetime.now(),
-            event_type=event_type,
-            agent_id=agent_id,
-            user_id=user_id,
-            action=action,
-            resource=resource,
-            details=details,
-            hash="",  # Will be calculated
-            previous_hash=self._last_hash
-        )
-        
-        # Calculate hash
-        entry_data = json.dumps({
-            "timestamp": entry.timestamp.isoformat(),
-            "event_type": entry.event_type,
-            "agent_id": entry.agent_id,
-            "action": entry.action,
-            "details": entry.details,
-            "previous_hash": entry.previous_hash
-        }, sort_keys=True)
-        
-        entry.hash = hashlib.sha256(entry_data.encode()).hexdigest()
-        self._last_hash = entry.hash
-        
-        # Store entry
-        self._entries.append(entry)
-        
-        # Persist if storage path provided
-        if self.storage_path:
-            self._persist_entry(entry)
-        
+        with self._lock:
+            timestamp = datetime.now()
+            entry_id = f"{timestamp.timestamp()}_{action}_{agent_id}"
+
+            # Create entry
+            entry = AuditEntry(
+                entry_id=entry_id,
+                timestamp=timestamp,
+                event_type=event_type,
+                agent_id=agent_id,
+                user_id=user_id,
+                action=action,
+                resource=resource,
+                details=details,
+                hash="",  # Will be calculated
+                previous_hash=self._last_hash
+            )
+
+            # Calculate hash
+            entry.hash = entry.compute_hash()
+            self._last_hash = entry.hash
+
+            # Store entry
+            self._index(entry)
+
+            # Persist if storage path provided
+            if self._writer:
+                self._persist_entry(entry)
+
+            if len(self._entries) % self.checkpoint_interval == 0:
+                self._checkpoint()
+
         return entry
-    
+
     def _persist_entry(self, entry: AuditEntry) -> None:
-        """Persist entry to file."""
-        if not self.storage_path:
-            return
-        
-        self.storage_path.mkdir(parents=True, exist_ok=True)
-        
-        file_path = self.storage_path / f"{entry.entry_id}.json"
-        with open(file_path, 'w') as f:
-            json.dump(entry.to_dict(), f, indent=2)
-    
+        """Append entry to the active segment."""
+        self._writer.append(json.dumps(entry.to_dict(), separators=(",", ":")))
+
+    def _checkpoint(self) -> None:
+        """Record a Merkle checkpoint over the latest full block."""
+        end = len(self._entries)
+        start = end - self.checkpoint_interval
+        checkpoint = AuditCheckpoint(
+            start=start,
+            end=end,
+            root=merkle_root([e.hash for e in self._entries[start:end]]),
+            last_hash=self._entries[end - 1].hash
+        )
+        self._checkpoints.append(checkpoint)
+
+        if self._writer:
+            # Entries must be durable before the checkpoint that covers them
+            self._writer.sync()
+            with open(self.storage_path / self.CHECKPOINT_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(checkpoint.to_dict()) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def flush(self) -> None:
+        """Force buffered entries to disk."""
+        with self._lock:
+            if self._writer:
+                self._writer.sync()
+
+    def close(self) -> None:
+        """Flush and close the segment files."""
+        with self._lock:
+            if self._writer:
+                self._writer.close()
+
+    def get_checkpoints(self) -> List[AuditCheckpoint]:
+        """Get recorded Merkle checkpoints."""
+        return list(self._checkpoints)
+
     def query(
         self,
         agent_id: Optional[str] = None,
@@ -134,51 +485,145 @@ class AuditTrail:
         end_time: Optional[datetime] = None,
         limit: int = 100
     ) -> List[AuditEntry]:
-        """Query audit entries."""
-        entries = self._entries
-        
+        """
+        Query audit entries.
+
+        Uses the agent and event type indexes to pick candidates and the
+        time index to bound them; returns the most recent ``limit`` matches
+        in log order.
+
+        Timestamps come from the local wall clock. While they never go
+        backwards (an NTP step or a DST change can do that) the time
+        window is a contiguous range found by bisection; after that,
+        candidates are filtered by timestamp instead.
+        """
+        if limit <= 0:
+            return []
+
+        filter_time = not self._time_ordered and (start_time or end_time)
+        if filter_time:
+            lo, hi = 0, len(self._entries)
+        else:
+            lo = bisect.bisect_left(self._timestamps, start_time) if start_time else 0
+            hi = bisect.bisect_right(self._timestamps, end_time) if end_time else len(self._entries)
+            if lo >= hi:
+                return []
+
+        candidates = []
         if agent_id:
-            entries = [e for e in entries if e.agent_id == agent_id]
-        
+            candidates.append(self._by_agent.get(agent_id, []))
         if event_type:
-            entries = [e for e in entries if e.event_type == event_type]
-        
-        if start_time:
-            entries = [e for e in entries if e.timestamp >= start_time]
-        
-        if end_time:
-            entries = [e for e in entries if e.timestamp <= end_time]
-        
-        return entries[-limit:]
-    
-    def verify_integrity(self) -> bool:
-        """Verify hash chain integrity."""
-        for i, entry in enumerate(self._entries):
-            if i > 0:
-                previous_entry = self._entries[i - 1]
-                if entry.previous_hash != previous_entry.hash:
+            candidates.append(self._by_event_type.get(event_type, []))
+
+        if not candidates and not filter_time:
+            return self._entries[max(lo, hi - limit):hi]
+
+        # Walk the smallest index backwards from the end of the window
+        if candidates:
+            candidates.sort(key=len)
+            positions = candidates[0]
+            stop = bisect.bisect_left(positions, lo)
+            start = bisect.bisect_left(positions, hi)
+        else:
+            positions = range(len(self._entries))
+            stop, start = lo, hi
+
+        results = []
+        for i in range(start - 1, stop - 1, -1):
+            entry = self._entries[positions[i]]
+            if agent_id and entry.agent_id != agent_id:
+                continue
+            if event_type and entry.event_type != event_type:
+                continue
+            if filter_time and (
+                (start_time and entry.timestamp < start_time)
+                or (end_time and entry.timestamp > end_time)
+            ):
+                continue
+            results.append(entry)
+            if len(results) >= limit:
+                break
+
+        results.reverse()
+        return results
+
+    def verify_integrity(self, full: bool = False) -> bool:
+        """
+        Verify hash chain integrity.
+
+        By default only entries after the last verified checkpoint are
+        rehashed; blocks covered by a checkpoint are checked against its
+        Merkle root and then skipped on later calls. Pass ``full=True``
+        to rehash the whole chain.
+        """
+        with self._lock:
+            start = 0 if full else self._verified_upto
+            end = len(self._entries)
+
+            for i in range(start, end):
+                entry = self._entries[i]
+                expected_previous = self._entries[i - 1].hash if i > 0 else ""
+                if i > 0 and entry.previous_hash != expected_previous:
                     self.logger.error(
                         f"Hash chain broken at entry {entry.entry_id}"
                     )
                     return False
-            
-            # Recalculate hash
-            entry_data = json.dumps({
-                "timestamp": entry.timestamp.isoformat(),
-                "event_type": entry.event_type,
-                "agent_id": entry.agent_id,
-                "action": entry.action,
-                "details": entry.details,
-                "previous_hash": entry.previous_hash
-            }, sort_keys=True)
-            
-            calculated_hash = hashlib.sha256(entry_data.encode()).hexdigest()
-            if calculated_hash != entry.hash:
-                self.logger.error(f"Hash mismatch for entry {entry.entry_id}")
-                return False
-        
+
+                # Recalculate hash
+                if entry.compute_hash() != entry.hash:
+                    self.logger.error(f"Hash mismatch for entry {entry.entry_id}")
+                    return False
+
+            verified = start
+            first = bisect.bisect_right([c.end for c in self._checkpoints], start)
+            for checkpoint in self._checkpoints[first:]:
+                if checkpoint.end > end:
+                    break
+                block = self._entries[checkpoint.start:checkpoint.end]
+                if (
+                    merkle_root([e.hash for e in block]) != checkpoint.root
+                    or block[-1].hash != checkpoint.last_hash
+                ):
+                    self.logger.error(
+                        f"Merkle checkpoint mismatch for entries "
+                        f"{checkpoint.start}-{checkpoint.end}"
+                    )
+                    return False
+                verified = checkpoint.end
+
+            self._verified_upto = max(self._verified_upto, verified)
+
         return True
-    
+
+    def iter_export(self, format: str = "jsonl") -> Iterator[str]:
+        """
+        Stream the audit trail as text chunks.
+
+        Args:
+            format: "jsonl" (one entry per line) or "json" (a JSON array)
+        """
+        if format == "jsonl":
+            for entry in self._entries:
+                yield json.dumps(entry.to_dict()) + "\n"
+        elif format == "json":
+            yield "["
+            for i, entry in enumerate(self._entries):
+                yield ("," if i else "") + "\n  " + json.dumps(entry.to_dict())
+            yield "\n]" if self._entries else "]"
+        else:
+            raise ValueError(f"Unsupported export format: {format}")
+
+    def export_to(self, stream: IO[str], format: str = "jsonl") -> int:
+        """
+        Write the audit trail to a text stream without building it in memory.
+
+        Returns:
+            Number of entries written
+        """
+        for chunk in self.iter_export(format):
+            stream.write(chunk)
+        return len(self._entries)
+
     def export(self, format: str = "json") -> str:
         """Export audit trail."""
         if format == "json":
@@ -186,5 +631,7 @@ class AuditTrail:
                 [e.to_dict() for e in self._entries],
                 indent=2
             )
+        elif format == "jsonl":
+            return "".join(self.iter_export("jsonl"))
         else:
-            raise ValueError(f"Unsupported export format: {format}")
\ No newline at end of file
+            raise ValueError(f"Unsupported export format: {format}")
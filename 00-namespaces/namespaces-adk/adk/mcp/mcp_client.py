@@ -45,8 +45,8 @@ class MCPTool:
     name: str
     description: str
     input_schema: Dict[str, Any]
-    output_schema: Optional[Dict[str, Any]] = None
     server_id: str
+    output_schema: Optional[Dict[str, Any]] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -6,8 +6,13 @@ for tool invocations across multiple MCP servers and local tools.
 """
 
 import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Callable, Set
+import random
+import statistics
+import time
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -25,6 +30,7 @@ class RoutingStrategy(Enum):
     LEAST_LOADED = "least_loaded"
     PRIORITY = "priority"
     AFFINITY = "affinity"
+    POWER_OF_TWO = "power_of_two"
 
 
 @dataclass
@@ -35,11 +41,53 @@ class ToolEndpoint:
     priority: int = 0
     enabled: bool = True
     tags: Set[str] = field(default_factory=set)
-    load: int = 0
+    load: int = 0  # Calls currently in flight
     last_used: Optional[datetime] = None
+    ewma_latency: Optional[float] = None  # Seconds
+    total_calls: int = 0
+    total_failures: int = 0
+    consecutive_failures: int = 0
+    ejection_count: int = 0
+    ejected_until: Optional[float] = None  # time.monotonic() deadline
     
     def __hash__(self):
         return hash((self.tool_name, self.server_id))
+    
+    def record(
+        self,
+        latency: float,
+        success: bool,
+        alpha: float,
+        failure_latency: float = 0.0
+    ) -> None:
+        """
+        Fold a completed call into the live statistics.
+        
+        A failed call is charged at least ``failure_latency`` so that an
+        endpoint failing fast does not look like the cheapest one.
+        """
+        if not success:
+            latency = max(latency, failure_latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += alpha * (latency - self.ewma_latency)
+        
+        self.total_calls += 1
+        self.last_used = datetime.now()
+        if success:
+            self.consecutive_failures = 0
+        else:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+    
+    def is_ejected(self, now: float) -> bool:
+        """Whether the endpoint is currently ejected as an outlier."""
+        return self.ejected_until is not None and now < self.ejected_until
+    
+    def cost(self) -> float:
+        """Expected cost of sending one more call here."""
+        return (self.ewma_latency or 0.0) * (self.load + 1)
 
 
 @dataclass
@@ -51,6 +99,46 @@ class RoutingPolicy:
     timeout: int = 30
     require_permission: bool = True
     allowed_tags: Set[str] = field(default_factory=set)
+    # Outlier ejection
+    ejection_consecutive_failures: int = 5
+    ejection_latency_factor: float = 3.0  # x median EWMA of peers; 0 disables
+    ejection_min_calls: int = 10
+    ejection_base_seconds: float = 30.0
+    ejection_max_seconds: float = 300.0
+    max_ejection_percent: float = 0.5
+
+
+# Virtual nodes per endpoint on the affinity hash ring
+_RING_REPLICAS = 64
+
+
+def _hash_key(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class _CandidateSet:
+    """Cached routable endpoints of one tool."""
+    
+    __slots__ = ("endpoints", "valid_until", "_ring")
+    
+    def __init__(self, endpoints: List[ToolEndpoint], valid_until: float):
+        self.endpoints = endpoints
+        self.valid_until = valid_until
+        self._ring: Optional[Tuple[List[int], List[ToolEndpoint]]] = None
+    
+    def ring(self) -> Tuple[List[int], List[ToolEndpoint]]:
+        """Consistent-hash ring over the candidates, built on first use."""
+        if self._ring is None:
+            points = sorted(
+                (_hash_key(f"{endpoint.server_id}#{replica}"), index)
+                for index, endpoint in enumerate(self.endpoints)
+                for replica in range(_RING_REPLICAS)
+            )
+            self._ring = (
+                [point for point, _ in points],
+                [self.endpoints[index] for _, index in points]
+            )
+        return self._ring
 
 
 class ToolRouter:
@@ -62,25 +150,31 @@ class ToolRouter:
     - Multiple routing strategies
     - Fallback and retry logic
     - Permission enforcement
-    - Load balancing
-    - Health checking
+    - Load balancing on live latency and in-flight calls
+    - Outlier ejection
     """
     
     def __init__(
         self,
         mcp_client: MCPClient,
         security: Optional[MCPSecurity] = None,
-        tracer: Optional[Tracer] = None
+        tracer: Optional[Tracer] = None,
+        latency_alpha: float = 0.2
     ):
         self.mcp_client = mcp_client
         self.security = security
         self.tracer = tracer or Tracer()
+        self.latency_alpha = latency_alpha
         
         self.logger = Logger(name="tool.router")
         
         # Tool registry
         self._tool_endpoints: Dict[str, List[ToolEndpoint]] = {}
         
+        # Routable endpoints per tool, rebuilt on registry changes,
+        # ejections and readmissions
+        self._candidates: Dict[str, _CandidateSet] = {}
+        
         # Routing policies
         self._policies: Dict[str, RoutingPolicy] = {}
         
@@ -89,6 +183,8 @@ class ToolRouter:
         
         # Round-robin index
         self._round_robin_index: Dict[str, int] = {}
+        
+        self._random = random.Random()
     
     def register_endpoint(
         self,
@@ -126,6 +222,7 @@ class ToolRouter:
             key=lambda e: e.priority,
             reverse=True
         )
+        self._candidates.pop(tool_name, None)
         
         self.logger.debug(f"Registered endpoint: {tool_name}@{server_id}")
     
@@ -162,14 +259,41 @@ class ToolRouter:
         if tool_name not in self._tool_endpoints:
             return False
         
-        self._tool_endpoints[tool_name] = [
-            e for e in self._tool_endpoints[tool_name]
-            if not (e.tool_name == tool_name and e.server_id == server_id)
-        ]
+        endpoints = self._tool_endpoints[tool_name]
+        remaining = [e for e in endpoints if e.server_id != server_id]
+        if len(remaining) == len(endpoints):
+            return False
+        
+        self._tool_endpoints[tool_name] = remaining
+        self._candidates.pop(tool_name, None)
         
         self.logger.debug(f"Unregistered endpoint: {tool_name}@{server_id}")
         return True
     
+    def set_endpoint_enabled(
+        self,
+        tool_name: str,
+        server_id: str,
+        enabled: bool
+    ) -> bool:
+        """
+        Enable or disable a tool endpoint.
+        
+        Args:
+            tool_name: Name of the tool
+            server_id: Server ID
+            enabled: Whether endpoint is enabled
+            
+        Returns:
+            True if updated, False if not found
+        """
+        for endpoint in self._tool_endpoints.get(tool_name, []):
+            if endpoint.server_id == server_id:
+                endpoint.enabled = enabled
+                self._candidates.pop(tool_name, None)
+                return True
+        return False
+    
     def set_policy(
         self,
         tool_name: str,
@@ -202,7 +326,8 @@ class ToolRouter:
         Args:
             tool_name: Name of the tool
             arguments: Tool arguments
-            context: Execution context
+            context: Execution context; "affinity_key", "session_id" or
+                "agent_id" pin calls under the AFFINITY strategy
             server_id: Specific server ID (optional)
             
         Returns:
@@ -235,7 +360,7 @@ class ToolRouter:
                     )
             
             # Select endpoint
-            endpoint = self._select_endpoint(tool_name, server_id, policy)
+            endpoint = self._select_endpoint(tool_name, server_id, policy, context)
             
             if not endpoint:
                 return MCPToolResult(
@@ -255,17 +380,42 @@ class ToolRouter:
         finally:
             self.tracer.end_span(span)
     
+    def _get_candidates(self, tool_name: str) -> _CandidateSet:
+        """Get the cached routable endpoints of a tool."""
+        now = time.monotonic()
+        candidates = self._candidates.get(tool_name)
+        if candidates is not None and now < candidates.valid_until:
+            return candidates
+        
+        endpoints = []
+        valid_until = float("inf")
+        for endpoint in self._tool_endpoints.get(tool_name, []):
+            if not endpoint.enabled:
+                continue
+            if endpoint.is_ejected(now):
+                # Rebuild once the earliest ejection ends
+                valid_until = min(valid_until, endpoint.ejected_until)
+            else:
+                endpoint.ejected_until = None
+                endpoints.append(endpoint)
+        
+        candidates = _CandidateSet(endpoints, valid_until)
+        self._candidates[tool_name] = candidates
+        return candidates
+    
     def _select_endpoint(
         self,
         tool_name: str,
         preferred_server_id: Optional[str],
-        policy: RoutingPolicy
+        policy: RoutingPolicy,
+        context: Optional[Dict[str, Any]] = None,
+        exclude: Optional[Set[ToolEndpoint]] = None
     ) -> Optional[ToolEndpoint]:
         """Select an endpoint based on routing strategy."""
-        endpoints = self._tool_endpoints.get(tool_name, [])
-        
-        # Filter by enabled status
-        endpoints = [e for e in endpoints if e.enabled]
+        candidates = self._get_candidates(tool_name)
+        endpoints = candidates.endpoints
+        if exclude:
+            endpoints = [e for e in endpoints if e not in exclude]
         
         if not endpoints:
             return None
@@ -289,14 +439,103 @@ class ToolRouter:
             return endpoints[index]
         
         elif policy.strategy == RoutingStrategy.LEAST_LOADED:
-            return min(endpoints, key=lambda e: e.load)
+            return min(endpoints, key=lambda e: (e.load, e.ewma_latency or 0.0))
         
         elif policy.strategy == RoutingStrategy.AFFINITY:
-            # Would implement affinity logic
-            return endpoints[0]
+            key = self._affinity_key(context)
+            if key is not None:
+                return self._select_by_hash(candidates, key, exclude)
+            return self._select_power_of_two(endpoints)
+        
+        elif policy.strategy == RoutingStrategy.POWER_OF_TWO:
+            return self._select_power_of_two(endpoints)
         
         return endpoints[0]
     
+    @staticmethod
+    def _affinity_key(context: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Extract the affinity key from the execution context."""
+        if not context:
+            return None
+        for name in ("affinity_key", "session_id", "agent_id"):
+            value = context.get(name)
+            if value is not None:
+                return str(value)
+        return None
+    
+    def _select_power_of_two(self, endpoints: List[ToolEndpoint]) -> ToolEndpoint:
+        """Pick the cheaper of two random endpoints."""
+        if len(endpoints) == 1:
+            return endpoints[0]
+        first, second = self._random.sample(endpoints, 2)
+        return first if first.cost() <= second.cost() else second
+    
+    @staticmethod
+    def _select_by_hash(
+        candidates: _CandidateSet,
+        key: str,
+        exclude: Optional[Set[ToolEndpoint]]
+    ) -> ToolEndpoint:
+        """Walk the hash ring clockwise from the key to the first usable endpoint."""
+        points, owners = candidates.ring()
+        start = bisect_left(points, _hash_key(key))
+        for offset in range(len(points)):
+            endpoint = owners[(start + offset) % len(points)]
+            if not exclude or endpoint not in exclude:
+                return endpoint
+        raise LookupError(key)  # Unreachable: caller checked for a usable endpoint
+    
+    def _update_ejection(
+        self,
+        endpoint: ToolEndpoint,
+        policy: RoutingPolicy
+    ) -> None:
+        """Eject an endpoint that keeps failing or is much slower than its peers."""
+        reason = None
+        if (
+            policy.ejection_consecutive_failures
+            and endpoint.consecutive_failures >= policy.ejection_consecutive_failures
+        ):
+            reason = f"{endpoint.consecutive_failures} consecutive failures"
+        elif policy.ejection_latency_factor and endpoint.total_calls >= policy.ejection_min_calls:
+            peers = [
+                e.ewma_latency for e in self._get_candidates(endpoint.tool_name).endpoints
+                if e is not endpoint and e.ewma_latency is not None
+            ]
+            if peers:
+                median = statistics.median(peers)
+                if median > 0 and endpoint.ewma_latency > policy.ejection_latency_factor * median:
+                    reason = (
+                        f"latency {endpoint.ewma_latency * 1000:.1f}ms vs "
+                        f"peer median {median * 1000:.1f}ms"
+                    )
+        if reason is None:
+            return
+        
+        now = time.monotonic()
+        if endpoint.is_ejected(now):
+            return
+        endpoints = [e for e in self._tool_endpoints.get(endpoint.tool_name, []) if e.enabled]
+        ejected = sum(1 for e in endpoints if e.is_ejected(now))
+        # Never eject the last routable endpoint
+        allowed = min(int(len(endpoints) * policy.max_ejection_percent), len(endpoints) - 1)
+        if ejected >= allowed:
+            return
+        
+        endpoint.ejection_count += 1
+        endpoint.ejected_until = now + min(
+            policy.ejection_base_seconds * endpoint.ejection_count,
+            policy.ejection_max_seconds
+        )
+        # Start afresh once readmitted
+        endpoint.consecutive_failures = 0
+        endpoint.ewma_latency = None
+        self._candidates.pop(endpoint.tool_name, None)
+        
+        self.logger.warning(
+            f"Ejected endpoint {endpoint.tool_name}@{endpoint.server_id}: {reason}"
+        )
+    
     async def _call_tool_with_retry(
         self,
         endpoint: ToolEndpoint,
@@ -306,47 +545,57 @@ class ToolRouter:
     ) -> MCPToolResult:
         """Call tool with retry logic."""
         last_error = None
+        tried: Set[ToolEndpoint] = set()
         
         for attempt in range(policy.max_retries):
+            tool_call = MCPToolCall(
+                tool_name=endpoint.tool_name,
+                arguments=arguments,
+                server_id=endpoint.server_id,
+                timeout=policy.timeout
+            )
+            
+            endpoint.load += 1
+            start = time.perf_counter()
+            result = None
             try:
-                # Update load
-                endpoint.load += 1
-                
-                # Call tool
-                tool_call = MCPToolCall(
-                    tool_name=endpoint.tool_name,
-                    arguments=arguments,
-                    server_id=endpoint.server_id,
-                    timeout=policy.timeout
-                )
-                
                 result = await self.mcp_client.call_tool(tool_call)
-                
-                # Update endpoint stats
-                endpoint.last_used = datetime.now()
-                endpoint.load -= 1
-                
-                if result.success or not policy.fallback_enabled:
-                    return result
-                
-                last_error = result.error
-                
-                # Try next endpoint
-                endpoint.enabled = False
-                next_endpoint = self._select_endpoint(
-                    endpoint.tool_name,
-                    None,
-                    policy
-                )
-                
-                if not next_endpoint:
-                    break
-                
-                endpoint = next_endpoint
-                
             except Exception as e:
                 last_error = str(e)
+            finally:
                 endpoint.load -= 1
+            
+            success = result is not None and result.success
+            endpoint.record(
+                time.perf_counter() - start,
+                success,
+                self.latency_alpha,
+                failure_latency=float(policy.timeout)
+            )
+            self._update_ejection(endpoint, policy)
+            
+            if result is not None:
+                if success or not policy.fallback_enabled:
+                    return result
+                last_error = result.error
+            elif not policy.fallback_enabled:
+                # Transport errors are retried on the same endpoint
+                continue
+            
+            # Try next endpoint, preferring ones not tried yet
+            tried.add(endpoint)
+            next_endpoint = self._select_endpoint(
+                endpoint.tool_name,
+                None,
+                policy,
+                context,
+                exclude=tried
+            ) or self._select_endpoint(endpoint.tool_name, None, policy, context)
+            
+            if not next_endpoint:
+                break
+            
+            endpoint = next_endpoint
         
         return MCPToolResult(
             call_id=str(uuid.uuid4()),
@@ -401,20 +650,29 @@ class ToolRouter:
     def get_tool_stats(self, tool_name: str) -> Dict[str, Any]:
         """Get statistics for a tool."""
         endpoints = self._tool_endpoints.get(tool_name, [])
+        now = time.monotonic()
         
         return {
             "tool_name": tool_name,
             "endpoint_count": len(endpoints),
             "enabled_endpoints": sum(1 for e in endpoints if e.enabled),
+            "ejected_endpoints": sum(1 for e in endpoints if e.is_ejected(now)),
             "total_load": sum(e.load for e in endpoints),
             "endpoints": [
                 {
                     "server_id": e.server_id,
                     "enabled": e.enabled,
+                    "ejected": e.is_ejected(now),
                     "load": e.load,
                     "priority": e.priority,
+                    "ewma_latency_ms": (
+                        e.ewma_latency * 1000 if e.ewma_latency is not None else None
+                    ),
+                    "total_calls": e.total_calls,
+                    "total_failures": e.total_failures,
+                    "ejection_count": e.ejection_count,
                     "last_used": e.last_used.isoformat() if e.last_used else None
                 }
                 for e in endpoints
             ]
-        }
\ No newline at end of file
+        }
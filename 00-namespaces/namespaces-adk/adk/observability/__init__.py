@@ -12,6 +12,8 @@ from .metrics import (
     MetricsCollector,
     Metric,
     MetricType,
+    Histogram,
+    QuantileSketch,
     Timer
 )
 from .event_schema import (
@@ -36,6 +38,8 @@ __all__ = [
     "MetricsCollector",
     "Metric",
     "MetricType",
+    "Histogram",
+    "QuantileSketch",
     "Timer",
     
     # Event Schemas
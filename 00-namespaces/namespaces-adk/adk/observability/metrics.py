@@ -5,9 +5,12 @@ This module provides metrics collection for performance monitoring
 and operational visibility.
 """
 
+import bisect
+import itertools
 import logging
+import math
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -34,6 +37,205 @@ class Metric:
     help_text: str = ""
 
 
+# Default histogram buckets (seconds), matching the Prometheus client defaults
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+
+# Quantiles exported for summaries
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Smallest magnitude mapped to a logarithmic bin; smaller values count as zero
+_MIN_INDEXABLE = 1e-9
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+    
+    Memory is proportional to the number of buckets, not observations.
+    Bucket counts are stored per bucket and made cumulative on export.
+    """
+    
+    __slots__ = ("bounds", "counts", "sum", "count")
+    
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        # One extra slot for the implicit +Inf bucket
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def merge(self, other: "Histogram") -> None:
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different buckets")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+    
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, cumulative count) pairs, ending with +Inf."""
+        result = []
+        total = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch (DDSketch).
+    
+    Values are mapped to logarithmic bins so that every quantile estimate
+    is within ``relative_accuracy`` of the true value. When the number of
+    bins exceeds ``max_bins`` the lowest bins are collapsed, which keeps
+    memory bounded and only affects accuracy of the smallest quantiles.
+    """
+    
+    __slots__ = (
+        "relative_accuracy", "max_bins", "_gamma", "_log_gamma",
+        "_positive", "_negative", "_zero", "count", "sum", "min", "max"
+    )
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+    
+    def _value(self, key: int) -> float:
+        # Midpoint of the bin in relative terms
+        return 2 * self._gamma ** key / (self._gamma + 1)
+    
+    def observe(self, value: float) -> None:
+        if value > _MIN_INDEXABLE:
+            store = self._positive
+            key = self._key(value)
+        elif value < -_MIN_INDEXABLE:
+            store = self._negative
+            key = self._key(-value)
+        else:
+            store = None
+        
+        if store is None:
+            self._zero += 1
+        else:
+            store[key] = store.get(key, 0) + 1
+            if len(store) > self.max_bins:
+                self._collapse(store)
+        
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def _collapse(self, store: Dict[int, int]) -> None:
+        """Fold the lowest-magnitude bins together to respect max_bins."""
+        keys = sorted(store)
+        excess = len(keys) - self.max_bins + 1
+        target = keys[excess]
+        folded = sum(store.pop(key) for key in keys[:excess])
+        store[target] += folded
+    
+    def merge(self, other: "QuantileSketch") -> None:
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for mine, theirs in ((self._positive, other._positive),
+                             (self._negative, other._negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+            if len(mine) > self.max_bins:
+                self._collapse(mine)
+        self._zero += other._zero
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1)."""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        
+        rank = q * (self.count - 1)
+        seen = 0
+        
+        # Negative values, largest magnitude first
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                return max(-self._value(key), self.min)
+        
+        seen += self._zero
+        if seen > rank:
+            return 0.0
+        
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen > rank:
+                return min(self._value(key), self.max)
+        
+        return self.max
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the Prometheus text format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_tuple: tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(label_tuple)
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class _Stripe:
+    """One shard of histogram and summary state, guarded by its own lock."""
+    
+    __slots__ = ("lock", "histograms", "summaries")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self.summaries: Dict[Tuple[str, tuple], QuantileSketch] = {}
+
+
 class MetricsCollector:
     """
     Collects and exposes runtime metrics.
@@ -43,16 +245,34 @@ class MetricsCollector:
     - Label-based filtering
     - Prometheus-compatible export
     - Real-time monitoring
+    
+    Histograms use fixed buckets and summaries use mergeable quantile
+    sketches, so memory stays bounded no matter how many values are
+    observed. Observations are spread over lock stripes (one per thread,
+    assigned round-robin) and merged when read or exported.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        default_buckets: Sequence[float] = DEFAULT_BUCKETS,
+        summary_quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        relative_accuracy: float = 0.01,
+        stripes: int = 8
+    ):
         self.logger = logging.getLogger(__name__)
+        self.default_buckets = tuple(sorted(default_buckets))
+        self.summary_quantiles = tuple(summary_quantiles)
+        self.relative_accuracy = relative_accuracy
         
         # Metric storage
-        self._counters: Dict[str, Dict[tuple, float]] = defaultdict(lambda: 0.0)
-        self._gauges: Dict[str, Dict[tuple, float]] = {}
-        self._histograms: Dict[str, Dict[tuple, List[float]]] = defaultdict(list)
-        self._summaries: Dict[str, Dict[tuple, List[float]]] = defaultdict(list)
+        self._counters: Dict[str, Dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[tuple, float]] = defaultdict(dict)
+        self._stripes = [_Stripe() for _ in range(max(1, stripes))]
+        self._stripe_counter = itertools.count()
+        self._local = threading.local()
+        
+        # Per-histogram bucket layout
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
         
         # Lock for thread safety
         self._lock = threading.Lock()
@@ -60,6 +280,14 @@ class MetricsCollector:
         # Metric help text
         self._help_text: Dict[str, str] = {}
     
+    def _stripe(self) -> _Stripe:
+        """The calling thread's stripe."""
+        index = getattr(self._local, "index", None)
+        if index is None:
+            index = next(self._stripe_counter) % len(self._stripes)
+            self._local.index = index
+        return self._stripes[index]
+    
     def increment_counter(
         self,
         name: str,
@@ -92,6 +320,28 @@ class MetricsCollector:
         if help_text:
             self._help_text[name] = help_text
     
+    def register_histogram(
+        self,
+        name: str,
+        buckets: Sequence[float],
+        help_text: str = ""
+    ) -> None:
+        """
+        Declare the bucket layout of a histogram.
+        
+        Must be called before the first observation; histograms that are
+        not registered use the collector's default buckets.
+        """
+        bounds = tuple(sorted(b for b in buckets if not math.isinf(b)))
+        with self._lock:
+            current = self._buckets.get(name)
+            if current is not None and current != bounds:
+                raise ValueError(f"Histogram {name} already uses different buckets")
+            self._buckets[name] = bounds
+        
+        if help_text:
+            self._help_text[name] = help_text
+    
     def observe_histogram(
         self,
         name: str,
@@ -101,9 +351,15 @@ class MetricsCollector:
     ) -> None:
         """Observe a histogram metric."""
         label_tuple = tuple(sorted(labels.items())) if labels else ()
+        key = (name, label_tuple)
+        stripe = self._stripe()
         
-        with self._lock:
-            self._histograms[name][label_tuple].append(value)
+        with stripe.lock:
+            histogram = stripe.histograms.get(key)
+            if histogram is None:
+                bounds = self._buckets.setdefault(name, self.default_buckets)
+                histogram = stripe.histograms[key] = Histogram(bounds)
+            histogram.observe(value)
         
         if help_text:
             self._help_text[name] = help_text
@@ -117,13 +373,57 @@ class MetricsCollector:
     ) -> None:
         """Observe a summary metric."""
         label_tuple = tuple(sorted(labels.items())) if labels else ()
+        key = (name, label_tuple)
+        stripe = self._stripe()
         
-        with self._lock:
-            self._summaries[name][label_tuple].append(value)
+        with stripe.lock:
+            sketch = stripe.summaries.get(key)
+            if sketch is None:
+                sketch = stripe.summaries[key] = QuantileSketch(self.relative_accuracy)
+            sketch.observe(value)
         
         if help_text:
             self._help_text[name] = help_text
     
+    def _merged_histograms(self) -> Dict[Tuple[str, tuple], Histogram]:
+        """Histogram series merged across stripes."""
+        merged: Dict[Tuple[str, tuple], Histogram] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                for key, histogram in stripe.histograms.items():
+                    target = merged.get(key)
+                    if target is None:
+                        target = merged[key] = Histogram(histogram.bounds)
+                    target.merge(histogram)
+        return merged
+    
+    def _merged_summaries(self) -> Dict[Tuple[str, tuple], QuantileSketch]:
+        """Summary series merged across stripes."""
+        merged: Dict[Tuple[str, tuple], QuantileSketch] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                for key, sketch in stripe.summaries.items():
+                    target = merged.get(key)
+                    if target is None:
+                        target = merged[key] = QuantileSketch(
+                            sketch.relative_accuracy, sketch.max_bins
+                        )
+                    target.merge(sketch)
+        return merged
+    
+    def _merged(self, attr: str, key: Tuple[str, tuple], factory) -> Optional[Any]:
+        """A single series merged across stripes, or None if never observed."""
+        result = None
+        for stripe in self._stripes:
+            with stripe.lock:
+                part = getattr(stripe, attr).get(key)
+                if part is None:
+                    continue
+                if result is None:
+                    result = factory(part)
+                result.merge(part)
+        return result
+    
     def get_counter(
         self,
         name: str,
@@ -146,10 +446,26 @@ class MetricsCollector:
         self,
         name: str,
         labels: Optional[Dict[str, str]] = None
-    ) -> Optional[List[float]]:
-        """Get histogram values."""
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get histogram state.
+        
+        Returns:
+            Dictionary with cumulative "buckets" (upper bound -> count),
+            "sum" and "count", or None if nothing was observed
+        """
         label_tuple = tuple(sorted(labels.items())) if labels else ()
-        return self._histograms.get(name, {}).get(label_tuple, []).copy()
+        histogram = self._merged(
+            "histograms", (name, label_tuple), lambda h: Histogram(h.bounds)
+        )
+        if histogram is None:
+            return None
+        
+        return {
+            "buckets": dict(histogram.cumulative()),
+            "sum": histogram.sum,
+            "count": histogram.count
+        }
     
     def get_summary(
         self,
@@ -158,57 +474,85 @@ class MetricsCollector:
         quantiles: Optional[List[float]] = None
     ) -> Optional[Dict[str, float]]:
         """Get summary statistics."""
-        quantiles = quantiles or [0.5, 0.9, 0.95, 0.99]
+        quantiles = quantiles or list(self.summary_quantiles)
         label_tuple = tuple(sorted(labels.items())) if labels else ()
-        values = self._summaries.get(name, {}).get(label_tuple, [])
+        sketch = self._merged(
+            "summaries",
+            (name, label_tuple),
+            lambda s: QuantileSketch(s.relative_accuracy, s.max_bins)
+        )
         
-        if not values:
+        if sketch is None or sketch.count == 0:
             return None
         
-        sorted_values = sorted(values)
         stats = {
-            "count": len(values),
-            "sum": sum(values),
-            "avg": sum(values) / len(values),
-            "min": min(values),
-            "max": max(values)
+            "count": sketch.count,
+            "sum": sketch.sum,
+            "avg": sketch.sum / sketch.count,
+            "min": sketch.min,
+            "max": sketch.max
         }
         
         for q in quantiles:
-            index = int(q * len(values))
-            stats[f"p{int(q*100)}"] = sorted_values[index]
+            stats[f"p{int(q*100)}"] = sketch.quantile(q)
         
         return stats
     
+    def _export_header(self, lines: List[str], name: str, metric_type: str) -> None:
+        help_text = self._help_text.get(name, "")
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+    
     def export_prometheus(self) -> str:
         """Export metrics in Prometheus format."""
         lines = []
         
+        with self._lock:
+            counters = {name: dict(values) for name, values in self._counters.items()}
+            gauges = {name: dict(values) for name, values in self._gauges.items()}
+        
         # Export counters
-        for name, label_values in self._counters.items():
-            help_text = self._help_text.get(name, "")
-            if help_text:
-                lines.append(f"# HELP {name} {help_text}")
-            lines.append(f"# TYPE {name} counter")
+        for name, label_values in counters.items():
+            self._export_header(lines, name, "counter")
             for label_tuple, value in label_values.items():
-                labels = ",".join(f'{k}="{v}"' for k, v in label_tuple)
-                if labels:
-                    lines.append(f'{name}{{{labels}}} {value}')
-                else:
-                    lines.append(f'{name} {value}')
+                lines.append(f"{name}{_format_labels(label_tuple)} {_format_value(value)}")
         
         # Export gauges
-        for name, label_values in self._gauges.items():
-            help_text = self._help_text.get(name, "")
-            if help_text:
-                lines.append(f"# HELP {name} {help_text}")
-            lines.append(f"# TYPE {name} gauge")
+        for name, label_values in gauges.items():
+            self._export_header(lines, name, "gauge")
             for label_tuple, value in label_values.items():
-                labels = ",".join(f'{k}="{v}"' for k, v in label_tuple)
-                if labels:
-                    lines.append(f'{name}{{{labels}}} {value}')
-                else:
-                    lines.append(f'{name} {value}')
+                lines.append(f"{name}{_format_labels(label_tuple)} {_format_value(value)}")
+        
+        # Export histograms
+        by_name: Dict[str, List[Tuple[tuple, Histogram]]] = defaultdict(list)
+        for (name, label_tuple), histogram in self._merged_histograms().items():
+            by_name[name].append((label_tuple, histogram))
+        
+        for name, series in by_name.items():
+            self._export_header(lines, name, "histogram")
+            for label_tuple, histogram in series:
+                for bound, count in histogram.cumulative():
+                    labels = _format_labels(label_tuple, ("le", _format_value(bound)))
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _format_labels(label_tuple)
+                lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{labels} {histogram.count}")
+        
+        # Export summaries
+        by_name_summary: Dict[str, List[Tuple[tuple, QuantileSketch]]] = defaultdict(list)
+        for (name, label_tuple), sketch in self._merged_summaries().items():
+            by_name_summary[name].append((label_tuple, sketch))
+        
+        for name, series in by_name_summary.items():
+            self._export_header(lines, name, "summary")
+            for label_tuple, sketch in series:
+                for q in self.summary_quantiles:
+                    labels = _format_labels(label_tuple, ("quantile", repr(float(q))))
+                    lines.append(f"{name}{labels} {_format_value(sketch.quantile(q))}")
+                labels = _format_labels(label_tuple)
+                lines.append(f"{name}_sum{labels} {_format_value(sketch.sum)}")
+                lines.append(f"{name}_count{labels} {sketch.count}")
         
         return "\n".join(lines)
     
@@ -217,8 +561,10 @@ class MetricsCollector:
         with self._lock:
             self._counters.clear()
             self._gauges.clear()
-            self._histograms.clear()
-            self._summaries.clear()
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.histograms.clear()
+                stripe.summaries.clear()
 
 
 # Context manager for timing
@@ -239,12 +585,12 @@ class Timer:
         self.start_time: Optional[float] = None
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.start_time is not None:
-            duration = time.time() - self.start_time
+            duration = time.perf_counter() - self.start_time
             if self.metric_type == MetricType.HISTOGRAM:
                 self.metrics_collector.observe_histogram(
                     self.name,
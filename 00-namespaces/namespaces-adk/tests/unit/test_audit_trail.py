@@ -0,0 +1,234 @@
+"""
+Unit tests for Audit Trail
+"""
+
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from adk.governance import audit_trail as audit_trail_module
+from adk.governance.audit_trail import AuditTrail, merkle_root
+
+
+def fill(trail, count, agents=("a1", "a2", "a3"), event_types=("tool", "policy")):
+    return [
+        trail.log(
+            event_type=event_types[i % len(event_types)],
+            agent_id=agents[i % len(agents)],
+            action=f"action-{i}",
+            details={"i": i}
+        )
+        for i in range(count)
+    ]
+
+
+class TestAuditTrailQuery:
+    """Test suite for indexed queries"""
+
+    def test_query_matches_linear_filter(self):
+        """Indexed query returns the same entries as a full scan"""
+        trail = AuditTrail()
+        entries = fill(trail, 500)
+        middle = entries[200].timestamp
+
+        for kwargs in (
+            {"agent_id": "a2"},
+            {"event_type": "policy"},
+            {"agent_id": "a1", "event_type": "tool", "start_time": middle},
+            {"end_time": middle, "limit": 7},
+            {"agent_id": "missing"},
+        ):
+            limit = kwargs.pop("limit", 100)
+            expected = [
+                e for e in entries
+                if kwargs.get("agent_id") in (None, e.agent_id)
+                and kwargs.get("event_type") in (None, e.event_type)
+                and (not kwargs.get("start_time") or e.timestamp >= kwargs["start_time"])
+                and (not kwargs.get("end_time") or e.timestamp <= kwargs["end_time"])
+            ][-limit:]
+            assert trail.query(limit=limit, **kwargs) == expected
+
+    def test_query_outside_time_range(self):
+        """Empty window returns no entries"""
+        trail = AuditTrail()
+        fill(trail, 10)
+        future = datetime.now() + timedelta(days=1)
+
+        assert trail.query(start_time=future) == []
+
+    def test_query_after_clock_steps_back(self, monkeypatch):
+        """Time windows stay exact when the wall clock goes backwards"""
+        base = datetime(2026, 3, 29, 2, 0)
+        offsets = [0, 10, 20, 5, 15, 30]
+
+        class SteppedClock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return base + timedelta(minutes=offsets.pop(0))
+
+        monkeypatch.setattr(audit_trail_module, "datetime", SteppedClock)
+        trail = AuditTrail()
+        entries = fill(trail, 6)
+
+        window = trail.query(
+            start_time=base + timedelta(minutes=4), end_time=base + timedelta(minutes=16)
+        )
+        assert window == [entries[1], entries[3], entries[4]]
+        assert trail.query(agent_id="a1", end_time=base + timedelta(minutes=6)) == [entries[0], entries[3]]
+        assert trail.query(limit=2) == entries[-2:]
+
+
+class TestAuditTrailIntegrity:
+    """Test suite for checkpointed verification"""
+
+    def test_checkpoints_recorded(self):
+        """A Merkle checkpoint is recorded per full block"""
+        trail = AuditTrail(checkpoint_interval=16)
+        entries = fill(trail, 40)
+
+        checkpoints = trail.get_checkpoints()
+        assert [(c.start, c.end) for c in checkpoints] == [(0, 16), (16, 32)]
+        assert checkpoints[1].root == merkle_root([e.hash for e in entries[16:32]])
+        assert trail.verify_integrity()
+
+    def test_incremental_verification_skips_verified_blocks(self):
+        """Only entries after the last verified checkpoint are rehashed"""
+        trail = AuditTrail(checkpoint_interval=16)
+        entries = fill(trail, 40)
+        assert trail.verify_integrity()
+
+        # Tampering inside an already verified block goes unnoticed
+        # until a full verification
+        entries[3].details["i"] = -1
+        assert trail.verify_integrity()
+        assert not trail.verify_integrity(full=True)
+
+    def test_tampering_after_checkpoint_detected(self):
+        """Unverified entries are always rehashed"""
+        trail = AuditTrail(checkpoint_interval=16)
+        entries = fill(trail, 40)
+        assert trail.verify_integrity()
+
+        entries[35].details["i"] = -1
+        assert not trail.verify_integrity()
+
+    def test_rewritten_chain_fails_checkpoint(self):
+        """A consistently rehashed block no longer matches its Merkle root"""
+        trail = AuditTrail(checkpoint_interval=8)
+        entries = fill(trail, 8)
+
+        entries[-1].details["i"] = -1
+        entries[-1].hash = entries[-1].compute_hash()
+        assert not trail.verify_integrity()
+
+
+class TestAuditTrailStorage:
+    """Test suite for segment storage and export"""
+
+    def test_segments_roll_and_reload(self, tmp_path):
+        """Entries survive a reopen and the chain continues"""
+        trail = AuditTrail(
+            storage_path=str(tmp_path), checkpoint_interval=10, segment_max_entries=25
+        )
+        fill(trail, 60)
+        trail.close()
+
+        assert len(list(tmp_path.glob("audit-*.jsonl"))) == 3
+        assert not list(tmp_path.glob("*.json"))
+
+        reopened = AuditTrail(storage_path=str(tmp_path), checkpoint_interval=10)
+        assert len(reopened.query(limit=1000)) == 60
+        assert len(reopened.get_checkpoints()) == 6
+        reopened.log("tool", "a1", "after-reopen", {})
+        reopened.close()
+
+        assert reopened.verify_integrity(full=True)
+        assert reopened.query(agent_id="a1", limit=1)[0].action == "after-reopen"
+
+    def test_torn_tail_truncated_on_reopen(self, tmp_path):
+        """A record torn by a crash is cut off before appending resumes"""
+        trail = AuditTrail(storage_path=str(tmp_path), checkpoint_interval=10)
+        fill(trail, 12)
+        trail.close()
+
+        segment = tmp_path / "audit-00000001.jsonl"
+        intact = segment.stat().st_size
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write('{"entry_id":"torn","timestamp":"20')
+
+        reopened = AuditTrail(storage_path=str(tmp_path), checkpoint_interval=10)
+        assert segment.stat().st_size == intact
+        reopened.log("tool", "a1", "after-crash", {})
+        reopened.close()
+
+        lines = segment.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 13
+        assert all(json.loads(line) for line in lines)
+
+        again = AuditTrail(storage_path=str(tmp_path), checkpoint_interval=10)
+        assert len(again.query(limit=100)) == 13
+        assert again.verify_integrity(full=True)
+
+    def test_torn_only_record_removed(self, tmp_path):
+        """A segment holding only a torn record is emptied"""
+        segment = tmp_path / "audit-00000002.jsonl"
+        segment.write_text('{"entry_id":"torn"')
+
+        trail = AuditTrail(storage_path=str(tmp_path))
+        assert segment.stat().st_size == 0
+        trail.log("tool", "a1", "first", {})
+        trail.close()
+
+        reopened = AuditTrail(storage_path=str(tmp_path))
+        assert [e.action for e in reopened.query()] == ["first"]
+        assert reopened.verify_integrity(full=True)
+
+    def test_torn_checkpoint_truncated_on_reopen(self, tmp_path):
+        """A checkpoint torn by a crash does not stop the trail from opening"""
+        trail = AuditTrail(storage_path=str(tmp_path), checkpoint_interval=10)
+        fill(trail, 20)
+        trail.close()
+
+        checkpoints = tmp_path / AuditTrail.CHECKPOINT_FILE
+        intact = checkpoints.stat().st_size
+        with open(checkpoints, "a", encoding="utf-8") as f:
+            f.write('{"start": 20, "end": 3')
+
+        reopened = AuditTrail(storage_path=str(tmp_path), checkpoint_interval=10)
+        assert checkpoints.stat().st_size == intact
+        assert len(reopened.get_checkpoints()) == 2
+        assert reopened.verify_integrity(full=True)
+
+    def test_fsync_batching(self, tmp_path, monkeypatch):
+        """Segments are fsynced once per batch"""
+        calls = []
+        monkeypatch.setattr(os, "fsync", calls.append)
+        trail = AuditTrail(
+            storage_path=str(tmp_path),
+            checkpoint_interval=10_000,
+            fsync_batch=50,
+            fsync_interval=3600
+        )
+        fill(trail, 120)
+        assert len(calls) == 2
+
+        trail.flush()
+        assert len(calls) == 3
+        trail.close()
+
+    def test_streaming_export(self):
+        """Streamed exports match the in-memory export"""
+        trail = AuditTrail()
+        fill(trail, 5)
+
+        stream = io.StringIO()
+        assert trail.export_to(stream) == 5
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == json.loads(trail.export())
+        assert json.loads("".join(trail.iter_export("json"))) == json.loads(trail.export())
+
+        with pytest.raises(ValueError):
+            trail.export("xml")
@@ -0,0 +1,172 @@
+"""
+Unit tests for Event Bus
+"""
+
+import asyncio
+
+import pytest
+
+from adk.core.event_bus import Event, EventBus, EventPriority, Subscription
+
+
+class TestEventBusDispatch:
+    """Test suite for subscription ordering and wildcard topics"""
+
+    @pytest.mark.asyncio
+    async def test_priority_then_registration_order(self):
+        """Handlers run highest priority first, ties in subscription order"""
+        bus = EventBus()
+        calls = []
+
+        await bus.subscribe("task.done", lambda e: calls.append("normal-1"))
+        await bus.subscribe("*", lambda e: calls.append("wildcard-low"), priority=EventPriority.LOW)
+        await bus.subscribe("task.done", lambda e: calls.append("critical"), priority=EventPriority.CRITICAL)
+        await bus.subscribe("task.*", lambda e: calls.append("normal-2"))
+
+        assert await bus.publish("task.done") == 4
+        assert calls == ["critical", "normal-1", "normal-2", "wildcard-low"]
+
+    @pytest.mark.asyncio
+    async def test_wildcard_patterns(self):
+        """'*' matches one segment, '**' matches any number"""
+        bus = EventBus()
+        seen = {}
+
+        for pattern in ["workflow.*", "workflow.**", "*.step.*", "*"]:
+            seen[pattern] = []
+            await bus.subscribe(pattern, lambda e, p=pattern: seen[p].append(e.name))
+
+        for name in ["workflow", "workflow.started", "workflow.step.done", "agent.step.done"]:
+            await bus.publish(name)
+
+        assert seen["workflow.*"] == ["workflow.started"]
+        assert seen["workflow.**"] == ["workflow", "workflow.started", "workflow.step.done"]
+        assert seen["*.step.*"] == ["workflow.step.done", "agent.step.done"]
+        assert len(seen["*"]) == 4
+
+    def test_subscription_matches_by_segment(self):
+        """A wildcard subscription rejects events its pattern does not match"""
+        cases = {
+            "workflow.*": (["workflow.started"], ["workflow", "agent.started", "workflow.step.done"]),
+            "workflow.**": (["workflow", "workflow.step.done"], ["agent.step.done", "workflows.x"]),
+            "*.step.*": (["agent.step.done"], ["agent.step", "agent.task.done"]),
+            "*": (["workflow", "agent.step.done"], []),
+        }
+        for pattern, (accepted, rejected) in cases.items():
+            subscription = Subscription(event_name=pattern, handler=lambda e: None)
+            for name in accepted:
+                assert subscription.matches(Event(name=name)), (pattern, name)
+            for name in rejected:
+                assert not subscription.matches(Event(name=name)), (pattern, name)
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_invalidates_resolution(self):
+        """Cached subscriber lists follow subscribe and unsubscribe"""
+        bus = EventBus()
+        calls = []
+
+        exact_id = await bus.subscribe("a.b", lambda e: calls.append("exact"))
+        pattern_id = await bus.subscribe("a.*", lambda e: calls.append("pattern"))
+        await bus.publish("a.b")
+
+        assert await bus.unsubscribe(pattern_id)
+        await bus.publish("a.b")
+        assert await bus.unsubscribe(exact_id)
+        assert not await bus.unsubscribe(exact_id)
+        await bus.publish("a.b")
+
+        assert calls == ["exact", "pattern", "exact"]
+        assert bus.get_subscriber_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_once_delivers_at_most_once(self):
+        """One-time subscriptions are detached before their handler runs"""
+        bus = EventBus()
+        calls = []
+
+        async def slow(event):
+            calls.append(event.data["n"])
+            await asyncio.sleep(0.01)
+
+        await bus.subscribe("tick", slow, once=True, filter_func=lambda e: e.data["n"] > 0)
+        await asyncio.gather(*(bus.publish("tick", {"n": n}) for n in range(3)))
+
+        assert calls == [1]
+        assert bus.get_subscriber_count("tick") == 0
+
+
+class TestEventBusFanOut:
+    """Test suite for concurrent fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_same_priority_handlers_run_concurrently(self):
+        """Handlers in a tier overlap, bounded by max_concurrency"""
+        bus = EventBus(max_concurrency=4)
+        running = 0
+        peak = 0
+
+        async def handler(event):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for _ in range(10):
+            await bus.subscribe("load", handler)
+
+        assert await bus.publish("load") == 10
+        assert peak == 4
+
+    @pytest.mark.asyncio
+    async def test_handler_timeout_isolated(self):
+        """A slow handler times out without affecting the others"""
+        bus = EventBus(handler_timeout=1.0)
+        calls = []
+
+        async def stuck(event):
+            await asyncio.sleep(10)
+
+        def failing(event):
+            raise RuntimeError("boom")
+
+        await bus.subscribe("job", stuck, timeout=0.01)
+        await bus.subscribe("job", failing)
+        await bus.subscribe("job", lambda e: calls.append(e.name))
+
+        assert await bus.publish("job") == 1
+        assert calls == ["job"]
+        stats = bus.get_stats()
+        assert stats["timeouts"] == 1
+        assert stats["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_nested_publish(self):
+        """Handlers may publish while a fan-out is in progress"""
+        bus = EventBus(max_concurrency=1)
+        calls = []
+
+        async def relay(event):
+            await bus.publish("inner")
+
+        await bus.subscribe("outer", relay)
+        await bus.subscribe("outer", relay)
+        await bus.subscribe("inner", lambda e: calls.append(e.name))
+
+        assert await asyncio.wait_for(bus.publish("outer"), 1) == 2
+        assert calls == ["inner", "inner"]
+
+    @pytest.mark.asyncio
+    async def test_publish_batch(self):
+        """Batched events are delivered in order and recorded in history"""
+        bus = EventBus(max_history=3)
+        calls = []
+
+        await bus.subscribe("m.*", lambda e: calls.append(e.data["i"]))
+        counts = await bus.publish_batch(
+            [("m.x", {"i": 0}), Event(name="m.y", data={"i": 1}), ("other", {"i": 2}), ("m.z", {"i": 3})]
+        )
+
+        assert counts == [1, 1, 0, 1]
+        assert calls == [0, 1, 3]
+        assert [e.name for e in bus.get_history()] == ["m.y", "other", "m.z"]
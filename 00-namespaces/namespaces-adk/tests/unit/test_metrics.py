@@ -0,0 +1,144 @@
+"""
+Unit tests for MetricsCollector histograms and summaries
+"""
+
+import random
+import threading
+
+import pytest
+
+from adk.observability.metrics import (
+    Histogram,
+    MetricsCollector,
+    QuantileSketch,
+)
+
+
+class TestQuantileSketch:
+    """Test suite for the streaming quantile sketch"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Estimates stay within the configured relative error"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(0, 2) for _ in range(50000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.observe(value)
+
+        ordered = sorted(values)
+        for q in (0.1, 0.5, 0.9, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
+
+    def test_memory_is_bounded(self):
+        """Bins are collapsed beyond max_bins"""
+        sketch = QuantileSketch(relative_accuracy=0.01, max_bins=64)
+        for i in range(1, 100000):
+            sketch.observe(i * 1e-3)
+
+        assert len(sketch._positive) <= 64
+        assert sketch.count == 99999
+        assert sketch.quantile(0.99) == pytest.approx(99.0, rel=0.02)
+
+    def test_merge_matches_single_sketch(self):
+        """Merging sketches equals observing everything in one"""
+        values = [((i * 7919) % 1000) - 300 for i in range(3000)]
+        whole = QuantileSketch()
+        parts = [QuantileSketch() for _ in range(3)]
+        for i, value in enumerate(values):
+            whole.observe(value)
+            parts[i % 3].observe(value)
+
+        merged = QuantileSketch()
+        for part in parts:
+            merged.merge(part)
+
+        assert merged.count == whole.count
+        assert merged.min == -300 and merged.max == 699
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            assert merged.quantile(q) == whole.quantile(q)
+
+
+class TestMetricsCollector:
+    """Test suite for histogram and summary metrics"""
+
+    def test_histogram_buckets(self):
+        """Observations land in cumulative buckets"""
+        metrics = MetricsCollector()
+        metrics.register_histogram("latency_seconds", [0.1, 1.0])
+        for value in (0.05, 0.1, 0.5, 2.0):
+            metrics.observe_histogram("latency_seconds", value, {"op": "read"})
+
+        histogram = metrics.get_histogram("latency_seconds", {"op": "read"})
+
+        assert histogram["buckets"] == {0.1: 2, 1.0: 3, float("inf"): 4}
+        assert histogram["count"] == 4
+        assert histogram["sum"] == pytest.approx(2.65)
+        assert metrics.get_histogram("latency_seconds") is None
+
+    def test_histogram_bucket_mismatch(self):
+        """Histograms cannot change buckets once declared"""
+        metrics = MetricsCollector()
+        metrics.register_histogram("h", [1, 2])
+        with pytest.raises(ValueError):
+            metrics.register_histogram("h", [1, 2, 3])
+        with pytest.raises(ValueError):
+            Histogram([1]).merge(Histogram([2]))
+
+    def test_concurrent_observations_are_merged(self):
+        """Observations from many threads are all counted"""
+        metrics = MetricsCollector(stripes=4)
+
+        def worker():
+            for i in range(1000):
+                metrics.observe_histogram("h", i / 1000)
+                metrics.observe_summary("s", i)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert metrics.get_histogram("h")["count"] == 8000
+        summary = metrics.get_summary("s")
+        assert summary["count"] == 8000
+        assert summary["min"] == 0 and summary["max"] == 999
+        assert summary["p50"] == pytest.approx(499.5, rel=0.02)
+
+    def test_prometheus_export(self):
+        """All metric types appear in the exposition"""
+        metrics = MetricsCollector(summary_quantiles=[0.5, 0.99])
+        metrics.increment_counter("requests_total", labels={"path": '/a"b'}, help_text="Requests")
+        metrics.set_gauge("inflight", 3)
+        metrics.register_histogram("latency_seconds", [0.5], help_text="Latency")
+        metrics.observe_histogram("latency_seconds", 0.2, {"op": "get"})
+        metrics.observe_histogram("latency_seconds", 0.7, {"op": "get"})
+        metrics.observe_summary("size_bytes", 100)
+
+        lines = metrics.export_prometheus().splitlines()
+
+        assert "# HELP requests_total Requests" in lines
+        assert 'requests_total{path="/a\\"b"} 1.0' in lines
+        assert "inflight 3.0" in lines
+        assert "# TYPE latency_seconds histogram" in lines
+        assert 'latency_seconds_bucket{op="get",le="0.5"} 1' in lines
+        assert 'latency_seconds_bucket{op="get",le="+Inf"} 2' in lines
+        assert 'latency_seconds_sum{op="get"} 0.8999999999999999' in lines
+        assert 'latency_seconds_count{op="get"} 2' in lines
+        assert "# TYPE size_bytes summary" in lines
+        assert any(line.startswith('size_bytes{quantile="0.99"} ') for line in lines)
+        assert "size_bytes_count 1" in lines
+
+    def test_reset(self):
+        """Reset clears every metric type"""
+        metrics = MetricsCollector()
+        metrics.increment_counter("c")
+        metrics.observe_histogram("h", 1)
+        metrics.observe_summary("s", 1)
+        metrics.reset()
+
+        assert metrics.get_counter("c") is None
+        assert metrics.get_histogram("h") is None
+        assert metrics.get_summary("s") is None
+        assert metrics.export_prometheus() == ""
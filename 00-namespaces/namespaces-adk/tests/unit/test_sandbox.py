@@ -0,0 +1,173 @@
+"""
+Unit tests for Sandbox pool and warm workers
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from adk.core.sandbox import ResourceLimits, Sandbox, SandboxConfig, SandboxType
+
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="warm workers need fork")
+
+
+def python_config(tmp_path, **limits):
+    return SandboxConfig(
+        sandbox_type=SandboxType.PYTHON,
+        resource_limits=ResourceLimits(**limits),
+        working_dir=str(tmp_path)
+    )
+
+
+class TestSandboxPool:
+    """Test suite for sandbox acquisition"""
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_fifo_order(self):
+        """Released sandboxes go to the longest-waiting caller"""
+        sandbox = Sandbox(pool_size=1)
+        held = await sandbox.acquire_sandbox()
+        order = []
+
+        async def waiter(name):
+            sandbox_id = await sandbox.acquire_sandbox()
+            order.append(name)
+            sandbox.release_sandbox(sandbox_id)
+
+        tasks = []
+        for name in ("first", "second", "third"):
+            tasks.append(asyncio.ensure_future(waiter(name)))
+            await asyncio.sleep(0)
+        assert sandbox.get_sandbox_stats()["waiting"] == 3
+
+        sandbox.release_sandbox(held)
+        await asyncio.gather(*tasks)
+
+        assert order == ["first", "second", "third"]
+        assert sandbox.get_sandbox_stats()["available"] == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self):
+        """Waiting callers give up after the timeout"""
+        sandbox = Sandbox(pool_size=1, acquire_timeout=0.05)
+        held = await sandbox.acquire_sandbox()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await sandbox.acquire_sandbox()
+
+        execution = await sandbox.execute("true")
+        assert not execution.success
+        assert "No sandbox available" in execution.error
+
+        sandbox.release_sandbox(held)
+        stats = sandbox.get_sandbox_stats()
+        assert stats["acquire_timeouts"] == 2
+        assert stats["waiting"] == 0
+        assert stats["available"] == 1
+
+
+class TestWarmWorkers:
+    """Test suite for pre-started Python workers"""
+
+    @pytest.mark.asyncio
+    async def test_runs_code_with_io_and_exit_code(self, tmp_path):
+        """Warm execution matches python -c semantics"""
+        sandbox = Sandbox(pool_size=1, warm_workers=True)
+        config = python_config(tmp_path)
+        try:
+            execution = await sandbox.execute(
+                "import os, sys; print(sys.stdin.read().upper(), os.getcwd())",
+                config,
+                input_data="hello"
+            )
+            assert execution.success
+            assert execution.stdout == f"HELLO {tmp_path}\n"
+
+            execution = await sandbox.execute("import sys; sys.exit(3)", config)
+            assert execution.exit_code == 3
+
+            execution = await sandbox.execute("raise ValueError('bad')", config)
+            assert execution.exit_code == 1
+            assert "ValueError: bad" in execution.stderr
+        finally:
+            await sandbox.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_state_not_shared_between_jobs(self, tmp_path):
+        """Each job runs in a fresh forked child"""
+        sandbox = Sandbox(pool_size=1, warm_workers=True)
+        config = python_config(tmp_path)
+        try:
+            await sandbox.execute("import json; json.leaked = 1", config)
+            execution = await sandbox.execute(
+                "import json; print(hasattr(json, 'leaked'))", config
+            )
+            assert execution.stdout == "False\n"
+            assert sandbox.get_sandbox_stats()["worker_spawns"] == 1
+        finally:
+            await sandbox.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_workers_recycled(self, tmp_path):
+        """Workers are replaced after the configured number of jobs"""
+        sandbox = Sandbox(pool_size=1, warm_workers=True, worker_max_executions=2)
+        config = python_config(tmp_path)
+        try:
+            for _ in range(5):
+                assert (await sandbox.execute("pass", config)).success
+            stats = sandbox.get_sandbox_stats()
+            assert stats["worker_recycles"] == 2
+            assert stats["worker_spawns"] == 3
+        finally:
+            await sandbox.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_limits_applied_per_job(self, tmp_path):
+        """Memory limits and timeouts are enforced on each job"""
+        sandbox = Sandbox(pool_size=1, warm_workers=True)
+        try:
+            execution = await sandbox.execute(
+                "x = bytearray(512 * 1024 * 1024)",
+                python_config(tmp_path, max_memory_mb=128)
+            )
+            assert execution.exit_code == 1
+            assert "MemoryError" in execution.stderr
+
+            execution = await sandbox.execute(
+                "while True: pass", python_config(tmp_path), timeout=0.5
+            )
+            assert "timeout" in execution.error
+
+            # A fresh worker replaces the killed one
+            execution = await sandbox.execute("print('ok')", python_config(tmp_path))
+            assert execution.stdout == "ok\n"
+            assert sandbox.get_sandbox_stats()["worker_spawns"] == 2
+        finally:
+            await sandbox.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_warm_faster_than_cold(self, tmp_path):
+        """Reusing interpreters beats spawning one per execution"""
+        warm = Sandbox(pool_size=1, warm_workers=True)
+        cold = Sandbox(pool_size=1)
+        config = python_config(tmp_path)
+        # The cold path resolves "python" through PATH
+        config.environment = {"PATH": os.environ.get("PATH", "")}
+        code = "import json, decimal; print(json.dumps(str(decimal.Decimal(1) / 3)))"
+        try:
+            await warm.warm_up()
+            timings = {}
+            for name, sandbox in (("warm", warm), ("cold", cold)):
+                start = time.perf_counter()
+                for _ in range(10):
+                    assert (await sandbox.execute(code, config)).success
+                timings[name] = time.perf_counter() - start
+
+            print(f"\n  cold: {timings['cold'] * 100:.1f} ms/execution")
+            print(f"  warm: {timings['warm'] * 100:.1f} ms/execution")
+            assert timings["warm"] < timings["cold"]
+        finally:
+            await warm.cleanup()
@@ -0,0 +1,208 @@
+"""
+Unit tests for Tool Router
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+from adk.mcp.mcp_client import MCPToolResult
+from adk.mcp.tool_router import RoutingPolicy, RoutingStrategy, ToolRouter
+
+
+class FakeClient:
+    """MCP client answering from per-server delays and failures"""
+
+    def __init__(self, delays=None, failing=()):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.calls = []
+
+    async def call_tool(self, tool_call):
+        self.calls.append(tool_call.server_id)
+        await asyncio.sleep(self.delays.get(tool_call.server_id, 0))
+        if tool_call.server_id in self.failing:
+            return MCPToolResult(call_id=tool_call.call_id, success=False, error="boom")
+        return MCPToolResult(
+            call_id=tool_call.call_id,
+            success=True,
+            output={"server": tool_call.server_id}
+        )
+
+
+def make_router(client, servers=("s1", "s2", "s3"), **policy):
+    router = ToolRouter(client)
+    for server_id in servers:
+        router.register_endpoint("search", server_id)
+    router.set_policy("search", RoutingPolicy(require_permission=False, **policy))
+    return router
+
+
+class TestToolRouterSelection:
+    """Test suite for load-aware endpoint selection"""
+
+    @pytest.mark.asyncio
+    async def test_latency_and_load_tracked(self):
+        """Calls update EWMA latency and release their in-flight slot"""
+        client = FakeClient(delays={"s1": 0.02})
+        router = make_router(client, servers=("s1",))
+
+        calls = [router.route_and_call("search", {}) for _ in range(3)]
+        pending = asyncio.gather(*calls)
+        await asyncio.sleep(0.005)
+        assert router.get_tool_stats("search")["total_load"] == 3
+        await pending
+
+        endpoint = router.get_tool_stats("search")["endpoints"][0]
+        assert endpoint["load"] == 0
+        assert endpoint["total_calls"] == 3
+        assert endpoint["ewma_latency_ms"] >= 20
+
+    @pytest.mark.asyncio
+    async def test_power_of_two_prefers_fast_endpoints(self):
+        """The slow endpoint receives the smallest share of traffic"""
+        client = FakeClient(delays={"s1": 0.02})
+        router = make_router(
+            client, strategy=RoutingStrategy.POWER_OF_TWO, ejection_latency_factor=0
+        )
+        router._random.seed(3)
+
+        for _ in range(60):
+            await router.route_and_call("search", {})
+
+        counts = Counter(client.calls)
+        assert counts["s1"] < counts["s2"] and counts["s1"] < counts["s3"]
+
+    @pytest.mark.asyncio
+    async def test_fast_failures_do_not_attract_traffic(self):
+        """A failing endpoint is charged the timeout, not its fast error latency"""
+        client = FakeClient(delays={"s2": 0.005, "s3": 0.005}, failing=("s1",))
+        router = make_router(
+            client,
+            strategy=RoutingStrategy.POWER_OF_TWO,
+            ejection_consecutive_failures=0,
+            ejection_latency_factor=0
+        )
+        router._random.seed(3)
+
+        for _ in range(60):
+            result = await router.route_and_call("search", {})
+            assert result.success
+
+        endpoints = {e["server_id"]: e for e in router.get_tool_stats("search")["endpoints"]}
+        assert endpoints["s1"]["ewma_latency_ms"] >= 30_000
+        counts = Counter(client.calls)
+        assert counts["s1"] < counts["s2"] and counts["s1"] < counts["s3"]
+
+    @pytest.mark.asyncio
+    async def test_affinity_is_sticky_and_consistent(self):
+        """Keys stay on their endpoint and only removed keys move"""
+        client = FakeClient()
+        # Sub-millisecond jitter must not eject endpoints mid-test
+        router = make_router(
+            client, strategy=RoutingStrategy.AFFINITY, ejection_latency_factor=0
+        )
+
+        async def placement():
+            placed = {}
+            for i in range(50):
+                result = await router.route_and_call("search", {}, {"session_id": f"user-{i}"})
+                placed[i] = result.output["server"]
+            return placed
+
+        before = await placement()
+        assert before == await placement()
+        assert len(set(before.values())) == 3
+
+        assert router.unregister_endpoint("search", "s2")
+        after = await placement()
+        for i, server_id in before.items():
+            if server_id != "s2":
+                assert after[i] == server_id
+        assert "s2" not in after.values()
+
+    @pytest.mark.asyncio
+    async def test_candidates_cached_until_registry_changes(self):
+        """Candidate sets are reused and rebuilt on register and disable"""
+        router = make_router(FakeClient(), servers=("s1",))
+        policy = router.get_policy("search")
+
+        candidates = router._get_candidates("search")
+        assert router._get_candidates("search") is candidates
+
+        router.register_endpoint("search", "s2", priority=5)
+        assert router._select_endpoint("search", None, policy).server_id == "s2"
+
+        assert router.set_endpoint_enabled("search", "s2", False)
+        assert router._select_endpoint("search", None, policy).server_id == "s1"
+        assert not router.unregister_endpoint("search", "missing")
+
+
+class TestToolRouterEjection:
+    """Test suite for outlier ejection"""
+
+    @pytest.mark.asyncio
+    async def test_failing_endpoint_ejected_and_readmitted(self):
+        """Consecutive failures eject an endpoint for a while"""
+        client = FakeClient(failing={"s1"})
+        router = make_router(
+            client,
+            servers=("s1", "s2"),
+            strategy=RoutingStrategy.ROUND_ROBIN,
+            ejection_consecutive_failures=2,
+            ejection_base_seconds=0.05
+        )
+
+        for _ in range(4):
+            result = await router.route_and_call("search", {})
+            assert result.success and result.output["server"] == "s2"
+
+        stats = router.get_tool_stats("search")
+        assert stats["ejected_endpoints"] == 1
+        assert stats["enabled_endpoints"] == 2
+        calls = len(client.calls)
+        await router.route_and_call("search", {})
+        await router.route_and_call("search", {})
+        assert client.calls[calls:] == ["s2", "s2"]
+
+        await asyncio.sleep(0.06)
+        assert router.get_tool_stats("search")["ejected_endpoints"] == 0
+        client.failing.clear()
+        servers = {(await router.route_and_call("search", {})).output["server"] for _ in range(2)}
+        assert servers == {"s1", "s2"}
+
+    @pytest.mark.asyncio
+    async def test_slow_outlier_ejected(self):
+        """An endpoint far slower than its peers is ejected"""
+        client = FakeClient(delays={"s1": 0.02})
+        router = make_router(
+            client,
+            strategy=RoutingStrategy.ROUND_ROBIN,
+            ejection_min_calls=2,
+            ejection_latency_factor=3.0
+        )
+
+        for _ in range(9):
+            await router.route_and_call("search", {})
+
+        endpoints = {e["server_id"]: e for e in router.get_tool_stats("search")["endpoints"]}
+        assert endpoints["s1"]["ejected"]
+        assert not endpoints["s2"]["ejected"] and not endpoints["s3"]["ejected"]
+
+    @pytest.mark.asyncio
+    async def test_last_endpoint_never_ejected(self):
+        """Ejection leaves at least one endpoint routable"""
+        client = FakeClient(failing={"s1", "s2"})
+        router = make_router(
+            client,
+            servers=("s1", "s2"),
+            ejection_consecutive_failures=1,
+            max_ejection_percent=1.0
+        )
+
+        result = await router.route_and_call("search", {})
+
+        assert not result.success and result.error == "boom"
+        assert router.get_tool_stats("search")["ejected_endpoints"] == 1
+        assert router._select_endpoint("search", None, router.get_policy("search")) is not None
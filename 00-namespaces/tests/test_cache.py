@@ -0,0 +1,233 @@
+"""
+Unit Tests for Multi-Layer Cache
+
+驗證有界淘汰、TTL 時間輪、single-flight 載入與前綴失效
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from namespace_registry.cache import (
+    CacheEntry,
+    CacheLevel,
+    EvictionPolicy,
+    MemoryTier,
+    MultiLayerCache,
+    SQLiteTier,
+    TimingWheel,
+)
+
+
+def make_entry(key, value=None, ttl=3600, created_at=None):
+    return CacheEntry(
+        key=key,
+        value=value if value is not None else {"key": key},
+        level=CacheLevel.LOCAL,
+        created_at=created_at or datetime.now(),
+        ttl=ttl
+    )
+
+
+class TestMemoryTier:
+    """測試記憶體緩存層"""
+
+    def test_lru_eviction(self):
+        tier = MemoryTier(CacheLevel.LOCAL, max_entries=2)
+        tier.put(make_entry("a"))
+        tier.put(make_entry("b"))
+        assert tier.lookup("a") is not None  # a 成為最近使用
+
+        tier.put(make_entry("c"))
+
+        assert "b" not in tier
+        assert "a" in tier and "c" in tier
+        assert tier.stats['evictions'] == 1
+
+    def test_lfu_eviction(self):
+        tier = MemoryTier(CacheLevel.LOCAL, max_entries=2, eviction=EvictionPolicy.LFU)
+        tier.put(make_entry("a"))
+        tier.put(make_entry("b"))
+        for _ in range(3):
+            tier.lookup("b")
+        tier.lookup("a")
+
+        tier.put(make_entry("c"))  # 淘汰頻率最低的 a
+        tier.put(make_entry("d"))  # 淘汰新加入的 c
+
+        assert "a" not in tier and "c" not in tier
+        assert "b" in tier and "d" in tier
+
+    def test_timing_wheel_purges_expired(self):
+        tier = MemoryTier(CacheLevel.LOCAL)
+        past = datetime.now() - timedelta(seconds=10)
+        tier.put(make_entry("old", ttl=5, created_at=past))
+        tier.put(make_entry("fresh", ttl=3600))
+
+        assert tier.purge_expired(time.time() + 2) == 1
+        assert len(tier) == 1
+        assert tier.lookup("fresh") is not None
+
+    def test_timing_wheel_keeps_entries_beyond_one_rotation(self):
+        wheel = TimingWheel(resolution=1.0, slots=8)
+        now = time.time()
+        wheel.schedule("soon", now + 3)
+        wheel.schedule("later", now + 3 + 8 * 2)
+
+        assert wheel.advance(now + 5) == ["soon"]
+        assert wheel.advance(now + 12) == []
+        assert wheel.advance(now + 30) == ["later"]
+        assert len(wheel) == 0
+
+    @pytest.mark.asyncio
+    async def test_prefix_delete(self):
+        tier = MemoryTier(CacheLevel.LOCAL)
+        for key in ["ns:a", "ns:b", "nsx", "other:ns:c"]:
+            tier.put(make_entry(key))
+
+        assert await tier.delete_prefix("ns:") == ["ns:a", "ns:b"]
+        assert len(tier) == 2
+
+
+class TestSQLiteTier:
+    """測試 SQLite 緩存層"""
+
+    @pytest.mark.asyncio
+    async def test_roundtrip_and_prefix_delete(self, tmp_path):
+        tier = SQLiteTier(str(tmp_path / "cache.db"))
+        await tier.set(make_entry("schema:a", {"created": datetime(2024, 1, 1)}))
+        await tier.set(make_entry("schema:b"))
+        await tier.set(make_entry("namespace:a"))
+
+        entry = await tier.get("schema:a")
+        assert entry.value == {"created": datetime(2024, 1, 1)}
+
+        assert sorted(await tier.delete_prefix("schema:")) == ["schema:a", "schema:b"]
+        assert len(tier) == 1
+        tier.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_not_returned(self):
+        tier = SQLiteTier()
+        past = datetime.now() - timedelta(seconds=10)
+        await tier.set(make_entry("old", ttl=5, created_at=past))
+
+        assert await tier.get("old") is None
+        assert len(tier) == 0
+
+
+class TestMultiLayerCacheLoading:
+    """測試 single-flight 載入與失效"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self):
+        cache = MultiLayerCache()
+        calls = []
+
+        async def load(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return {"key": key}
+
+        results = await asyncio.gather(
+            *(cache.get_or_load("namespace:a", load) for _ in range(20))
+        )
+
+        assert calls == ["namespace:a"]
+        assert all(r == {"key": "namespace:a"} for r in results)
+        stats = cache.get_stats()
+        assert stats['loads'] == 1
+        assert stats['coalesced'] == 19
+        assert await cache.get("namespace:a") == {"key": "namespace:a"}
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_reports_source(self):
+        cache = MultiLayerCache()
+
+        async def load(key):
+            await asyncio.sleep(0.01)
+            return key
+
+        results = await asyncio.gather(
+            *(cache.get_or_load_with_source("k", load) for _ in range(3))
+        )
+
+        assert sorted(source for _, source in results) == ["coalesced", "coalesced", "load"]
+        assert await cache.get_or_load_with_source("k", load) == ("k", "cache")
+        assert await cache.get_or_load_with_source("missing") == (None, "miss")
+
+    @pytest.mark.asyncio
+    async def test_load_error_propagates_and_is_not_cached(self):
+        cache = MultiLayerCache()
+
+        async def failing(key):
+            await asyncio.sleep(0.01)
+            raise LookupError(key)
+
+        results = await asyncio.gather(
+            *(cache.get_or_load("k", failing) for _ in range(3)),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, LookupError) for r in results)
+        assert cache.get_stats()['load_errors'] == 1
+        assert await cache.get_or_load("k", lambda key: "ok") == "ok"
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load_skips_backfill(self):
+        cache = MultiLayerCache()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow(key):
+            started.set()
+            await release.wait()
+            return "stale"
+
+        task = asyncio.ensure_future(cache.get_or_load("namespace:a", slow))
+        await started.wait()
+        await cache.invalidate("namespace:*")
+        release.set()
+
+        assert await task == "stale"
+        assert await cache.get("namespace:a") is None
+
+    @pytest.mark.asyncio
+    async def test_bounded_local_tier_falls_through(self):
+        cache = MultiLayerCache(local_max_entries=2)
+        for i in range(5):
+            await cache.set(f"k{i}", i)
+
+        assert cache.get_stats()['local_cache_size'] == 2
+        assert await cache.get("k0") == 0
+
+        stats = cache.get_stats()
+        assert stats['redis_hits'] == 1
+        # 回填 k0 時再淘汰一個
+        assert stats['evictions']['local'] == 4
+
+    @pytest.mark.asyncio
+    async def test_prefix_and_substring_invalidation(self):
+        cache = MultiLayerCache()
+        for key in ["namespace:a", "namespace:b", "schema:namespace:c"]:
+            await cache.set(key, key)
+
+        assert await cache.invalidate_prefix("namespace:") == 2
+        assert await cache.get("schema:namespace:c") == "schema:namespace:c"
+        assert await cache.invalidate("namespace") == 1
+        assert cache.get_stats()['database_cache_size'] == 0
+
+    @pytest.mark.asyncio
+    async def test_hot_keys_and_latency_stats(self):
+        cache = MultiLayerCache()
+        await cache.set("hot", 1)
+        await cache.set("warm", 2)
+        for _ in range(3):
+            await cache.get("hot")
+        await cache.get("warm")
+
+        assert cache.get_hot_keys(2) == [("hot", 3), ("warm", 1)]
+        latency = cache.get_stats()['latency_ms']
+        assert 0 <= latency['p50'] <= latency['p99'] <= latency['max']
@@ -321,6 +321,36 @@ class TestRegistryManagerInstant:
         stats = await registry.get_stats()
         assert stats['cache']['local_hits'] >= 1
     
+    @pytest.mark.asyncio
+    async def test_get_namespace_coalesced_not_counted_as_hit(self, registry, valid_namespace_data):
+        """測試並發未命中的等待者不計為緩存命中"""
+        await registry.create_namespace(
+            "platform-registry-service-v1",
+            valid_namespace_data
+        )
+        await registry.cache.delete("namespace:platform-registry-service-v1")
+        
+        # 延遲回填，讓其餘調用等待同一次載入
+        cache_set = registry.cache.set
+        
+        async def slow_set(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return await cache_set(*args, **kwargs)
+        
+        registry.cache.set = slow_set
+        results = await asyncio.gather(
+            *(registry.get_namespace("platform-registry-service-v1") for _ in range(5))
+        )
+        assert all(r is not None for r in results)
+        
+        stats = await registry.get_stats()
+        assert stats['operations']['cache_hits'] == 0
+        assert stats['operations']['cache_misses'] == 5
+        assert stats['operations']['coalesced_loads'] == 4
+        
+        await registry.get_namespace("platform-registry-service-v1")
+        assert registry.stats['cache_hits'] == 1
+    
     @pytest.mark.asyncio
     async def test_update_namespace(self, registry, valid_namespace_data):
         """測試更新 namespace"""
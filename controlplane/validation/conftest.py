@@ -0,0 +1,30 @@
+"""
+Shared fixtures for the supply-chain verifier tests
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+MODULE_NAME = "supply_chain_complete_verifier"
+
+
+def load_verifier():
+    """Import supply-chain-complete-verifier.py, whose name is not importable."""
+    if MODULE_NAME not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            MODULE_NAME, Path(__file__).parent / "supply-chain-complete-verifier.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        # Registered so process pool workers can unpickle _analyze_file
+        sys.modules[MODULE_NAME] = module
+        spec.loader.exec_module(module)
+    return sys.modules[MODULE_NAME]
+
+
+@pytest.fixture
+def scv():
+    """The verifier module"""
+    return load_verifier()
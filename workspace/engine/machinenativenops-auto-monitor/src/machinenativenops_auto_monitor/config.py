@@ -6,12 +6,6 @@ Configuration Module
 配置模組
 
 Manages configuration for the auto-monitor system.
-"""
-
-import logging
-from pathlib import Path
-from typing import Any, Dict
-import yaml
 Handles configuration loading and management for the auto-monitor system.
 """
 
@@ -0,0 +1,511 @@
+"""
+MachineNativeOps Auto-Monitor - HTTP Health Probes
+HTTP 健康探測模組
+
+Asynchronous HTTP/1.1 health probing with a shared keep-alive connection
+pool, per-endpoint timeouts and concurrency limits, jittered scheduling
+and per-endpoint latency histograms.
+"""
+
+import asyncio
+import logging
+import random
+import ssl
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Same upper bounds as the Prometheus client's default histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bodies larger than this are not drained; the connection is closed instead
+MAX_DRAIN_BYTES = 1024 * 1024
+
+USER_AGENT = "machinenativenops-auto-monitor"
+
+
+class ProbeError(Exception):
+    """Raised when an HTTP probe cannot complete."""
+
+
+@dataclass
+class ProbeTarget:
+    """An HTTP endpoint to probe."""
+    name: str
+    url: str
+    timeout: float = 5.0
+    interval: float = 30.0
+    max_concurrency: int = 1
+    expected_status: Tuple[int, ...] = (200,)
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> "ProbeTarget":
+        """Build a target from a service check config."""
+        return cls(
+            name=name,
+            url=config.get("url") or config.get("health_url"),
+            timeout=config.get("timeout", 5.0),
+            interval=config.get("interval", 30.0),
+            max_concurrency=config.get("max_concurrency", 1),
+            expected_status=tuple(config.get("expected_status", (200,))),
+        )
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one HTTP probe."""
+    healthy: bool
+    status_code: Optional[int] = None
+    latency: float = 0.0
+    error: Optional[str] = None
+    reused_connection: bool = False
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the service check result format."""
+        result = {
+            "healthy": self.healthy,
+            "status": "up" if self.healthy else "down",
+            "status_code": self.status_code,
+            "response_time": self.latency,
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """``(upper_bound, cumulative_count)`` pairs ending with +Inf."""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile from the bucket counts."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class HttpConnectionPool:
+    """Keep-alive connections shared by all probes, bounded per origin."""
+
+    def __init__(self, max_per_host: int = 4, idle_timeout: float = 30.0):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[Any, Any, float]]] = {}
+        self._limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self.stats = {"opened": 0, "reused": 0, "discarded": 0}
+
+    def limit(self, origin: Tuple[str, str, int]) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent connections to an origin."""
+        semaphore = self._limits.get(origin)
+        if semaphore is None:
+            semaphore = self._limits[origin] = asyncio.Semaphore(self.max_per_host)
+        return semaphore
+
+    async def acquire(self, origin: Tuple[str, str, int]) -> Tuple[Any, Any, bool]:
+        """Return ``(reader, writer, reused)``, preferring an idle connection."""
+        idle = self._idle.get(origin)
+        now = time.monotonic()
+        while idle:
+            reader, writer, since = idle.pop()
+            if now - since < self.idle_timeout and not reader.at_eof() \
+                    and not writer.is_closing():
+                self.stats["reused"] += 1
+                return reader, writer, True
+            self.stats["discarded"] += 1
+            writer.close()
+
+        scheme, host, port = origin
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            reader, writer = await asyncio.open_connection(
+                host, port, ssl=self._ssl_context, server_hostname=host
+            )
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        self.stats["opened"] += 1
+        return reader, writer, False
+
+    def release(self, origin: Tuple[str, str, int], reader: Any, writer: Any,
+                reusable: bool):
+        """Return a connection to the pool, or close it."""
+        if reusable and not writer.is_closing():
+            self._idle.setdefault(origin, []).append((reader, writer, time.monotonic()))
+        else:
+            writer.close()
+
+    async def close(self):
+        """Close all idle connections."""
+        for connections in self._idle.values():
+            for _, writer, _ in connections:
+                writer.close()
+        self._idle.clear()
+
+
+async def _read_response(reader: Any, method: str) -> Tuple[int, bool]:
+    """Read one response; return ``(status_code, connection_reusable)``."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ProbeError("connection closed before response")
+    parts = status_line.decode("latin-1").split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ProbeError(f"malformed status line: {status_line[:80]!r}")
+    version, status = parts[0], int(parts[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    connection = headers.get("connection", "").lower()
+    reusable = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        return status, reusable
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        drained = 0
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailer section ends with an empty line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return status, reusable
+            drained += size
+            if drained > MAX_DRAIN_BYTES:
+                return status, False
+            await reader.readexactly(size + 2)
+
+    if "content-length" in headers:
+        length = int(headers["content-length"])
+        if length > MAX_DRAIN_BYTES:
+            return status, False
+        await reader.readexactly(length)
+        return status, reusable
+
+    # Body delimited by connection close
+    return status, False
+
+
+class HttpProbeEngine:
+    """
+    Asynchronous HTTP health prober.
+
+    Probes share one ``HttpConnectionPool``. A global semaphore bounds
+    in-flight probes and each target's ``max_concurrency`` bounds probes of
+    the same endpoint. ``schedule()`` probes every target on its own
+    interval with a random initial offset and jittered period so hundreds of
+    endpoints do not fire in lockstep; the latest result per target is kept
+    in ``latest``. The synchronous helpers run the engine on a private event
+    loop thread so pooled connections survive across collection cycles.
+    """
+
+    def __init__(self, max_concurrency: int = 64, max_per_host: int = 4,
+                 jitter: float = 0.1,
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 on_result: Optional[Callable[[str, ProbeResult], None]] = None):
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.buckets = buckets
+        self.on_result = on_result
+        self.pool = HttpConnectionPool(max_per_host=max_per_host)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.latest: Dict[str, ProbeResult] = {}
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._endpoint_limits: Dict[str, asyncio.Semaphore] = {}
+        self._scheduled: Dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _prepare(target: ProbeTarget) -> Tuple[Tuple[str, str, int], bytes]:
+        """Origin and encoded GET request for a target."""
+        parts = urlsplit(target.url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or "localhost"
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        host_header = host if parts.port is None else f"{host}:{port}"
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host_header}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept: */*\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1")
+        return (scheme, host, port), request
+
+    async def _request(self, target: ProbeTarget, origin: Tuple[str, str, int],
+                       request: bytes, start: float) -> ProbeResult:
+        for attempt in range(2):
+            reader, writer, reused = await self.pool.acquire(origin)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, reusable = await _read_response(reader, "GET")
+            except (ProbeError, ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # An idle keep-alive connection may have been closed by
+                # the server; retry once on a fresh one
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            self.pool.release(origin, reader, writer, reusable)
+            return ProbeResult(
+                healthy=status in target.expected_status,
+                status_code=status,
+                latency=time.perf_counter() - start,
+                reused_connection=reused,
+            )
+        raise ProbeError("unreachable")
+
+    def _endpoint_limit(self, target: ProbeTarget) -> asyncio.Semaphore:
+        semaphore = self._endpoint_limits.get(target.name)
+        if semaphore is None:
+            semaphore = self._endpoint_limits[target.name] = asyncio.Semaphore(
+                target.max_concurrency
+            )
+        return semaphore
+
+    async def probe(self, target: ProbeTarget) -> ProbeResult:
+        """Probe one target within its timeout and record the result."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        try:
+            origin, request = self._prepare(target)
+        except ValueError as e:
+            return self._record(target, ProbeResult(healthy=False, error=str(e)))
+
+        # The timeout and latency cover the exchange itself, not the wait
+        # for a free concurrency slot
+        async with self._semaphore, self._endpoint_limit(target), self.pool.limit(origin):
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(
+                    self._request(target, origin, request, start), target.timeout
+                )
+            except asyncio.TimeoutError:
+                result = ProbeResult(
+                    healthy=False, latency=time.perf_counter() - start,
+                    error=f"timeout after {target.timeout}s",
+                )
+            except (OSError, ProbeError, asyncio.IncompleteReadError, ValueError) as e:
+                result = ProbeResult(
+                    healthy=False, latency=time.perf_counter() - start, error=str(e)
+                )
+        return self._record(target, result)
+
+    def _record(self, target: ProbeTarget, result: ProbeResult) -> ProbeResult:
+        histogram = self.histograms.get(target.name)
+        if histogram is None:
+            histogram = self.histograms[target.name] = LatencyHistogram(self.buckets)
+        histogram.observe(result.latency)
+        self.latest[target.name] = result
+
+        if self.on_result is not None:
+            try:
+                self.on_result(target.name, result)
+            except Exception as e:
+                logger.error(f"Probe result callback failed for {target.name}: {e}")
+        return result
+
+    async def probe_all(self, targets: List[ProbeTarget], spread: float = 0.0,
+                        deadline: Optional[float] = None) -> Dict[str, ProbeResult]:
+        """
+        Probe all targets concurrently, staggering starts over ``spread`` seconds.
+
+        Probes still queued or running after ``deadline`` seconds are
+        cancelled and reported as unhealthy; the others keep their results.
+        """
+        async def _delayed(target: ProbeTarget) -> ProbeResult:
+            if spread > 0:
+                await asyncio.sleep(random.uniform(0, spread))
+            return await self.probe(target)
+
+        tasks = [asyncio.ensure_future(_delayed(t)) for t in targets]
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = {}
+        for target, task in zip(targets, tasks):
+            if task in pending:
+                results[target.name] = self._record(target, ProbeResult(
+                    healthy=False, latency=deadline,
+                    error=f"not completed within {deadline:.1f}s deadline"
+                ))
+            else:
+                results[target.name] = task.result()
+        return results
+
+    def estimate_duration(self, targets: List[ProbeTarget], spread: float = 0.0) -> float:
+        """
+        Worst-case time to probe ``targets`` in one batch.
+
+        Probes of the same origin queue behind ``max_per_host`` connections
+        and all probes behind ``max_concurrency``, so the bound is the number
+        of queueing waves times the longest timeout.
+        """
+        if not targets:
+            return spread
+        longest = max(t.timeout for t in targets)
+        per_origin: Dict[Tuple[str, str, int], int] = {}
+        for target in targets:
+            try:
+                origin, _ = self._prepare(target)
+            except ValueError:
+                continue
+            per_origin[origin] = per_origin.get(origin, 0) + 1
+
+        waves = -(-len(targets) // self.max_concurrency)
+        for count in per_origin.values():
+            waves = max(waves, -(-count // self.pool.max_per_host))
+        return spread + waves * longest
+
+    async def _probe_loop(self, target: ProbeTarget):
+        await asyncio.sleep(random.uniform(0, target.interval))
+        while True:
+            await self.probe(target)
+            jitter = random.uniform(-self.jitter, self.jitter)
+            await asyncio.sleep(target.interval * (1 + jitter))
+
+    async def _schedule(self, targets: List[ProbeTarget]):
+        wanted = {t.name for t in targets}
+        for name in list(self._scheduled):
+            if name not in wanted:
+                self._scheduled.pop(name).cancel()
+        for target in targets:
+            if target.name not in self._scheduled:
+                self._scheduled[target.name] = asyncio.create_task(self._probe_loop(target))
+
+    async def _shutdown(self):
+        for task in self._scheduled.values():
+            task.cancel()
+        await asyncio.gather(*self._scheduled.values(), return_exceptions=True)
+        self._scheduled.clear()
+        await self.pool.close()
+
+    # Synchronous interface, backed by a private event loop thread
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="http-probes", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def probe_all_sync(self, targets: List[ProbeTarget], spread: float = 0.0,
+                       deadline: Optional[float] = None) -> Dict[str, ProbeResult]:
+        """
+        Blocking ``probe_all`` for synchronous collectors.
+
+        ``deadline`` defaults to ``estimate_duration()`` plus a second of
+        slack. Targets not probed by then are reported as unhealthy, so the
+        call always returns a result per target.
+        """
+        if not targets:
+            return {}
+        if deadline is None:
+            deadline = self.estimate_duration(targets, spread) + 1.0
+        future = asyncio.run_coroutine_threadsafe(
+            self.probe_all(targets, spread, deadline), self._ensure_loop()
+        )
+        try:
+            # probe_all enforces the deadline itself; this only guards a stuck loop
+            return future.result(timeout=deadline + 5.0)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.error(f"HTTP probe batch of {len(targets)} targets did not finish")
+            return {
+                t.name: ProbeResult(healthy=False, error="probe batch did not finish")
+                for t in targets
+            }
+
+    def schedule(self, targets: List[ProbeTarget]):
+        """Probe targets continuously in the background; replaces the previous set."""
+        asyncio.run_coroutine_threadsafe(
+            self._schedule(targets), self._ensure_loop()
+        ).result()
+
+    def is_scheduled(self, name: str) -> bool:
+        return name in self._scheduled
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters and latency summaries per endpoint."""
+        return {
+            "pool": dict(self.pool.stats),
+            "endpoints": {name: h.to_dict() for name, h in self.histograms.items()},
+        }
+
+    def close(self):
+        """Stop scheduled probes, close pooled connections and the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
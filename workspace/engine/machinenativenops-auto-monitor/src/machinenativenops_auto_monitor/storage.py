@@ -1,6 +1,12 @@
 """
 Database storage for metrics data
 SQLite-based storage with proper schema and retention
+
+Uses one persistent WAL-mode connection. Numeric metric values are written
+only to a TimeSeriesStorage in the same database file, which keeps compact
+per-series chunks and 1m/5m/1h rollups for range queries. The metrics table
+keeps the non-numeric rest of each snapshot (statuses, error messages), and
+the read paths merge the numeric values back in from the series data.
 """
 
 import sqlite3
@@ -12,21 +18,47 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 from contextlib import contextmanager
 
-from .config import DatabaseConfig
+from .儲存 import TimeSeriesStorage, _to_millis
+
+
+def _strip_numeric(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the numeric leaves that TimeSeriesStorage already keeps"""
+    stripped = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            nested = _strip_numeric(value)
+            if nested:
+                stripped[key] = nested
+        elif not isinstance(value, (int, float)):
+            stripped[key] = value
+    return stripped
+
+
+def _parse_timestamp(timestamp: Any) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(timestamp))
+    except ValueError:
+        return None
+
 
 class DatabaseManager:
     """SQLite database manager for metrics storage"""
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, retention: Optional[Dict[str, float]] = None):
         self.db_path = Path(db_path)
         self.logger = logging.getLogger(__name__)
         
         # Thread lock for database operations
         self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
         
         # Ensure database directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # Per-series storage for numeric metric values. Created first so it
+        # can migrate a legacy per-point metrics table out of the way.
+        self.timeseries = TimeSeriesStorage(str(self.db_path), retention=retention)
+        
         # Initialize database
         self._init_database()
         
@@ -43,11 +75,18 @@ class DatabaseManager:
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT NOT NULL,
                     data TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    INDEX(timestamp),
-                    INDEX(created_at)
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON metrics(timestamp)'
+            )
+            # A metrics table from an older schema may lack created_at
+            columns = {row['name'] for row in cursor.execute('PRAGMA table_info(metrics)')}
+            if 'created_at' in columns:
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_metrics_created_at ON metrics(created_at)'
+                )
             
             # Create alerts table
             cursor.execute('''
@@ -60,12 +99,18 @@ class DatabaseManager:
                     data TEXT,
                     resolved BOOLEAN DEFAULT FALSE,
                     resolved_at TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    INDEX(timestamp),
-                    INDEX(alert_type),
-                    INDEX(resolved)
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_alerts_type ON alerts(alert_type)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_alerts_resolved ON alerts(resolved)'
+            )
             
             # Create system_events table
             cursor.execute('''
@@ -76,40 +121,58 @@ class DatabaseManager:
                     component TEXT NOT NULL,
                     message TEXT NOT NULL,
                     data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    INDEX(timestamp),
-                    INDEX(event_type),
-                    INDEX(component)
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_events_timestamp ON system_events(timestamp)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_events_type ON system_events(event_type)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_events_component ON system_events(component)'
+            )
             
             conn.commit()
             self.logger.info("Database schema initialized")
     
     @contextmanager
     def _get_connection(self):
-        """Get database connection with thread safety"""
+        """Get the shared database connection with thread safety"""
         with self._lock:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
+            if self._conn is None:
+                conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+                conn.row_factory = sqlite3.Row  # Enable dict-like access
+                conn.execute('PRAGMA journal_mode = WAL')
+                conn.execute('PRAGMA synchronous = NORMAL')
+                self._conn = conn
             try:
-                yield conn
-            finally:
-                conn.close()
+                yield self._conn
+            except Exception:
+                self._conn.rollback()
+                raise
     
     def store_metrics(self, metrics: Dict[str, Any]):
         """Store metrics data"""
         try:
             timestamp = metrics.get('timestamp', datetime.utcnow().isoformat())
-            data_json = json.dumps(metrics, default=str)
+            series_time = _parse_timestamp(timestamp)
+            if series_time is None:
+                # Keep the row and its series points joinable on read
+                series_time = datetime.utcnow()
+                timestamp = series_time.isoformat()
+            data = _strip_numeric(metrics)
+            data['timestamp'] = timestamp
+            data_json = json.dumps(data, default=str)
             
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
+            # The snapshot row commits together with its buffered points
+            self.timeseries.store_metrics(metrics, timestamp=series_time)
+            with self.timeseries.transaction() as cursor:
                 cursor.execute(
                     'INSERT INTO metrics (timestamp, data) VALUES (?, ?)',
                     (timestamp, data_json)
                 )
-                conn.commit()
             
             self.logger.debug(f"Stored metrics for timestamp: {timestamp}")
             
@@ -154,13 +217,48 @@ class DatabaseManager:
                         metrics.append(data)
                     except json.JSONDecodeError as e:
                         self.logger.warning(f"Failed to decode metrics data: {e}")
-                
-                return metrics
+            
+            return self._attach_series_values(metrics)
                 
         except Exception as e:
             self.logger.error(f"Failed to retrieve metrics: {e}")
             raise
     
+    def _attach_series_values(self, snapshots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge numeric values from the series data into stored snapshots
+        
+        Values are keyed by their flattened series name, e.g. ``memory_used``.
+        """
+        times = {}
+        for data in snapshots:
+            parsed = _parse_timestamp(data.get('timestamp'))
+            if parsed is not None:
+                times[id(data)] = parsed
+        if not times:
+            return snapshots
+        
+        points = self.timeseries.query_points(
+            start_time=min(times.values()), end_time=max(times.values())
+        )
+        for data in snapshots:
+            parsed = times.get(id(data))
+            if parsed is not None:
+                data.update(points.get(_to_millis(parsed), {}))
+        return snapshots
+    
+    def get_series(self, name: str, start_time: Optional[datetime] = None,
+                   end_time: Optional[datetime] = None):
+        """Get raw points of one metric as (timestamps_ms, values) arrays"""
+        return self.timeseries.query_range(name, start_time=start_time, end_time=end_time)
+    
+    def get_series_aggregate(self, name: str, start_time: Optional[datetime] = None,
+                             end_time: Optional[datetime] = None,
+                             step: int = 60, agg: str = 'avg'):
+        """Get one metric aggregated into fixed steps, served from rollups when possible"""
+        return self.timeseries.query_aggregate(
+            name, start_time=start_time, end_time=end_time, step=step, agg=agg
+        )
+    
     def get_recent_metrics(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent metrics"""
         try:
@@ -180,8 +278,8 @@ class DatabaseManager:
                         metrics.append(data)
                     except json.JSONDecodeError:
                         self.logger.warning(f"Failed to decode metrics data")
-                
-                return metrics
+            
+            return self._attach_series_values(metrics)
                 
         except Exception as e:
             self.logger.error(f"Failed to get recent metrics: {e}")
@@ -358,13 +456,18 @@ class DatabaseManager:
                 
                 conn.commit()
                 
+                # Apply tiered retention to series data; this also commits
+                # the series connection so VACUUM is not blocked by it
+                series_deleted = self.timeseries.apply_retention()
+                
                 # Vacuum database to reclaim space
                 cursor.execute('VACUUM')
                 conn.commit()
                 
                 self.logger.info(
                     f"Cleanup completed: {metrics_deleted} metrics, "
-                    f"{alerts_deleted} alerts, {events_deleted} events"
+                    f"{alerts_deleted} alerts, {events_deleted} events, "
+                    f"series {series_deleted}"
                 )
                 
         except Exception as e:
@@ -406,6 +509,7 @@ class DatabaseManager:
                     'oldest_record': oldest_newest[0],
                     'newest_record': oldest_newest[1],
                     'database_path': str(self.db_path),
+                    'timeseries': self.timeseries.get_stats(),
                 }
                 
                 return stats
@@ -429,5 +533,9 @@ class DatabaseManager:
     
     def close(self):
         """Close database connections"""
-        # SQLite connections are closed automatically in context manager
+        self.timeseries.close()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
         self.logger.info("Database connections closed")
\ No newline at end of file
@@ -12,17 +12,24 @@ Handles metric and alert data storage.
 
 import json
 import logging
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import logging
-import json
+import mmap
+import os
 import sqlite3
-from pathlib import Path
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import struct
+import sys
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 
 @dataclass
@@ -43,22 +50,122 @@ class MetricRecord:
         }
 
 
+# 彙總解析度（秒）/ Rollup resolutions in seconds
+ROLLUP_RESOLUTIONS = (60, 300, 3600)
+
+# 保留層級（天）/ Retention tiers in days, keyed by tier name
+DEFAULT_RETENTION = {'raw': 7, '1m': 30, '5m': 180, '1h': 730}
+_TIER_RESOLUTIONS = {'raw': 0, '1m': 60, '5m': 300, '1h': 3600}
+
+AGGREGATIONS = ('avg', 'sum', 'min', 'max', 'count')
+
+# 舊版逐行 metrics 表的遷移批次大小 / Rows per batch when migrating the
+# legacy one-row-per-point metrics table
+_MIGRATION_BATCH = 10000
+
+
+def _encode_timestamps(timestamps: List[int]) -> bytes:
+    """差分編碼毫秒時間戳 / Delta-encode millisecond timestamps."""
+    deltas = array('q', [timestamps[0]])
+    deltas.extend(b - a for a, b in zip(timestamps, timestamps[1:]))
+    if sys.byteorder == 'big':
+        deltas.byteswap()
+    return zlib.compress(deltas.tobytes(), 1)
+
+
+def _decode_timestamps(blob: bytes) -> array:
+    """解碼差分時間戳 / Decode delta-encoded timestamps."""
+    deltas = array('q')
+    deltas.frombytes(zlib.decompress(blob))
+    if sys.byteorder == 'big':
+        deltas.byteswap()
+    return array('q', accumulate(deltas))
+
+
+def _encode_values(values: List[float]) -> bytes:
+    """編碼浮點數組 / Encode a float64 array."""
+    packed = array('d', values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return zlib.compress(packed.tobytes(), 1)
+
+
+def _decode_values(blob: bytes) -> array:
+    """解碼浮點數組 / Decode a float64 array."""
+    values = array('d')
+    values.frombytes(zlib.decompress(blob))
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _to_millis(timestamp: datetime) -> int:
+    return int(round(timestamp.timestamp() * 1000))
+
+
+def _flatten(metrics: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """展平嵌套指標，只保留數值 / Flatten nested metrics, keeping numeric leaves."""
+    flat = {}
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}_"))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = float(value)
+    return flat
+
+
+class _OpenChunk:
+    """尚未封閉的序列數據塊 / A series chunk still accepting points."""
+
+    __slots__ = ('series_id', 'rowid', 'timestamps', 'values', 'dirty')
+
+    def __init__(self, series_id: int):
+        self.series_id = series_id
+        self.rowid: Optional[int] = None
+        self.timestamps: List[int] = []
+        self.values: List[float] = []
+        self.dirty = False
+
+
 class TimeSeriesStorage:
     """
     時間序列指標儲存 / Time-series metrics storage.
     使用 SQLite 作為後端 / Uses SQLite as backend.
+
+    每個序列（名稱 + 標籤）的數據按塊儲存：時間戳差分編碼、數值為
+    float64 數組，各自壓縮。寫入時同步維護 1m/5m/1h 彙總，按層級保留。
+    Points are buffered in per-series open chunks and written on ``flush()``,
+    which runs automatically every ``flush_interval`` seconds and before
+    queries. Range and aggregation queries return ``array.array`` columns.
     """
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str,
+                 retention: Optional[Dict[str, float]] = None,
+                 chunk_points: int = 120,
+                 flush_interval: float = 10.0):
         """
         初始化時間序列儲存 / Initialize time-series storage.
         
         Args:
             db_path: 數據庫文件路徑 / Database file path
+            retention: 各層級保留天數 / Retention days per tier (raw, 1m, 5m, 1h)
+            chunk_points: 每塊最大點數 / Maximum points per chunk
+            flush_interval: 自動刷新間隔（秒）/ Automatic flush interval in seconds
         """
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
         self.connection: Optional[sqlite3.Connection] = None
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.chunk_points = chunk_points
+        self.flush_interval = flush_interval
+        
+        self._lock = threading.RLock()
+        self._series_ids: Dict[Tuple[str, str], int] = {}
+        self._open_chunks: Dict[int, _OpenChunk] = {}
+        self._full_chunks: List[_OpenChunk] = []
+        # (series_id, resolution, bucket) -> [count, sum, min, max]
+        self._pending_rollups: Dict[Tuple[int, int, int], List[float]] = {}
+        self._last_flush = time.monotonic()
         
         self._initialize_database()
     
@@ -68,40 +175,167 @@ class TimeSeriesStorage:
             # 確保目錄存在 / Ensure directory exists
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # 連接數據庫 / Connect to database
-            self.connection = sqlite3.connect(self.db_path)
+            # 持久連接，WAL 模式 / Persistent connection in WAL mode
+            self.connection = sqlite3.connect(
+                self.db_path, timeout=30.0, check_same_thread=False
+            )
             cursor = self.connection.cursor()
+            if cursor.execute("PRAGMA page_count").fetchone()[0] == 0:
+                # 僅對新文件生效；已有文件需調用 enable_incremental_vacuum()
+                # Only takes effect on a new file; existing files are
+                # converted explicitly with enable_incremental_vacuum()
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
             
-            # 創建指標表 / Create metrics table
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                CREATE TABLE IF NOT EXISTS series (
+                    id INTEGER PRIMARY KEY,
                     name TEXT NOT NULL,
-                    value REAL NOT NULL,
-                    timestamp DATETIME NOT NULL,
-                    labels TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    labels TEXT NOT NULL,
+                    UNIQUE(name, labels)
                 )
             """)
             
-            # 創建索引以提高查詢效能 / Create indexes for query performance
+            # 原始數據塊 / Raw data chunks
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_metrics_name 
-                ON metrics(name)
+                CREATE TABLE IF NOT EXISTS series_chunks (
+                    id INTEGER PRIMARY KEY,
+                    series_id INTEGER NOT NULL,
+                    min_ts INTEGER NOT NULL,
+                    max_ts INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    timestamps BLOB NOT NULL,
+                    vals BLOB NOT NULL
+                )
             """)
             
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_metrics_timestamp 
-                ON metrics(timestamp)
+                CREATE INDEX IF NOT EXISTS idx_series_chunks_range
+                ON series_chunks(series_id, max_ts)
+            """)
+            
+            # 彙總數據（bucket 為秒）/ Rollups, bucket in epoch seconds
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS series_rollups (
+                    series_id INTEGER NOT NULL,
+                    resolution INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    PRIMARY KEY (series_id, resolution, bucket)
+                ) WITHOUT ROWID
             """)
             
             self.connection.commit()
+            
+            for series_id, name, labels in cursor.execute(
+                "SELECT id, name, labels FROM series"
+            ):
+                self._series_ids[(name, labels)] = series_id
+            
+            self._migrate_legacy_metrics()
+            
             self.logger.info(f"Database initialized at: {self.db_path}")
         
         except Exception as e:
             self.logger.error(f"Error initializing database: {e}")
             raise
     
+    def _migrate_legacy_metrics(self):
+        """
+        遷移舊版逐行 metrics 表 / Move the legacy one-row-per-point table.
+        
+        每批寫入數據塊並刪除已遷移的行，兩者在同一事務中提交，中斷後
+        可安全續跑。完成後刪除舊表。
+        Each batch writes its chunks and deletes the migrated rows in one
+        transaction, so an interrupted migration resumes without
+        duplicates. The emptied table is dropped at the end.
+        """
+        columns = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(metrics)")
+        }
+        if not {'name', 'value', 'timestamp'} <= columns:
+            return
+        
+        migrated = 0
+        with self._lock:
+            while True:
+                rows = self.connection.execute(
+                    """
+                    SELECT id, name, value, timestamp, labels FROM metrics
+                    ORDER BY id LIMIT ?
+                    """,
+                    (_MIGRATION_BATCH,)
+                ).fetchall()
+                if not rows:
+                    break
+                for _, name, value, timestamp, labels in rows:
+                    try:
+                        ts_ms = _to_millis(datetime.fromisoformat(str(timestamp)))
+                    except ValueError:
+                        self.logger.warning(f"Dropping legacy metric with bad timestamp: {timestamp!r}")
+                        continue
+                    self._append(
+                        self._series_id(name, json.loads(labels) if labels else {}),
+                        ts_ms, float(value)
+                    )
+                with self.connection:
+                    cursor = self.connection.cursor()
+                    self._write_pending(cursor)
+                    cursor.execute("DELETE FROM metrics WHERE id <= ?", (rows[-1][0],))
+                migrated += len(rows)
+            
+            with self.connection:
+                self.connection.execute("DROP TABLE metrics")
+        self.logger.info(f"Migrated {migrated} legacy metric rows into series chunks")
+    
+    def _series_id(self, name: str, labels: Optional[Dict[str, str]]) -> int:
+        """獲取或創建序列 ID / Get or create a series id."""
+        key = (name, json.dumps(labels or {}, sort_keys=True))
+        series_id = self._series_ids.get(key)
+        if series_id is None:
+            # 立即提交，避免長期持有寫鎖 / Commit at once so no write lock
+            # stays open until the next flush (other connections share the file)
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO series (name, labels) VALUES (?, ?)", key
+                )
+            series_id = cursor.lastrowid
+            self._series_ids[key] = series_id
+        return series_id
+    
+    def _append(self, series_id: int, ts_ms: int, value: float):
+        """追加一個數據點並更新彙總 / Append one point and update rollups."""
+        chunk = self._open_chunks.get(series_id)
+        if chunk is None or len(chunk.timestamps) >= self.chunk_points:
+            if chunk is not None:
+                self._full_chunks.append(chunk)
+            chunk = self._open_chunks[series_id] = _OpenChunk(series_id)
+        chunk.timestamps.append(ts_ms)
+        chunk.values.append(value)
+        chunk.dirty = True
+        
+        seconds = ts_ms // 1000
+        for resolution in ROLLUP_RESOLUTIONS:
+            key = (series_id, resolution, seconds - seconds % resolution)
+            agg = self._pending_rollups.get(key)
+            if agg is None:
+                self._pending_rollups[key] = [1, value, value, value]
+            else:
+                agg[0] += 1
+                agg[1] += value
+                if value < agg[2]:
+                    agg[2] = value
+                if value > agg[3]:
+                    agg[3] = value
+    
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+    
     def store_metric(self, name: str, value: float, 
                     timestamp: Optional[datetime] = None,
                     labels: Optional[Dict[str, str]] = None):
@@ -117,58 +351,332 @@ class TimeSeriesStorage:
         if timestamp is None:
             timestamp = datetime.now()
         
-        if labels is None:
-            labels = {}
-        
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(
-                """
-                INSERT INTO metrics (name, value, timestamp, labels)
-                VALUES (?, ?, ?, ?)
-                """,
-                (name, value, timestamp, json.dumps(labels))
-            )
-            self.connection.commit()
+            with self._lock:
+                self._append(self._series_id(name, labels), _to_millis(timestamp), float(value))
+                self._maybe_flush()
         
         except Exception as e:
             self.logger.error(f"Error storing metric {name}: {e}")
     
     def store_metrics(self, metrics: Dict[str, float],
-                     timestamp: Optional[datetime] = None):
+                     timestamp: Optional[datetime] = None,
+                     labels: Optional[Dict[str, str]] = None):
         """
         批量儲存指標 / Store multiple metrics in batch.
         
+        嵌套字典以 ``_`` 展平，非數值字段被忽略。
+        Nested dicts are flattened with ``_``; non-numeric fields are skipped.
+        
         Args:
             metrics: 指標字典（名稱 -> 值）/ Metrics dictionary (name -> value)
             timestamp: 時間戳（可選）/ Timestamp (optional)
+            labels: 所有指標共用的標籤（可選）/ Labels shared by all metrics (optional)
         """
         if timestamp is None:
             timestamp = datetime.now()
+        ts_ms = _to_millis(timestamp)
         
         try:
-            cursor = self.connection.cursor()
-            
-            # 準備批量插入數據 / Prepare batch insert data
-            data = [
-                (name, value, timestamp, json.dumps({}))
-                for name, value in metrics.items()
-            ]
-            
-            cursor.executemany(
-                """
-                INSERT INTO metrics (name, value, timestamp, labels)
-                VALUES (?, ?, ?, ?)
-                """,
-                data
-            )
+            flat = _flatten(metrics)
+            with self._lock:
+                for name, value in flat.items():
+                    self._append(self._series_id(name, labels), ts_ms, value)
+                self._maybe_flush()
             
-            self.connection.commit()
-            self.logger.debug(f"Stored {len(metrics)} metrics")
+            self.logger.debug(f"Stored {len(flat)} metrics")
         
         except Exception as e:
             self.logger.error(f"Error storing metrics batch: {e}")
     
+    def flush(self):
+        """將緩衝的數據塊和彙總寫入數據庫 / Write buffered chunks and rollups."""
+        with self._lock:
+            with self.connection:
+                self._write_pending(self.connection.cursor())
+    
+    @contextmanager
+    def transaction(self):
+        """
+        在刷新緩衝數據的同一事務中執行其他寫入
+        Run other writes in the same transaction that flushes buffered points.
+        
+        Yields a cursor on this storage's connection; the buffered chunks and
+        rollups are written after the caller's statements and everything
+        commits together.
+        """
+        with self._lock:
+            with self.connection:
+                cursor = self.connection.cursor()
+                yield cursor
+                self._write_pending(cursor)
+    
+    def _write_pending(self, cursor: sqlite3.Cursor):
+        """在當前事務中寫入緩衝數據 / Write buffered data in the open transaction."""
+        chunks = self._full_chunks + [c for c in self._open_chunks.values() if c.dirty]
+        rollups = self._pending_rollups
+        self._full_chunks = []
+        self._pending_rollups = {}
+        self._last_flush = time.monotonic()
+        if not chunks and not rollups:
+            return
+        
+        for chunk in chunks:
+            row = (
+                min(chunk.timestamps),
+                max(chunk.timestamps),
+                len(chunk.timestamps),
+                _encode_timestamps(chunk.timestamps),
+                _encode_values(chunk.values),
+            )
+            if chunk.rowid is not None:
+                cursor.execute(
+                    """
+                    UPDATE series_chunks
+                    SET min_ts = ?, max_ts = ?, count = ?, timestamps = ?, vals = ?
+                    WHERE id = ?
+                    """,
+                    (*row, chunk.rowid)
+                )
+                if cursor.rowcount == 0:
+                    # 行已被刪除（如保留清理）/ Row is gone, e.g. removed
+                    # by retention; write the chunk as a new row
+                    chunk.rowid = None
+            if chunk.rowid is None:
+                cursor.execute(
+                    """
+                    INSERT INTO series_chunks
+                        (series_id, min_ts, max_ts, count, timestamps, vals)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (chunk.series_id, *row)
+                )
+                chunk.rowid = cursor.lastrowid
+            chunk.dirty = False
+        
+        cursor.executemany(
+            """
+            INSERT INTO series_rollups
+                (series_id, resolution, bucket, count, sum, min, max)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (series_id, resolution, bucket) DO UPDATE SET
+                count = count + excluded.count,
+                sum = sum + excluded.sum,
+                min = MIN(min, excluded.min),
+                max = MAX(max, excluded.max)
+            """,
+            [(*key, *agg) for key, agg in rollups.items()]
+        )
+    
+    def _matching_series(self, name: str,
+                         labels: Optional[Dict[str, str]]) -> List[Tuple[int, str]]:
+        """按名稱（及標籤）查找序列 / Find series by name and optional labels."""
+        if labels is not None:
+            key = (name, json.dumps(labels, sort_keys=True))
+            series_id = self._series_ids.get(key)
+            return [(series_id, key[1])] if series_id is not None else []
+        return [
+            (series_id, series_labels)
+            for (series_name, series_labels), series_id in self._series_ids.items()
+            if series_name == name
+        ]
+    
+    def _read_range(self, series_id: int, start_ms: int, end_ms: int) -> Tuple[array, array]:
+        """讀取單個序列的原始數據 / Read raw points of one series."""
+        timestamps = array('q')
+        values = array('d')
+        rows = self.connection.execute(
+            """
+            SELECT min_ts, max_ts, timestamps, vals FROM series_chunks
+            WHERE series_id = ? AND max_ts >= ? AND min_ts <= ?
+            ORDER BY min_ts
+            """,
+            (series_id, start_ms, end_ms)
+        )
+        for min_ts, max_ts, ts_blob, val_blob in rows:
+            chunk_ts = _decode_timestamps(ts_blob)
+            chunk_values = _decode_values(val_blob)
+            if start_ms <= min_ts and max_ts <= end_ms:
+                timestamps.extend(chunk_ts)
+                values.extend(chunk_values)
+            else:
+                for ts, value in zip(chunk_ts, chunk_values):
+                    if start_ms <= ts <= end_ms:
+                        timestamps.append(ts)
+                        values.append(value)
+        
+        # 亂序寫入或塊重疊時排序 / Sort when points arrived out of order
+        if any(b < a for a, b in zip(timestamps, timestamps[1:])):
+            order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+            timestamps = array('q', (timestamps[i] for i in order))
+            values = array('d', (values[i] for i in order))
+        return timestamps, values
+    
+    @staticmethod
+    def _range_millis(start_time: Optional[datetime],
+                      end_time: Optional[datetime]) -> Tuple[int, int]:
+        start_ms = _to_millis(start_time) if start_time else -(1 << 62)
+        end_ms = _to_millis(end_time) if end_time else 1 << 62
+        return start_ms, end_ms
+    
+    def query_range(self, name: str,
+                    start_time: Optional[datetime] = None,
+                    end_time: Optional[datetime] = None,
+                    labels: Optional[Dict[str, str]] = None) -> Tuple[array, array]:
+        """
+        查詢單個序列的原始數據 / Query raw points of a single series.
+        
+        Args:
+            name: 指標名稱 / Metric name
+            start_time: 開始時間（可選）/ Start time (optional)
+            end_time: 結束時間（可選）/ End time (optional)
+            labels: 序列標籤，默認為空 / Series labels, empty by default
+            
+        Returns:
+            (毫秒時間戳 array('q'), 數值 array('d'))，按時間升序
+            (millisecond timestamps, values), ascending by time
+        """
+        start_ms, end_ms = self._range_millis(start_time, end_time)
+        with self._lock:
+            self.flush()
+            series = self._matching_series(name, labels or {})
+            if not series:
+                return array('q'), array('d')
+            return self._read_range(series[0][0], start_ms, end_ms)
+    
+    def query_points(self, start_time: Optional[datetime] = None,
+                     end_time: Optional[datetime] = None,
+                     labels: Optional[Dict[str, str]] = None) -> Dict[int, Dict[str, float]]:
+        """
+        按時間戳分組查詢所有序列 / Query all series grouped by timestamp.
+        
+        Args:
+            start_time: 開始時間（可選）/ Start time (optional)
+            end_time: 結束時間（可選）/ End time (optional)
+            labels: 序列標籤，默認為空 / Series labels, empty by default
+        
+        Returns:
+            {毫秒時間戳: {指標名稱: 數值}} / {timestamp in ms: {metric name: value}}
+        """
+        start_ms, end_ms = self._range_millis(start_time, end_time)
+        series_labels = json.dumps(labels or {}, sort_keys=True)
+        points: Dict[int, Dict[str, float]] = {}
+        with self._lock:
+            self.flush()
+            for (name, key_labels), series_id in self._series_ids.items():
+                if key_labels != series_labels:
+                    continue
+                for ts, value in zip(*self._read_range(series_id, start_ms, end_ms)):
+                    points.setdefault(ts, {})[name] = value
+        return points
+        
+    @staticmethod
+    def _pick_resolution(step: int) -> int:
+        """選擇能整除步長的最粗彙總 / Coarsest rollup resolution dividing the step."""
+        return max((r for r in ROLLUP_RESOLUTIONS if step % r == 0), default=0)
+    
+    def _group_raw(self, grouped: Dict[int, List[float]], series_id: int,
+                   start_ms: int, end_ms: int, step_ms: int):
+        """將原始數據按步長累加 / Accumulate raw points into steps."""
+        if start_ms > end_ms:
+            return
+        for ts, value in zip(*self._read_range(series_id, start_ms, end_ms)):
+            step_start = ts - ts % step_ms
+            acc = grouped.get(step_start)
+            if acc is None:
+                grouped[step_start] = [1, value, value, value]
+            else:
+                acc[0] += 1
+                acc[1] += value
+                acc[2] = min(acc[2], value)
+                acc[3] = max(acc[3], value)
+    
+    def query_aggregate(self, name: str,
+                        start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None,
+                        step: int = 60,
+                        agg: str = 'avg',
+                        labels: Optional[Dict[str, str]] = None) -> Tuple[array, array]:
+        """
+        按固定步長聚合查詢 / Query values aggregated into fixed steps.
+        
+        步長為彙總解析度的倍數時直接讀取彙總表，否則回退到原始數據。
+        範圍邊緣未完全覆蓋的彙總桶改用原始數據，結果精確限於查詢範圍。
+        Steps that are multiples of a rollup resolution are served from the
+        coarsest such rollup; other steps fall back to raw chunks. Rollup
+        buckets only partly inside the range are read from raw chunks
+        instead, so results never include points outside the range.
+        
+        Args:
+            name: 指標名稱 / Metric name
+            start_time: 開始時間（可選）/ Start time (optional)
+            end_time: 結束時間（可選）/ End time (optional)
+            step: 步長（秒）/ Step in seconds
+            agg: 聚合函數 / Aggregation: avg, sum, min, max or count
+            labels: 序列標籤，默認為空 / Series labels, empty by default
+            
+        Returns:
+            (步起始毫秒時間戳 array('q'), 聚合值 array('d'))
+            (step start in milliseconds, aggregated values)
+        """
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {agg}")
+        if step <= 0:
+            raise ValueError("step must be positive")
+        
+        start_ms, end_ms = self._range_millis(start_time, end_time)
+        buckets = array('q')
+        results = array('d')
+        
+        with self._lock:
+            self.flush()
+            series = self._matching_series(name, labels or {})
+            if not series:
+                return buckets, results
+            series_id = series[0][0]
+            resolution = self._pick_resolution(step)
+            
+            step_ms = step * 1000
+            grouped: Dict[int, List[float]] = {}
+            first_s = stop_s = 0
+            if resolution:
+                # 完全落在範圍內的彙總桶 / Rollup buckets fully inside the range
+                res_ms = resolution * 1000
+                first_s = -(-start_ms // res_ms) * resolution
+                stop_s = (end_ms + 1) // res_ms * resolution
+            if resolution and first_s < stop_s:
+                for step_start, count, total, low, high in self.connection.execute(
+                    """
+                    SELECT (bucket / ?) * ? AS step_start,
+                           SUM(count), SUM(sum), MIN(min), MAX(max)
+                    FROM series_rollups
+                    WHERE series_id = ? AND resolution = ? AND bucket >= ? AND bucket < ?
+                    GROUP BY step_start
+                    """,
+                    (step, step, series_id, resolution, first_s, stop_s)
+                ):
+                    grouped[step_start * 1000] = [count, total, low, high]
+                # 邊緣部分讀取原始數據 / Partial edges come from raw chunks
+                self._group_raw(grouped, series_id, start_ms, first_s * 1000 - 1, step_ms)
+                self._group_raw(grouped, series_id, stop_s * 1000, end_ms, step_ms)
+            else:
+                self._group_raw(grouped, series_id, start_ms, end_ms, step_ms)
+            rows = [(k // 1000, *grouped[k]) for k in sorted(grouped)]
+        
+        for step_start, count, total, low, high in rows:
+            buckets.append(step_start * 1000)
+            if agg == 'avg':
+                results.append(total / count)
+            elif agg == 'sum':
+                results.append(total)
+            elif agg == 'min':
+                results.append(low)
+            elif agg == 'max':
+                results.append(high)
+            else:
+                results.append(count)
+        return buckets, results
+    
     def query_metrics(self, name: str,
                      start_time: Optional[datetime] = None,
                      end_time: Optional[datetime] = None,
@@ -183,64 +691,83 @@ class TimeSeriesStorage:
             limit: 最大返回數量 / Maximum number of results
             
         Returns:
-            指標記錄列表 / List of metric records
+            指標記錄列表，最新在前 / List of metric records, newest first
         """
         try:
-            cursor = self.connection.cursor()
-            
-            query = "SELECT name, value, timestamp, labels FROM metrics WHERE name = ?"
-            params = [name]
+            start_ms, end_ms = self._range_millis(start_time, end_time)
+            points = []
+            with self._lock:
+                self.flush()
+                for series_id, labels in self._matching_series(name, None):
+                    timestamps, values = self._read_range(series_id, start_ms, end_ms)
+                    points.extend(
+                        (ts, value, labels)
+                        for ts, value in zip(timestamps[-limit:], values[-limit:])
+                    )
             
-            if start_time:
-                query += " AND timestamp >= ?"
-                params.append(start_time)
-            
-            if end_time:
-                query += " AND timestamp <= ?"
-                params.append(end_time)
-            
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            # 轉換為 MetricRecord 物件 / Convert to MetricRecord objects
-            records = []
-            for row in rows:
-                records.append(MetricRecord(
-                    name=row[0],
-                    value=row[1],
-                    timestamp=datetime.fromisoformat(row[2]),
-                    labels=json.loads(row[3]) if row[3] else {}
-                ))
-            
-            return records
+            points.sort(key=lambda p: p[0], reverse=True)
+            return [
+                MetricRecord(
+                    name=name,
+                    value=value,
+                    timestamp=datetime.fromtimestamp(ts / 1000),
+                    labels=json.loads(labels)
+                )
+                for ts, value, labels in points[:limit]
+            ]
         
         except Exception as e:
             self.logger.error(f"Error querying metrics: {e}")
             return []
     
-    def cleanup_old_data(self, retention_days: int = 30):
+    def apply_retention(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        按層級刪除過期數據 / Delete data past each tier's retention.
+        
+        Returns:
+            每個層級刪除的行數 / Rows deleted per tier
+        """
+        now_s = (now or datetime.now()).timestamp()
+        deleted = {}
+        with self._lock:
+            self.flush()
+            with self.connection:
+                for tier, resolution in _TIER_RESOLUTIONS.items():
+                    cutoff_s = now_s - self.retention[tier] * 86400
+                    if resolution == 0:
+                        cutoff_ms = int(cutoff_s * 1000)
+                        cursor = self.connection.execute(
+                            "DELETE FROM series_chunks WHERE max_ts < ?",
+                            (cutoff_ms,)
+                        )
+                        # 丟棄行已被刪除的開放塊，新數據點另起新塊
+                        # Drop open chunks whose row was just deleted so new
+                        # points start a fresh chunk instead of updating it
+                        for series_id, chunk in list(self._open_chunks.items()):
+                            if max(chunk.timestamps) < cutoff_ms:
+                                del self._open_chunks[series_id]
+                    else:
+                        cursor = self.connection.execute(
+                            "DELETE FROM series_rollups WHERE resolution = ? AND bucket < ?",
+                            (resolution, int(cutoff_s))
+                        )
+                    deleted[tier] = cursor.rowcount
+            self.connection.execute("PRAGMA incremental_vacuum").fetchall()
+        return deleted
+    
+    def cleanup_old_data(self, retention_days: Optional[int] = None):
         """
         清理過期數據 / Clean up old data.
         
         Args:
-            retention_days: 保留天數 / Number of days to retain
+            retention_days: 原始數據保留天數（可選，默認按層級）
+                Raw data retention in days (optional, defaults to the tier setting)
         """
         try:
-            cutoff_date = datetime.now() - timedelta(days=retention_days)
-            
-            cursor = self.connection.cursor()
-            cursor.execute(
-                "DELETE FROM metrics WHERE timestamp < ?",
-                (cutoff_date,)
-            )
-            
-            deleted_count = cursor.rowcount
-            self.connection.commit()
-            
-            self.logger.info(f"Cleaned up {deleted_count} old metric records")
+            if retention_days is not None:
+                self.retention['raw'] = retention_days
+            deleted = self.apply_retention()
+            self.logger.info(f"Cleaned up old data: {deleted}")
         
         except Exception as e:
             self.logger.error(f"Error cleaning up old data: {e}")
@@ -253,25 +780,41 @@ class TimeSeriesStorage:
             統計信息字典 / Statistics dictionary
         """
         try:
-            cursor = self.connection.cursor()
-            
-            # 總記錄數 / Total records
-            cursor.execute("SELECT COUNT(*) FROM metrics")
-            total_records = cursor.fetchone()[0]
-            
-            # 不同指標數量 / Distinct metrics count
-            cursor.execute("SELECT COUNT(DISTINCT name) FROM metrics")
-            distinct_metrics = cursor.fetchone()[0]
-            
-            # 最舊和最新的記錄時間 / Oldest and newest record times
-            cursor.execute("SELECT MIN(timestamp), MAX(timestamp) FROM metrics")
-            oldest, newest = cursor.fetchone()
+            with self._lock:
+                self.flush()
+                cursor = self.connection.cursor()
+                
+                # 原始數據點和數據塊 / Raw points and chunks
+                cursor.execute(
+                    "SELECT COALESCE(SUM(count), 0), COUNT(*), MIN(min_ts), MAX(max_ts) "
+                    "FROM series_chunks"
+                )
+                total_records, chunk_count, oldest, newest = cursor.fetchone()
+                
+                cursor.execute(
+                    "SELECT resolution, COUNT(*) FROM series_rollups GROUP BY resolution"
+                )
+                rollup_rows = dict(cursor.fetchall())
+                
+                cursor.execute("SELECT COUNT(DISTINCT name) FROM series")
+                distinct_metrics = cursor.fetchone()[0]
+                
+                page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+                page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
             
             return {
                 'total_records': total_records,
                 'distinct_metrics': distinct_metrics,
-                'oldest_record': oldest,
-                'newest_record': newest,
+                'series': len(self._series_ids),
+                'chunks': chunk_count,
+                'rollup_rows': {f"{r // 60}m" if r < 3600 else f"{r // 3600}h": n
+                                for r, n in sorted(rollup_rows.items())},
+                'oldest_record': (datetime.fromtimestamp(oldest / 1000).isoformat()
+                                  if oldest is not None else None),
+                'newest_record': (datetime.fromtimestamp(newest / 1000).isoformat()
+                                  if newest is not None else None),
+                'size_bytes': page_count * page_size,
+                'retention_days': dict(self.retention),
                 'db_path': self.db_path
             }
         
@@ -279,10 +822,30 @@ class TimeSeriesStorage:
             self.logger.error(f"Error getting storage stats: {e}")
             return {}
     
+    def enable_incremental_vacuum(self):
+        """
+        將已有數據庫轉為增量自動清理 / Convert an existing file to
+        incremental auto-vacuum.
+        
+        需要一次完整 VACUUM，會重寫整個文件並阻塞寫入，應作為維護操作執行。
+        Needs one full VACUUM, which rewrites the whole file and blocks
+        writers, so run it as a maintenance step rather than at startup.
+        """
+        with self._lock:
+            self.flush()
+            self.connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if self.connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                self.connection.execute("VACUUM")
+    
     def close(self):
         """關閉數據庫連接 / Close database connection."""
         if self.connection:
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Error flushing metrics on close: {e}")
             self.connection.close()
+            self.connection = None
             self.logger.info("Database connection closed")
 
 
@@ -306,14 +869,20 @@ class StorageManager:
         # 初始化儲存後端 / Initialize storage backend
         backend_type = config.get('backend', 'timeseries')
         
+        # 設置數據保留策略 / Set data retention policy
+        self.retention_days = config.get('retention_days', 30)
+        
         if backend_type == 'timeseries':
             db_path = config.get('path', '/var/lib/machinenativeops/metrics/metrics.db')
-            self.backend = TimeSeriesStorage(db_path)
+            retention = {'raw': self.retention_days, **config.get('retention_tiers', {})}
+            self.backend = TimeSeriesStorage(
+                db_path,
+                retention=retention,
+                chunk_points=config.get('chunk_points', 120),
+                flush_interval=config.get('flush_interval', 10.0),
+            )
         else:
             raise ValueError(f"Unsupported storage backend: {backend_type}")
-        
-        # 設置數據保留策略 / Set data retention policy
-        self.retention_days = config.get('retention_days', 30)
     
     def store_metrics(self, metrics: Dict[str, float]):
         """
@@ -343,6 +912,14 @@ class StorageManager:
         """
         return self.backend.query_metrics(name, **kwargs)
     
+    def query_range(self, name: str, **kwargs) -> Tuple[array, array]:
+        """查詢原始數據數組 / Query raw points as arrays."""
+        return self.backend.query_range(name, **kwargs)
+    
+    def query_aggregate(self, name: str, **kwargs) -> Tuple[array, array]:
+        """查詢聚合數據數組 / Query aggregated points as arrays."""
+        return self.backend.query_aggregate(name, **kwargs)
+    
     def cleanup(self):
         """執行數據清理 / Perform data cleanup."""
         if not self.enabled:
@@ -369,11 +946,6 @@ class StorageManager:
         """關閉儲存管理器 / Close storage manager."""
         if self.enabled and self.backend:
             self.backend.close()
-from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
-from abc import ABC, abstractmethod
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -477,121 +1049,393 @@ class MemoryStorage(MetricStorage):
         return deleted_count
 
 
-class FileStorage(MetricStorage):
-    """File-based metric storage"""
-    
-    def __init__(self, storage_dir: Path = Path("/var/lib/machinenativeops/metrics")):
-        """Initialize file storage"""
+# 密封段文件尾部標記 / Trailer magic of a sealed segment file
+_SEGMENT_MAGIC = b'MNOSEG1\n'
+_TRAILER = struct.Struct('<Q8s')
+
+
+def _record_ts(buf, pos: int) -> int:
+    """讀取記錄行的時間戳 / Timestamp of the ``[ts,value]`` line at ``pos``."""
+    return int(buf[pos + 1:buf.find(b',', pos)])
+
+
+def _seek_time(buf, size: int, start_ms: int) -> int:
+    """二分查找首個時間戳 >= start_ms 的行 / First line with timestamp >= start_ms."""
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        line = buf.rfind(b'\n', 0, mid) + 1
+        end = buf.find(b'\n', line)
+        if end == -1:
+            hi = line
+        elif _record_ts(buf, line) < start_ms:
+            lo = end + 1
+        else:
+            hi = line
+    return lo
+
+
+class SegmentFileStorage(MetricStorage):
+    """
+    Append-only segmented metric storage.
+
+    Each metric has a directory of segments named ``<first_ts>-<seq>``, the
+    sequence number keeping segments that start at the same millisecond
+    apart. The active segment (``.log``) is JSONL with one ``[ts_ms,value]``
+    record per line, so a write is a single append. Once it exceeds
+    ``segment_bytes`` or spans ``segment_seconds`` it is sealed into
+    ``.seg``: records sorted by time, zlib-compressed in blocks of
+    ``block_records``, followed by a JSON block index and a fixed trailer.
+    Range reads mmap the segment,
+    bisect the active log and decompress only the overlapping sealed blocks.
+    ``compact()`` merges small sealed segments; ``start_compaction()`` runs it
+    periodically in the background.
+    """
+
+    def __init__(
+        self,
+        storage_dir: Path = Path("/var/lib/machinenativeops/metrics"),
+        segment_bytes: int = 4 * 1024 * 1024,
+        segment_seconds: int = 3600,
+        block_records: int = 1024,
+        compact_target_bytes: int = 16 * 1024 * 1024,
+        max_open_files: int = 128,
+    ):
+        """Initialize segmented file storage"""
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Initialized file storage at {self.storage_dir}")
-    
-    def _get_metric_file(self, metric_name: str, date: datetime = None) -> Path:
-        """Get file path for a metric"""
-        if date is None:
-            date = datetime.utcnow()
-        
-        # Store metrics by date (one file per metric per day)
-        date_str = date.strftime("%Y-%m-%d")
-        return self.storage_dir / f"{metric_name}_{date_str}.json"
-    
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.block_records = block_records
+        self.compact_target_bytes = compact_target_bytes
+        self.max_open_files = max_open_files
+
+        self._lock = threading.RLock()
+        # metric_name -> [path, first_ts, last_ts, ordered]
+        self._active: Dict[str, List[Any]] = {}
+        self._handles: "OrderedDict[Path, Any]" = OrderedDict()
+        self._index_cache: Dict[Path, Tuple[float, List[List[int]]]] = {}
+        self._compaction_stop = threading.Event()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        # Logs left by a previous process are sealed so the active segment
+        # is always one this process has appended to in order
+        for log_path in self.storage_dir.glob("*/*.log"):
+            self._seal(log_path)
+
+        logger.info(f"Initialized segmented file storage at {self.storage_dir}")
+
+    def _metric_dir(self, metric_name: str) -> Path:
+        return self.storage_dir / quote(metric_name, safe='')
+
+    @staticmethod
+    def _segment_path(metric_dir: Path, ts_ms: int, suffix: str) -> Path:
+        """Unused ``<first_ts>-<seq>`` path; the sequence breaks first-timestamp ties"""
+        seq = 0
+        while True:
+            stem = f"{ts_ms:013d}-{seq:04d}"
+            if not any((metric_dir / f"{stem}{s}").exists() for s in ('.log', '.seg')):
+                return metric_dir / f"{stem}{suffix}"
+            seq += 1
+
+    def _handle(self, path: Path):
+        """Cached append handle, closing the least recently used beyond the limit"""
+        handle = self._handles.pop(path, None)
+        if handle is None:
+            handle = open(path, 'ab')
+            while len(self._handles) >= self.max_open_files:
+                self._handles.popitem(last=False)[1].close()
+        self._handles[path] = handle
+        return handle
+
+    def _close_handle(self, path: Path):
+        handle = self._handles.pop(path, None)
+        if handle is not None:
+            handle.close()
+
     def store_metric(self, metric_name: str, value: Any, timestamp: datetime = None):
-        """Store a metric value to file"""
+        """Append a metric value to the active segment"""
         if timestamp is None:
             timestamp = datetime.utcnow()
-        
-        metric_file = self._get_metric_file(metric_name, timestamp)
-        
+        ts_ms = _to_millis(timestamp)
+        line = json.dumps([ts_ms, value], separators=(',', ':'), default=str).encode() + b'\n'
+
         try:
-            # Load existing metrics
-            if metric_file.exists():
-                with open(metric_file, 'r') as f:
-                    metrics = json.load(f)
-            else:
-                metrics = []
-            
-            # Append new metric
-            metrics.append({
-                "value": value,
-                "timestamp": timestamp.isoformat()
-            })
-            
-            # Save back to file
-            with open(metric_file, 'w') as f:
-                json.dump(metrics, f, indent=2)
-            
-            logger.debug(f"Stored metric {metric_name} to {metric_file}")
-        
+            with self._lock:
+                active = self._active.get(metric_name)
+                if active is not None and (
+                    active[0].stat().st_size >= self.segment_bytes
+                    or ts_ms - active[1] >= self.segment_seconds * 1000
+                ):
+                    self._seal(active[0])
+                    active = None
+
+                if active is None:
+                    metric_dir = self._metric_dir(metric_name)
+                    metric_dir.mkdir(exist_ok=True)
+                    path = self._segment_path(metric_dir, ts_ms, '.log')
+                    active = self._active[metric_name] = [path, ts_ms, ts_ms, True]
+                elif ts_ms < active[2]:
+                    active[3] = False
+                active[2] = max(active[2], ts_ms)
+
+                handle = self._handle(active[0])
+                handle.write(line)
+                handle.flush()
+
+            logger.debug(f"Stored metric {metric_name} to {active[0]}")
+
         except Exception as e:
             logger.error(f"Error storing metric to file: {e}")
-    
+
+    @staticmethod
+    def _parse_lines(data: bytes) -> List[List[Any]]:
+        return [json.loads(line) for line in data.splitlines() if line]
+
+    def _write_sealed(self, path: Path, records: List[List[Any]]):
+        """Write sorted records as a compressed, block-indexed segment"""
+        records.sort(key=lambda r: r[0])
+        blocks = []
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            for i in range(0, len(records), self.block_records):
+                block = records[i:i + self.block_records]
+                payload = zlib.compress(
+                    b''.join(
+                        json.dumps(r, separators=(',', ':')).encode() + b'\n' for r in block
+                    ),
+                    6
+                )
+                blocks.append([block[0][0], block[-1][0], f.tell(), len(payload), len(block)])
+                f.write(payload)
+            index = json.dumps({'blocks': blocks}, separators=(',', ':')).encode()
+            f.write(index)
+            f.write(_TRAILER.pack(len(index), _SEGMENT_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._index_cache.pop(path, None)
+
+    def _seal(self, log_path: Path):
+        """Convert an active log into a sealed segment"""
+        with self._lock:
+            self._close_handle(log_path)
+            for metric_name, active in list(self._active.items()):
+                if active[0] == log_path:
+                    del self._active[metric_name]
+
+            data = log_path.read_bytes()
+            # A torn final line from a crash is dropped
+            records = self._parse_lines(data[:data.rfind(b'\n') + 1])
+            if records:
+                seg_path = log_path.with_suffix('.seg')
+                if seg_path.exists():
+                    # Never overwrite another segment with the same first timestamp
+                    seg_path = self._segment_path(
+                        log_path.parent, int(log_path.stem.split('-')[0]), '.seg'
+                    )
+                self._write_sealed(seg_path, records)
+            log_path.unlink()
+
+    def _read_index(self, buf, path: Path) -> List[List[int]]:
+        """Block index of a sealed segment, cached by mtime"""
+        mtime = path.stat().st_mtime
+        cached = self._index_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index_len, magic = _TRAILER.unpack(buf[-_TRAILER.size:])
+        if magic != _SEGMENT_MAGIC:
+            raise ValueError(f"Not a sealed segment: {path}")
+        end = len(buf) - _TRAILER.size
+        blocks = json.loads(buf[end - index_len:end])['blocks']
+        self._index_cache[path] = (mtime, blocks)
+        return blocks
+
+    def _read_sealed(self, path: Path, start_ms: int, end_ms: int) -> List[List[Any]]:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            records = []
+            for first, last, offset, length, _ in self._read_index(buf, path):
+                if last < start_ms or first > end_ms:
+                    continue
+                block = self._parse_lines(zlib.decompress(buf[offset:offset + length]))
+                if start_ms <= first and last <= end_ms:
+                    records.extend(block)
+                else:
+                    records.extend(r for r in block if start_ms <= r[0] <= end_ms)
+            return records
+
+    def _read_active(self, path: Path, start_ms: int, end_ms: int,
+                     ordered: bool) -> List[List[Any]]:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                pos = _seek_time(buf, size, start_ms) if ordered else 0
+                records = []
+                while pos < size:
+                    end = buf.find(b'\n', pos)
+                    if end == -1:
+                        break
+                    record = json.loads(buf[pos:end])
+                    if ordered and record[0] > end_ms:
+                        break
+                    if start_ms <= record[0] <= end_ms:
+                        records.append(record)
+                    pos = end + 1
+                return records
+
+    def _segments(self, metric_name: str) -> List[Path]:
+        """Sealed segments of a metric ordered by first timestamp"""
+        metric_dir = self._metric_dir(metric_name)
+        if not metric_dir.exists():
+            return []
+        return sorted(metric_dir.glob("*.seg"))
+
     def retrieve_metrics(
         self,
         metric_name: str,
         start_time: datetime = None,
         end_time: datetime = None
     ) -> List[Dict[str, Any]]:
-        """Retrieve metric values from files"""
-        all_metrics = []
-        
-        # Determine date range
+        """Retrieve metric values in time order"""
+        # Determine time range
         if start_time is None:
             start_time = datetime.utcnow() - timedelta(days=7)
         if end_time is None:
             end_time = datetime.utcnow()
-        
-        # Read metrics from each day in range
-        current_date = start_time.date()
-        end_date = end_time.date()
-        
-        while current_date <= end_date:
-            metric_file = self._get_metric_file(
-                metric_name,
-                datetime.combine(current_date, datetime.min.time())
+        start_ms = _to_millis(start_time)
+        end_ms = _to_millis(end_time)
+
+        records = []
+        with self._lock:
+            for segment in self._segments(metric_name):
+                try:
+                    records.extend(self._read_sealed(segment, start_ms, end_ms))
+                except Exception as e:
+                    logger.error(f"Error reading segment {segment}: {e}")
+
+            active = self._active.get(metric_name)
+            if active is not None and active[1] <= end_ms and active[2] >= start_ms:
+                records.extend(self._read_active(active[0], start_ms, end_ms, active[3]))
+
+        records.sort(key=lambda r: r[0])
+        return [
+            {"value": value, "timestamp": datetime.fromtimestamp(ts / 1000).isoformat()}
+            for ts, value in records
+        ]
+
+    def compact(self, metric_name: Optional[str] = None) -> int:
+        """
+        Seal stale active segments and merge runs of small sealed segments
+
+        Returns:
+            Number of segments removed by merging
+        """
+        now_ms = _to_millis(datetime.utcnow())
+        removed = 0
+        with self._lock:
+            for active in list(self._active.values()):
+                if now_ms - active[1] >= self.segment_seconds * 1000:
+                    self._seal(active[0])
+
+            metric_dirs = (
+                [self._metric_dir(metric_name)] if metric_name
+                else [p for p in self.storage_dir.iterdir() if p.is_dir()]
             )
-            
-            if metric_file.exists():
+            for metric_dir in metric_dirs:
+                run: List[Path] = []
+                run_bytes = 0
+                for segment in sorted(metric_dir.glob("*.seg")) + [None]:
+                    size = segment.stat().st_size if segment else 0
+                    if segment is None or run_bytes + size > self.compact_target_bytes:
+                        if len(run) > 1:
+                            removed += self._merge(run)
+                        run, run_bytes = [], 0
+                    if segment is not None:
+                        run.append(segment)
+                        run_bytes += size
+        if removed:
+            logger.info(f"Compaction merged away {removed} segments")
+        return removed
+
+    def _merge(self, segments: List[Path]) -> int:
+        records = []
+        for segment in segments:
+            records.extend(self._read_sealed(segment, -(1 << 62), 1 << 62))
+        self._write_sealed(segments[0], records)
+        for segment in segments[1:]:
+            segment.unlink()
+            self._index_cache.pop(segment, None)
+        return len(segments) - 1
+
+    def start_compaction(self, interval: float = 3600.0):
+        """Run ``compact()`` every ``interval`` seconds on a daemon thread"""
+        if self._compaction_thread is not None:
+            return
+        self._compaction_stop.clear()
+
+        def _loop():
+            while not self._compaction_stop.wait(interval):
                 try:
-                    with open(metric_file, 'r') as f:
-                        daily_metrics = json.load(f)
-                    
-                    # Filter by time range
-                    for metric in daily_metrics:
-                        metric_time = datetime.fromisoformat(metric["timestamp"])
-                        
-                        if start_time <= metric_time <= end_time:
-                            all_metrics.append(metric)
-                
+                    self.compact()
                 except Exception as e:
-                    logger.error(f"Error reading metric file {metric_file}: {e}")
-            
-            current_date += timedelta(days=1)
-        
-        return all_metrics
-    
+                    logger.error(f"Segment compaction failed: {e}")
+
+        self._compaction_thread = threading.Thread(
+            target=_loop, name="segment-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+
+    def stop_compaction(self):
+        """Stop the background compaction job"""
+        if self._compaction_thread is not None:
+            self._compaction_stop.set()
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
     def delete_old_metrics(self, older_than: datetime):
-        """Delete metric files older than specified time"""
+        """Delete records older than specified time, rewriting straddling segments"""
+        cutoff_ms = _to_millis(older_than)
         deleted_count = 0
-        cutoff_date = older_than.date()
-        
-        for metric_file in self.storage_dir.glob("*.json"):
-            try:
-                # Extract date from filename
-                # Format: metric_name_YYYY-MM-DD.json
-                date_str = metric_file.stem.split('_')[-1]
-                file_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                
-                if file_date < cutoff_date:
-                    metric_file.unlink()
-                    deleted_count += 1
-                    logger.debug(f"Deleted old metric file: {metric_file}")
-            
-            except Exception as e:
-                logger.error(f"Error deleting metric file {metric_file}: {e}")
-        
-        logger.info(f"Deleted {deleted_count} old metric files")
+
+        with self._lock:
+            for active in list(self._active.values()):
+                if active[2] < cutoff_ms:
+                    self._seal(active[0])
+
+            for segment in self.storage_dir.glob("*/*.seg"):
+                try:
+                    with open(segment, 'rb') as f, \
+                            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                        blocks = self._read_index(buf, segment)
+                    if blocks and blocks[0][0] >= cutoff_ms:
+                        continue
+                    total = sum(b[4] for b in blocks)
+                    # A segment without blocks holds no records and goes as well
+                    if not blocks or max(b[1] for b in blocks) < cutoff_ms:
+                        segment.unlink()
+                        self._index_cache.pop(segment, None)
+                        deleted_count += total
+                        continue
+                    kept = self._read_sealed(segment, cutoff_ms, 1 << 62)
+                    self._write_sealed(segment, kept)
+                    deleted_count += total - len(kept)
+
+                except Exception as e:
+                    logger.error(f"Error deleting old metrics in {segment}: {e}")
+
+        logger.info(f"Deleted {deleted_count} old metrics")
         return deleted_count
 
+    def close(self):
+        """Stop compaction and close append handles"""
+        self.stop_compaction()
+        with self._lock:
+            for path in list(self._handles):
+                self._close_handle(path)
+
 
 def create_storage(storage_type: str = "memory", **kwargs) -> MetricStorage:
     """
@@ -607,7 +1451,7 @@ def create_storage(storage_type: str = "memory", **kwargs) -> MetricStorage:
     if storage_type == "memory":
         return MemoryStorage(**kwargs)
     elif storage_type == "file":
-        return FileStorage(**kwargs)
+        return SegmentFileStorage(**kwargs)
     else:
         logger.warning(f"Unknown storage type: {storage_type}, using memory")
         return MemoryStorage()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent collection in MetricsCollector
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import machinenativenops_auto_monitor
+from machinenativenops_auto_monitor.collectors import (
+    BaseCollector,
+    MetricsCollector,
+    ServiceCollector,
+)
+
+
+class SleepyCollector(BaseCollector):
+    """Returns fixed metrics after a delay"""
+
+    def __init__(self, name, delay=0.0, metrics=None, **config):
+        super().__init__({"name": name, **config})
+        self.delay = delay
+        self.metrics = metrics if metrics is not None else {name: 1.0}
+        self.calls = 0
+
+    def collect(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return dict(self.metrics)
+
+
+class FailingCollector(BaseCollector):
+    def collect(self):
+        raise RuntimeError("boom")
+
+
+class TestMetricsCollector:
+    """Thread-pool collection with deadlines"""
+
+    def test_package_exports_concurrent_collector(self):
+        assert machinenativenops_auto_monitor.MetricsCollector is MetricsCollector
+        assert hasattr(MetricsCollector, "collect_all")
+
+    def test_collectors_run_concurrently(self):
+        collectors = [SleepyCollector(f"c{i}", delay=0.2) for i in range(4)]
+        metrics_collector = MetricsCollector(collectors)
+        try:
+            start = time.perf_counter()
+            metrics = metrics_collector.collect_all()
+            elapsed = time.perf_counter() - start
+        finally:
+            metrics_collector.close()
+
+        assert elapsed < 0.6
+        assert {"c0", "c1", "c2", "c3"} <= set(metrics)
+        assert metrics["collector_c0_duration_seconds"] >= 0.2
+
+    def test_merge_keeps_collector_order(self):
+        first = SleepyCollector("first", delay=0.05, metrics={"shared": 1.0})
+        second = SleepyCollector("second", metrics={"shared": 2.0})
+        metrics_collector = MetricsCollector([first, second])
+        try:
+            assert metrics_collector.collect_all()["shared"] == 2.0
+        finally:
+            metrics_collector.close()
+
+    def test_deadline_and_busy_skip(self):
+        slow = SleepyCollector("slow", delay=0.3, collection_timeout=0.05)
+        fast = SleepyCollector("fast")
+        metrics_collector = MetricsCollector([slow, fast])
+        try:
+            metrics = metrics_collector.collect_all()
+            assert "slow" not in metrics and "fast" in metrics
+
+            # Still running from the first cycle
+            metrics_collector.collect_all()
+            stats = metrics_collector.get_collector_stats()
+            assert stats["slow"]["timeouts"] == 1
+            assert stats["slow"]["skipped_busy"] == 1
+            assert slow.calls == 1
+            assert stats["fast"]["runs"] == 2
+        finally:
+            metrics_collector.close()
+
+    def test_interval_and_errors(self):
+        periodic = SleepyCollector("periodic", collection_interval=3600)
+        failing = FailingCollector({"name": "failing"})
+        disabled = SleepyCollector("disabled", enabled=False)
+        metrics_collector = MetricsCollector([periodic, failing, disabled])
+        try:
+            metrics_collector.collect_all()
+            metrics = metrics_collector.collect_all()
+        finally:
+            metrics_collector.close()
+
+        assert periodic.calls == 1 and "periodic" not in metrics
+        assert disabled.calls == 0
+        assert metrics_collector.get_collector_stats()["failing"]["errors"] == 2
+
+    def test_shared_snapshot_attached(self):
+        services = ServiceCollector({"monitored_services": []})
+        metrics_collector = MetricsCollector([services])
+        try:
+            assert services.snapshot is metrics_collector.snapshot
+            assert services.is_enabled()
+            assert "services" in metrics_collector.collect_all()
+        finally:
+            metrics_collector.close()
+
+    def test_close_cancels_queued_runs(self):
+        collectors = [SleepyCollector(f"c{i}", delay=0.2, collection_timeout=0.01) for i in range(3)]
+        metrics_collector = MetricsCollector(collectors, max_workers=1)
+        metrics_collector.collect_all()
+        metrics_collector.close()
+        time.sleep(0.3)
+
+        assert sum(c.calls for c in collectors) == 1
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for HTTP health probes against a local stand-in server
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from machinenativenops_auto_monitor.collectors import ServiceCollector
+from machinenativenops_auto_monitor.probes import HttpProbeEngine, ProbeTarget
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler: /ok, /fail and /slow?delay=<seconds>"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/slow":
+            time.sleep(float(query.partition("=")[2] or 0.5))
+        status = 500 if path == "/fail" else 200
+        body = b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def engine():
+    engine = HttpProbeEngine()
+    yield engine
+    engine.close()
+
+
+def pending_tasks(engine):
+    async def _count():
+        return len([t for t in asyncio.all_tasks() if t is not asyncio.current_task()])
+    return asyncio.run_coroutine_threadsafe(_count(), engine._ensure_loop()).result()
+
+
+class TestProbeAll:
+    """Batch probing through the shared pool"""
+
+    def test_status_and_connection_reuse(self, server, engine):
+        targets = [
+            ProbeTarget("ok", f"{server}/ok", timeout=2),
+            ProbeTarget("fail", f"{server}/fail", timeout=2),
+            ProbeTarget("refused", "http://127.0.0.1:1/", timeout=2),
+        ]
+        results = engine.probe_all_sync(targets)
+        assert results["ok"].healthy and results["ok"].status_code == 200
+        assert not results["fail"].healthy and results["fail"].status_code == 500
+        assert not results["refused"].healthy and results["refused"].error
+
+        results = engine.probe_all_sync(targets[:2])
+        assert results["ok"].reused_connection and results["fail"].reused_connection
+        assert engine.get_stats()["pool"]["reused"] == 2
+        assert engine.histograms["ok"].count == 2
+
+    def test_per_target_timeout(self, server, engine):
+        results = engine.probe_all_sync([
+            ProbeTarget("slow", f"{server}/slow?delay=1", timeout=0.2),
+            ProbeTarget("ok", f"{server}/ok", timeout=2),
+        ])
+        assert not results["slow"].healthy and results["slow"].error == "timeout after 0.2s"
+        assert results["ok"].healthy
+
+    def test_queueing_behind_host_limit_fits_deadline(self, server, engine):
+        # 24 probes through 4 connections take 6 waves of 0.3 s, longer than
+        # any single timeout; all of them must still complete
+        targets = [
+            ProbeTarget(f"svc-{i}", f"{server}/slow?delay=0.3", timeout=0.5)
+            for i in range(24)
+        ]
+        assert engine.estimate_duration(targets) == pytest.approx(6 * 0.5)
+
+        start = time.monotonic()
+        results = engine.probe_all_sync(targets)
+        elapsed = time.monotonic() - start
+
+        assert len(results) == 24
+        assert all(r.healthy for r in results.values())
+        assert 1.5 < elapsed < 3.5
+
+    def test_deadline_returns_partial_results(self, server, engine):
+        targets = [ProbeTarget("ok", f"{server}/ok", timeout=2)] + [
+            ProbeTarget(f"slow-{i}", f"{server}/slow?delay=0.4", timeout=2)
+            for i in range(12)
+        ]
+        start = time.monotonic()
+        results = engine.probe_all_sync(targets, deadline=0.6)
+        assert time.monotonic() - start < 1.5
+
+        assert len(results) == 13
+        assert results["ok"].healthy
+        late = [r for r in results.values() if not r.healthy]
+        assert late and all("deadline" in r.error for r in late)
+        assert pending_tasks(engine) == 0
+
+
+class TestScheduling:
+    """Background probing wired through ServiceCollector"""
+
+    def test_scheduled_checks_report_latest(self, server, engine):
+        collector = ServiceCollector({"monitored_services": [
+            {"name": "api", "type": "http", "url": f"{server}/ok", "interval": 0.1},
+            {"name": "broken", "type": "http", "url": f"{server}/fail", "interval": 0.1},
+        ]}, probe_engine=engine)
+
+        assert collector.schedule_http_checks() == 2
+        assert engine.is_scheduled("api") and engine.is_scheduled("broken")
+
+        deadline = time.monotonic() + 2
+        while len(engine.latest) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.3)
+
+        services = collector.collect()["services"]
+        assert services["api"]["healthy"] and services["api"]["status_code"] == 200
+        assert not services["broken"]["healthy"]
+        assert engine.histograms["api"].count >= 2
+
+    def test_failed_batch_keeps_other_services(self, server, engine):
+        def broken(*args, **kwargs):
+            raise RuntimeError("loop gone")
+
+        engine.probe_all_sync = broken
+        collector = ServiceCollector({"monitored_services": [
+            {"name": "api", "type": "http", "url": f"{server}/ok"},
+            {"name": "db", "type": "port", "port": 1},
+        ]}, probe_engine=engine)
+
+        services = collector.collect()["services"]
+        assert services["api"] == {"healthy": False, "status": "down",
+                                   "status_code": None, "response_time": 0.0,
+                                   "error": "loop gone"}
+        assert services["db"]["status"] in ("not_listening", "error")
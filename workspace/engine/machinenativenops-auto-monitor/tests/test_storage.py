@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite time-series storage and its shared database file
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from machinenativenops_auto_monitor import 儲存 as storage_module
+from machinenativenops_auto_monitor.storage import DatabaseManager
+from machinenativenops_auto_monitor.儲存 import SegmentFileStorage, TimeSeriesStorage
+
+
+class TestSharedDatabaseFile:
+    """DatabaseManager and TimeSeriesStorage write the same file"""
+
+    def test_new_series_do_not_hold_write_lock(self, tmp_path):
+        db_path = tmp_path / "metrics.db"
+        manager = DatabaseManager(str(db_path))
+        try:
+            manager.store_metrics({"cpu": 1.0, "memory": {"used": 2.0}})
+            # New series again, then writes on DatabaseManager's connection
+            manager.store_metrics({"disk": 3.0})
+            manager.store_alert("cpu", "warning", "high cpu")
+
+            other = sqlite3.connect(str(db_path), timeout=0.1)
+            with other:
+                other.execute("INSERT INTO system_events (timestamp, event_type, component, message) "
+                              "VALUES ('now', 'test', 'test', 'other writer')")
+            other.close()
+
+            manager.timeseries.flush()
+            timestamps, values = manager.timeseries.query_range("disk")
+            assert list(values) == [3.0]
+        finally:
+            manager.close()
+
+    def test_numeric_values_live_only_in_series(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / "metrics.db"))
+        try:
+            manager.store_metrics({
+                "timestamp": "2026-01-01T00:00:00",
+                "cpu": 1.5,
+                "memory": {"used": 2.0},
+                "services": {"api": {"status": "up", "latency": 0.25}},
+            })
+
+            with manager._get_connection() as conn:
+                blob = conn.execute("SELECT data FROM metrics").fetchone()[0]
+            assert "1.5" not in blob and "latency" not in blob
+            assert '"up"' in blob
+
+            (snapshot,) = manager.get_recent_metrics()
+            assert snapshot["cpu"] == 1.5
+            assert snapshot["memory_used"] == 2.0
+            assert snapshot["services_api_latency"] == 0.25
+            assert snapshot["services"] == {"api": {"status": "up"}}
+            assert manager.get_metrics(
+                start_time=datetime(2025, 12, 31), end_time=datetime(2026, 1, 2)
+            )[0]["cpu"] == 1.5
+        finally:
+            manager.close()
+
+    def test_incremental_vacuum_on_new_file_only(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / "metrics.db"))
+        try:
+            assert manager.timeseries.connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        finally:
+            manager.close()
+
+        db_path = tmp_path / "existing.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE other (id INTEGER PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+
+        # No VACUUM at startup; conversion is an explicit maintenance step
+        storage = TimeSeriesStorage(str(db_path))
+        try:
+            assert storage.connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+            storage.enable_incremental_vacuum()
+            assert storage.connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        finally:
+            storage.close()
+
+    def test_snapshot_commits_with_its_points(self, tmp_path):
+        db_path = tmp_path / "metrics.db"
+        manager = DatabaseManager(str(db_path))
+        try:
+            manager.store_metrics({"timestamp": "2026-01-01T00:00:00", "cpu": 1.5})
+
+            # Read from another connection, without any flush on this side
+            other = sqlite3.connect(str(db_path))
+            snapshots = other.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+            points = other.execute("SELECT SUM(count) FROM series_chunks").fetchone()[0]
+            other.close()
+            assert (snapshots, points) == (1, 1)
+        finally:
+            manager.close()
+
+    def test_legacy_metrics_table_without_created_at(self, tmp_path):
+        db_path = tmp_path / "metrics.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp TEXT, data TEXT)")
+        conn.commit()
+        conn.close()
+
+        manager = DatabaseManager(str(db_path))
+        try:
+            manager.store_metrics({"timestamp": "2026-01-01T00:00:00", "cpu": 1.5})
+            assert manager.get_recent_metrics()[0]["cpu"] == 1.5
+        finally:
+            manager.close()
+
+    def test_legacy_point_table_is_migrated(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "metrics.db"
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                value REAL NOT NULL, timestamp DATETIME NOT NULL, labels TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO metrics (name, value, timestamp, labels) VALUES (?, ?, ?, ?)",
+            [("cpu", float(i), str(base + timedelta(seconds=i)), "{}") for i in range(25)]
+            + [("disk", 7.0, str(base), '{"mount": "/"}')]
+        )
+        conn.commit()
+        conn.close()
+
+        monkeypatch.setattr(storage_module, "_MIGRATION_BATCH", 10)
+        manager = DatabaseManager(str(db_path))
+        try:
+            _, values = manager.timeseries.query_range("cpu")
+            assert list(values) == [float(i) for i in range(25)]
+            _, values = manager.timeseries.query_range("disk", labels={"mount": "/"})
+            assert list(values) == [7.0]
+
+            # The legacy table made way for the snapshot table
+            manager.store_metrics({"timestamp": "2026-01-02T00:00:00", "cpu": 1.0})
+            assert len(manager.get_recent_metrics()) == 1
+        finally:
+            manager.close()
+
+
+class TestTimeSeriesStorage:
+    """Chunked series storage, rollups and retention"""
+
+    def test_round_trip_and_retention(self, tmp_path):
+        storage = TimeSeriesStorage(str(tmp_path / "ts.db"), chunk_points=4)
+        now = datetime.now()
+        try:
+            for i in range(10):
+                storage.store_metric("load", float(i), timestamp=now - timedelta(seconds=10 - i))
+            storage.store_metric("stale", 99.0, timestamp=now - timedelta(days=30))
+
+            _, values = storage.query_range("load", start_time=now - timedelta(minutes=1))
+            assert list(values) == [float(i) for i in range(10)]
+
+            # Retention drops whole chunks past the raw tier
+            deleted = storage.apply_retention()
+            assert deleted["raw"] == 1
+            _, values = storage.query_range("stale", start_time=now - timedelta(days=60))
+            assert len(values) == 0
+            assert len(storage.query_range("load")[1]) == 10
+        finally:
+            storage.close()
+
+    def test_rollup_aggregate_clips_unaligned_range(self, tmp_path):
+        storage = TimeSeriesStorage(str(tmp_path / "ts.db"))
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        try:
+            for i in range(600):
+                storage.store_metric("load", float(i), timestamp=base + timedelta(seconds=i))
+
+            start = base + timedelta(seconds=95)
+            end = base + timedelta(seconds=437, milliseconds=500)
+            # step=60 uses the 1m rollup, step=30 reads raw chunks only
+            _, sums = storage.query_aggregate("load", start, end, step=60, agg="sum")
+            _, counts = storage.query_aggregate("load", start, end, step=60, agg="count")
+            assert sum(counts) == 343
+            assert sum(sums) == float(sum(range(95, 438)))
+            buckets, values = storage.query_aggregate("load", start, end, step=30, agg="sum")
+            assert sum(values) == sum(sums)
+            assert buckets[0] == int((base + timedelta(seconds=90)).timestamp() * 1000)
+        finally:
+            storage.close()
+
+    def test_retention_of_open_chunk_keeps_later_points(self, tmp_path):
+        storage = TimeSeriesStorage(str(tmp_path / "ts.db"))
+        now = datetime.now()
+        try:
+            storage.store_metric("cpu", 1.0, timestamp=now - timedelta(days=400))
+            storage.flush()
+            assert storage.apply_retention()["raw"] == 1
+
+            for i in range(5):
+                storage.store_metric("cpu", float(i), timestamp=now - timedelta(seconds=5 - i))
+            storage.flush()
+
+            records = storage.query_metrics("cpu", start_time=now - timedelta(minutes=1))
+            assert sorted(r.value for r in records) == [float(i) for i in range(5)]
+            assert storage.get_stats()["total_records"] == 5
+        finally:
+            storage.close()
+
+    def test_flush_reinserts_chunk_whose_row_was_deleted(self, tmp_path):
+        storage = TimeSeriesStorage(str(tmp_path / "ts.db"))
+        now = datetime.now()
+        try:
+            storage.store_metric("cpu", 1.0, timestamp=now)
+            storage.flush()
+            with storage.connection:
+                storage.connection.execute("DELETE FROM series_chunks")
+
+            storage.store_metric("cpu", 2.0, timestamp=now + timedelta(seconds=1))
+            _, values = storage.query_range("cpu")
+            assert list(values) == [1.0, 2.0]
+        finally:
+            storage.close()
+
+
+class TestSegmentFileStorage:
+    """Append-only segments: sealing, compaction and retention"""
+
+    START = datetime(2026, 1, 1, 12, 0, 0)
+
+    def at(self, seconds):
+        return self.START + timedelta(seconds=seconds)
+
+    def values(self, storage, name="cpu"):
+        records = storage.retrieve_metrics(name, self.at(-3600), self.at(86400))
+        return [r["value"] for r in records]
+
+    def test_append_and_read_round_trip(self, tmp_path):
+        storage = SegmentFileStorage(tmp_path, segment_seconds=60, block_records=4)
+        try:
+            for i in range(10):
+                storage.store_metric("cpu", float(i), self.at(i))
+            # Out of order within the active segment
+            storage.store_metric("cpu", 0.5, self.at(0.5))
+
+            assert self.values(storage) == [0.0, 0.5] + [float(i) for i in range(1, 10)]
+            records = storage.retrieve_metrics("cpu", self.at(3), self.at(5))
+            assert [r["value"] for r in records] == [3.0, 4.0, 5.0]
+        finally:
+            storage.close()
+
+    def test_seal_on_span_and_restart(self, tmp_path):
+        storage = SegmentFileStorage(tmp_path, segment_seconds=60, block_records=4)
+        for i in range(0, 300, 10):
+            storage.store_metric("cpu", float(i), self.at(i))
+        storage.close()
+
+        metric_dir = tmp_path / "cpu"
+        assert len(list(metric_dir.glob("*.seg"))) == 4
+        assert len(list(metric_dir.glob("*.log"))) == 1
+
+        reopened = SegmentFileStorage(tmp_path, segment_seconds=60, block_records=4)
+        try:
+            assert not list(metric_dir.glob("*.log"))
+            assert self.values(reopened) == [float(i) for i in range(0, 300, 10)]
+        finally:
+            reopened.close()
+
+    def test_same_first_timestamp_does_not_overwrite(self, tmp_path):
+        for value in (1.0, 2.0, 3.0):
+            storage = SegmentFileStorage(tmp_path)
+            storage.store_metric("cpu", value, self.START)
+            storage.close()
+
+        reopened = SegmentFileStorage(tmp_path)
+        try:
+            assert len(list((tmp_path / "cpu").glob("*.seg"))) == 3
+            assert sorted(self.values(reopened)) == [1.0, 2.0, 3.0]
+        finally:
+            reopened.close()
+
+    def test_compaction_merges_small_segments(self, tmp_path):
+        storage = SegmentFileStorage(tmp_path, segment_seconds=10, block_records=4)
+        try:
+            for i in range(50):
+                storage.store_metric("cpu", float(i), self.at(i))
+            before = len(list((tmp_path / "cpu").glob("*.seg")))
+
+            # The stale active log is sealed first, then everything merges
+            removed = storage.compact("cpu")
+
+            assert removed == before
+            assert len(list((tmp_path / "cpu").glob("*.seg"))) == 1
+            assert self.values(storage) == [float(i) for i in range(50)]
+        finally:
+            storage.close()
+
+    def test_retention_deletes_and_rewrites(self, tmp_path):
+        storage = SegmentFileStorage(tmp_path, segment_seconds=10)
+        try:
+            for i in range(30):
+                storage.store_metric("cpu", float(i), self.at(i))
+
+            deleted = storage.delete_old_metrics(self.at(15))
+
+            assert deleted == 15
+            assert self.values(storage) == [float(i) for i in range(15, 30)]
+        finally:
+            storage.close()
+
+    def test_retention_removes_empty_segment(self, tmp_path, caplog):
+        storage = SegmentFileStorage(tmp_path, segment_seconds=10)
+        try:
+            storage.store_metric("cpu", 1.0, self.at(100))
+            empty = tmp_path / "cpu" / "0-empty.seg"
+            storage._write_sealed(empty, [])
+
+            with caplog.at_level("ERROR"):
+                storage.delete_old_metrics(self.at(15))
+
+            assert not empty.exists()
+            assert not [r for r in caplog.records if r.levelname == "ERROR"]
+            assert self.values(storage) == [1.0]
+        finally:
+            storage.close()
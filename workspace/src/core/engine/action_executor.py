@@ -18,6 +18,8 @@ from datetime import datetime
 import asyncio
 import uuid
 
+from .history_store import BoundedHistory
+
 
 class StepStatus(Enum):
     """步驟狀態"""
@@ -128,8 +130,13 @@ class ActionExecutor:
     4. 管理錯誤和重試
     """
     
-    def __init__(self):
-        """初始化行動執行器"""
+    def __init__(self, history: Optional[BoundedHistory] = None):
+        """
+        初始化行動執行器
+        
+        Args:
+            history: 執行歷史存儲（默認為有界環形緩衝區）
+        """
         
         # 步驟處理器
         self._handlers: Dict[str, Callable] = {}
@@ -137,8 +144,12 @@ class ActionExecutor:
         # 執行中的計劃
         self._running_plans: Dict[str, ActionPlan] = {}
         
-        # 執行歷史
-        self._execution_history: List[ActionPlan] = []
+        # 執行歷史（有界，按計劃狀態索引）
+        if history is None:
+            history = BoundedHistory(
+                status_of=lambda p: p.status,
+            )
+        self._execution_history: BoundedHistory[ActionPlan] = history
         
         # 統計
         self._stats = {
@@ -524,7 +535,19 @@ class ActionExecutor:
     
     def get_history(self, limit: int = 100) -> List[ActionPlan]:
         """獲取執行歷史"""
-        return self._execution_history[-limit:]
+        return self._execution_history.recent(limit)
+    
+    def query_history(
+        self,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[ActionPlan]:
+        """按計劃狀態和時間範圍查詢執行歷史"""
+        return self._execution_history.query(
+            status=status, since=since, until=until, limit=limit
+        )
     
     def _update_stats(self, plan: ActionPlan):
         """更新統計信息"""
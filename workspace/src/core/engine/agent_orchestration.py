@@ -11,6 +11,7 @@ from typing import Any, Callable, Dict, List, Optional, Set
 from datetime import datetime
 import uuid
 import asyncio
+import weakref
 
 
 class StepStatus(Enum):
@@ -304,6 +305,10 @@ class OrchestratorConfig:
     default_timeout: float = 300.0
     auto_retry: bool = True
     max_retries: int = 3
+    parallel_execution: bool = False
+    max_concurrent_steps_per_plan: int = 10
+    max_concurrent_steps: int = 50
+    fail_fast: bool = True
 
 
 class AgentOrchestrator:
@@ -320,6 +325,9 @@ class AgentOrchestrator:
         self._active_executions: Dict[str, asyncio.Task] = {}
         self._planner = TaskPlanner()
         self._contexts: Dict[str, ExecutionContext] = {}
+        # Shared by all plans running in parallel mode on the same event loop
+        # (created lazily: an asyncio.Semaphore binds to the loop it first waits on)
+        self._step_semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
     
     def create_agent(
         self,
@@ -369,12 +377,25 @@ class AgentOrchestrator:
         self,
         plan: ExecutionPlan,
         context: Optional[ExecutionContext] = None,
-        tool_executor: Any = None
+        tool_executor: Any = None,
+        parallel: Optional[bool] = None
     ) -> Dict[str, Any]:
-        """Execute a complete plan"""
+        """
+        Execute a complete plan
+        
+        With ``parallel`` (default: ``config.parallel_execution``) all ready
+        steps run concurrently; otherwise ready steps run one at a time.
+        """
         if context is None:
             context = self.create_context()
         
+        if parallel is None:
+            parallel = self.config.parallel_execution
+        if parallel:
+            return await self._execute_plan_parallel(
+                plan, context, tool_executor, self._get_step_semaphore()
+            )
+        
         plan.status = "running"
         results = []
         
@@ -392,36 +413,179 @@ class AgentOrchestrator:
                 await asyncio.sleep(0.1)
                 continue
             
-            # Execute ready steps (could be parallel)
             for step in ready_steps:
-                step.status = StepStatus.RUNNING
-                step.started_at = datetime.now()
-                
-                try:
-                    if step.tool_name and tool_executor:
-                        result = await tool_executor.execute(step.tool_name, step.params)
-                        step.result = result.output if hasattr(result, 'output') else result
-                    else:
-                        step.result = f"Executed {step.name} (simulated)"
+                results.append(await self._execute_step(step, context, tool_executor))
+        
+        plan.status = "completed"
+        
+        return {
+            "plan_id": plan.plan_id,
+            "status": plan.status,
+            "results": results,
+            "context": context.to_dict()
+        }
+    
+    async def _execute_step(
+        self,
+        step: ExecutionStep,
+        context: ExecutionContext,
+        tool_executor: Any = None
+    ) -> Dict[str, Any]:
+        """Run a single step and return its result record"""
+        step.status = StepStatus.RUNNING
+        step.started_at = datetime.now()
+        
+        try:
+            if step.tool_name and tool_executor:
+                result = await tool_executor.execute(step.tool_name, step.params)
+                step.result = result.output if hasattr(result, 'output') else result
+            else:
+                step.result = f"Executed {step.name} (simulated)"
+            
+            step.status = StepStatus.COMPLETED
+            context.set(f"step_{step.step_id}_result", step.result)
+            
+        except asyncio.CancelledError:
+            step.status = StepStatus.CANCELLED
+            step.error = "Cancelled"
+            step.completed_at = datetime.now()
+            raise
+            
+        except Exception as e:
+            step.status = StepStatus.FAILED
+            step.error = str(e)
+        
+        step.completed_at = datetime.now()
+        return self._step_record(step)
+    
+    @staticmethod
+    def _step_record(step: ExecutionStep) -> Dict[str, Any]:
+        """Build the result record reported for a step"""
+        return {
+            "step_id": step.step_id,
+            "name": step.name,
+            "status": step.status.value,
+            "result": step.result,
+            "error": step.error,
+            "duration_ms": step.duration_ms
+        }
+    
+    def _get_step_semaphore(self) -> asyncio.Semaphore:
+        """Orchestrator-wide step semaphore of the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._step_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_concurrent_steps)
+            self._step_semaphores[loop] = semaphore
+        return semaphore
+    
+    async def _execute_plan_parallel(
+        self,
+        plan: ExecutionPlan,
+        context: ExecutionContext,
+        tool_executor: Any,
+        step_semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """
+        Execute a plan with all ready steps running concurrently
+        
+        Steps are bounded by a per-plan and the orchestrator-wide semaphore.
+        A finishing step releases its dependents directly instead of the plan
+        being polled. Dependents of a failed step are skipped; with
+        ``config.fail_fast`` the remaining steps are cancelled as well.
+        """
+        plan.status = "running"
+        results: List[Dict[str, Any]] = []
+        plan_semaphore = asyncio.Semaphore(self.config.max_concurrent_steps_per_plan)
+        
+        steps = {step.step_id: step for step in plan.steps}
+        dependents: Dict[str, List[str]] = {step_id: [] for step_id in steps}
+        remaining: Dict[str, int] = {}
+        for step in plan.steps:
+            if step.status != StepStatus.PENDING:
+                continue
+            remaining[step.step_id] = 0
+            for dep in step.dependencies:
+                dep_step = steps.get(dep)
+                if dep_step is None:
+                    # Unknown dependency can never complete
+                    remaining[step.step_id] = -1
+                    break
+                dependents[dep].append(step.step_id)
+                if dep_step.status != StepStatus.COMPLETED:
+                    remaining[step.step_id] += 1
+        
+        def skip(step_id: str) -> None:
+            stack = [step_id]
+            while stack:
+                current = stack.pop()
+                step = steps[current]
+                if step.status != StepStatus.PENDING:
+                    continue
+                step.status = StepStatus.SKIPPED
+                remaining.pop(current, None)
+                stack.extend(dependents[current])
+        
+        async def run(step: ExecutionStep) -> Dict[str, Any]:
+            async with plan_semaphore:
+                async with step_semaphore:
+                    return await self._execute_step(step, context, tool_executor)
+        
+        in_flight: Dict[asyncio.Task, ExecutionStep] = {}
+        
+        def launch(step_id: str) -> None:
+            remaining.pop(step_id, None)
+            step = steps[step_id]
+            in_flight[asyncio.create_task(run(step))] = step
+        
+        for step_id, count in list(remaining.items()):
+            if count < 0:
+                skip(step_id)
+            elif count == 0:
+                launch(step_id)
+        
+        aborted = False
+        try:
+            while in_flight:
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    step = in_flight.pop(task)
+                    if task.cancelled():
+                        if step.status == StepStatus.PENDING:
+                            step.status = StepStatus.CANCELLED
+                        results.append(self._step_record(step))
+                        continue
+                    results.append(task.result())
                     
-                    step.status = StepStatus.COMPLETED
-                    context.set(f"step_{step.step_id}_result", step.result)
+                    if step.status == StepStatus.COMPLETED:
+                        for dependent_id in dependents[step.step_id]:
+                            if dependent_id not in remaining:
+                                continue
+                            remaining[dependent_id] -= 1
+                            if remaining[dependent_id] == 0:
+                                launch(dependent_id)
+                        continue
                     
-                except Exception as e:
-                    step.status = StepStatus.FAILED
-                    step.error = str(e)
-                
-                step.completed_at = datetime.now()
-                results.append({
-                    "step_id": step.step_id,
-                    "name": step.name,
-                    "status": step.status.value,
-                    "result": step.result,
-                    "error": step.error,
-                    "duration_ms": step.duration_ms
-                })
+                    for dependent_id in dependents[step.step_id]:
+                        skip(dependent_id)
+                    if self.config.fail_fast and not aborted:
+                        aborted = True
+                        for other in in_flight:
+                            other.cancel()
+                        for step_id in list(remaining):
+                            skip(step_id)
+        finally:
+            for task in in_flight:
+                task.cancel()
         
-        plan.status = "completed"
+        # Steps left waiting are part of a dependency cycle
+        for step_id in list(remaining):
+            skip(step_id)
+        
+        failed = any(s.status == StepStatus.FAILED for s in plan.steps)
+        plan.status = "failed" if failed else "completed"
         
         return {
             "plan_id": plan.plan_id,
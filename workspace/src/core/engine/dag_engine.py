@@ -9,7 +9,7 @@ from typing import Dict, List, Set, Any, Optional, Callable
 from enum import Enum
 from dataclasses import dataclass, field
 import asyncio
-from collections import defaultdict, deque
+from collections import defaultdict
 
 
 class NodeStatus(Enum):
@@ -50,17 +50,47 @@ class DAGEngine:
     
     Provides topological sorting, dependency resolution, and parallel execution
     of directed acyclic graph workflows.
+    
+    Execution uses ready-queue dispatch: every node is started the moment its
+    last dependency completes instead of waiting for the rest of its level.
+    Reverse-dependency adjacency lists are maintained on ``add_node`` so both
+    sorting and release of dependents are O(V + E).
     """
     
-    def __init__(self):
-        """Initialize the DAG engine"""
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """
+        Initialize the DAG engine
+        
+        Args:
+            max_concurrency: Maximum number of nodes running at once
+                (None for unlimited)
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
         self.nodes: Dict[str, DAGNode] = {}
         self.execution_order: List[List[str]] = []
+        self.max_concurrency = max_concurrency
+        
+        # Reverse adjacency: node_id -> node_ids that depend on it
+        self._dependents: Dict[str, List[str]] = defaultdict(list)
+        self._order_valid = False
+        
+        # Scheduler state, only populated while execute() is running
+        self._running = False
+        self._remaining: Dict[str, int] = {}
+        self._results: Dict[str, Any] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._idle: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
     def add_node(self, node: DAGNode) -> None:
         """
         Add a node to the DAG
         
+        Nodes may also be added while ``execute()`` is running; such a node
+        is dispatched as soon as its dependencies have completed (immediately
+        if they already have) and is skipped if any of them failed.
+        
         Args:
             node: DAGNode to add
             
@@ -70,85 +100,82 @@ class DAGEngine:
         if node.node_id in self.nodes:
             raise ValueError(f"Node {node.node_id} already exists")
         self.nodes[node.node_id] = node
+        for dep in node.dependencies:
+            self._dependents[dep].append(node.node_id)
+        self._order_valid = False
+        
+        if self._running:
+            self._schedule_added_node(node)
+            
+    def _known_dependencies(self, node: DAGNode) -> List[str]:
+        """Dependencies of a node that are present in the graph"""
+        return [dep for dep in node.dependencies if dep in self.nodes]
         
     def _detect_cycle(self) -> bool:
         """
         Detect if there are cycles in the DAG
         
+        Uses Kahn's algorithm, so deep graphs are not limited by the
+        interpreter recursion depth.
+        
         Returns:
             bool: True if cycle detected, False otherwise
         """
-        visited = set()
-        rec_stack = set()
-        
-        def visit(node_id: str) -> bool:
-            visited.add(node_id)
-            rec_stack.add(node_id)
-            
-            node = self.nodes.get(node_id)
-            if node:
-                for dep in node.dependencies:
-                    if dep not in visited:
-                        if visit(dep):
-                            return True
-                    elif dep in rec_stack:
-                        return True
-                        
-            rec_stack.remove(node_id)
-            return False
+        return self._kahn_levels() is None
+        
+    def _kahn_levels(self) -> Optional[List[List[str]]]:
+        """
+        Group nodes into dependency levels in O(V + E)
+        
+        Returns:
+            List of levels, or None if the graph contains a cycle
+        """
+        in_degree = {
+            node_id: len(self._known_dependencies(node))
+            for node_id, node in self.nodes.items()
+        }
+        current = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        levels: List[List[str]] = []
+        visited = 0
+        
+        while current:
+            levels.append(current)
+            visited += len(current)
+            next_level = []
+            for node_id in current:
+                for dependent_id in self._dependents.get(node_id, ()):
+                    if dependent_id not in in_degree:
+                        continue
+                    in_degree[dependent_id] -= 1
+                    if in_degree[dependent_id] == 0:
+                        next_level.append(dependent_id)
+            current = next_level
             
-        for node_id in self.nodes:
-            if node_id not in visited:
-                if visit(node_id):
-                    return True
-        return False
+        if visited != len(self.nodes):
+            return None
+        return levels
         
     def topological_sort(self) -> List[List[str]]:
         """
         Perform topological sort with level-based grouping for parallel execution
         
+        The result is cached until the graph is modified.
+        
         Returns:
             List of levels, where each level contains node_ids that can run in parallel
             
         Raises:
             ValueError: If cycle is detected
         """
-        if self._detect_cycle():
-            raise ValueError("Cycle detected in DAG")
+        if self._order_valid:
+            return self.execution_order
             
-        # Calculate in-degree for each node
-        in_degree = {node_id: 0 for node_id in self.nodes}
-        for node in self.nodes.values():
-            for dep in node.dependencies:
-                if dep in in_degree:
-                    in_degree[dep] += 1
-                    
-        # Find all nodes with in-degree 0
-        queue = deque([node_id for node_id, degree in in_degree.items() if degree == 0])
-        levels = []
-        
-        while queue:
-            # Current level - all nodes that can run in parallel
-            current_level = list(queue)
-            levels.append(current_level)
-            
-            # Process current level
-            next_queue = []
-            for node_id in current_level:
-                queue.popleft()
-                node = self.nodes[node_id]
-                
-                # Decrease in-degree for dependent nodes
-                for dependent_id in self.nodes:
-                    dependent = self.nodes[dependent_id]
-                    if node_id in dependent.dependencies:
-                        in_degree[dependent_id] -= 1
-                        if in_degree[dependent_id] == 0:
-                            next_queue.append(dependent_id)
-                            
-            queue.extend(next_queue)
+        levels = self._kahn_levels()
+        if levels is None:
+            raise ValueError("Cycle detected in DAG")
             
         self.execution_order = levels
+        self._order_valid = True
         return levels
         
     async def _execute_node(self, node: DAGNode) -> Any:
@@ -179,50 +206,136 @@ class DAGEngine:
             node.error = e
             raise
             
+    def _dependency_blocked(self, node: DAGNode) -> bool:
+        """Check whether a dependency is missing, failed or skipped"""
+        for dep_id in node.dependencies:
+            dep_node = self.nodes.get(dep_id)
+            if dep_node is None or dep_node.status in (NodeStatus.FAILED, NodeStatus.SKIPPED):
+                return True
+        return False
+        
+    def _schedule_added_node(self, node: DAGNode) -> None:
+        """Register a node added to a running graph with the scheduler"""
+        if self._dependency_blocked(node):
+            self._skip(node.node_id)
+            return
+        pending = sum(
+            1 for dep_id in node.dependencies
+            if self.nodes[dep_id].status != NodeStatus.COMPLETED
+        )
+        self._remaining[node.node_id] = pending
+        if pending == 0:
+            self._dispatch(node.node_id)
+            
+    def _dispatch(self, node_id: str) -> None:
+        """Start a ready node as its own task"""
+        self._remaining.pop(node_id, None)
+        task = asyncio.create_task(self._run_node(self.nodes[node_id]))
+        self._tasks.add(task)
+        self._idle.clear()
+        task.add_done_callback(self._on_task_done)
+        
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        """Track completion of dispatched tasks"""
+        self._tasks.discard(task)
+        if not self._tasks:
+            self._idle.set()
+            
+    async def _run_node(self, node: DAGNode) -> None:
+        """Run a node under the concurrency cap and release its dependents"""
+        if self._semaphore is not None:
+            async with self._semaphore:
+                await self._run_and_record(node)
+        else:
+            await self._run_and_record(node)
+            
+        if node.status == NodeStatus.COMPLETED:
+            self._release_dependents(node.node_id)
+        else:
+            for dependent_id in self._dependents.get(node.node_id, ()):
+                self._skip(dependent_id)
+                
+    async def _run_and_record(self, node: DAGNode) -> None:
+        """Execute a node and store its result or exception"""
+        try:
+            self._results[node.node_id] = await self._execute_node(node)
+        except Exception as e:
+            self._results[node.node_id] = e
+            
+    def _release_dependents(self, node_id: str) -> None:
+        """Decrement waiting dependents and dispatch those that became ready"""
+        for dependent_id in self._dependents.get(node_id, ()):
+            if dependent_id not in self._remaining:
+                continue
+            self._remaining[dependent_id] -= 1
+            if self._remaining[dependent_id] == 0:
+                self._dispatch(dependent_id)
+                
+    def _skip(self, node_id: str) -> None:
+        """Mark a node and all of its transitive dependents as skipped"""
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            node = self.nodes.get(current)
+            if node is None or node.status != NodeStatus.PENDING:
+                continue
+            node.status = NodeStatus.SKIPPED
+            self._remaining.pop(current, None)
+            stack.extend(self._dependents.get(current, ()))
+            
     async def execute(self) -> Dict[str, Any]:
         """
         Execute the DAG with parallel execution where possible
         
+        Nodes are dispatched as soon as all of their dependencies complete,
+        bounded by ``max_concurrency``. Dependents of a failed node are
+        marked as skipped.
+        
         Returns:
-            Dict mapping node_id to execution result
+            Dict mapping node_id to execution result (the exception for
+            failed nodes)
             
         Raises:
             ValueError: If DAG has cycles or dependencies are invalid
+            RuntimeError: If the DAG is already executing
         """
-        # Perform topological sort
-        levels = self.topological_sort()
+        if self._running:
+            raise RuntimeError("DAG is already executing")
+            
+        # Validates the graph and records the level layout for summaries
+        self.topological_sort()
         
-        results = {}
+        self._results = {}
+        self._tasks = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._semaphore = (
+            asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        )
+        self._remaining = {}
+        self._running = True
         
-        # Execute level by level
-        for level in levels:
-            # Execute all nodes in this level in parallel
-            tasks = []
-            for node_id in level:
-                node = self.nodes[node_id]
-                
-                # Check if all dependencies completed successfully
-                dependencies_ok = True
-                for dep_id in node.dependencies:
-                    dep_node = self.nodes.get(dep_id)
-                    if not dep_node or dep_node.status != NodeStatus.COMPLETED:
-                        dependencies_ok = False
-                        break
+        try:
+            # Tasks cannot start before the first await, so every pending
+            # node is registered before any dependent can be released
+            for level in self.execution_order:
+                for node_id in level:
+                    node = self.nodes[node_id]
+                    if node.status == NodeStatus.PENDING:
+                        self._schedule_added_node(node)
                         
-                if dependencies_ok:
-                    tasks.append(self._execute_node(node))
-                else:
-                    node.status = NodeStatus.SKIPPED
-                    
-            # Wait for all tasks in this level to complete
-            if tasks:
-                level_results = await asyncio.gather(*tasks, return_exceptions=True)
+            await self._idle.wait()
+        finally:
+            self._running = False
+            for task in list(self._tasks):
+                task.cancel()
                 
-                # Store results
-                for i, node_id in enumerate([nid for nid in level if self.nodes[nid].status == NodeStatus.RUNNING or self.nodes[nid].status == NodeStatus.COMPLETED]):
-                    results[node_id] = level_results[i] if i < len(level_results) else None
-                    
-        return results
+        # Anything still waiting could never be released
+        for node_id in list(self._remaining):
+            self._skip(node_id)
+        self._remaining = {}
+        
+        return self._results
         
     def get_execution_summary(self) -> Dict[str, Any]:
         """
@@ -20,6 +20,8 @@ from datetime import datetime
 import asyncio
 import uuid
 
+from .history_store import BoundedHistory
+
 
 class ExecutionStatus(Enum):
     """執行狀態"""
@@ -119,8 +121,13 @@ class ExecutionEngine:
     3. 代碼 ≠ 執行：代碼只是指令，需要執行層來實現
     """
     
-    def __init__(self):
-        """初始化執行引擎"""
+    def __init__(self, history: Optional[BoundedHistory] = None):
+        """
+        初始化執行引擎
+        
+        Args:
+            history: 執行歷史存儲（默認為有界環形緩衝區）
+        """
         
         # 執行器註冊表
         self._executors: Dict[ActionType, Callable] = {}
@@ -128,8 +135,13 @@ class ExecutionEngine:
         # 連接器管理
         self._connectors: Dict[str, Any] = {}
         
-        # 執行歷史
-        self._execution_history: List[ExecutionResult] = []
+        # 執行歷史（有界，按狀態/行動類型索引）
+        if history is None:
+            history = BoundedHistory(
+                status_of=lambda r: r.status,
+                kind_of=lambda r: r.action_type,
+            )
+        self._execution_history: BoundedHistory[ExecutionResult] = history
         
         # 能力驗證器
         self._capability_validators: Dict[ActionType, Callable] = {}
@@ -940,4 +952,17 @@ class ExecutionEngine:
         limit: int = 100
     ) -> List[ExecutionResult]:
         """獲取執行歷史"""
-        return self._execution_history[-limit:]
+        return self._execution_history.recent(limit)
+    
+    def query_execution_history(
+        self,
+        status: Optional[ExecutionStatus] = None,
+        action_type: Optional[ActionType] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[ExecutionResult]:
+        """按狀態、行動類型和時間範圍查詢執行歷史"""
+        return self._execution_history.query(
+            status=status, kind=action_type, since=since, until=until, limit=limit
+        )
@@ -44,6 +44,7 @@ The system consists of four main components:
    - Defines routing rules with conditions
    - Supports multiple executors
    - Priority-based rule matching
+   - Compiled name/prefix/tag index with a per-tool route cache
 
 Design Principles (設計原則):
 ------------------------------
@@ -176,12 +177,15 @@ Last Updated: 2025-12-12
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 import uuid
 import json
 import asyncio
 
+from .history_store import BoundedHistory
+from .schema_validation import JSON_TYPE_MAP, ArgumentValidator, compile_validator
+
 
 class FunctionCallStatus(Enum):
     """
@@ -308,6 +312,9 @@ class FunctionDefinition:
         "properties": {},
         "required": []
     })
+    _validator: Optional[ArgumentValidator] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def to_openai_format(self) -> Dict[str, Any]:
         """
@@ -383,7 +390,8 @@ class FunctionDefinition:
         Validation Checks:
             1. Required Fields: All fields in "required" array must be present
             2. Type Checking: Values must match their declared JSON Schema type
-            3. Future: Additional constraints (min/max, enum, patterns, etc.)
+            3. Enum: Values must be one of the declared "enum" members
+            4. Future: Additional constraints (min/max, patterns, etc.)
 
         Type Mapping:
             - "string" → str
@@ -422,9 +430,11 @@ class FunctionDefinition:
         Note:
             This is a basic validation implementation. For comprehensive JSON Schema
             validation, consider using libraries like jsonschema or pydantic.
+            This method interprets the schema on every call; hot paths should
+            use compile_validator(), which FunctionCallHandler does.
 
         See Also:
-            - FunctionCallHandler.handle_call(): Uses this for validation
+            - compile_validator(): Pre-compiled equivalent of this check
             - FunctionCallResult.validation_errors: Stores validation errors
         """
         errors = []
@@ -437,25 +447,44 @@ class FunctionDefinition:
             if field_name not in arguments:
                 errors.append(f"Missing required field: {field_name}")
 
-        # Check types
-        type_map = {
-            "string": str,
-            "number": (int, float),
-            "integer": int,
-            "boolean": bool,
-            "array": list,
-            "object": dict,
-        }
-
+        # Check types and enums
         for key, value in arguments.items():
             if key in properties:
                 expected_type = properties[key].get("type")
-                if expected_type and expected_type in type_map:
-                    if not isinstance(value, type_map[expected_type]):
+                if expected_type and expected_type in JSON_TYPE_MAP:
+                    if not isinstance(value, JSON_TYPE_MAP[expected_type]):
                         errors.append(f"Invalid type for {key}: expected {expected_type}")
+                        continue
+                enum = properties[key].get("enum")
+                if isinstance(enum, list) and value not in enum:
+                    errors.append(f"Invalid value for {key}: not in enum")
 
         return errors
 
+    def compile_validator(self) -> ArgumentValidator:
+        """
+        Compile the parameter schema into a validator closure.
+
+        The schema is interpreted once: required keys become a frozenset,
+        property types a lookup table and enums frozensets. The closure is
+        cached on the definition and returns the same errors as
+        validate_arguments(). Call again after mutating ``parameters``.
+
+        編譯參數驗證器並快取於函數定義上。
+
+        Returns:
+            ArgumentValidator: Callable mapping arguments to validation errors
+        """
+        self._validator = compile_validator(self.parameters)
+        return self._validator
+
+    @property
+    def validator(self) -> ArgumentValidator:
+        """Cached compiled validator, compiled on first access"""
+        if self._validator is None:
+            return self.compile_validator()
+        return self._validator
+
 
 @dataclass
 class FunctionCallResult:
@@ -627,7 +656,8 @@ class FunctionCallHandler:
     Attributes:
         _functions (Dict[str, FunctionDefinition]): Registry of function definitions
         _handlers (Dict[str, Callable]): Registry of function handlers (sync or async)
-        _call_history (List[FunctionCallResult]): Complete execution history
+        _call_history (BoundedHistory[FunctionCallResult]): Most recent calls,
+            indexed by status and function name
 
     Thread Safety:
         This class is NOT thread-safe. Use separate instances per thread or
@@ -707,18 +737,28 @@ class FunctionCallHandler:
         - ToolCallRouter: Route calls to different handlers
     """
 
-    def __init__(self):
+    def __init__(self, history: Optional[BoundedHistory] = None):
         """
         Initialize an empty function call handler.
 
         Creates empty registries for functions and handlers, and initializes
-        an empty call history list.
+        an empty, bounded call history.
 
         初始化函數調用處理器。
+
+        Args:
+            history (Optional[BoundedHistory]): Call history store. Defaults to
+                a fixed-capacity ring buffer so long-running workers stay bounded.
         """
         self._functions: Dict[str, FunctionDefinition] = {}
         self._handlers: Dict[str, Callable] = {}
-        self._call_history: List[FunctionCallResult] = []
+        self._validators: Dict[str, ArgumentValidator] = {}
+        if history is None:
+            history = BoundedHistory(
+                status_of=lambda r: r.status,
+                kind_of=lambda r: r.function_name,
+            )
+        self._call_history: BoundedHistory[FunctionCallResult] = history
     
     def register(
         self,
@@ -781,6 +821,8 @@ class FunctionCallHandler:
         Note:
             If a function with the same name exists, it will be replaced.
             No warning is issued for overwrites.
+            The parameter schema is compiled into a validator here, so
+            changes to ``function_def.parameters`` require re-registering.
 
         See Also:
             - unregister(): Remove a registered function
@@ -788,6 +830,7 @@ class FunctionCallHandler:
         """
         self._functions[function_def.name] = function_def
         self._handlers[function_def.name] = handler
+        self._validators[function_def.name] = function_def.compile_validator()
     
     def unregister(self, function_name: str) -> None:
         """Unregister a function"""
@@ -795,6 +838,7 @@ class FunctionCallHandler:
             del self._functions[function_name]
         if function_name in self._handlers:
             del self._handlers[function_name]
+        self._validators.pop(function_name, None)
     
     def get_function(self, name: str) -> Optional[FunctionDefinition]:
         """Get a function definition"""
@@ -875,7 +919,8 @@ class FunctionCallHandler:
             ...     # "division by zero"
 
         Performance:
-            - Validation: O(n) where n = number of parameters
+            - Validation: O(n) where n = number of arguments, using the
+              validator compiled at register() time
             - Execution: Depends on handler implementation
             - History storage: O(1) append
 
@@ -902,8 +947,9 @@ class FunctionCallHandler:
 
         function_def = self._functions[function_name]
 
-        # Validate arguments
-        validation_errors = function_def.validate_arguments(arguments)
+        # Validate arguments with the validator compiled at register()
+        validator = self._validators.get(function_name) or function_def.validator
+        validation_errors = validator(arguments)
         if validation_errors:
             result = FunctionCallResult(
                 function_name=function_name,
@@ -971,9 +1017,22 @@ class FunctionCallHandler:
         
         return function_name, arguments
     
-    def get_history(self) -> List[FunctionCallResult]:
-        """Get call history"""
-        return self._call_history.copy()
+    def get_history(self, limit: Optional[int] = None) -> List[FunctionCallResult]:
+        """Get call history (newest ``limit`` calls, oldest first)"""
+        return self._call_history.recent(limit)
+    
+    def query_history(
+        self,
+        status: Optional[FunctionCallStatus] = None,
+        function_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[FunctionCallResult]:
+        """Query call history by status, function name and time range"""
+        return self._call_history.query(
+            status=status, kind=function_name, since=since, until=until, limit=limit
+        )
     
     def clear_history(self) -> None:
         """Clear call history"""
@@ -1041,21 +1100,103 @@ class RoutingRule:
         ...     priority=50
         ... )
 
+    Example - Indexed Matchers:
+        >>> # No Python callable: compiled into the router's name/prefix/tag index
+        >>> rule = RoutingRule(
+        ...     name="database_rule",
+        ...     executor_id="database_executor",
+        ...     tool_prefix="db_",
+        ...     priority=10
+        ... )
+
+    Declarative Matchers:
+        tool_names, tool_prefix and tag only look at the tool name, so the
+        router resolves them through a dict/trie index and caches the result
+        per tool name. When combined with a condition, all of them must match.
+        A rule with neither matchers nor condition matches every call.
+
     Condition Best Practices:
         - Keep conditions fast (evaluated on every call)
         - Avoid side effects in conditions
         - Make conditions deterministic
         - Use specific conditions for high-priority rules
         - Use general conditions for low-priority rules
+        - Prefer declarative matchers when only the tool name matters
 
     See Also:
         - ToolCallRouter.add_rule(): Add rule to router
         - ToolCallRouter.route(): Evaluate rules to find executor
     """
     name: str
-    condition: Callable[[str, Dict[str, Any]], bool]
-    executor_id: str
+    condition: Optional[Callable[[str, Dict[str, Any]], bool]] = None
+    executor_id: str = ""
     priority: int = 0
+    tool_names: Optional[Iterable[str]] = None
+    tool_prefix: Optional[str] = None
+    tag: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if not self.executor_id:
+            raise ValueError(f"Routing rule {self.name} requires an executor_id")
+        if self.tool_names is not None:
+            self.tool_names = frozenset(self.tool_names)
+
+    @property
+    def is_static(self) -> bool:
+        """True if the rule depends only on the tool name"""
+        return self.condition is None
+
+    def matches_name(self, tool_name: str, tool_tags: FrozenSet[str] = frozenset()) -> bool:
+        """Evaluate the declarative (tool-name based) matchers only"""
+        if self.tool_names is not None and tool_name not in self.tool_names:
+            return False
+        if self.tool_prefix is not None and not tool_name.startswith(self.tool_prefix):
+            return False
+        if self.tag is not None and self.tag not in tool_tags:
+            return False
+        return True
+
+    def matches(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        tool_tags: FrozenSet[str] = frozenset()
+    ) -> bool:
+        """Evaluate all matchers, including the condition callable"""
+        if not self.matches_name(tool_name, tool_tags):
+            return False
+        return self.condition is None or bool(self.condition(tool_name, params))
+
+
+class _PrefixTrie:
+    """Character trie mapping tool-name prefixes to the rules that use them"""
+
+    __slots__ = ("_root",)
+
+    def __init__(self) -> None:
+        self._root: Dict[str, Any] = {}
+
+    def insert(self, prefix: str, value: Any) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(None, []).append(value)
+
+    def collect(self, name: str) -> List[Any]:
+        """Return values of every stored prefix of name"""
+        found: List[Any] = list(self._root.get(None, ()))
+        node = self._root
+        for char in name:
+            node = node.get(char)
+            if node is None:
+                break
+            found.extend(node.get(None, ()))
+        return found
+
+
+# Cached resolution for a tool name: conditional rules to evaluate in
+# precedence order, then the executor to fall back to.
+_RouteEntry = Tuple[Tuple[RoutingRule, ...], Optional[str]]
 
 
 class ToolCallRouter:
@@ -1150,11 +1291,21 @@ class ToolCallRouter:
         ...     priority=10
         ... ))
 
+    Compiled Routing:
+        With compiled=True (the default) rules are indexed by exact tool
+        name, prefix trie and tag. The outcome for each tool name is
+        memoized: rules without a condition are resolved once, and only the
+        condition callables that outrank the best static match are evaluated
+        per call. The cache is invalidated by add_rule, remove_rule,
+        register_executor, unregister_executor, set_default_executor and
+        set_tool_tags. compiled=False keeps the plain linear scan.
+
     Thread Safety:
         Not thread-safe. Use separate instances or add synchronization.
 
     Performance:
-        - Rule evaluation: O(n) where n = number of rules
+        - Compiled: O(1) cache hit plus any conditions that must run
+        - Linear: O(n) where n = number of rules
         - Rules sorted by priority once on add/remove
         - Executor lookup: O(1) hash table lookup
 
@@ -1163,17 +1314,34 @@ class ToolCallRouter:
         - FunctionCallHandler: Basic executor without routing
     """
 
-    def __init__(self):
+    # Upper bound on memoized tool names before the route cache is reset
+    ROUTE_CACHE_SIZE = 4096
+
+    def __init__(self, compiled: bool = True):
         """
         Initialize an empty tool call router.
 
         Creates empty registries for executors and rules, with no default executor.
 
         初始化工具調用路由器。
+
+        Args:
+            compiled (bool): Use the indexed, memoized routing table instead
+                             of scanning every rule per call.
         """
         self._executors: Dict[str, Any] = {}
         self._rules: List[RoutingRule] = []
         self._default_executor: Optional[str] = None
+        self._compiled = compiled
+        self._tool_tags: Dict[str, FrozenSet[str]] = {}
+        # executor_id -> (callable, is_coroutine_function)
+        self._invokers: Dict[str, Tuple[Callable, bool]] = {}
+        self._route_cache: Dict[str, _RouteEntry] = {}
+        self._index_valid = False
+        self._name_index: Dict[str, List[Tuple[int, RoutingRule]]] = {}
+        self._prefix_index = _PrefixTrie()
+        self._tag_index: Dict[str, List[Tuple[int, RoutingRule]]] = {}
+        self._unindexed: List[Tuple[int, RoutingRule]] = []
     
     def register_executor(
         self,
@@ -1182,25 +1350,130 @@ class ToolCallRouter:
     ) -> None:
         """Register an executor"""
         self._executors[executor_id] = executor
+        if hasattr(executor, 'execute'):
+            target = executor.execute
+        elif callable(executor):
+            target = executor
+        else:
+            target = None
+        if target is not None:
+            self._invokers[executor_id] = (target, asyncio.iscoroutinefunction(target))
+        else:
+            self._invokers.pop(executor_id, None)
+        self._invalidate_routes()
     
     def unregister_executor(self, executor_id: str) -> None:
         """Unregister an executor"""
         if executor_id in self._executors:
             del self._executors[executor_id]
+        self._invokers.pop(executor_id, None)
+        self._invalidate_routes()
     
     def add_rule(self, rule: RoutingRule) -> None:
         """Add a routing rule"""
         self._rules.append(rule)
         # Sort by priority (higher first)
         self._rules.sort(key=lambda r: r.priority, reverse=True)
+        self._invalidate_index()
     
     def remove_rule(self, rule_name: str) -> None:
         """Remove a routing rule"""
         self._rules = [r for r in self._rules if r.name != rule_name]
+        self._invalidate_index()
     
     def set_default_executor(self, executor_id: str) -> None:
         """Set the default executor"""
         self._default_executor = executor_id
+        self._invalidate_routes()
+    
+    def set_tool_tags(self, tool_name: str, tags: Iterable[str]) -> None:
+        """Assign tags to a tool name for tag-based routing rules"""
+        self._tool_tags[tool_name] = frozenset(tags)
+        self._route_cache.pop(tool_name, None)
+    
+    def _invalidate_routes(self) -> None:
+        """Drop memoized routes (executors or default changed)"""
+        self._route_cache.clear()
+    
+    def _invalidate_index(self) -> None:
+        """Drop the compiled rule index and memoized routes"""
+        self._index_valid = False
+        self._route_cache.clear()
+    
+    def _build_index(self) -> None:
+        """Compile rules into name, prefix and tag indexes"""
+        self._name_index = {}
+        self._prefix_index = _PrefixTrie()
+        self._tag_index = {}
+        self._unindexed = []
+        
+        for position, rule in enumerate(self._rules):
+            entry = (position, rule)
+            # Index each rule under its most selective matcher; the
+            # remaining matchers are re-checked with matches_name()
+            if rule.tool_names is not None:
+                for tool_name in rule.tool_names:
+                    self._name_index.setdefault(tool_name, []).append(entry)
+            elif rule.tool_prefix is not None:
+                self._prefix_index.insert(rule.tool_prefix, entry)
+            elif rule.tag is not None:
+                self._tag_index.setdefault(rule.tag, []).append(entry)
+            else:
+                self._unindexed.append(entry)
+        
+        self._index_valid = True
+    
+    def _compile_route(self, tool_name: str) -> _RouteEntry:
+        """Resolve the routing outcome for a tool name"""
+        if not self._index_valid:
+            self._build_index()
+        
+        tags = self._tool_tags.get(tool_name, frozenset())
+        candidates = list(self._name_index.get(tool_name, ()))
+        candidates.extend(self._prefix_index.collect(tool_name))
+        for tag in tags:
+            candidates.extend(self._tag_index.get(tag, ()))
+        candidates.extend(self._unindexed)
+        candidates.sort(key=lambda entry: entry[0])
+        
+        conditional: List[RoutingRule] = []
+        fallback = self._default_executor if self._default_executor in self._executors else None
+        for _, rule in candidates:
+            if rule.executor_id not in self._executors:
+                continue
+            if not rule.matches_name(tool_name, tags):
+                continue
+            if rule.is_static:
+                fallback = rule.executor_id
+                break
+            conditional.append(rule)
+        
+        return tuple(conditional), fallback
+    
+    def _resolve(self, tool_name: str, params: Dict[str, Any]) -> Optional[str]:
+        """Return the executor_id a tool call routes to"""
+        if not self._compiled:
+            tags = self._tool_tags.get(tool_name, frozenset())
+            for rule in self._rules:
+                if rule.matches(tool_name, params, tags):
+                    if rule.executor_id in self._executors:
+                        return rule.executor_id
+            if self._default_executor and self._default_executor in self._executors:
+                return self._default_executor
+            return None
+        
+        entry = self._route_cache.get(tool_name)
+        if entry is None:
+            if len(self._route_cache) >= self.ROUTE_CACHE_SIZE:
+                self._route_cache.clear()
+            entry = self._compile_route(tool_name)
+            self._route_cache[tool_name] = entry
+        
+        conditional, fallback = entry
+        for rule in conditional:
+            if rule.condition(tool_name, params):
+                return rule.executor_id
+        return fallback
     
     def route(
         self,
@@ -1208,17 +1481,10 @@ class ToolCallRouter:
         params: Dict[str, Any]
     ) -> Optional[Any]:
         """Route a tool call to the appropriate executor"""
-        # Check rules in priority order
-        for rule in self._rules:
-            if rule.condition(tool_name, params):
-                if rule.executor_id in self._executors:
-                    return self._executors[rule.executor_id]
-        
-        # Use default executor
-        if self._default_executor and self._default_executor in self._executors:
-            return self._executors[self._default_executor]
-        
-        return None
+        executor_id = self._resolve(tool_name, params)
+        if executor_id is None:
+            return None
+        return self._executors[executor_id]
     
     async def execute(
         self,
@@ -1226,24 +1492,20 @@ class ToolCallRouter:
         params: Dict[str, Any]
     ) -> Any:
         """Route and execute a tool call"""
-        executor = self.route(tool_name, params)
+        executor_id = self._resolve(tool_name, params)
         
-        if executor is None:
+        if executor_id is None:
             raise ValueError(f"No executor found for tool: {tool_name}")
         
-        # Execute based on executor type
-        if hasattr(executor, 'execute'):
-            if asyncio.iscoroutinefunction(executor.execute):
-                return await executor.execute(tool_name, params)
-            else:
-                return executor.execute(tool_name, params)
-        elif callable(executor):
-            if asyncio.iscoroutinefunction(executor):
-                return await executor(tool_name, params)
-            else:
-                return executor(tool_name, params)
-        else:
+        invoker = self._invokers.get(executor_id)
+        if invoker is None:
+            executor = self._executors[executor_id]
             raise ValueError(f"Executor is not callable: {type(executor)}")
+        
+        target, is_async = invoker
+        if is_async:
+            return await target(tool_name, params)
+        return target(tool_name, params)
     
     def list_executors(self) -> List[str]:
         """List all executor IDs"""
@@ -0,0 +1,320 @@
+"""
+Bounded History Store (有界歷史存儲)
+Fixed-capacity ring buffer for execution histories with secondary indexes
+
+Engine components append finished results here instead of to unbounded
+lists. When the buffer is full the oldest record is evicted and, if a
+spill path is configured, written out as one JSON line.
+"""
+
+from collections import deque
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import (
+    Any, Callable, Deque, Dict, Generic, Iterator, List, Optional, TextIO, TypeVar, Union,
+)
+import json
+import time
+
+
+T = TypeVar("T")
+
+DEFAULT_HISTORY_CAPACITY = 10000
+
+
+class HistoryRecord(Generic[T]):
+    """A single stored history entry"""
+
+    __slots__ = ("seq", "recorded_at", "status", "kind", "item")
+
+    def __init__(
+        self,
+        seq: int,
+        recorded_at: float,
+        status: Optional[str],
+        kind: Optional[str],
+        item: T,
+    ):
+        self.seq = seq
+        self.recorded_at = recorded_at
+        self.status = status
+        self.kind = kind
+        self.item = item
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert dataclasses, enums and datetimes into JSON-compatible values"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            f.name: to_jsonable(getattr(value, f.name))
+            for f in fields(value)
+            if not callable(getattr(value, f.name))
+        }
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_jsonable(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _label(value: Any) -> Optional[str]:
+    """Normalise an index key (enum members index by their value)"""
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+class BoundedHistory(Generic[T]):
+    """
+    有界歷史
+    Ring buffer of the most recent ``capacity`` items
+
+    Records are addressed by a monotonically increasing sequence number
+    (slot = seq % capacity), so indexes hold sequence numbers and eviction
+    only pops from the left of each index deque. Time-range queries bisect
+    over the append timestamps, which are monotonic in sequence order.
+
+    Not thread-safe; the engine components using it run on one event loop.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_HISTORY_CAPACITY,
+        status_of: Optional[Callable[[T], Any]] = None,
+        kind_of: Optional[Callable[[T], Any]] = None,
+        spill_path: Optional[Union[str, Path]] = None,
+        serializer: Optional[Callable[[T], Any]] = None,
+    ):
+        """
+        Args:
+            capacity: Maximum number of records kept in memory
+            status_of: Extracts the status index key from an item
+            kind_of: Extracts the kind (e.g. action type) index key
+            spill_path: JSONL file evicted records are appended to
+            serializer: Converts an item to a JSON-compatible value
+                (defaults to to_jsonable)
+        """
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self._status_of = status_of
+        self._kind_of = kind_of
+        self._spill_path = Path(spill_path) if spill_path else None
+        self._serializer = serializer or to_jsonable
+        self._spill_file: Optional[TextIO] = None
+
+        self._slots: List[Optional[HistoryRecord[T]]] = [None] * capacity
+        self._next_seq = 0
+        self._count = 0
+        self._last_recorded_at = 0.0
+        self._by_status: Dict[str, Deque[int]] = {}
+        self._by_kind: Dict[str, Deque[int]] = {}
+        self.evicted = 0
+
+    # ============ Writing ============
+
+    def append(self, item: T) -> HistoryRecord[T]:
+        """Store an item, evicting the oldest one when full"""
+        seq = self._next_seq
+        slot = seq % self.capacity
+
+        if self._count == self.capacity:
+            self._evict(self._slots[slot])
+        else:
+            self._count += 1
+
+        # Keep timestamps monotonic so time queries can bisect
+        recorded_at = max(time.time(), self._last_recorded_at)
+        self._last_recorded_at = recorded_at
+
+        status = _label(self._status_of(item)) if self._status_of else None
+        kind = _label(self._kind_of(item)) if self._kind_of else None
+        record = HistoryRecord(seq, recorded_at, status, kind, item)
+        self._slots[slot] = record
+        self._next_seq = seq + 1
+
+        if status is not None:
+            self._by_status.setdefault(status, deque()).append(seq)
+        if kind is not None:
+            self._by_kind.setdefault(kind, deque()).append(seq)
+        return record
+
+    def _evict(self, record: Optional[HistoryRecord[T]]) -> None:
+        """Drop the oldest record from indexes and spill it if configured"""
+        if record is None:
+            return
+        for index, key in ((self._by_status, record.status), (self._by_kind, record.kind)):
+            if key is None:
+                continue
+            seqs = index.get(key)
+            if seqs and seqs[0] == record.seq:
+                seqs.popleft()
+                if not seqs:
+                    del index[key]
+        self.evicted += 1
+        if self._spill_path is not None:
+            self._spill(record)
+
+    def _spill(self, record: HistoryRecord[T]) -> None:
+        """Append an evicted record to the spill file as one JSON line"""
+        if self._spill_file is None:
+            self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill_file = open(self._spill_path, "a", encoding="utf-8")
+        line = {
+            "seq": record.seq,
+            "recorded_at": record.recorded_at,
+            "status": record.status,
+            "kind": record.kind,
+            "item": self._serializer(record.item),
+        }
+        self._spill_file.write(json.dumps(line, default=str) + "\n")
+
+    def flush(self) -> None:
+        """Flush buffered spill writes to disk"""
+        if self._spill_file is not None:
+            self._spill_file.flush()
+
+    def close(self) -> None:
+        """Close the spill file"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def clear(self) -> None:
+        """Drop all in-memory records (spilled records are kept)"""
+        self._slots = [None] * self.capacity
+        self._count = 0
+        self._by_status.clear()
+        self._by_kind.clear()
+
+    # ============ Reading ============
+
+    @property
+    def _oldest_seq(self) -> int:
+        return self._next_seq - self._count
+
+    def _record(self, seq: int) -> HistoryRecord[T]:
+        return self._slots[seq % self.capacity]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate items from oldest to newest"""
+        for seq in range(self._oldest_seq, self._next_seq):
+            yield self._record(seq).item
+
+    def recent(self, limit: Optional[int] = None) -> List[T]:
+        """
+        Return up to ``limit`` newest items, oldest first
+
+        ``None`` returns every item. Unlike ``list[-limit:]``, a ``limit`` of
+        zero or less returns nothing, as it does for ``query``.
+        """
+        count = self._count if limit is None else max(0, min(limit, self._count))
+        return [self._record(seq).item for seq in range(self._next_seq - count, self._next_seq)]
+
+    def _seq_at_or_after(self, timestamp: float) -> int:
+        """First sequence number recorded at or after ``timestamp``"""
+        lo, hi = self._oldest_seq, self._next_seq
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid).recorded_at < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(
+        self,
+        status: Any = None,
+        kind: Any = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[T]:
+        """
+        Query items by status, kind and append-time range
+
+        Args:
+            status: Status index key (enum members match by value)
+            kind: Kind index key
+            since: Only items recorded at or after this time
+            until: Only items recorded before this time
+            limit: Return at most this many of the newest matches
+
+        Returns:
+            Matching items, oldest first
+        """
+        if limit is not None and limit <= 0:
+            return []
+
+        lo, hi = self._oldest_seq, self._next_seq
+        if since is not None:
+            lo = self._seq_at_or_after(since.timestamp())
+        if until is not None:
+            hi = self._seq_at_or_after(until.timestamp())
+        if lo >= hi:
+            return []
+
+        candidates: List[Deque[int]] = []
+        for index, key in ((self._by_status, status), (self._by_kind, kind)):
+            if key is None:
+                continue
+            seqs = index.get(_label(key))
+            if not seqs:
+                return []
+            candidates.append(seqs)
+
+        if not candidates:
+            seq_range = range(lo, hi)
+            if limit is not None:
+                seq_range = seq_range[-limit:]
+            return [self._record(seq).item for seq in seq_range]
+
+        # Walk the smallest index newest-first and check the other filters
+        candidates.sort(key=len)
+        primary = candidates[0]
+        status_key = _label(status)
+        kind_key = _label(kind)
+        matches: List[T] = []
+        for seq in reversed(primary):
+            if seq >= hi:
+                continue
+            if seq < lo:
+                break
+            record = self._record(seq)
+            if status_key is not None and record.status != status_key:
+                continue
+            if kind_key is not None and record.kind != kind_key:
+                continue
+            matches.append(record.item)
+            if limit is not None and len(matches) >= limit:
+                break
+        matches.reverse()
+        return matches
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Number of in-memory records per status"""
+        return {key: len(seqs) for key, seqs in self._by_status.items()}
+
+    def read_spilled(self) -> Iterator[Dict[str, Any]]:
+        """Iterate spilled records (oldest first) as decoded JSON lines"""
+        if self._spill_path is None or not self._spill_path.exists():
+            return
+        self.flush()
+        with open(self._spill_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
@@ -19,6 +19,8 @@ import asyncio
 import uuid
 import copy
 
+from .history_store import BoundedHistory
+
 
 class RollbackStatus(Enum):
     """回滾狀態"""
@@ -129,8 +131,13 @@ class RollbackManager:
     4. 確保系統可恢復性
     """
     
-    def __init__(self):
-        """初始化回滾管理器"""
+    def __init__(self, history: Optional[BoundedHistory] = None):
+        """
+        初始化回滾管理器
+        
+        Args:
+            history: 回滾歷史存儲（默認為有界環形緩衝區）
+        """
         
         # 檢查點存儲
         self._checkpoints: Dict[str, Checkpoint] = {}
@@ -138,8 +145,13 @@ class RollbackManager:
         # 按執行 ID 索引檢查點
         self._execution_checkpoints: Dict[str, List[str]] = {}
         
-        # 回滾計劃歷史
-        self._rollback_history: List[RollbackPlan] = []
+        # 回滾計劃歷史（有界，按狀態/策略索引）
+        if history is None:
+            history = BoundedHistory(
+                status_of=lambda p: p.status,
+                kind_of=lambda p: p.strategy,
+            )
+        self._rollback_history: BoundedHistory[RollbackPlan] = history
         
         # 回滾處理器
         self._rollback_handlers: Dict[str, Callable] = {}
@@ -538,7 +550,20 @@ class RollbackManager:
     
     def get_history(self, limit: int = 100) -> List[RollbackPlan]:
         """獲取回滾歷史"""
-        return self._rollback_history[-limit:]
+        return self._rollback_history.recent(limit)
+    
+    def query_history(
+        self,
+        status: Optional[RollbackStatus] = None,
+        strategy: Optional[RollbackStrategy] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[RollbackPlan]:
+        """按狀態、策略和時間範圍查詢回滾歷史"""
+        return self._rollback_history.query(
+            status=status, kind=strategy, since=since, until=until, limit=limit
+        )
     
     # ============ 默認回滾處理器 ============
     
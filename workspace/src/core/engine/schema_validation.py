@@ -0,0 +1,96 @@
+"""
+Compiled Argument Validation (參數驗證編譯)
+Turns JSON-Schema-style parameter specs into specialised validator closures
+
+The schema is interpreted once at registration time; the returned closure
+only performs set and isinstance checks per call.
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+
+ArgumentValidator = Callable[[Dict[str, Any]], List[str]]
+
+# JSON Schema type name -> Python type(s)
+JSON_TYPE_MAP: Dict[str, Union[type, Tuple[type, ...]]] = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+def _freeze_enum(values: List[Any]) -> Union[FrozenSet[Any], Tuple[Any, ...]]:
+    """Build the fastest membership container the enum values allow"""
+    try:
+        return frozenset(values)
+    except TypeError:
+        # Unhashable members (lists, dicts) fall back to a linear tuple scan
+        return tuple(values)
+
+
+def compile_validator(schema: Optional[Dict[str, Any]]) -> ArgumentValidator:
+    """
+    Compile a parameter schema into a validator closure
+
+    Supports the subset used by FunctionDefinition and Tool: ``required``,
+    per-property ``type`` and ``enum``. Error messages match the
+    interpreted validators.
+
+    Args:
+        schema: JSON-Schema-style object spec (may be empty or None)
+
+    Returns:
+        Callable taking the arguments dict and returning a list of errors
+    """
+    schema = schema or {}
+    required: Tuple[str, ...] = tuple(schema.get("required", ()))
+    required_set = frozenset(required)
+
+    # property -> (python type or None, type name, enum container or None)
+    checks: Dict[str, Tuple[Any, Optional[str], Any]] = {}
+    for name, spec in (schema.get("properties") or {}).items():
+        if not isinstance(spec, dict):
+            continue
+        type_name = spec.get("type")
+        py_type = JSON_TYPE_MAP.get(type_name) if isinstance(type_name, str) else None
+        enum = spec.get("enum")
+        enum_values = _freeze_enum(enum) if isinstance(enum, list) else None
+        if py_type is None and enum_values is None:
+            continue
+        checks[name] = (py_type, type_name, enum_values)
+
+    if not required_set and not checks:
+        def validate_nothing(arguments: Dict[str, Any]) -> List[str]:
+            return []
+        return validate_nothing
+
+    def validate(arguments: Dict[str, Any]) -> List[str]:
+        errors: List[str] = []
+
+        if not required_set <= arguments.keys():
+            for name in required:
+                if name not in arguments:
+                    errors.append(f"Missing required field: {name}")
+
+        if checks:
+            for key, value in arguments.items():
+                check = checks.get(key)
+                if check is None:
+                    continue
+                py_type, type_name, enum_values = check
+                if py_type is not None and not isinstance(value, py_type):
+                    errors.append(f"Invalid type for {key}: expected {type_name}")
+                elif enum_values is not None:
+                    try:
+                        allowed = value in enum_values
+                    except TypeError:
+                        allowed = False
+                    if not allowed:
+                        errors.append(f"Invalid value for {key}: not in enum")
+
+        return errors
+
+    return validate
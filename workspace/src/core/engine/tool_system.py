@@ -13,6 +13,9 @@ import uuid
 import json
 import asyncio
 
+from .history_store import BoundedHistory
+from .schema_validation import JSON_TYPE_MAP, ArgumentValidator, compile_validator
+
 
 class ToolCategory(Enum):
     """Tool categories for organization and routing"""
@@ -78,6 +81,11 @@ class Tool:
     created_at: datetime = field(default_factory=datetime.now)
     tags: List[str] = field(default_factory=list)
     
+    # Compiled input validator, built on first use or by ToolRegistry.register()
+    _validator: Optional[ArgumentValidator] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
     async def execute(self, params: Dict[str, Any]) -> ToolResult:
         """Execute the tool with given parameters"""
         start_time = datetime.now()
@@ -124,35 +132,21 @@ class Tool:
                 execution_time_ms=execution_time
             )
     
+    def compile_validator(self) -> ArgumentValidator:
+        """Compile input_schema into a cached validator closure"""
+        self._validator = compile_validator(self.input_schema)
+        return self._validator
+    
     def _validate_input(self, params: Dict[str, Any]) -> None:
         """Validate input parameters against schema"""
-        if not self.input_schema:
-            return
-        
-        required = self.input_schema.get('required', [])
-        properties = self.input_schema.get('properties', {})
-        
-        for req_field in required:
-            if req_field not in params:
-                raise ValueError(f"Missing required field: {req_field}")
-        
-        for key, value in params.items():
-            if key in properties:
-                expected_type = properties[key].get('type')
-                if expected_type and not self._check_type(value, expected_type):
-                    raise ValueError(f"Invalid type for {key}: expected {expected_type}")
+        validator = self._validator or self.compile_validator()
+        errors = validator(params)
+        if errors:
+            raise ValueError(errors[0])
     
     def _check_type(self, value: Any, expected_type: str) -> bool:
         """Check if value matches expected JSON Schema type"""
-        type_map = {
-            'string': str,
-            'number': (int, float),
-            'integer': int,
-            'boolean': bool,
-            'array': list,
-            'object': dict,
-        }
-        return isinstance(value, type_map.get(expected_type, object))
+        return isinstance(value, JSON_TYPE_MAP.get(expected_type, object))
     
     def to_openai_function(self) -> Dict[str, Any]:
         """Convert to OpenAI function calling format"""
@@ -193,6 +187,7 @@ class ToolRegistry:
         if tool.name in self._tools:
             raise ValueError(f"Tool {tool.name} already registered")
         
+        tool.compile_validator()
         self._tools[tool.name] = tool
         self._categories[tool.category].append(tool.name)
         
@@ -251,9 +246,19 @@ class ToolExecutor:
     Executes tools with retry logic, timeout handling, and error recovery
     """
     
-    def __init__(self, registry: Optional[ToolRegistry] = None):
+    def __init__(
+        self,
+        registry: Optional[ToolRegistry] = None,
+        history: Optional[BoundedHistory] = None
+    ):
         self.registry = registry or ToolRegistry()
-        self._execution_history: List[ToolResult] = []
+        # Bounded, indexed by status and tool name
+        if history is None:
+            history = BoundedHistory(
+                status_of=lambda r: r.status,
+                kind_of=lambda r: r.tool_name,
+            )
+        self._execution_history: BoundedHistory[ToolResult] = history
     
     async def execute(
         self,
@@ -306,9 +311,22 @@ class ToolExecutor:
                 results.append(result)
             return results
     
-    def get_history(self) -> List[ToolResult]:
-        """Get execution history"""
-        return self._execution_history.copy()
+    def get_history(self, limit: Optional[int] = None) -> List[ToolResult]:
+        """Get execution history (newest ``limit`` results, oldest first)"""
+        return self._execution_history.recent(limit)
+    
+    def query_history(
+        self,
+        status: Optional[ToolStatus] = None,
+        tool_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[ToolResult]:
+        """Query execution history by status, tool name and time range"""
+        return self._execution_history.query(
+            status=status, kind=tool_name, since=since, until=until, limit=limit
+        )
     
     def clear_history(self) -> None:
         """Clear execution history"""
@@ -17,6 +17,8 @@ from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime
 import uuid
 
+from .history_store import BoundedHistory
+
 
 class VerificationStrategy(Enum):
     """驗證策略"""
@@ -102,14 +104,23 @@ class VerificationEngine:
     4. 支持自定義驗證規則
     """
     
-    def __init__(self):
-        """初始化驗證引擎"""
+    def __init__(self, history: Optional[BoundedHistory] = None):
+        """
+        初始化驗證引擎
+        
+        Args:
+            history: 驗證歷史存儲（默認為有界環形緩衝區）
+        """
         
         # 自定義驗證器
         self._validators: Dict[str, Callable] = {}
         
-        # 驗證歷史
-        self._verification_history: List[VerificationResult] = []
+        # 驗證歷史（有界，按通過/失敗索引）
+        if history is None:
+            history = BoundedHistory(
+                status_of=lambda r: "passed" if r.passed else "failed",
+            )
+        self._verification_history: BoundedHistory[VerificationResult] = history
         
         # 統計
         self._stats = {
@@ -448,7 +459,20 @@ class VerificationEngine:
     
     def get_history(self, limit: int = 100) -> List[VerificationResult]:
         """獲取驗證歷史"""
-        return self._verification_history[-limit:]
+        return self._verification_history.recent(limit)
+    
+    def query_history(
+        self,
+        passed: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[VerificationResult]:
+        """按結果和時間範圍查詢驗證歷史"""
+        status = None if passed is None else ("passed" if passed else "failed")
+        return self._verification_history.query(
+            status=status, since=since, until=until, limit=limit
+        )
     
     # ============ 默認驗證器實現 ============
     
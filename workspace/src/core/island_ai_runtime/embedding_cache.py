@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Embedding Cache - 嵌入緩存
+Persistent Embedding Cache Keyed by Content Hash and Model
+
+相同內容在相同模型下只需嵌入一次；重新索引時未變更的文件直接命中緩存。
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+
+def content_hash(content: str) -> str:
+    """計算內容哈希（SHA-256）"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    嵌入緩存
+
+    以 (model, content_hash) 為鍵緩存向量。配置 path 時以 JSONL 追加寫入，
+    啟動時重放文件恢復緩存，新條目只追加不重寫。
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self._entries: dict[tuple[str, str], list[float]] = {}
+        self._pending: list[dict[str, Any]] = []
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        """從 JSONL 文件載入緩存（損壞的行直接跳過）"""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._entries[(entry["model"], entry["hash"])] = entry["vector"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, model: str, digest: str) -> list[float] | None:
+        """查詢緩存"""
+        vector = self._entries.get((model, digest))
+        if vector is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return vector
+
+    def put(self, model: str, digest: str, vector: list[float]) -> None:
+        """寫入緩存（持久化延遲到 flush）"""
+        key = (model, digest)
+        if key in self._entries:
+            return
+        self._entries[key] = vector
+        if self.path is not None:
+            self._pending.append({"model": model, "hash": digest, "vector": vector})
+
+    def flush(self) -> None:
+        """將新條目追加到緩存文件"""
+        if self.path is None or not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in self._pending:
+                f.write(json.dumps(entry) + "\n")
+        self._pending.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """獲取統計"""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
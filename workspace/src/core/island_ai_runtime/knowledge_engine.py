@@ -6,11 +6,17 @@ Repository Graph, Embeddings, and Vector Search
 提供代碼庫理解和語義搜索能力
 """
 
+import asyncio
 import hashlib
+import heapq
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+from .embedding_cache import EmbeddingCache, content_hash
+from .vector_store import NUMPY_AVAILABLE, MatrixVectorStore
+
 
 class NodeType(Enum):
     """節點類型"""
@@ -90,6 +96,14 @@ class RepoGraph:
         """獲取節點"""
         return self.nodes.get(node_id)
 
+    def remove_node(self, node_id: str) -> None:
+        """移除節點及其相關的邊"""
+        if self.nodes.pop(node_id, None) is None:
+            return
+        self.edges = [
+            e for e in self.edges if e.source_id != node_id and e.target_id != node_id
+        ]
+
     def get_neighbors(self, node_id: str, edge_type: EdgeType | None = None) -> list[GraphNode]:
         """獲取鄰居節點"""
         neighbors = []
@@ -119,11 +133,18 @@ class EmbeddingProvider:
     """
     嵌入提供者
 
-    生成文本的向量嵌入。
+    生成文本的向量嵌入。批量請求按 batch_size 分塊，最多 max_concurrency 個塊並發。
     """
 
-    def __init__(self, model: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+    ):
         self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
         self._dimension = 1536  # OpenAI 嵌入維度
 
     @property
@@ -137,7 +158,22 @@ class EmbeddingProvider:
         return self._mock_embedding(text)
 
     async def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        """批量生成嵌入"""
+        """批量生成嵌入（分塊並發請求，結果順序與輸入一致）"""
+        if not texts:
+            return []
+        chunks = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(chunk: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._embed_request(chunk)
+
+        results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        return [embedding for chunk_result in results for embedding in chunk_result]
+
+    async def _embed_request(self, texts: list[str]) -> list[list[float]]:
+        """單次批量嵌入請求"""
+        # 實際實現會以一次 OpenAI API 調用處理整個塊
         return [self._mock_embedding(text) for text in texts]
 
     def _mock_embedding(self, text: str) -> list[float]:
@@ -160,7 +196,7 @@ class VectorStore:
     """
     向量存儲
 
-    存儲和搜索向量嵌入。
+    存儲和搜索向量嵌入（純 Python 實現，大規模數據請使用 MatrixVectorStore）。
     """
 
     def __init__(self):
@@ -184,9 +220,8 @@ class VectorStore:
             score = self._cosine_similarity(query_vector, vector)
             scores.append((id, score))
 
-        # 按分數排序
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores[:top_k]
+        # 只選出前 top_k 個，避免全排序
+        return heapq.nlargest(top_k, scores, key=lambda x: x[1])
 
     @staticmethod
     def _cosine_similarity(a: list[float], b: list[float]) -> float:
@@ -215,41 +250,147 @@ class KnowledgeEngine:
     - Embeddings 向量嵌入
     - Vector Search 向量搜索
     - Context Retrieval 上下文檢索
+
+    配置：
+    - vector_store: "matrix"（默認，需要 numpy）或 "memory"（純 Python）
+    - embedding_batch_size / embedding_concurrency: 批量嵌入的塊大小與並發數
+    - embedding_cache_path: 嵌入緩存文件（JSONL），不配置則只緩存在內存
+
+    索引是增量的：內容哈希未變的文件直接跳過，變更文件的嵌入先查緩存，
+    未命中的才批量請求嵌入。
     """
 
     def __init__(self, config: dict[str, Any] | None = None):
         self.config = config or {}
         self.repo_graph = RepoGraph()
         self.embedding_provider = EmbeddingProvider(
-            model=self.config.get("embedding_model", "text-embedding-3-small")
-        )
-        self.vector_store = VectorStore()
-
-    async def index_file(self, path: str, content: str) -> None:
-        """索引文件"""
-        # 創建節點
-        node_id = self._generate_id(path)
-
-        # 生成嵌入
-        embedding = await self.embedding_provider.embed(content)
-
-        # 創建圖節點
-        node = GraphNode(
-            id=node_id,
-            name=path.split("/")[-1],
-            node_type=NodeType.FILE,
-            path=path,
-            content=content,
-            embedding=embedding,
+            model=self.config.get("embedding_model", "text-embedding-3-small"),
+            batch_size=self.config.get("embedding_batch_size", 64),
+            max_concurrency=self.config.get("embedding_concurrency", 4),
         )
+        self.embedding_cache = EmbeddingCache(self.config.get("embedding_cache_path"))
+        self.vector_store = self._create_vector_store()
+        self._content_hashes: dict[str, str] = {}  # path -> content hash
+
+    def _create_vector_store(self) -> VectorStore | MatrixVectorStore:
+        """根據配置創建向量存儲"""
+        backend = self.config.get("vector_store", "matrix")
+        if backend == "matrix" and NUMPY_AVAILABLE:
+            return MatrixVectorStore(dimension=self.embedding_provider.dimension)
+        return VectorStore()
+
+    async def index_file(self, path: str, content: str) -> bool:
+        """索引文件，返回是否實際更新（內容未變時跳過）"""
+        stats = await self.index_files({path: content})
+        return stats["indexed"] == 1
+
+    async def index_files(
+        self,
+        files: dict[str, str] | Iterable[tuple[str, str]],
+        prune: bool = False,
+    ) -> dict[str, int]:
+        """
+        增量索引一批文件
+
+        Args:
+            files: path -> content 映射或 (path, content) 序列
+            prune: 為 True 時移除不在本批中的已索引文件（全量重建時使用）
+
+        Returns:
+            統計：indexed / unchanged / embedded / cache_hits / removed
+        """
+        items = files.items() if isinstance(files, dict) else files
+
+        # 1. 按內容哈希篩出變更的文件
+        seen: set[str] = set()
+        changed: dict[str, tuple[str, str]] = {}  # path -> (content, hash)
+        for path, content in items:
+            seen.add(path)
+            digest = content_hash(content)
+            if self._content_hashes.get(path) == digest:
+                changed.pop(path, None)
+            else:
+                changed[path] = (content, digest)
+
+        removed = 0
+        if prune:
+            for path in [p for p in self._content_hashes if p not in seen]:
+                self.remove_file(path)
+                removed += 1
+
+        # 2. 查緩存，相同內容只嵌入一次
+        model = self.embedding_provider.model
+        embeddings: dict[str, list[float]] = {}
+        to_embed: dict[str, str] = {}  # hash -> content
+        cache_hits = 0
+        for content, digest in changed.values():
+            if digest in embeddings or digest in to_embed:
+                continue
+            cached = self.embedding_cache.get(model, digest)
+            if cached is not None:
+                embeddings[digest] = cached
+                cache_hits += 1
+            else:
+                to_embed[digest] = content
+
+        # 3. 批量嵌入未命中的內容並寫回緩存
+        if to_embed:
+            vectors = await self.embedding_provider.embed_batch(list(to_embed.values()))
+            for digest, vector in zip(to_embed, vectors, strict=True):
+                embeddings[digest] = vector
+                self.embedding_cache.put(model, digest, vector)
+            self.embedding_cache.flush()
+
+        # 4. 更新圖與向量存儲
+        ids: list[str] = []
+        vectors: list[list[float]] = []
+        metadatas: list[dict[str, Any]] = []
+        for path, (content, digest) in changed.items():
+            node_id = self._generate_id(path)
+            embedding = embeddings[digest]
+            self.repo_graph.add_node(
+                GraphNode(
+                    id=node_id,
+                    name=path.split("/")[-1],
+                    node_type=NodeType.FILE,
+                    path=path,
+                    content=content,
+                    metadata={"content_hash": digest},
+                    embedding=embedding,
+                )
+            )
+            ids.append(node_id)
+            vectors.append(embedding)
+            metadatas.append({"path": path, "type": "file"})
+            self._content_hashes[path] = digest
+        self._upsert_vectors(ids, vectors, metadatas)
 
-        # 添加到圖
-        self.repo_graph.add_node(node)
+        return {
+            "indexed": len(changed),
+            "unchanged": len(seen) - len(changed),
+            "embedded": len(to_embed),
+            "cache_hits": cache_hits,
+            "removed": removed,
+        }
 
-        # 添加到向量存儲
-        self.vector_store.upsert(
-            id=node_id, vector=embedding, metadata={"path": path, "type": "file"}
-        )
+    def _upsert_vectors(
+        self, ids: list[str], vectors: list[list[float]], metadatas: list[dict[str, Any]]
+    ) -> None:
+        """寫入向量存儲（矩陣存儲使用批量寫入）"""
+        if not ids:
+            return
+        if isinstance(self.vector_store, MatrixVectorStore):
+            self.vector_store.upsert_batch(ids, vectors, metadatas)
+            return
+        for id, vector, metadata in zip(ids, vectors, metadatas, strict=True):
+            self.vector_store.upsert(id=id, vector=vector, metadata=metadata)
+
+    def remove_file(self, path: str) -> None:
+        """從索引中移除文件"""
+        node_id = self._generate_id(path)
+        self._content_hashes.pop(path, None)
+        self.repo_graph.remove_node(node_id)
+        self.vector_store.delete(node_id)
 
     async def search(self, query: str, top_k: int = 10) -> list[SearchResult]:
         """語義搜索"""
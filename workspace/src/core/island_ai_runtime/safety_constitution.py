@@ -6,12 +6,13 @@ AI Guardrails, Red Flags, and Constitutional AI
 確保 AI 行為符合安全和道德準則
 """
 
-import re
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+from ..safety.pattern_set import PatternSet
+
 
 class RiskLevel(Enum):
     """風險等級"""
@@ -75,7 +76,8 @@ class Guardrails:
     """
     防護欄
 
-    定義和執行安全規則。
+    定義和執行安全規則。所有啟用規則的模式編譯為一個 PatternSet，
+    僅在規則變更（增刪、啟用狀態或模式改變）時重建。
     """
 
     DEFAULT_RULES = [
@@ -115,6 +117,18 @@ class Guardrails:
 
     def __init__(self, rules: list[Rule] | None = None):
         self.rules = rules or self.DEFAULT_RULES.copy()
+        self._pattern_set: PatternSet | None = None
+        self._signature: tuple[Any, ...] = ()
+
+    def _compiled_patterns(self) -> PatternSet:
+        """獲取已編譯的規則模式（規則變更時重建），鍵為規則下標"""
+        signature = tuple((id(r), r.pattern, r.enabled) for r in self.rules)
+        if self._pattern_set is None or signature != self._signature:
+            self._pattern_set = PatternSet(
+                (i, r.pattern) for i, r in enumerate(self.rules) if r.enabled and r.pattern
+            )
+            self._signature = signature
+        return self._pattern_set
 
     def add_rule(self, rule: Rule) -> None:
         """添加規則"""
@@ -127,14 +141,15 @@ class Guardrails:
     def check(self, content: str) -> list[Violation]:
         """檢查內容是否違規"""
         violations = []
+        matched = {i for i, _ in self._compiled_patterns().search(content)}
 
-        for rule in self.rules:
+        for i, rule in enumerate(self.rules):
             if not rule.enabled:
                 continue
 
             # 模式匹配
             if rule.pattern:
-                if re.search(rule.pattern, content, re.IGNORECASE):
+                if i in matched:
                     violations.append(
                         Violation(
                             rule_id=rule.id,
@@ -179,21 +194,24 @@ class RedFlags:
 
     def __init__(self):
         self.triggered_flags: list[dict[str, Any]] = []
+        self._pattern_set = PatternSet(
+            ((category, pattern), pattern)
+            for category, patterns in self.PATTERNS.items()
+            for pattern in patterns
+        )
 
     def scan(self, content: str) -> list[dict[str, Any]]:
         """掃描紅旗"""
         flags = []
 
-        for category, patterns in self.PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    flag = {
-                        "category": category,
-                        "pattern": pattern,
-                        "risk_level": RiskLevel.CRITICAL.value,
-                        "action": "block",
-                    }
-                    flags.append(flag)
+        for (category, pattern), _ in self._pattern_set.search(content):
+            flag = {
+                "category": category,
+                "pattern": pattern,
+                "risk_level": RiskLevel.CRITICAL.value,
+                "action": "block",
+            }
+            flags.append(flag)
 
         self.triggered_flags.extend(flags)
         return flags
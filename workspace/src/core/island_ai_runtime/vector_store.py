@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Matrix Vector Store - 矩陣向量存儲
+NumPy-backed Vector Search with Top-k Selection and Persistence
+
+以連續 float32 矩陣存儲預先歸一化的向量，餘弦相似度即為一次矩陣乘法。
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - numpy is a core dependency
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+class MatrixVectorStore:
+    """
+    矩陣向量存儲
+
+    與 VectorStore 相同的 upsert/delete/search 介面，但：
+    - 向量按行存於連續 float32 矩陣，寫入時即歸一化
+    - search 用 argpartition 做 top-k 部分選擇，不做全排序
+    - search_batch 一次處理多個查詢
+    - delete 只標記墓碑，刪除比例超過閾值時自動壓縮
+    - save/load 支援以 mmap 方式載入磁碟上的矩陣
+    """
+
+    MATRIX_FILE = "vectors.npy"
+    INDEX_FILE = "index.json"
+
+    def __init__(
+        self,
+        dimension: int | None = None,
+        initial_capacity: int = 1024,
+        compaction_threshold: float = 0.25,
+    ):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("MatrixVectorStore requires numpy")
+        self.dimension = dimension
+        self.compaction_threshold = compaction_threshold
+        self.metadata: dict[str, dict[str, Any]] = {}
+
+        self._initial_capacity = max(1, initial_capacity)
+        self._matrix = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: list[str | None] = []
+        self._rows: dict[str, int] = {}
+        self._size = 0  # rows in use, including tombstones
+        self._deleted = 0
+
+    # ============ 寫入 ============
+
+    def _normalize(self, vectors: "np.ndarray") -> "np.ndarray":
+        """按行歸一化（零向量保持為零，相似度為 0）"""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def _as_matrix(self, vectors: Any) -> "np.ndarray":
+        """轉為 (n, dimension) 的 float32 矩陣並檢查維度"""
+        matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+        if self.dimension is None:
+            self.dimension = matrix.shape[1]
+            self._matrix = np.zeros((0, self.dimension), dtype=np.float32)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {matrix.shape[1]} does not match store dimension {self.dimension}"
+            )
+        return matrix
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """確保矩陣至少有 rows 行（按倍數增長；mmap 載入的矩陣在此複製為可寫）"""
+        capacity = self._matrix.shape[0]
+        writable = self._matrix.flags.writeable
+        if rows <= capacity and writable:
+            return
+        new_capacity = max(capacity, self._initial_capacity)
+        while new_capacity < rows:
+            new_capacity *= 2
+        matrix = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        matrix[: self._size] = self._matrix[: self._size]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[: self._size] = self._alive[: self._size]
+        self._matrix = matrix
+        self._alive = alive
+
+    def upsert(self, id: str, vector: list[float], metadata: dict[str, Any] | None = None) -> None:
+        """插入或更新向量"""
+        self.upsert_batch([id], [vector], [metadata])
+
+    def upsert_batch(
+        self,
+        ids: list[str],
+        vectors: Any,
+        metadatas: list[dict[str, Any] | None] | None = None,
+    ) -> None:
+        """批量插入或更新向量"""
+        matrix = self._normalize(self._as_matrix(vectors))
+        if matrix.shape[0] != len(ids):
+            raise ValueError("ids and vectors must have the same length")
+        metadatas = metadatas or [None] * len(ids)
+
+        new_ids = [id for id in dict.fromkeys(ids) if id not in self._rows]
+        self._ensure_capacity(self._size + len(new_ids))
+        for id in new_ids:
+            self._rows[id] = self._size
+            self._ids.append(id)
+            self._size += 1
+
+        rows = np.fromiter((self._rows[id] for id in ids), dtype=np.int64, count=len(ids))
+        self._matrix[rows] = matrix
+        self._alive[rows] = True
+        for id, metadata in zip(ids, metadatas, strict=True):
+            self.metadata[id] = metadata or {}
+
+    def delete(self, id: str) -> None:
+        """刪除向量（墓碑標記，必要時壓縮）"""
+        row = self._rows.pop(id, None)
+        if row is None:
+            return
+        self.metadata.pop(id, None)
+        self._alive[row] = False
+        self._ids[row] = None
+        self._deleted += 1
+        if self._size and self._deleted / self._size > self.compaction_threshold:
+            self.compact()
+
+    def compact(self) -> None:
+        """移除墓碑行，重建連續矩陣"""
+        if not self._deleted:
+            return
+        keep = np.flatnonzero(self._alive[: self._size])
+        capacity = max(len(keep), self._initial_capacity)
+        matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        matrix[: len(keep)] = self._matrix[keep]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(keep)] = True
+
+        self._ids = [self._ids[row] for row in keep]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._matrix = matrix
+        self._alive = alive
+        self._size = len(keep)
+        self._deleted = 0
+
+    # ============ 查詢 ============
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._rows
+
+    def get(self, id: str) -> list[float] | None:
+        """獲取（歸一化後的）向量"""
+        row = self._rows.get(id)
+        if row is None:
+            return None
+        return self._matrix[row].tolist()
+
+    def search(self, query_vector: list[float], top_k: int = 10) -> list[tuple[str, float]]:
+        """搜索最相似的向量"""
+        return self.search_batch([query_vector], top_k)[0]
+
+    def search_batch(self, query_vectors: Any, top_k: int = 10) -> list[list[tuple[str, float]]]:
+        """批量搜索，每個查詢返回按分數降序的 (id, score) 列表"""
+        queries = self._normalize(self._as_matrix(query_vectors))
+        alive_count = len(self._rows)
+        k = min(top_k, alive_count)
+        if k <= 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        scores = queries @ self._matrix[: self._size].T
+        if self._deleted:
+            scores[:, ~self._alive[: self._size]] = -np.inf
+
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self._size), (queries.shape[0], self._size))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+
+        results = []
+        for rows, row_scores, row_order in zip(top, top_scores, order, strict=True):
+            hits = []
+            for i in row_order[:k]:
+                id = self._ids[rows[i]]
+                if id is not None:
+                    hits.append((id, float(row_scores[i])))
+            results.append(hits)
+        return results
+
+    # ============ 持久化 ============
+
+    def save(self, path: str | Path) -> None:
+        """保存到目錄（矩陣為 .npy，id 與元數據為 JSON）"""
+        self.compact()
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / self.MATRIX_FILE, self._matrix[: self._size])
+        index = {
+            "dimension": self.dimension,
+            "ids": self._ids,
+            "metadata": [self.metadata.get(id, {}) for id in self._ids],
+        }
+        (directory / self.INDEX_FILE).write_text(json.dumps(index), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "MatrixVectorStore":
+        """從目錄載入；mmap=True 時矩陣以唯讀記憶體映射方式打開，首次寫入時才複製"""
+        directory = Path(path)
+        index = json.loads((directory / cls.INDEX_FILE).read_text(encoding="utf-8"))
+        matrix = np.load(directory / cls.MATRIX_FILE, mmap_mode="r" if mmap else None)
+
+        store = cls(dimension=index["dimension"])
+        store._matrix = matrix
+        store._size = matrix.shape[0]
+        store._alive = np.ones(store._size, dtype=bool)
+        store._ids = list(index["ids"])
+        store._rows = {id: row for row, id in enumerate(store._ids)}
+        store.metadata = dict(zip(store._ids, index["metadata"], strict=True))
+        return store
@@ -7,103 +7,335 @@ Responsibilities:
 - Merkle tree construction and verification
 - State integrity proofs
 - Tamper-evident logging
+
+The tree follows RFC 6962 (Certificate Transparency) hashing: leaves are
+hashed as H(0x00 || data), interior nodes as H(0x01 || left || right), and an
+unbalanced tree splits at the largest power of two. This makes inclusion and
+consistency proofs well defined for every tree size.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, List, Optional, Any
 from dataclasses import dataclass
 import hashlib
 import json
 
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
 
 @dataclass
 class MerkleNode:
-    """Merkle tree node."""
+    """
+    Merkle tree node.
+
+    Deprecated: MerkleTree stores nodes in per-level arrays and no longer
+    builds MerkleNode objects. Kept for callers that import it.
+    """
     hash: str
     left: Optional['MerkleNode'] = None
     right: Optional['MerkleNode'] = None
     data: Optional[Any] = None
 
 
+def _largest_power_of_two_below(n: int) -> int:
+    """Largest power of two strictly less than n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
 class MerkleTree:
     """
     Merkle tree implementation for state verification.
 
+    Nodes are stored per level in flat byte arrays: level 0 holds the leaf
+    digests and level k holds the roots of every complete subtree of 2**k
+    leaves. Appending a leaf only hashes the subtrees it completes, so
+    appends are O(log n) and the root, inclusion proofs and consistency
+    proofs are computed from at most O(log n) stored nodes.
+
     Part of L0 Immutable Foundation layer.
     """
 
-    VERSION = "2.0.0"
+    VERSION = "3.0.0"
     LAYER = "L0_immutable_foundation"
 
-    def __init__(self, hash_func=None):
+    def __init__(self, hash_func: Optional[Callable[[bytes], bytes]] = None):
+        """
+        Args:
+            hash_func: Function returning the binary digest of its input
+                (defaults to SHA-256).
+        """
         self.hash_func = hash_func or self._default_hash
-        self.root: Optional[MerkleNode] = None
-        self.leaves: List[MerkleNode] = []
+        self.digest_size = len(self.hash_func(b""))
+        self._levels: List[bytearray] = [bytearray()]
+        self._size = 0
 
-    def _default_hash(self, data: bytes) -> str:
+    def _default_hash(self, data: bytes) -> bytes:
         """Default SHA-256 hash function."""
-        return hashlib.sha256(data).hexdigest()
+        return hashlib.sha256(data).digest()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def size(self) -> int:
+        """Number of leaves."""
+        return self._size
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def serialize(data: Any) -> bytes:
+        """Canonical leaf serialization."""
+        return json.dumps(data, sort_keys=True).encode()
+
+    def hash_leaf(self, data: bytes) -> bytes:
+        """Hash leaf data."""
+        return self.hash_func(LEAF_PREFIX + data)
+
+    def hash_children(self, left: bytes, right: bytes) -> bytes:
+        """Hash an interior node."""
+        return self.hash_func(NODE_PREFIX + left + right)
 
     def add_leaf(self, data: Any) -> str:
-        """Add a leaf to the tree."""
-        serialized = json.dumps(data, sort_keys=True).encode()
-        leaf_hash = self.hash_func(serialized)
-        node = MerkleNode(hash=leaf_hash, data=data)
-        self.leaves.append(node)
-        return leaf_hash
+        """Add a leaf to the tree and return its hash."""
+        leaf_hash = self.hash_leaf(self.serialize(data))
+        self.append_leaf_hash(leaf_hash)
+        return leaf_hash.hex()
+
+    def add_leaves(self, items: Iterable[Any]) -> int:
+        """Add many leaves at once and return the new tree size."""
+        hash_leaf = self.hash_leaf
+        serialize = self.serialize
+        self.extend_leaf_hashes(b"".join(hash_leaf(serialize(item)) for item in items))
+        return self._size
+
+    def append_leaf_hash(self, leaf_hash: bytes) -> int:
+        """Append a precomputed leaf hash in O(log n); returns its index."""
+        if len(leaf_hash) != self.digest_size:
+            raise ValueError(f"Leaf hash must be {self.digest_size} bytes")
+
+        index = self._size
+        self._levels[0] += leaf_hash
+        self._size += 1
+
+        # Every trailing 1 bit of the index closes a complete subtree
+        node, level, position = leaf_hash, 0, index
+        while position & 1:
+            left = self._node(level, position - 1)
+            node = self.hash_children(left, node)
+            level += 1
+            position >>= 1
+            if level == len(self._levels):
+                self._levels.append(bytearray())
+            self._levels[level] += node
+        return index
+
+    def extend_leaf_hashes(self, leaf_hashes: bytes) -> None:
+        """Append concatenated leaf hashes, building each level in bulk."""
+        ds = self.digest_size
+        if len(leaf_hashes) % ds:
+            raise ValueError(f"Leaf hashes must be a multiple of {ds} bytes")
+        if not leaf_hashes:
+            return
+
+        self._levels[0] += leaf_hashes
+        self._size += len(leaf_hashes) // ds
+
+        hash_func = self.hash_func
+        level = 0
+        while len(self._levels[level]) >= 2 * ds:
+            if level + 1 == len(self._levels):
+                self._levels.append(bytearray())
+            nodes, parents = self._levels[level], self._levels[level + 1]
+            start = len(parents) // ds
+            # Sibling pairs are adjacent, so each parent hashes one slice
+            parents += b"".join(
+                hash_func(NODE_PREFIX + nodes[i * 2 * ds:(i + 1) * 2 * ds])
+                for i in range(start, len(nodes) // (2 * ds))
+            )
+            level += 1
+
+    @classmethod
+    def from_leaf_hashes(cls, leaf_hashes: bytes,
+                         hash_func: Optional[Callable[[bytes], bytes]] = None) -> "MerkleTree":
+        """Build a tree from concatenated leaf hashes."""
+        tree = cls(hash_func)
+        tree.extend_leaf_hashes(leaf_hashes)
+        return tree
 
     def build(self) -> Optional[str]:
-        """Build the Merkle tree and return root hash."""
-        if not self.leaves:
+        """Return the root hash (the tree is maintained incrementally)."""
+        return self.get_root_hash()
+
+    # ------------------------------------------------------------------
+    # Hashes
+    # ------------------------------------------------------------------
+
+    def _node(self, level: int, index: int) -> bytes:
+        ds = self.digest_size
+        return bytes(self._levels[level][index * ds:(index + 1) * ds])
+
+    def _subtree_hash(self, start: int, end: int) -> bytes:
+        """MTH(D[start:end]) for a subtree of the RFC 6962 decomposition."""
+        # Split into complete aligned subtrees, then fold right to left
+        peaks = []
+        while start < end:
+            size = 1 << ((end - start).bit_length() - 1)
+            while start % size:
+                size >>= 1
+            peaks.append(self._node(size.bit_length() - 1, start // size))
+            start += size
+
+        node = peaks.pop()
+        while peaks:
+            node = self.hash_children(peaks.pop(), node)
+        return node
+
+    def get_root(self, tree_size: Optional[int] = None) -> Optional[bytes]:
+        """Binary root of the first tree_size leaves (default: all)."""
+        tree_size = self._size if tree_size is None else tree_size
+        if tree_size <= 0 or tree_size > self._size:
             return None
+        return self._subtree_hash(0, tree_size)
 
-        nodes = self.leaves.copy()
+    def get_root_hash(self, tree_size: Optional[int] = None) -> Optional[str]:
+        """Get the root hash."""
+        root = self.get_root(tree_size)
+        return root.hex() if root is not None else None
 
-        while len(nodes) > 1:
-            next_level = []
-            for i in range(0, len(nodes), 2):
-                left = nodes[i]
-                right = nodes[i + 1] if i + 1 < len(nodes) else left
+    def get_leaf_hash(self, leaf_index: int) -> Optional[str]:
+        """Get the hash of a leaf."""
+        if not 0 <= leaf_index < self._size:
+            return None
+        return self._node(0, leaf_index).hex()
 
-                combined = (left.hash + right.hash).encode()
-                parent_hash = self.hash_func(combined)
-                parent = MerkleNode(hash=parent_hash, left=left, right=right)
-                next_level.append(parent)
-            nodes = next_level
+    # ------------------------------------------------------------------
+    # Inclusion proofs
+    # ------------------------------------------------------------------
 
-        self.root = nodes[0]
-        return self.root.hash
+    def get_proof(self, leaf_index: int,
+                  tree_size: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Get Merkle inclusion proof for a leaf.
 
-    def get_proof(self, leaf_index: int) -> List[Dict[str, str]]:
-        """Get Merkle proof for a leaf."""
-        if not self.root or leaf_index >= len(self.leaves):
+        Steps are ordered from the leaf up; "position" tells on which side
+        the sibling hash is combined.
+        """
+        tree_size = self._size if tree_size is None else tree_size
+        if not 0 <= leaf_index < tree_size <= self._size:
             return []
 
         proof = []
-        # Simplified proof generation
-        # Full implementation would traverse tree
+        start, end = 0, tree_size
+        while end - start > 1:
+            k = _largest_power_of_two_below(end - start)
+            if leaf_index < start + k:
+                proof.append({"position": "right", "hash": self._subtree_hash(start + k, end).hex()})
+                end = start + k
+            else:
+                proof.append({"position": "left", "hash": self._subtree_hash(start, start + k).hex()})
+                start += k
+        proof.reverse()
         return proof
 
     def verify_proof(self, leaf_hash: str, proof: List[Dict[str, str]],
                      root_hash: str) -> bool:
-        """Verify a Merkle proof."""
-        current = leaf_hash
-        for step in proof:
-            if step.get("position") == "left":
-                current = self.hash_func((step["hash"] + current).encode())
+        """Verify a Merkle inclusion proof."""
+        try:
+            current = bytes.fromhex(leaf_hash)
+            for step in proof:
+                sibling = bytes.fromhex(step["hash"])
+                if step.get("position") == "left":
+                    current = self.hash_children(sibling, current)
+                else:
+                    current = self.hash_children(current, sibling)
+            return current == bytes.fromhex(root_hash)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    # ------------------------------------------------------------------
+    # Consistency proofs
+    # ------------------------------------------------------------------
+
+    def get_consistency_proof(self, old_size: int,
+                              new_size: Optional[int] = None) -> List[str]:
+        """
+        Get proof that the first old_size leaves are a prefix of the tree
+        of new_size leaves (RFC 6962 section 2.1.2).
+        """
+        new_size = self._size if new_size is None else new_size
+        if not 0 < old_size <= new_size <= self._size:
+            return []
+
+        proof = []
+        start, end, complete = 0, new_size, True
+        while old_size != end:
+            k = _largest_power_of_two_below(end - start)
+            if old_size - start <= k:
+                proof.append(self._subtree_hash(start + k, end))
+                end = start + k
             else:
-                current = self.hash_func((current + step["hash"]).encode())
-        return current == root_hash
+                proof.append(self._subtree_hash(start, start + k))
+                start += k
+                complete = False
+        if not complete:
+            proof.append(self._subtree_hash(start, end))
+        proof.reverse()
+        return [node.hex() for node in proof]
 
-    def get_root_hash(self) -> Optional[str]:
-        """Get the root hash."""
-        return self.root.hash if self.root else None
+    def verify_consistency(self, old_size: int, new_size: int, old_root: str,
+                           new_root: str, proof: List[str]) -> bool:
+        """Verify a consistency proof (RFC 9162 section 2.1.4.2)."""
+        try:
+            old_root_b = bytes.fromhex(old_root)
+            new_root_b = bytes.fromhex(new_root)
+            nodes = [bytes.fromhex(node) for node in proof]
+        except (TypeError, ValueError):
+            return False
+
+        if not 0 < old_size <= new_size:
+            return False
+        if old_size == new_size:
+            return not nodes and old_root_b == new_root_b
+        if not nodes:
+            return False
+
+        # A power-of-two old tree is itself a node of the new tree
+        if old_size & (old_size - 1) == 0:
+            nodes.insert(0, old_root_b)
+
+        fn, sn = old_size - 1, new_size - 1
+        while fn & 1:
+            fn >>= 1
+            sn >>= 1
+
+        fr = sr = nodes[0]
+        for c in nodes[1:]:
+            if sn == 0:
+                return False
+            if fn & 1 or fn == sn:
+                fr = self.hash_children(c, fr)
+                sr = self.hash_children(c, sr)
+                if not fn & 1:
+                    while fn and not fn & 1:
+                        fn >>= 1
+                        sn >>= 1
+            else:
+                sr = self.hash_children(sr, c)
+            fn >>= 1
+            sn >>= 1
+
+        return sn == 0 and fr == old_root_b and sr == new_root_b
 
 
 class StateVerifier:
     """
     State verification using Merkle proofs.
 
-    Ensures state integrity across system components.
+    Ensures state integrity across system components. Records are appended
+    to the tree as they are logged, so anchoring a record never rebuilds it.
     """
 
     def __init__(self):
@@ -121,10 +353,32 @@ class StateVerifier:
         self.state_log.append({"hash": leaf_hash, **entry})
         return leaf_hash
 
-    def finalize(self) -> str:
+    def finalize(self) -> Optional[str]:
         """Finalize and get root hash."""
         return self.tree.build()
 
+    def get_state_proof(self, index: int) -> Dict[str, Any]:
+        """Get an inclusion proof for a recorded state against the current root."""
+        return {
+            "index": index,
+            "leaf_hash": self.tree.get_leaf_hash(index),
+            "tree_size": self.tree.size,
+            "root_hash": self.tree.get_root_hash(),
+            "proof": self.tree.get_proof(index),
+        }
+
+    def verify_state(self, index: int) -> bool:
+        """Verify a logged state against the tree."""
+        if not 0 <= index < len(self.state_log):
+            return False
+        record = dict(self.state_log[index])
+        recorded_hash = record.pop("hash")
+        leaf_hash = self.tree.hash_leaf(MerkleTree.serialize(record)).hex()
+        if leaf_hash != recorded_hash:
+            return False
+        proof = self.get_state_proof(index)
+        return self.tree.verify_proof(leaf_hash, proof["proof"], proof["root_hash"])
+
     def _get_timestamp(self) -> str:
         """Get current timestamp."""
         from datetime import datetime, timezone
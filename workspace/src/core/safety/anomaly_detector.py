@@ -7,12 +7,17 @@ Reference: Organizations will leverage AI-driven infrastructure that can
 detect anomalies, neutralize risks, and learn from each incident [5]
 """
 
+from collections import deque
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-import statistics
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from datetime import datetime
 import asyncio
+import bisect
+import math
+import time
+
+from .streaming_stats import EWMA, P2Quantile
 
 
 class AnomalyType(Enum):
@@ -59,40 +64,185 @@ class AnomalyAlert:
     acknowledged: bool = False
 
 
-@dataclass
 class MetricWindow:
-    """Sliding window of metric values"""
-    values: List[float] = field(default_factory=list)
-    timestamps: List[datetime] = field(default_factory=list)
-    max_size: int = 1000
-    
+    """
+    Sliding window of metric values
+
+    Every operation on the record path is O(1) (amortised):
+    - mean / std_dev come from a sliding Welford accumulator that adds the
+      new sample and removes the evicted one
+    - min / max come from monotonic deques
+    - time-range counts bisect a monotonic timestamp index
+    - EWMA and optional P² quantile sketches track the whole stream
+
+    ``values`` and ``timestamps`` are deques ordered oldest to newest.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ewma_alpha: float = 0.1,
+        quantiles: Sequence[float] = (),
+    ):
+        if max_size < 1:
+            raise ValueError("Window size must be at least 1")
+        self.max_size = max_size
+        self.values: Deque[float] = deque()
+        self.timestamps: Deque[datetime] = deque()
+        self.ewma = EWMA(ewma_alpha)
+        self.sketches: Dict[float, P2Quantile] = {q: P2Quantile(q) for q in quantiles}
+        self.total_count = 0
+
+        # Sliding Welford accumulator
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._removals = 0
+
+        # Monotonic epoch-second index; _time_head is the slot of the oldest value
+        self._times: List[float] = []
+        self._time_head = 0
+
+        # Monotonic deques of (sequence number, value) for min / max
+        self._seq = 0
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+
     def add(self, value: float, timestamp: Optional[datetime] = None) -> None:
         """Add a value to the window"""
+        if len(self.values) >= self.max_size:
+            self._evict()
+
+        if timestamp is None:
+            now = time.time()
+            timestamp = datetime.fromtimestamp(now)
+        else:
+            now = timestamp.timestamp()
+        # Out-of-order timestamps are clamped so the index stays sorted
+        if self._times and now < self._times[-1]:
+            now = self._times[-1]
+
         self.values.append(value)
-        self.timestamps.append(timestamp or datetime.now())
-        
-        # Trim if needed
-        if len(self.values) > self.max_size:
-            self.values = self.values[-self.max_size:]
-            self.timestamps = self.timestamps[-self.max_size:]
-    
+        self.timestamps.append(timestamp)
+        self._times.append(now)
+
+        n = len(self.values)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+
+        seq = self._seq
+        self._seq += 1
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+
+        self.ewma.add(value)
+        for sketch in self.sketches.values():
+            sketch.add(value)
+        self.total_count += 1
+
+    def _evict(self) -> None:
+        """Remove the oldest value from every running structure"""
+        old = self.values.popleft()
+        self.timestamps.popleft()
+        self._time_head += 1
+        if self._time_head >= self.max_size:
+            del self._times[:self._time_head]
+            self._time_head = 0
+
+        n = len(self.values)
+        if n == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+        else:
+            delta = old - self._mean
+            self._mean -= delta / n
+            self._m2 -= delta * (old - self._mean)
+
+        old_seq = self._seq - n - 1
+        if self._min and self._min[0][0] == old_seq:
+            self._min.popleft()
+        if self._max and self._max[0][0] == old_seq:
+            self._max.popleft()
+
+        # Re-anchor the accumulator once per window to bound rounding drift
+        self._removals += 1
+        if self._removals >= self.max_size:
+            self._resync()
+
+    def _resync(self) -> None:
+        """Recompute the Welford accumulator exactly from the window"""
+        self._removals = 0
+        n = len(self.values)
+        if n == 0:
+            self._mean = self._m2 = 0.0
+            return
+        mean = math.fsum(self.values) / n
+        self._mean = mean
+        self._m2 = math.fsum((v - mean) ** 2 for v in self.values)
+
+    def _index_since(self, seconds: float) -> int:
+        """Offset into ``values`` of the first value from the last N seconds"""
+        cutoff = time.time() - seconds
+        return bisect.bisect_left(self._times, cutoff, self._time_head) - self._time_head
+
+    def count_recent(self, seconds: float) -> int:
+        """Count values from the last N seconds"""
+        return len(self.values) - self._index_since(seconds)
+
     def get_recent(self, seconds: float) -> List[float]:
         """Get values from the last N seconds"""
-        cutoff = datetime.now() - timedelta(seconds=seconds)
-        return [
-            v for v, t in zip(self.values, self.timestamps)
-            if t >= cutoff
-        ]
-    
+        count = self.count_recent(seconds)
+        if count <= 0:
+            return []
+        recent = []
+        for value in reversed(self.values):
+            recent.append(value)
+            if len(recent) == count:
+                break
+        recent.reverse()
+        return recent
+
     @property
     def mean(self) -> float:
-        """Calculate mean of values"""
-        return statistics.mean(self.values) if self.values else 0.0
-    
+        """Mean of the window"""
+        return self._mean if self.values else 0.0
+
     @property
     def std_dev(self) -> float:
-        """Calculate standard deviation"""
-        return statistics.stdev(self.values) if len(self.values) > 1 else 0.0
+        """Sample standard deviation of the window"""
+        n = len(self.values)
+        if n < 2:
+            return 0.0
+        return math.sqrt(max(self._m2, 0.0) / (n - 1))
+
+    @property
+    def min(self) -> Optional[float]:
+        """Smallest value in the window"""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        """Largest value in the window"""
+        return self._max[0][1] if self._max else None
+
+    def quantile(self, q: float) -> float:
+        """
+        Quantile estimate
+
+        Uses the P² sketch when ``q`` is tracked (whole stream), otherwise
+        an exact nearest-rank quantile over the window (O(n log n)).
+        """
+        sketch = self.sketches.get(q)
+        if sketch is not None:
+            return sketch.value
+        if not self.values:
+            return 0.0
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
 
 
 class AnomalyDetector:
@@ -133,7 +283,9 @@ class AnomalyDetector:
         std_dev_factor: float = 2.0,
         rate_limit: Optional[Tuple[int, float]] = None,  # (count, seconds)
         detection_strategy: DetectionStrategy = DetectionStrategy.HYBRID,
-        window_size: int = 1000
+        window_size: int = 1000,
+        ewma_alpha: float = 0.1,
+        quantiles: Sequence[float] = ()
     ) -> None:
         """
         Add a metric to monitor
@@ -147,8 +299,13 @@ class AnomalyDetector:
             rate_limit: Rate limit as (count, seconds)
             detection_strategy: Strategy to use
             window_size: Size of sliding window
+            ewma_alpha: Smoothing factor of the metric's EWMA
+            quantiles: Quantiles to track with streaming sketches
+                (e.g. (0.5, 0.99)), reported by get_metrics_summary
         """
-        self._metrics[name] = MetricWindow(max_size=window_size)
+        self._metrics[name] = MetricWindow(
+            max_size=window_size, ewma_alpha=ewma_alpha, quantiles=quantiles
+        )
         self._thresholds[name] = {
             "threshold": threshold,
             "min": min_threshold,
@@ -269,12 +426,12 @@ class AnomalyDetector:
         rate_limit = config.get("rate_limit")
         if rate_limit:
             count, seconds = rate_limit
-            recent = window.get_recent(seconds)
-            if len(recent) > count:
+            recent_count = window.count_recent(seconds)
+            if recent_count > count:
                 is_anomaly = True
                 anomaly_type = AnomalyType.RATE_ANOMALY
-                description = f"Rate limit exceeded: {len(recent)} events in {seconds}s (limit: {count})"
-                details["rate_count"] = len(recent)
+                description = f"Rate limit exceeded: {recent_count} events in {seconds}s (limit: {count})"
+                details["rate_count"] = recent_count
                 details["rate_limit"] = count
                 details["rate_window"] = seconds
         
@@ -408,9 +565,11 @@ class AnomalyDetector:
                     "count": len(window.values),
                     "mean": window.mean,
                     "std_dev": window.std_dev,
-                    "min": min(window.values),
-                    "max": max(window.values),
-                    "latest": window.values[-1] if window.values else None
+                    "min": window.min,
+                    "max": window.max,
+                    "latest": window.values[-1],
+                    "ewma": window.ewma.mean,
+                    "quantiles": {q: s.value for q, s in window.sketches.items()},
                 }
         return summary
     
@@ -4,6 +4,14 @@ Checkpoint Manager for HLP Executor Core
 Implements checkpoint creation, compression, restoration, and cleanup
 functionality with copy-on-write strategy and retention policies.
 
+In delta mode the state is split into a tree of content-addressed chunks:
+sibling values are packed into chunks of roughly ``delta_chunk_size``
+bytes (group boundaries are chosen by key hash, so inserting a key only
+disturbs its own group), and large nested dicts down to ``delta_depth``
+levels are split recursively. Chunks are deduplicated across checkpoints,
+so a checkpoint only stores the groups that changed; restore reassembles
+the tree.
+
 This module provides checkpoint management for safe state restoration
 in case of failures during execution.
 """
@@ -12,14 +20,21 @@ import gzip
 import hashlib
 import json
 import logging
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 logger = logging.getLogger(__name__)
 
+# Canonical chunk encoding (sorted keys, compact separators)
+_CHUNK_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+_encode_key = json.encoder.encode_basestring_ascii
+
 
 class CheckpointStatus(Enum):
     """Status of a checkpoint."""
@@ -44,6 +59,10 @@ class Checkpoint:
     original_size: int = 0
     checksum: str = ""
     metadata: dict[str, Any] = field(default_factory=dict)
+    # Delta mode: chunk tree ({"p": [["c", digest] | ["n", key, node], ...]})
+    # and the flat list of referenced chunk digests
+    manifest: dict[str, Any] | None = None
+    chunks: list[str] = field(default_factory=list)
 
     def __post_init__(self):
         """Calculate checksum after initialization."""
@@ -53,6 +72,92 @@ class Checkpoint:
             self.original_size = len(state_str.encode())
 
 
+class ChunkStore:
+    """
+    Content-addressed, reference-counted chunk storage.
+
+    Chunks are keyed by the SHA-256 of their uncompressed bytes, so
+    identical values are stored once. Thread-safe: compression may run on
+    a background thread while checkpoints are created and restored.
+    """
+
+    def __init__(self, min_compress_size: int = 1024):
+        self.min_compress_size = min_compress_size
+        # digest -> [data, compressed, refcount]
+        self._chunks: dict[str, list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes) -> tuple[str, bool]:
+        """Store a chunk (or add a reference); returns (digest, newly_stored)."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            entry = self._chunks.get(digest)
+            if entry is not None:
+                entry[2] += 1
+                return digest, False
+            self._chunks[digest] = [data, False, 1]
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read a chunk, decompressing and verifying it against its address.
+
+        Raises:
+            ValueError: If the chunk is missing or corrupt
+        """
+        with self._lock:
+            entry = self._chunks.get(digest)
+            if entry is None:
+                raise ValueError(f"Chunk not found: {digest}")
+            data, compressed = entry[0], entry[1]
+        if compressed:
+            data = gzip.decompress(data)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk checksum mismatch: {digest}")
+        return data
+
+    def release(self, digest: str) -> None:
+        """Drop one reference; the chunk is freed when none remain."""
+        with self._lock:
+            entry = self._chunks.get(digest)
+            if entry is None:
+                return
+            entry[2] -= 1
+            if entry[2] <= 0:
+                del self._chunks[digest]
+
+    def compress(self, digest: str, compresslevel: int = 6) -> int:
+        """Gzip a chunk in place (if large enough); returns its stored size."""
+        with self._lock:
+            entry = self._chunks.get(digest)
+            if entry is None:
+                return 0
+            data, compressed = entry[0], entry[1]
+        if compressed or len(data) < self.min_compress_size:
+            return len(data)
+        # zlib releases the GIL, so this does not block other threads
+        packed = gzip.compress(data, compresslevel=compresslevel)
+        if len(packed) >= len(data):
+            return len(data)
+        with self._lock:
+            entry = self._chunks.get(digest)
+            if entry is not None and not entry[1]:
+                entry[0], entry[1] = packed, True
+        return len(packed)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Number of chunks and bytes held."""
+        with self._lock:
+            return {
+                "chunks": len(self._chunks),
+                "stored_bytes": sum(len(entry[0]) for entry in self._chunks.values()),
+                "compressed_chunks": sum(1 for entry in self._chunks.values() if entry[1]),
+            }
+
+
 class CheckpointManager:
     """
     Manages checkpoint lifecycle including creation, compression, restoration,
@@ -64,6 +169,8 @@ class CheckpointManager:
     - Retention policy (keep last N checkpoints)
     - Checksum verification
     - Automatic cleanup of old checkpoints
+    - Delta mode: deduplicated, content-addressed chunks
+    - Background compression and cleanup off the caller's path
     """
     
     def __init__(
@@ -71,7 +178,11 @@ class CheckpointManager:
         storage_path: Path | None = None,
         retention_count: int = 5,
         compression_enabled: bool = True,
-        auto_cleanup: bool = True
+        auto_cleanup: bool = True,
+        delta_mode: bool = False,
+        delta_depth: int = 2,
+        delta_chunk_size: int = 64 * 1024,
+        background_maintenance: bool = False
     ):
         """
         Initialize the CheckpointManager.
@@ -81,14 +192,30 @@ class CheckpointManager:
             retention_count: Number of recent checkpoints to retain per execution
             compression_enabled: Whether to compress checkpoints automatically
             auto_cleanup: Whether to automatically clean up old checkpoints
+            delta_mode: Store states as deduplicated content-addressed chunks
+            delta_depth: Levels of nested dicts that may be split into chunks
+            delta_chunk_size: Target size in bytes of a chunk of sibling values
+            background_maintenance: Run compression and cleanup on a
+                background thread instead of inside create_checkpoint
         """
         self.storage_path = storage_path
         self.retention_count = retention_count
         self.compression_enabled = compression_enabled
         self.auto_cleanup = auto_cleanup
+        self.delta_mode = delta_mode
+        self.delta_depth = delta_depth
+        self.delta_chunk_size = delta_chunk_size
+        self.background_maintenance = background_maintenance
         
         # In-memory storage
         self._checkpoints: dict[str, list[Checkpoint]] = {}
+        self._index: dict[str, Checkpoint] = {}
+        self._chunks = ChunkStore()
+        self._lock = threading.RLock()
+        
+        # Background maintenance (compression / cleanup)
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: list[Future] = []
         
         logger.info(
             "CheckpointManager initialized: storage_path=%s, retention=%d, compression=%s",
@@ -119,31 +246,37 @@ class CheckpointManager:
         """
         checkpoint_id = self._generate_checkpoint_id(execution_id, phase_id)
         
-        # Deep copy state using copy-on-write strategy
-        state_copy = self._copy_on_write(state)
-        
-        checkpoint = Checkpoint(
-            checkpoint_id=checkpoint_id,
-            execution_id=execution_id,
-            phase_id=phase_id,
-            timestamp=datetime.utcnow(),
-            state=state_copy,
-            status=CheckpointStatus.CREATED
-        )
+        if self.delta_mode:
+            checkpoint = self._create_delta_checkpoint(
+                checkpoint_id, execution_id, phase_id, state
+            )
+        else:
+            # Deep copy state using copy-on-write strategy
+            state_copy = self._copy_on_write(state)
+            
+            checkpoint = Checkpoint(
+                checkpoint_id=checkpoint_id,
+                execution_id=execution_id,
+                phase_id=phase_id,
+                timestamp=datetime.utcnow(),
+                state=state_copy,
+                status=CheckpointStatus.CREATED
+            )
         
         # Store checkpoint
-        if execution_id not in self._checkpoints:
-            self._checkpoints[execution_id] = []
-        
-        self._checkpoints[execution_id].append(checkpoint)
+        with self._lock:
+            self._checkpoints.setdefault(execution_id, []).append(checkpoint)
+            self._index[checkpoint_id] = checkpoint
         
         # Compress if enabled
         if self.compression_enabled:
-            self.compress_checkpoint(checkpoint_id)
+            self._run_maintenance(self.compress_checkpoint, checkpoint_id)
         
         # Auto cleanup if enabled
         if self.auto_cleanup:
-            self.cleanup_old_checkpoints(execution_id, self.retention_count)
+            self._run_maintenance(
+                self.cleanup_old_checkpoints, execution_id, self.retention_count
+            )
         
         logger.info(
             "Created checkpoint: %s for execution=%s, phase=%s (size=%d bytes)",
@@ -165,7 +298,8 @@ class CheckpointManager:
         Returns:
             List of checkpoints, sorted by timestamp (newest first)
         """
-        checkpoints = self._checkpoints.get(execution_id, [])
+        with self._lock:
+            checkpoints = list(self._checkpoints.get(execution_id, []))
         return sorted(checkpoints, key=lambda cp: cp.timestamp, reverse=True)
     
     def restore_checkpoint(self, checkpoint_id: str) -> dict[str, Any]:
@@ -188,6 +322,9 @@ class CheckpointManager:
         if not checkpoint:
             raise ValueError(f"Checkpoint not found: {checkpoint_id}")
         
+        if checkpoint.manifest is not None:
+            return self._restore_delta_checkpoint(checkpoint)
+        
         # Decompress if compressed
         if checkpoint.compressed:
             self._decompress_checkpoint(checkpoint)
@@ -226,26 +363,28 @@ class CheckpointManager:
         Returns:
             Number of checkpoints removed
         """
-        if execution_id not in self._checkpoints:
-            return 0
-        
-        checkpoints = self._checkpoints[execution_id]
-        if len(checkpoints) <= keep_count:
-            return 0
-        
-        # Sort by timestamp (newest first)
-        checkpoints.sort(key=lambda cp: cp.timestamp, reverse=True)
-        
-        # Keep only the most recent
-        to_keep = checkpoints[:keep_count]
-        to_remove = checkpoints[keep_count:]
-        
-        # Update storage
-        self._checkpoints[execution_id] = to_keep
-        
-        # Mark removed checkpoints as deleted
-        for checkpoint in to_remove:
-            checkpoint.status = CheckpointStatus.DELETED
+        with self._lock:
+            if execution_id not in self._checkpoints:
+                return 0
+            
+            checkpoints = self._checkpoints[execution_id]
+            if len(checkpoints) <= keep_count:
+                return 0
+            
+            # Sort by timestamp (newest first)
+            checkpoints.sort(key=lambda cp: cp.timestamp, reverse=True)
+            
+            # Keep only the most recent
+            to_keep = checkpoints[:keep_count]
+            to_remove = checkpoints[keep_count:]
+            
+            # Update storage
+            self._checkpoints[execution_id] = to_keep
+            
+            # Mark removed checkpoints as deleted
+            for checkpoint in to_remove:
+                checkpoint.status = CheckpointStatus.DELETED
+                self._release(checkpoint)
         
         removed_count = len(to_remove)
         
@@ -280,6 +419,14 @@ class CheckpointManager:
             logger.debug("Checkpoint already compressed: %s", checkpoint_id)
             return checkpoint.compressed_size or 0
         
+        if checkpoint.manifest is not None:
+            # Delta checkpoints compress their chunks in the shared store
+            compressed_size = sum(self._chunks.compress(digest) for digest in checkpoint.chunks)
+            checkpoint.compressed = True
+            checkpoint.compressed_size = compressed_size
+            checkpoint.status = CheckpointStatus.COMPRESSED
+            return compressed_size
+        
         # Serialize state
         state_json = json.dumps(checkpoint.state, sort_keys=True)
         state_bytes = state_json.encode('utf-8')
@@ -293,7 +440,10 @@ class CheckpointManager:
         checkpoint.compressed_size = compressed_size
         checkpoint.status = CheckpointStatus.COMPRESSED
         
-        compression_ratio = (1 - compressed_size / checkpoint.original_size) * 100
+        compression_ratio = (
+            (1 - compressed_size / checkpoint.original_size) * 100
+            if checkpoint.original_size else 0.0
+        )
         
         logger.info(
             "Compressed checkpoint: %s (original=%d bytes, compressed=%d bytes, ratio=%.1f%%)",
@@ -315,7 +465,8 @@ class CheckpointManager:
         Returns:
             Dictionary with checkpoint statistics
         """
-        checkpoints = self._checkpoints.get(execution_id, [])
+        with self._lock:
+            checkpoints = list(self._checkpoints.get(execution_id, []))
         
         if not checkpoints:
             return {
@@ -337,13 +488,22 @@ class CheckpointManager:
             "compressed_size": compressed_size,
             "compression_ratio": (1 - compressed_size / total_size) * 100 if total_size > 0 else 0,
             "oldest_checkpoint": min(cp.timestamp for cp in checkpoints),
-            "newest_checkpoint": max(cp.timestamp for cp in checkpoints)
+            "newest_checkpoint": max(cp.timestamp for cp in checkpoints),
+            "chunk_store": self._chunks.get_stats() if self.delta_mode else None
         }
     
     def _generate_checkpoint_id(self, execution_id: str, phase_id: str) -> str:
         """Generate a unique checkpoint ID."""
         timestamp = int(datetime.utcnow().timestamp() * 1000)
-        return f"cp_{execution_id}_{phase_id}_{timestamp}"
+        checkpoint_id = f"cp_{execution_id}_{phase_id}_{timestamp}"
+        
+        # Same phase checkpointed twice within a millisecond
+        with self._lock:
+            candidate, suffix = checkpoint_id, 1
+            while candidate in self._index:
+                suffix += 1
+                candidate = f"{checkpoint_id}_{suffix}"
+        return candidate
     
     def _copy_on_write(self, state: dict[str, Any]) -> dict[str, Any]:
         """
@@ -355,11 +515,200 @@ class CheckpointManager:
     
     def _find_checkpoint_by_id(self, checkpoint_id: str) -> Checkpoint | None:
         """Find a checkpoint by its ID across all executions."""
-        for checkpoints in self._checkpoints.values():
-            for checkpoint in checkpoints:
-                if checkpoint.checkpoint_id == checkpoint_id:
-                    return checkpoint
-        return None
+        with self._lock:
+            return self._index.get(checkpoint_id)
+    
+    # ============ Delta mode ============
+    
+    def _create_delta_checkpoint(
+        self,
+        checkpoint_id: str,
+        execution_id: str,
+        phase_id: str,
+        state: dict[str, Any]
+    ) -> Checkpoint:
+        """Split the state into chunks, storing only ones not already held."""
+        if not all(isinstance(key, str) for key in state):
+            # Normalise keys the way a JSON round trip would
+            state = self._copy_on_write(state)
+        chunks: list[str] = []
+        stats = {"new_chunks": 0, "new_bytes": 0, "total_bytes": 0}
+        tree = self._encode_tree(state, max(1, self.delta_depth))
+        if isinstance(tree, bytes):
+            tree = {"p": [["g", tree]]}
+        manifest = self._store_tree(tree, chunks, stats)
+        
+        return Checkpoint(
+            checkpoint_id=checkpoint_id,
+            execution_id=execution_id,
+            phase_id=phase_id,
+            timestamp=datetime.utcnow(),
+            state={},
+            status=CheckpointStatus.CREATED,
+            original_size=stats["total_bytes"],
+            checksum=self._manifest_checksum(manifest),
+            metadata={
+                "delta": {
+                    "chunks": len(chunks),
+                    "new_chunks": stats["new_chunks"],
+                    "new_bytes": stats["new_bytes"],
+                }
+            },
+            manifest=manifest,
+            chunks=chunks
+        )
+    
+    def _encode_tree(self, value: dict[str, Any], depth: int) -> bytes | dict[str, Any]:
+        """
+        Encode a dict bottom-up.
+        
+        Returns the canonical JSON bytes when the whole dict is smaller than
+        a chunk, otherwise a node whose parts are groups of encoded members
+        ("g", bytes) and recursively split children ("n", key, node).
+        """
+        members: list[tuple[str, bytes | dict[str, Any]]] = []
+        total = 0
+        for key in sorted(value):
+            child = value[key]
+            if depth > 1 and isinstance(child, dict) and all(isinstance(k, str) for k in child):
+                encoded = self._encode_tree(child, depth - 1)
+            else:
+                encoded = _CHUNK_ENCODER.encode(child).encode("ascii")
+            members.append((key, encoded))
+            total += len(encoded) if isinstance(encoded, bytes) else self.delta_chunk_size
+        
+        if total < self.delta_chunk_size:
+            return b"{" + b",".join(
+                _encode_key(key).encode("ascii") + b":" + encoded
+                for key, encoded in members
+            ) + b"}"
+        
+        parts: list[list[Any]] = []
+        group: list[bytes] = []
+        group_size = 0
+        
+        def flush_group() -> None:
+            nonlocal group_size
+            if group:
+                parts.append(["g", b"{" + b",".join(group) + b"}"])
+                group.clear()
+                group_size = 0
+        
+        for key, encoded in members:
+            if not isinstance(encoded, bytes):
+                flush_group()
+                parts.append(["n", key, encoded])
+                continue
+            key_bytes = _encode_key(key).encode("ascii")
+            group.append(key_bytes + b":" + encoded)
+            group_size += len(key_bytes) + len(encoded) + 1
+            # Content-defined boundary: stable under insertions of other keys
+            if group_size >= 4 * self.delta_chunk_size or (
+                group_size >= self.delta_chunk_size and zlib.crc32(key_bytes) % 4 == 0
+            ):
+                flush_group()
+        flush_group()
+        return {"p": parts}
+    
+    def _store_tree(
+        self,
+        node: dict[str, Any],
+        chunks: list[str],
+        stats: dict[str, int]
+    ) -> dict[str, Any]:
+        """Store the groups of an encoded tree, replacing them with chunk hashes."""
+        parts: list[list[Any]] = []
+        for part in node["p"]:
+            if part[0] == "n":
+                parts.append(["n", part[1], self._store_tree(part[2], chunks, stats)])
+                continue
+            data = part[1]
+            digest, is_new = self._chunks.put(data)
+            chunks.append(digest)
+            stats["total_bytes"] += len(data)
+            if is_new:
+                stats["new_chunks"] += 1
+                stats["new_bytes"] += len(data)
+            parts.append(["c", digest])
+        return {"p": parts}
+    
+    def _load_tree(self, node: dict[str, Any]) -> dict[str, Any]:
+        """Reassemble a state from a manifest node."""
+        state: dict[str, Any] = {}
+        for part in node["p"]:
+            if part[0] == "n":
+                state[part[1]] = self._load_tree(part[2])
+            else:
+                state.update(json.loads(self._chunks.get(part[1])))
+        return state
+    
+    @staticmethod
+    def _manifest_checksum(manifest: dict[str, Any]) -> str:
+        """Checksum over the chunk tree (chunks are verified by their own hashes)."""
+        return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+    
+    def _restore_delta_checkpoint(self, checkpoint: Checkpoint) -> dict[str, Any]:
+        """Verify and reassemble a delta checkpoint."""
+        if self._manifest_checksum(checkpoint.manifest) != checkpoint.checksum:
+            raise ValueError(
+                f"Checksum verification failed for checkpoint: {checkpoint.checkpoint_id}"
+            )
+        state = self._load_tree(checkpoint.manifest)
+        checkpoint.status = CheckpointStatus.RESTORED
+        
+        logger.info(
+            "Restored delta checkpoint: %s (execution=%s, phase=%s, chunks=%d)",
+            checkpoint.checkpoint_id,
+            checkpoint.execution_id,
+            checkpoint.phase_id,
+            len(checkpoint.chunks)
+        )
+        return state
+    
+    def _release(self, checkpoint: Checkpoint) -> None:
+        """Forget a removed checkpoint and drop its chunk references."""
+        self._index.pop(checkpoint.checkpoint_id, None)
+        for digest in checkpoint.chunks:
+            self._chunks.release(digest)
+    
+    # ============ Background maintenance ============
+    
+    def _run_maintenance(self, func: Callable[..., Any], *args: Any) -> None:
+        """Run compression/cleanup inline or on the maintenance thread."""
+        if not self.background_maintenance:
+            func(*args)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="checkpoint-maintenance"
+                )
+            self._pending = [f for f in self._pending if not f.done()]
+            future = self._executor.submit(func, *args)
+            self._pending.append(future)
+        future.add_done_callback(self._log_maintenance_error)
+    
+    @staticmethod
+    def _log_maintenance_error(future: Future) -> None:
+        """Log failures of background maintenance tasks."""
+        error = future.exception()
+        if error is not None:
+            logger.warning("Checkpoint maintenance task failed: %s", error)
+    
+    def flush(self) -> None:
+        """Wait for pending background compression and cleanup."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.exception()
+    
+    def close(self) -> None:
+        """Finish pending maintenance and stop the maintenance thread."""
+        self.flush()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
     
     def _verify_checksum(self, checkpoint: Checkpoint) -> bool:
         """Verify the checksum of a checkpoint."""
@@ -397,14 +746,17 @@ class CheckpointManager:
         Returns:
             True if deleted, False if not found
         """
-        for execution_id, checkpoints in self._checkpoints.items():
-            for i, checkpoint in enumerate(checkpoints):
-                if checkpoint.checkpoint_id == checkpoint_id:
-                    checkpoint.status = CheckpointStatus.DELETED
-                    checkpoints.pop(i)
-                    logger.info("Deleted checkpoint: %s", checkpoint_id)
-                    return True
-        return False
+        with self._lock:
+            checkpoint = self._index.get(checkpoint_id)
+            if checkpoint is None:
+                return False
+            checkpoints = self._checkpoints.get(checkpoint.execution_id, [])
+            if checkpoint in checkpoints:
+                checkpoints.remove(checkpoint)
+            checkpoint.status = CheckpointStatus.DELETED
+            self._release(checkpoint)
+        logger.info("Deleted checkpoint: %s", checkpoint_id)
+        return True
     
     def cleanup_expired_checkpoints(self, max_age_days: int = 7) -> int:
         """
@@ -419,17 +771,19 @@ class CheckpointManager:
         cutoff_time = datetime.utcnow() - timedelta(days=max_age_days)
         removed_count = 0
         
-        for execution_id, checkpoints in list(self._checkpoints.items()):
-            expired = [cp for cp in checkpoints if cp.timestamp < cutoff_time]
-            
-            for checkpoint in expired:
-                checkpoint.status = CheckpointStatus.EXPIRED
-                checkpoints.remove(checkpoint)
-                removed_count += 1
-            
-            # Remove empty execution entries
-            if not checkpoints:
-                del self._checkpoints[execution_id]
+        with self._lock:
+            for execution_id, checkpoints in list(self._checkpoints.items()):
+                expired = [cp for cp in checkpoints if cp.timestamp < cutoff_time]
+                
+                for checkpoint in expired:
+                    checkpoint.status = CheckpointStatus.EXPIRED
+                    checkpoints.remove(checkpoint)
+                    self._release(checkpoint)
+                    removed_count += 1
+                
+                # Remove empty execution entries
+                if not checkpoints:
+                    del self._checkpoints[execution_id]
         
         logger.info(
             "Cleaned up %d expired checkpoints (older than %d days)",
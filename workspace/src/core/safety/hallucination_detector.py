@@ -19,6 +19,8 @@ from typing import Any, Callable, Optional
 import re
 import hashlib
 
+from .pattern_set import PatternSet
+
 
 class HallucinationType(Enum):
     """Types of AI hallucinations (AI 幻覺類型)"""
@@ -113,6 +115,35 @@ class HallucinationDetector:
     研究顯示：約 50% 的 AI 生成代碼審查包含幻覺
     """
     
+    # pattern group -> (severity, description, suggested fix, confidence)
+    _SECURITY_FINDINGS = {
+        "PLAINTEXT_PASSWORD": (
+            SeverityLevel.CRITICAL,
+            "Potential plaintext password storage detected (可能的明文密碼存儲)",
+            "Use bcrypt or argon2 for password hashing",
+            0.85,
+        ),
+        "SQL_INJECTION": (
+            SeverityLevel.CRITICAL,
+            "Potential SQL injection vulnerability (可能的 SQL 注入漏洞)",
+            "Use parameterized queries or ORM",
+            0.80,
+        ),
+        "SENSITIVE_DATA_EXPOSURE": (
+            SeverityLevel.HIGH,
+            "Sensitive data may be exposed in logs (敏感數據可能在日誌中暴露)",
+            "Remove sensitive data from logs or use redaction",
+            0.75,
+        ),
+    }
+
+    # 所有安全模式預編譯為一個帶字面量預過濾的模式集合
+    _SECURITY_PATTERNS = PatternSet(
+        (group, pattern)
+        for group in _SECURITY_FINDINGS
+        for pattern in getattr(SecurityPattern, group)
+    )
+
     def __init__(self) -> None:
         self._detection_history: list[HallucinationDetection] = []
         self._custom_validators: list[Callable[[str], list[HallucinationDetection]]] = []
@@ -194,55 +225,21 @@ class HallucinationDetector:
     def _detect_security_flaws(self, code: str) -> list[HallucinationDetection]:
         """Detect security vulnerabilities (檢測安全漏洞)"""
         detections: list[HallucinationDetection] = []
-        
-        # 檢測明文密碼
-        for pattern in SecurityPattern.PLAINTEXT_PASSWORD:
-            matches = re.finditer(pattern, code, re.IGNORECASE)
-            for match in matches:
-                self._detection_count += 1
-                detections.append(HallucinationDetection(
-                    detection_id=f"SEC-{self._detection_count:06d}",
-                    hallucination_type=HallucinationType.SECURITY_FLAW,
-                    severity=SeverityLevel.CRITICAL,
-                    description="Potential plaintext password storage detected (可能的明文密碼存儲)",
-                    location=f"Line containing: {match.group()[:50]}...",
-                    suggested_fix="Use bcrypt or argon2 for password hashing",
-                    confidence=0.85,
-                    metadata={"pattern": "PLAINTEXT_PASSWORD"},
-                ))
-        
-        # 檢測 SQL 注入
-        for pattern in SecurityPattern.SQL_INJECTION:
-            matches = re.finditer(pattern, code, re.IGNORECASE)
-            for match in matches:
-                self._detection_count += 1
-                detections.append(HallucinationDetection(
-                    detection_id=f"SEC-{self._detection_count:06d}",
-                    hallucination_type=HallucinationType.SECURITY_FLAW,
-                    severity=SeverityLevel.CRITICAL,
-                    description="Potential SQL injection vulnerability (可能的 SQL 注入漏洞)",
-                    location=f"Line containing: {match.group()[:50]}...",
-                    suggested_fix="Use parameterized queries or ORM",
-                    confidence=0.80,
-                    metadata={"pattern": "SQL_INJECTION"},
-                ))
-        
-        # 檢測敏感數據暴露
-        for pattern in SecurityPattern.SENSITIVE_DATA_EXPOSURE:
-            matches = re.finditer(pattern, code, re.IGNORECASE)
-            for match in matches:
-                self._detection_count += 1
-                detections.append(HallucinationDetection(
-                    detection_id=f"SEC-{self._detection_count:06d}",
-                    hallucination_type=HallucinationType.SECURITY_FLAW,
-                    severity=SeverityLevel.HIGH,
-                    description="Sensitive data may be exposed in logs (敏感數據可能在日誌中暴露)",
-                    location=f"Line containing: {match.group()[:50]}...",
-                    suggested_fix="Remove sensitive data from logs or use redaction",
-                    confidence=0.75,
-                    metadata={"pattern": "SENSITIVE_DATA_EXPOSURE"},
-                ))
-        
+
+        for group, match in self._SECURITY_PATTERNS.finditer(code):
+            severity, description, suggested_fix, confidence = self._SECURITY_FINDINGS[group]
+            self._detection_count += 1
+            detections.append(HallucinationDetection(
+                detection_id=f"SEC-{self._detection_count:06d}",
+                hallucination_type=HallucinationType.SECURITY_FLAW,
+                severity=severity,
+                description=description,
+                location=f"Line containing: {match.group()[:50]}...",
+                suggested_fix=suggested_fix,
+                confidence=confidence,
+                metadata={"pattern": group},
+            ))
+
         return detections
     
     def _detect_logic_errors(self, code: str, language: str) -> list[HallucinationDetection]:
@@ -0,0 +1,169 @@
+"""
+Pattern Set (模式集合)
+
+Compiled set of regular expressions scanned with a literal prefilter.
+
+Every pattern is parsed once to find literals that any match must contain
+(e.g. ``eval\\s*\\(|exec\\s*\\(`` needs "eval" or "exec"). A scan first
+checks which of those literals occur in the text using C-level substring
+search, then runs only the patterns whose literals are present. Patterns
+with no extractable literal always run. Results are identical to calling
+``re.search`` / ``re.finditer`` per pattern.
+"""
+
+from typing import Any, Iterable, Iterator, Optional
+import re
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+
+# Non-ASCII characters that IGNORECASE matches against ASCII letters
+_ASCII_CASE_CONFUSABLES = str.maketrans({
+    "İ": "i",  # İ
+    "ı": "i",  # ı
+    "ſ": "s",  # ſ
+    "K": "k",  # Kelvin sign
+})
+
+_REPEATS = tuple(
+    op for op in (
+        sre_parse.MAX_REPEAT,
+        sre_parse.MIN_REPEAT,
+        getattr(sre_parse, "POSSESSIVE_REPEAT", None),
+    )
+    if op is not None
+)
+
+
+def _best(candidates: list[frozenset[str]]) -> Optional[frozenset[str]]:
+    """Pick the most selective requirement (longest shortest literal)"""
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (min(len(s) for s in c), -len(c)))
+
+
+def _required_literals(items: Any) -> Optional[frozenset[str]]:
+    """
+    Literals of which at least one occurs in every match of ``items``
+
+    Returns None when no such guarantee can be derived.
+    """
+    candidates: list[frozenset[str]] = []
+    run: list[str] = []
+
+    def flush() -> None:
+        if run:
+            candidates.append(frozenset(["".join(run)]))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        required = None
+        if op is sre_parse.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            if not add_flags and not del_flags:
+                required = _required_literals(sub)
+        elif op is sre_parse.BRANCH:
+            union: set[str] = set()
+            for branch in av[1]:
+                branch_required = _required_literals(branch)
+                if branch_required is None:
+                    union = set()
+                    break
+                union |= branch_required
+            required = frozenset(union) if union else None
+        elif op in _REPEATS:
+            low, _high, sub = av
+            if low >= 1:
+                required = _required_literals(sub)
+        elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+            required = _required_literals(av)
+        if required:
+            candidates.append(required)
+    flush()
+    return _best(candidates)
+
+
+def extract_literals(pattern: str, flags: int = 0) -> Optional[frozenset[str]]:
+    """Required literals of a pattern, or None if it cannot be prefiltered"""
+    try:
+        return _required_literals(sre_parse.parse(pattern, flags))
+    except Exception:
+        return None
+
+
+def _fold(text: str) -> str:
+    """Case-fold text so ASCII literals can be found as IGNORECASE would match them"""
+    if not text.isascii():
+        text = text.translate(_ASCII_CASE_CONFUSABLES)
+    return text.lower()
+
+
+class PatternSet:
+    """
+    預編譯模式集合
+
+    Holds ``(key, pattern)`` pairs in order. ``search`` and ``finditer``
+    report results in pattern order, so callers keep their original
+    output ordering.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[Any, str]] = (), flags: int = re.IGNORECASE):
+        self.keys: list[Any] = []
+        self.compiled: list[re.Pattern] = []
+        self._always: list[int] = []
+        self._exact: dict[str, list[int]] = {}   # case-sensitive literal -> pattern indexes
+        self._folded: dict[str, list[int]] = {}  # lower-cased literal -> pattern indexes
+
+        for key, pattern in patterns:
+            index = len(self.compiled)
+            compiled = re.compile(pattern, flags)
+            self.keys.append(key)
+            self.compiled.append(compiled)
+
+            ignore_case = bool(compiled.flags & re.IGNORECASE)
+            literals = extract_literals(pattern, compiled.flags)
+            if not literals or (ignore_case and not all(s.isascii() for s in literals)):
+                self._always.append(index)
+                continue
+            table = self._folded if ignore_case else self._exact
+            for literal in literals:
+                table.setdefault(literal.lower() if ignore_case else literal, []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.compiled)
+
+    def candidates(self, text: str) -> list[int]:
+        """Indexes of patterns that may match ``text``, in pattern order"""
+        selected = set(self._always)
+        for literal, indexes in self._exact.items():
+            if literal in text:
+                selected.update(indexes)
+        if self._folded:
+            folded = _fold(text)
+            for literal, indexes in self._folded.items():
+                if literal in folded:
+                    selected.update(indexes)
+        return sorted(selected)
+
+    def search(self, text: str) -> list[tuple[Any, re.Match]]:
+        """First match of every matching pattern, as (key, match)"""
+        results = []
+        for index in self.candidates(text):
+            match = self.compiled[index].search(text)
+            if match is not None:
+                results.append((self.keys[index], match))
+        return results
+
+    def finditer(self, text: str) -> Iterator[tuple[Any, re.Match]]:
+        """All matches of every pattern (grouped by pattern), as (key, match)"""
+        for index in self.candidates(text):
+            key = self.keys[index]
+            for match in self.compiled[index].finditer(text):
+                yield key, match
@@ -0,0 +1,128 @@
+"""
+Streaming Statistics (流式統計)
+
+Constant-memory estimators updated one sample at a time, used by
+MetricWindow to keep per-record anomaly checks O(1).
+
+- EWMA: exponentially weighted moving mean and variance
+- P2Quantile: P² quantile estimator (Jain & Chlamtac, 1985), five markers
+  per tracked quantile, no samples retained
+"""
+
+from typing import List
+import math
+
+
+class EWMA:
+    """Exponentially weighted moving average and variance"""
+
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha: float = 0.1):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("EWMA alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Fold a sample into the running estimates"""
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.variance = (1.0 - self.alpha) * (self.variance + diff * increment)
+        self.count += 1
+
+    @property
+    def std_dev(self) -> float:
+        """Exponentially weighted standard deviation"""
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """
+    P² streaming quantile estimator
+
+    Keeps five marker heights and positions; each sample adjusts them in
+    constant time. Exact for the first five samples.
+    """
+
+    __slots__ = ("q", "count", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, q: float):
+        if not 0.0 < q < 1.0:
+            raise ValueError("Quantile must be in (0, 1)")
+        self.q = q
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1.0 + 2 * q, 1.0 + 4 * q, 3.0 + 2 * q, 5.0]
+        self._increments = [0.0, q / 2, q, (1.0 + q) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        """Fold a sample into the marker estimates"""
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(value)
+            if self.count == 5:
+                heights.sort()
+            return
+
+        positions = self._positions
+        # Find the cell the sample falls into, extending the extremes
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        desired = self._desired
+        increments = self._increments
+        for i in range(5):
+            desired[i] += increments[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            delta = desired[i] - positions[i]
+            if (delta >= 1 and positions[i + 1] - positions[i] > 1) or (
+                delta <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        positions[i + step] - positions[i]
+                    )
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        """Piecewise-parabolic prediction of marker i moved by step"""
+        h = self._heights
+        n = self._positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        """Current quantile estimate (0.0 before any sample)"""
+        if self.count == 0:
+            return 0.0
+        if self.count <= 5:
+            ordered = sorted(self._heights)
+            return ordered[min(len(ordered) - 1, int(round(self.q * (len(ordered) - 1))))]
+        return self._heights[2]
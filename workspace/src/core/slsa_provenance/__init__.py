@@ -13,12 +13,14 @@ Key Components:
 - SignatureVerifier: Verify signatures using Sigstore
 - AttestationManager: Manage build attestations
 - ArtifactVerifier: Verify artifact integrity
+- DigestService: Streaming, cached multi-algorithm digests
 """
 
 from .provenance_generator import ProvenanceGenerator, Provenance, BuildDefinition, SLSALevel
 from .signature_verifier import SignatureVerifier, SignatureResult, VerificationPolicy, SignatureType
 from .attestation_manager import AttestationManager, Attestation, AttestationType
 from .artifact_verifier import ArtifactVerifier, VerificationResult, ArtifactMetadata
+from .digest_service import DigestService, get_digest_service
 
 __all__ = [
     'ProvenanceGenerator',
@@ -35,6 +37,8 @@ __all__ = [
     'ArtifactVerifier',
     'VerificationResult',
     'ArtifactMetadata',
+    'DigestService',
+    'get_digest_service',
 ]
 
 __version__ = '1.0.0'
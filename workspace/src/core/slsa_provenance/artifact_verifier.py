@@ -15,6 +15,8 @@ from enum import Enum
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
+from .digest_service import DigestService, get_digest_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -144,15 +146,18 @@ class ArtifactVerifier:
     
     def __init__(
         self,
-        default_policy: Optional[VerificationPolicy] = None
+        default_policy: Optional[VerificationPolicy] = None,
+        digest_service: Optional[DigestService] = None
     ):
         """
         Initialize the verifier
         
         Args:
             default_policy: Default verification policy
+            digest_service: Digest service (defaults to the shared instance)
         """
         self.default_policy = default_policy or self._create_default_policy()
+        self.digest_service = digest_service or get_digest_service()
         self._verification_cache: Dict[str, VerificationResult] = {}
         
     def verify_artifact(
@@ -181,12 +186,14 @@ class ArtifactVerifier:
         active_policy = policy or self.default_policy
         
         # Get artifact metadata
+        algorithms = self._required_algorithms(expected_digest, active_policy)
         if artifact_path:
-            metadata = self._get_file_metadata(artifact_path)
+            metadata = self._get_file_metadata(artifact_path, algorithms)
         elif artifact_content:
             metadata = self._get_content_metadata(
                 artifact_content,
-                artifact_name or 'unknown'
+                artifact_name or 'unknown',
+                algorithms
             )
         elif expected_digest and artifact_name:
             metadata = ArtifactMetadata(
@@ -252,6 +259,9 @@ class ArtifactVerifier:
         """
         Verify multiple artifacts
         
+        File digests for the whole batch are computed up front in parallel;
+        the per-artifact checks then read them from the digest cache.
+        
         Args:
             artifacts: List of artifact specifications
             policy: Verification policy
@@ -259,6 +269,18 @@ class ArtifactVerifier:
         Returns:
             List of verification results
         """
+        active_policy = policy or self.default_policy
+        
+        # Group paths by the digest algorithms they need
+        pending: Dict[tuple, List[str]] = {}
+        for artifact in artifacts:
+            if artifact.get('path'):
+                algorithms = tuple(self._required_algorithms(artifact.get('digest'), active_policy))
+                pending.setdefault(algorithms, []).append(artifact['path'])
+        for algorithms, paths in pending.items():
+            # Errors are reported by verify_artifact below, in order
+            self.digest_service.digest_files(paths, algorithms, return_exceptions=True)
+            
         results = []
         for artifact in artifacts:
             result = self.verify_artifact(
@@ -403,34 +425,44 @@ class ArtifactVerifier:
             digest_algorithms=['sha256']
         )
         
-    def _get_file_metadata(self, file_path: str) -> ArtifactMetadata:
+    def _required_algorithms(
+        self,
+        expected_digest: Optional[Dict[str, str]],
+        policy: VerificationPolicy
+    ) -> List[str]:
+        """Digest algorithms to compute: sha256, policy requirements and expected digests"""
+        algorithms = ['sha256']
+        for alg in list(policy.digest_algorithms) + list(expected_digest or {}):
+            if alg not in algorithms and alg in hashlib.algorithms_available:
+                algorithms.append(alg)
+        return algorithms
+        
+    def _get_file_metadata(
+        self,
+        file_path: str,
+        algorithms: Optional[List[str]] = None
+    ) -> ArtifactMetadata:
         """Get metadata for a file"""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f'File not found: {file_path}')
             
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            
-        digest = {
-            'sha256': hashlib.sha256(content).hexdigest()
-        }
+        digest = self.digest_service.digest_file(file_path, algorithms)
         
         return ArtifactMetadata(
             name=os.path.basename(file_path),
             digest=digest,
-            size=len(content),
+            size=os.path.getsize(file_path),
             uri=f'file://{os.path.abspath(file_path)}'
         )
         
     def _get_content_metadata(
         self,
         content: bytes,
-        name: str
+        name: str,
+        algorithms: Optional[List[str]] = None
     ) -> ArtifactMetadata:
         """Get metadata for content bytes"""
-        digest = {
-            'sha256': hashlib.sha256(content).hexdigest()
-        }
+        digest = self.digest_service.digest_bytes(content, algorithms)
         
         return ArtifactMetadata(
             name=name,
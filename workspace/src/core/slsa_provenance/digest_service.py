@@ -0,0 +1,240 @@
+"""
+Digest Service - Streaming, multi-algorithm artifact digests
+
+This module provides a shared service for computing artifact digests without
+loading artifacts into memory. Files are hashed in fixed-size chunks with all
+requested algorithms updated in a single pass, batches are spread across a
+thread pool (hashlib releases the GIL while hashing), and results are cached
+by file identity so unchanged artifacts are never re-read.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_CACHE_SIZE = 4096
+
+# (path, size, mtime_ns, ctime_ns, inode, device)
+# ctime is part of the key because, unlike mtime, it cannot be set back from
+# userspace: a file rewritten in place with its mtime restored still misses.
+FileIdentity = Tuple[str, int, int, int, int, int]
+
+
+def _algorithm_names(algorithms: Optional[Iterable[Any]]) -> List[str]:
+    """Normalize algorithm names (accepts strings or DigestAlgorithm members)"""
+    if algorithms is None:
+        return ['sha256']
+    names = []
+    for alg in algorithms:
+        name = getattr(alg, 'value', alg)
+        if name not in names:
+            names.append(name)
+    return names
+
+
+class DigestService:
+    """
+    Computes and caches artifact digests
+    
+    Features:
+    - Chunked hashing with constant memory use
+    - Multiple algorithms computed in one read
+    - Parallel batch hashing on a thread pool
+    - LRU cache keyed by (path, size, mtime, ctime, inode)
+    """
+    
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE
+    ):
+        """
+        Initialize the service
+        
+        Args:
+            chunk_size: Bytes read per chunk
+            max_workers: Threads used for batches (defaults to CPU count)
+            cache_size: Maximum number of cached files (0 disables caching)
+        """
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be positive')
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or min(32, os.cpu_count() or 1)
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[FileIdentity, Dict[str, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'bytes_hashed': 0}
+        
+    def digest_bytes(
+        self,
+        content: bytes,
+        algorithms: Optional[Sequence[Any]] = None
+    ) -> Dict[str, str]:
+        """
+        Compute digest(s) of in-memory content
+        
+        Args:
+            content: Content bytes
+            algorithms: Algorithm names (default: sha256)
+            
+        Returns:
+            Mapping of algorithm name to hex digest
+        """
+        digests = {}
+        for name in _algorithm_names(algorithms):
+            hasher = hashlib.new(name)
+            hasher.update(content)
+            digests[name] = hasher.hexdigest()
+        return digests
+        
+    def digest_file(
+        self,
+        file_path: Union[str, os.PathLike],
+        algorithms: Optional[Sequence[Any]] = None
+    ) -> Dict[str, str]:
+        """
+        Compute digest(s) of a file, reading it once in chunks
+        
+        Algorithms already cached for an unchanged file are not recomputed;
+        only the missing ones are hashed.
+        
+        Args:
+            file_path: Path to the file
+            algorithms: Algorithm names (default: sha256)
+            
+        Returns:
+            Mapping of algorithm name to hex digest
+        """
+        names = _algorithm_names(algorithms)
+        path = os.path.abspath(os.fspath(file_path))
+        identity = self._identity(path, os.stat(path))
+        
+        cached = self._cache_get(identity)
+        missing = [name for name in names if name not in cached]
+        if not missing:
+            with self._lock:
+                self._stats['hits'] += 1
+            return {name: cached[name] for name in names}
+            
+        digests, size = self._hash_file(path, missing)
+        
+        with self._lock:
+            self._stats['misses'] += 1
+            self._stats['bytes_hashed'] += size
+            
+        # Only cache if the file did not change while it was read
+        if self._identity(path, os.stat(path)) == identity:
+            cached = self._cache_put(identity, digests)
+        else:
+            cached = dict(cached, **digests)
+            logger.warning(f'File changed while hashing, not cached: {path}')
+            
+        return {name: cached[name] for name in names}
+        
+    def digest_files(
+        self,
+        file_paths: Sequence[Union[str, os.PathLike]],
+        algorithms: Optional[Sequence[Any]] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[Dict[str, str], Exception]]:
+        """
+        Compute digests of many files in parallel
+        
+        Args:
+            file_paths: Paths to the files
+            algorithms: Algorithm names (default: sha256)
+            return_exceptions: Return errors in place of results instead of raising
+            
+        Returns:
+            Digests in the same order as file_paths
+        """
+        def run(file_path):
+            try:
+                return self.digest_file(file_path, algorithms)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+                
+        if len(file_paths) <= 1 or self.max_workers <= 1:
+            return [run(file_path) for file_path in file_paths]
+            
+        workers = min(self.max_workers, len(file_paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='digest') as executor:
+            return list(executor.map(run, file_paths))
+            
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache and throughput statistics"""
+        with self._lock:
+            return dict(self._stats, cached_files=len(self._cache))
+            
+    def clear_cache(self) -> None:
+        """Clear the digest cache"""
+        with self._lock:
+            self._cache.clear()
+            
+    def _hash_file(self, path: str, names: List[str]) -> Tuple[Dict[str, str], int]:
+        """Hash a file in fixed-size chunks, updating every algorithm per chunk"""
+        hashers = [hashlib.new(name) for name in names]
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        size = 0
+        
+        with open(path, 'rb', buffering=0) as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                chunk = view[:count]
+                for hasher in hashers:
+                    hasher.update(chunk)
+                size += count
+                
+        return {name: hasher.hexdigest() for name, hasher in zip(names, hashers, strict=True)}, size
+        
+    @staticmethod
+    def _identity(path: str, stat: os.stat_result) -> FileIdentity:
+        return (
+            path, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino, stat.st_dev
+        )
+        
+    def _cache_get(self, identity: FileIdentity) -> Dict[str, str]:
+        with self._lock:
+            cached = self._cache.get(identity)
+            if cached is None:
+                return {}
+            self._cache.move_to_end(identity)
+            return dict(cached)
+            
+    def _cache_put(self, identity: FileIdentity, digests: Dict[str, str]) -> Dict[str, str]:
+        with self._lock:
+            merged = dict(self._cache.get(identity, {}), **digests)
+            if self.cache_size <= 0:
+                return merged
+            self._cache[identity] = merged
+            self._cache.move_to_end(identity)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return dict(merged)
+
+
+_default_service: Optional[DigestService] = None
+_default_lock = threading.Lock()
+
+
+def get_digest_service() -> DigestService:
+    """Get the shared DigestService instance"""
+    global _default_service
+    if _default_service is None:
+        with _default_lock:
+            if _default_service is None:
+                _default_service = DigestService()
+    return _default_service
@@ -15,6 +15,8 @@ from enum import Enum
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
+from .digest_service import DigestService, get_digest_service
+
 logger = logging.getLogger(__name__)
 
 # SLSA Provenance constants
@@ -196,7 +198,8 @@ class ProvenanceGenerator:
         self,
         builder_id: str,
         builder_version: Optional[str] = None,
-        default_level: SLSALevel = SLSALevel.L3
+        default_level: SLSALevel = SLSALevel.L3,
+        digest_service: Optional[DigestService] = None
     ):
         """
         Initialize the generator
@@ -205,10 +208,12 @@ class ProvenanceGenerator:
             builder_id: Unique identifier for the build platform
             builder_version: Version of the builder
             default_level: Default SLSA level for generated provenance
+            digest_service: Digest service (defaults to the shared instance)
         """
         self.builder_id = builder_id
         self.builder_version = builder_version
         self.default_level = default_level
+        self.digest_service = digest_service or get_digest_service()
         self._current_build: Optional[Dict[str, Any]] = None
         
     def start_build(
@@ -468,20 +473,10 @@ class ProvenanceGenerator:
         if algorithms is None:
             algorithms = [DigestAlgorithm.SHA256]
             
-        digests = {}
-        
         if not os.path.exists(file_path):
             raise FileNotFoundError(f'File not found: {file_path}')
             
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            
-        for alg in algorithms:
-            hasher = hashlib.new(alg.value)
-            hasher.update(content)
-            digests[alg.value] = hasher.hexdigest()
-            
-        return digests
+        return self.digest_service.digest_file(file_path, algorithms)
         
     def _compute_content_digest(
         self,
@@ -492,14 +487,7 @@ class ProvenanceGenerator:
         if algorithms is None:
             algorithms = [DigestAlgorithm.SHA256]
             
-        digests = {}
-        
-        for alg in algorithms:
-            hasher = hashlib.new(alg.value)
-            hasher.update(content)
-            digests[alg.value] = hasher.hexdigest()
-            
-        return digests
+        return self.digest_service.digest_bytes(content, algorithms)
         
     def _get_level_from_issues(
         self,
@@ -20,7 +20,8 @@ from slsa_provenance import (
     AttestationManager,
     AttestationType,
     ArtifactVerifier,
-    VerificationResult
+    VerificationResult,
+    DigestService
 )
 from slsa_provenance.provenance_generator import SLSALevel, Subject
 
@@ -303,5 +304,99 @@ class TestArtifactVerifier:
         assert summary['total_artifacts'] == 2
 
 
+class TestDigestService:
+    """Tests for DigestService"""
+    
+    @pytest.fixture
+    def service(self):
+        return DigestService(chunk_size=1000, max_workers=4)
+        
+    def test_multiple_algorithms_in_one_pass(self, service, tmp_path):
+        """Test chunked digests match hashlib for every algorithm"""
+        import hashlib
+        
+        for size in (0, 999, 1000, 1001, 4567):
+            content = os.urandom(size)
+            path = tmp_path / f'artifact-{size}.bin'
+            path.write_bytes(content)
+            
+            digests = service.digest_file(str(path), ['sha256', 'sha512'])
+            
+            assert digests == {
+                'sha256': hashlib.sha256(content).hexdigest(),
+                'sha512': hashlib.sha512(content).hexdigest()
+            }
+            
+    def test_cache_reuse_and_invalidation(self, service, tmp_path):
+        """Test unchanged files are served from cache"""
+        import hashlib
+        
+        path = tmp_path / 'layer.tar'
+        path.write_bytes(b'a' * 5000)
+        
+        first = service.digest_file(str(path))
+        assert service.digest_file(str(path)) == first
+        assert service.get_stats()['hits'] == 1
+        
+        # Adding an algorithm only hashes the missing one
+        service.digest_file(str(path), ['sha256', 'sha384'])
+        assert service.get_stats()['bytes_hashed'] == 10000
+        
+        path.write_bytes(b'b' * 4000)
+        assert service.digest_file(str(path))['sha256'] == hashlib.sha256(b'b' * 4000).hexdigest()
+        
+    def test_cache_misses_after_mtime_restored(self, service, tmp_path):
+        """Test same-size rewrites with a restored mtime are rehashed"""
+        import hashlib
+        import time
+        
+        path = tmp_path / 'layer.tar'
+        path.write_bytes(b'a' * 5000)
+        before = os.stat(path)
+        service.digest_file(str(path))
+        
+        # Let the coarse kernel clock tick so the rewrite gets a new ctime
+        time.sleep(0.05)
+        path.write_bytes(b'x' * 5000)
+        os.utime(path, ns=(before.st_atime_ns, before.st_mtime_ns))
+        
+        assert service.digest_file(str(path))['sha256'] == hashlib.sha256(b'x' * 5000).hexdigest()
+        
+    def test_parallel_batch_preserves_order(self, service, tmp_path):
+        """Test batch digests come back in input order"""
+        import hashlib
+        
+        paths = []
+        for i in range(20):
+            path = tmp_path / f'artifact-{i}.bin'
+            path.write_bytes(str(i).encode() * 3000)
+            paths.append(str(path))
+            
+        results = service.digest_files(paths + [str(tmp_path / 'missing')], return_exceptions=True)
+        
+        assert [r['sha256'] for r in results[:-1]] == [
+            hashlib.sha256(str(i).encode() * 3000).hexdigest() for i in range(20)
+        ]
+        assert isinstance(results[-1], FileNotFoundError)
+        
+    def test_verifier_batch_uses_required_algorithms(self, tmp_path):
+        """Test batch verification computes expected digest algorithms"""
+        import hashlib
+        
+        path = tmp_path / 'app.tar'
+        path.write_bytes(b'layer' * 1000)
+        service = DigestService()
+        verifier = ArtifactVerifier(digest_service=service)
+        
+        results = verifier.verify_artifact_batch([
+            {'path': str(path), 'digest': {'sha512': hashlib.sha512(b'layer' * 1000).hexdigest()}},
+            {'path': str(path), 'digest': {'sha512': '0' * 128}}
+        ])
+        
+        assert [r.integrity_status.value for r in results] == ['verified', 'tampered']
+        assert results[0].artifact.size == 5000
+        assert service.get_stats()['misses'] == 1
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for parallel plan execution in AgentOrchestrator
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.engine.agent_orchestration import (
+    AgentOrchestrator,
+    ExecutionPlan,
+    ExecutionStep,
+    OrchestratorConfig,
+    StepStatus,
+)
+
+
+class SleepyExecutor:
+    """Tool executor stand-in that sleeps and tracks concurrency"""
+
+    def __init__(self, delay: float = 0.05, fail: tuple = ()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.running = 0
+        self.peak = 0
+
+    async def execute(self, tool_name, params):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(params.get("delay", self.delay))
+            if tool_name in self.fail:
+                raise RuntimeError(f"{tool_name} failed")
+            return f"{tool_name} ok"
+        finally:
+            self.running -= 1
+
+
+def make_plan(*specs) -> ExecutionPlan:
+    """Build a plan from (step_id, tool_name, dependencies) tuples"""
+    return ExecutionPlan(
+        name="test",
+        steps=[
+            ExecutionStep(step_id=step_id, name=step_id, tool_name=tool, dependencies=deps)
+            for step_id, tool, deps in specs
+        ],
+    )
+
+
+class TestParallelExecution:
+    """Test concurrent execution of ready steps"""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self):
+        orchestrator = AgentOrchestrator(OrchestratorConfig(parallel_execution=True))
+        executor = SleepyExecutor(delay=0.1)
+        plan = make_plan(*[(f"s{i}", f"tool{i}", []) for i in range(5)])
+
+        start = time.perf_counter()
+        outcome = await orchestrator.execute_plan(plan, tool_executor=executor)
+        elapsed = time.perf_counter() - start
+
+        assert outcome["status"] == "completed"
+        assert len(outcome["results"]) == 5
+        assert executor.peak == 5
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_dependency_chain_has_no_polling_delay(self):
+        orchestrator = AgentOrchestrator()
+        executor = SleepyExecutor(delay=0)
+        plan = make_plan(*[
+            (f"s{i}", "tool", [f"s{i-1}"] if i else []) for i in range(10)
+        ])
+
+        start = time.perf_counter()
+        outcome = await orchestrator.execute_plan(plan, tool_executor=executor, parallel=True)
+        elapsed = time.perf_counter() - start
+
+        assert [r["step_id"] for r in outcome["results"]] == [f"s{i}" for i in range(10)]
+        assert elapsed < 0.1
+
+    @pytest.mark.asyncio
+    async def test_per_plan_limit(self):
+        orchestrator = AgentOrchestrator(
+            OrchestratorConfig(parallel_execution=True, max_concurrent_steps_per_plan=2)
+        )
+        executor = SleepyExecutor(delay=0.02)
+        plan = make_plan(*[(f"s{i}", "tool", []) for i in range(6)])
+
+        await orchestrator.execute_plan(plan, tool_executor=executor)
+
+        assert executor.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_global_limit_across_plans(self):
+        orchestrator = AgentOrchestrator(
+            OrchestratorConfig(parallel_execution=True, max_concurrent_steps=3)
+        )
+        executor = SleepyExecutor(delay=0.02)
+        plans = [make_plan(*[(f"s{i}", "tool", []) for i in range(4)]) for _ in range(3)]
+
+        await asyncio.gather(*[
+            orchestrator.execute_plan(plan, tool_executor=executor) for plan in plans
+        ])
+
+        assert executor.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_fail_fast_cancels_and_skips(self):
+        orchestrator = AgentOrchestrator(OrchestratorConfig(parallel_execution=True))
+        executor = SleepyExecutor(delay=0.01, fail=("bad",))
+        plan = make_plan(
+            ("bad", "bad", []),
+            ("slow", "slow", []),
+            ("after_bad", "tool", ["bad"]),
+            ("after_slow", "tool", ["slow"]),
+        )
+        plan.steps[1].params = {"delay": 1.0}
+
+        start = time.perf_counter()
+        outcome = await orchestrator.execute_plan(plan, tool_executor=executor)
+        elapsed = time.perf_counter() - start
+
+        statuses = {s.step_id: s.status for s in plan.steps}
+        assert outcome["status"] == "failed"
+        assert statuses["bad"] == StepStatus.FAILED
+        assert statuses["slow"] == StepStatus.CANCELLED
+        assert statuses["after_bad"] == StepStatus.SKIPPED
+        assert statuses["after_slow"] == StepStatus.SKIPPED
+        assert elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_failure_without_fail_fast_keeps_other_branches(self):
+        orchestrator = AgentOrchestrator(
+            OrchestratorConfig(parallel_execution=True, fail_fast=False)
+        )
+        executor = SleepyExecutor(delay=0.01, fail=("bad",))
+        plan = make_plan(
+            ("bad", "bad", []),
+            ("good", "tool", []),
+            ("after_bad", "tool", ["bad"]),
+            ("after_good", "tool", ["good"]),
+        )
+
+        await orchestrator.execute_plan(plan, tool_executor=executor)
+
+        statuses = {s.step_id: s.status for s in plan.steps}
+        assert statuses["after_bad"] == StepStatus.SKIPPED
+        assert statuses["after_good"] == StepStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_unknown_dependency_is_skipped(self):
+        orchestrator = AgentOrchestrator()
+        plan = make_plan(("a", None, ["missing"]))
+
+        outcome = await orchestrator.execute_plan(plan, parallel=True)
+
+        assert outcome["results"] == []
+        assert plan.steps[0].status == StepStatus.SKIPPED
+
+    def test_orchestrator_reused_across_event_loops(self):
+        orchestrator = AgentOrchestrator(
+            OrchestratorConfig(parallel_execution=True, max_concurrent_steps=1)
+        )
+
+        for _ in range(2):
+            executor = SleepyExecutor(delay=0.01)
+            plan = make_plan(*[(f"s{i}", "tool", []) for i in range(3)])
+            outcome = asyncio.run(orchestrator.execute_plan(plan, tool_executor=executor))
+
+            assert [r["status"] for r in outcome["results"]] == ["completed"] * 3
+            assert executor.peak == 1
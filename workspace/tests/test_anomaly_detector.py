@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Tests for AnomalyDetector sliding-window statistics
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.safety.anomaly_detector import (
+    AnomalyDetector,
+    AnomalyType,
+    DetectionStrategy,
+    MetricWindow,
+)
+from core.safety.streaming_stats import EWMA, P2Quantile
+
+
+class TestMetricWindow:
+    """Running statistics must match a full recomputation"""
+
+    def test_running_stats_match_statistics_module(self):
+        rng = random.Random(7)
+        window = MetricWindow(max_size=50)
+        values = [rng.gauss(100, 15) for _ in range(537)]
+
+        for i, value in enumerate(values):
+            window.add(value)
+            current = values[max(0, i - 49):i + 1]
+            assert window.mean == pytest.approx(statistics.mean(current), rel=1e-9)
+            if len(current) > 1:
+                assert window.std_dev == pytest.approx(statistics.stdev(current), rel=1e-6)
+            assert window.min == min(current)
+            assert window.max == max(current)
+
+        assert len(window.values) == 50
+        assert list(window.values) == values[-50:]
+        assert window.total_count == 537
+
+    def test_empty_and_single_value(self):
+        window = MetricWindow()
+        assert window.mean == 0.0
+        assert window.std_dev == 0.0
+        assert window.min is None
+        window.add(3.0)
+        assert window.mean == 3.0
+        assert window.std_dev == 0.0
+
+    def test_time_range_queries(self):
+        window = MetricWindow(max_size=10)
+        now = datetime.now()
+        for age in (120, 90, 30, 5, 1):
+            window.add(float(age), now - timedelta(seconds=age))
+
+        assert window.count_recent(60) == 3
+        assert window.get_recent(60) == [30.0, 5.0, 1.0]
+        assert window.get_recent(0.5) == []
+        assert window.count_recent(3600) == 5
+
+    def test_time_index_survives_eviction(self):
+        window = MetricWindow(max_size=3)
+        now = datetime.now()
+        for i in range(10):
+            window.add(float(i), now - timedelta(seconds=100 - i * 10))
+
+        assert list(window.values) == [7.0, 8.0, 9.0]
+        assert window.get_recent(25) == [8.0, 9.0]
+
+    def test_out_of_order_timestamps_do_not_break_index(self):
+        window = MetricWindow()
+        now = datetime.now()
+        window.add(1.0, now)
+        window.add(2.0, now - timedelta(hours=1))
+
+        assert window.count_recent(60) == 2
+
+    def test_quantiles(self):
+        rng = random.Random(1)
+        window = MetricWindow(max_size=100, quantiles=(0.5, 0.9))
+        values = [rng.uniform(0, 1000) for _ in range(20000)]
+        for value in values:
+            window.add(value)
+
+        # Sketches cover the whole stream, exact quantiles cover the window
+        assert window.quantile(0.5) == pytest.approx(500, abs=25)
+        assert window.quantile(0.9) == pytest.approx(900, abs=25)
+        assert window.quantile(0.25) == sorted(values[-100:])[25]
+
+    def test_invalid_window_size(self):
+        with pytest.raises(ValueError):
+            MetricWindow(max_size=0)
+
+
+class TestStreamingStats:
+    """EWMA and P² estimators"""
+
+    def test_ewma_tracks_level_shift(self):
+        ewma = EWMA(alpha=0.5)
+        for _ in range(20):
+            ewma.add(10.0)
+        assert ewma.mean == pytest.approx(10.0)
+        assert ewma.std_dev == pytest.approx(0.0)
+        for _ in range(20):
+            ewma.add(20.0)
+        assert ewma.mean == pytest.approx(20.0, abs=1e-3)
+
+    def test_p2_exact_for_small_samples(self):
+        sketch = P2Quantile(0.5)
+        for value in (5.0, 1.0, 3.0):
+            sketch.add(value)
+        assert sketch.value == 3.0
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            EWMA(alpha=0)
+        with pytest.raises(ValueError):
+            P2Quantile(1.0)
+
+
+class TestAnomalyDetection:
+    """Detector behaviour on top of the running window"""
+
+    @pytest.mark.asyncio
+    async def test_statistical_anomaly(self):
+        detector = AnomalyDetector()
+        detector.add_metric("latency", detection_strategy=DetectionStrategy.STATISTICAL)
+        for i in range(50):
+            assert await detector.record("latency", 100.0 + (i % 5)) is None
+
+        alert = await detector.record("latency", 500.0)
+
+        assert alert is not None
+        assert alert.type == AnomalyType.VALUE_ANOMALY
+        assert alert.details["z_score"] > 2
+
+    @pytest.mark.asyncio
+    async def test_rate_anomaly(self):
+        detector = AnomalyDetector()
+        detector.add_metric(
+            "logins", rate_limit=(3, 60), detection_strategy=DetectionStrategy.THRESHOLD
+        )
+        for _ in range(3):
+            assert await detector.record("logins", 1.0) is None
+
+        alert = await detector.record("logins", 1.0)
+
+        assert alert.type == AnomalyType.RATE_ANOMALY
+        assert alert.details["rate_count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_metrics_summary(self):
+        detector = AnomalyDetector()
+        detector.add_metric("cpu", window_size=3, quantiles=(0.5,))
+        for value in (1.0, 9.0, 4.0, 6.0):
+            await detector.record("cpu", value)
+
+        summary = detector.get_metrics_summary()["cpu"]
+
+        assert summary["count"] == 3
+        assert summary["min"] == 4.0
+        assert summary["max"] == 9.0
+        assert summary["latest"] == 6.0
+        assert summary["mean"] == pytest.approx(19 / 3)
+        assert set(summary["quantiles"]) == {0.5}
+
+
+class TestMetricWindowBenchmark:
+    """Per-record cost must not grow with the window size"""
+
+    @staticmethod
+    def _time_adds(window_size: int, samples: int) -> float:
+        window = MetricWindow(max_size=window_size)
+        for i in range(window_size):
+            window.add(float(i))
+        start = time.perf_counter()
+        for i in range(samples):
+            window.add(float(i % 97))
+            mean = window.mean
+            std_dev = window.std_dev
+            window.count_recent(60)
+        elapsed = time.perf_counter() - start
+
+        # The O(1) statistics read on the last record match a full recompute
+        values = list(window.values)
+        assert mean == pytest.approx(statistics.fmean(values))
+        assert std_dev == pytest.approx(statistics.stdev(values))
+        return elapsed / samples
+
+    def test_record_cost_independent_of_window_size(self):
+        small = self._time_adds(100, 20000)
+        large = self._time_adds(100000, 20000)
+
+        print(f"\n  window 100:    {small * 1e6:.2f} us/record")
+        print(f"  window 100000: {large * 1e6:.2f} us/record")
+        assert large < small * 5
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_detector_throughput_10k_metrics(self):
+        num_metrics, samples = 10_000, 1_000
+        detector = AnomalyDetector()
+        names = [f"metric_{i}" for i in range(num_metrics)]
+        for name in names:
+            detector.add_metric(name, std_dev_factor=6.0, window_size=1000)
+
+        rng = random.Random(3)
+        noise = [rng.gauss(0, 1) for _ in range(4096)]
+        start = time.perf_counter()
+        for s in range(samples):
+            for i, name in enumerate(names):
+                await detector.record(name, noise[(s * 31 + i) & 4095])
+        elapsed = time.perf_counter() - start
+
+        per_record = elapsed / (num_metrics * samples)
+        print(f"\n  {num_metrics} metrics x {samples} samples: "
+              f"{elapsed:.1f}s, {per_record * 1e6:.2f} us/record")
+        assert per_record < 100e-6
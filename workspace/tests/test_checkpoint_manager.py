@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tests for delta checkpoints in CheckpointManager
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.safety.checkpoint_manager import CheckpointManager, CheckpointStatus
+
+
+def pipeline_state(records: int = 200, version: int = 0) -> dict:
+    return {
+        "phase": f"phase-{version}",
+        "config": {"retries": 3, "targets": ["a", "b"]},
+        "artifacts": {
+            f"artifact_{i}": {"path": f"/out/{i}.bin", "size": i * 1024, "tags": ["x"] * 5}
+            for i in range(records)
+        },
+        "metrics": {"latency_ms": [1.5, 2.5], "errors": 0},
+    }
+
+
+class TestDeltaCheckpoints:
+    """Chunked, deduplicated checkpoint storage"""
+
+    def test_restore_matches_full_mode(self):
+        state = pipeline_state()
+        state[1] = "int key"
+        full = CheckpointManager()
+        delta = CheckpointManager(delta_mode=True)
+
+        full_state = full.restore_checkpoint(full.create_checkpoint("ex", "p1", state))
+        delta_state = delta.restore_checkpoint(delta.create_checkpoint("ex", "p1", state))
+
+        assert delta_state == full_state
+        assert delta_state["1"] == "int key"
+
+    def test_only_changed_groups_are_stored(self):
+        manager = CheckpointManager(
+            delta_mode=True, compression_enabled=False, delta_chunk_size=512
+        )
+        state = pipeline_state()
+        first = manager.create_checkpoint("ex", "p1", state)
+        total_chunks = manager._find_checkpoint_by_id(first).metadata["delta"]["chunks"]
+        assert total_chunks > 10
+
+        # Small top-level values share one group
+        state["metrics"]["errors"] = 1
+        state["phase"] = "phase-2"
+        second = manager.create_checkpoint("ex", "p2", state)
+        assert manager._find_checkpoint_by_id(second).metadata["delta"]["new_chunks"] == 1
+
+        # One artifact changed: only its group is new
+        state["artifacts"]["artifact_7"]["size"] = -1
+        third = manager.create_checkpoint("ex", "p3", state)
+        delta = manager._find_checkpoint_by_id(third).metadata["delta"]
+        assert delta["new_chunks"] == 1
+        assert delta["chunks"] == total_chunks
+
+        assert manager.restore_checkpoint(first)["metrics"]["errors"] == 0
+        assert manager.restore_checkpoint(second)["metrics"]["errors"] == 1
+        assert manager.restore_checkpoint(third) == state
+
+    def test_inserted_key_only_disturbs_nearby_groups(self):
+        manager = CheckpointManager(
+            delta_mode=True, compression_enabled=False, delta_chunk_size=256
+        )
+        state = {f"key_{i:04d}": "x" * 40 for i in range(1000)}
+        manager.create_checkpoint("ex", "p1", state)
+
+        state["key_0500a"] = "inserted"
+        checkpoint_id = manager.create_checkpoint("ex", "p2", state)
+
+        delta = manager._find_checkpoint_by_id(checkpoint_id).metadata["delta"]
+        assert delta["new_chunks"] <= 2
+        assert manager.restore_checkpoint(checkpoint_id) == state
+
+    def test_restored_state_is_independent(self):
+        manager = CheckpointManager(delta_mode=True)
+        checkpoint_id = manager.create_checkpoint("ex", "p1", {"items": [1, 2]})
+
+        restored = manager.restore_checkpoint(checkpoint_id)
+        restored["items"].append(3)
+
+        assert manager.restore_checkpoint(checkpoint_id) == {"items": [1, 2]}
+
+    def test_compressed_chunks_restore(self):
+        manager = CheckpointManager(delta_mode=True, compression_enabled=True)
+        state = pipeline_state(records=500)
+        checkpoint_id = manager.create_checkpoint("ex", "p1", state)
+
+        checkpoint = manager._find_checkpoint_by_id(checkpoint_id)
+        assert checkpoint.status == CheckpointStatus.COMPRESSED
+        assert checkpoint.compressed_size < checkpoint.original_size
+        assert manager._chunks.get_stats()["compressed_chunks"] > 0
+        assert manager.restore_checkpoint(checkpoint_id) == state
+
+    def test_cleanup_releases_unreferenced_chunks(self):
+        manager = CheckpointManager(delta_mode=True, retention_count=2, delta_chunk_size=1)
+        for version in range(5):
+            manager.create_checkpoint("ex", f"p{version}", {"v": version, "shared": "same"})
+
+        assert len(manager.list_checkpoints("ex")) == 2
+        # One member per chunk: two distinct "v" chunks plus the shared one
+        assert len(manager._chunks) == 3
+
+        for checkpoint in manager.list_checkpoints("ex"):
+            manager.delete_checkpoint(checkpoint.checkpoint_id)
+        assert len(manager._chunks) == 0
+
+    def test_corrupt_chunk_detected(self):
+        manager = CheckpointManager(delta_mode=True, compression_enabled=False)
+        checkpoint_id = manager.create_checkpoint("ex", "p1", {"value": "original"})
+        digest = manager._find_checkpoint_by_id(checkpoint_id).chunks[0]
+        manager._chunks._chunks[digest][0] = b'"tampered"'
+
+        with pytest.raises(ValueError):
+            manager.restore_checkpoint(checkpoint_id)
+
+    def test_unique_ids_within_same_millisecond(self):
+        manager = CheckpointManager(delta_mode=True, auto_cleanup=False)
+        ids = {manager.create_checkpoint("ex", "p", {"i": i}) for i in range(20)}
+        assert len(ids) == 20
+
+
+class TestBackgroundMaintenance:
+    """Compression and cleanup run off the caller's path"""
+
+    def test_flush_completes_pending_work(self):
+        manager = CheckpointManager(
+            delta_mode=True, retention_count=3, background_maintenance=True
+        )
+        ids = [
+            manager.create_checkpoint("ex", f"p{i}", pipeline_state(50, i)) for i in range(6)
+        ]
+        manager.flush()
+
+        assert len(manager.list_checkpoints("ex")) == 3
+        assert all(
+            cp.status == CheckpointStatus.COMPRESSED for cp in manager.list_checkpoints("ex")
+        )
+        assert manager.restore_checkpoint(ids[-1]) == pipeline_state(50, 5)
+        manager.close()
+
+    def test_full_mode_background_cleanup(self):
+        manager = CheckpointManager(retention_count=1, background_maintenance=True)
+        for i in range(3):
+            manager.create_checkpoint("ex", f"p{i}", {"i": i})
+        manager.close()
+
+        assert len(manager.list_checkpoints("ex")) == 1
+
+
+class TestCheckpointBenchmark:
+    """Phase transitions with a large, mostly unchanged state"""
+
+    @staticmethod
+    def _time_transitions(manager: CheckpointManager, state: dict, phases: int) -> float:
+        manager.create_checkpoint("ex", "p0", state)
+        start = time.perf_counter()
+        for phase in range(1, phases + 1):
+            state["metrics"]["errors"] = phase
+            manager.create_checkpoint("ex", f"p{phase}", state)
+        return (time.perf_counter() - start) / phases
+
+    def test_delta_faster_than_full_copy(self):
+        state = pipeline_state(records=20000)
+        full = CheckpointManager()
+        delta = CheckpointManager(delta_mode=True, background_maintenance=True)
+
+        full_time = self._time_transitions(full, state, 3)
+        delta_time = self._time_transitions(delta, state, 3)
+        delta.close()
+
+        print(f"\n  full copy: {full_time * 1e3:.1f} ms/checkpoint")
+        print(f"  delta:     {delta_time * 1e3:.1f} ms/checkpoint")
+        assert delta_time < full_time
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for DAGEngine ready-queue scheduling
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.engine.dag_engine import DAGEngine, DAGNode, NodeStatus
+
+
+def make_task(value, delay: float = 0.0):
+    """Helper to build an async task returning value after delay"""
+    async def task():
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+    return task
+
+
+class TestTopologicalSort:
+    """Test level grouping and cycle detection"""
+
+    def test_levels_follow_dependencies(self):
+        engine = DAGEngine()
+        engine.add_node(DAGNode("a", make_task("a")))
+        engine.add_node(DAGNode("b", make_task("b"), dependencies=["a"]))
+        engine.add_node(DAGNode("c", make_task("c"), dependencies=["a"]))
+        engine.add_node(DAGNode("d", make_task("d"), dependencies=["b", "c"]))
+
+        levels = engine.topological_sort()
+
+        assert levels[0] == ["a"]
+        assert sorted(levels[1]) == ["b", "c"]
+        assert levels[2] == ["d"]
+
+    def test_cycle_detected(self):
+        engine = DAGEngine()
+        engine.add_node(DAGNode("a", make_task("a"), dependencies=["b"]))
+        engine.add_node(DAGNode("b", make_task("b"), dependencies=["a"]))
+
+        with pytest.raises(ValueError):
+            engine.topological_sort()
+
+    def test_large_chain_is_linear(self):
+        """A 5k-deep chain must not hit recursion limits or quadratic cost"""
+        engine = DAGEngine()
+        engine.add_node(DAGNode("n0", make_task(0)))
+        for i in range(1, 5000):
+            engine.add_node(DAGNode(f"n{i}", make_task(i), dependencies=[f"n{i-1}"]))
+
+        start = time.perf_counter()
+        levels = engine.topological_sort()
+        elapsed = time.perf_counter() - start
+
+        assert len(levels) == 5000
+        assert elapsed < 1.0
+
+
+class TestReadyQueueExecution:
+    """Test dispatch of nodes as soon as dependencies finish"""
+
+    @pytest.mark.asyncio
+    async def test_straggler_does_not_block_independent_branch(self):
+        engine = DAGEngine()
+        engine.add_node(DAGNode("slow", make_task("slow", delay=0.3)))
+        engine.add_node(DAGNode("fast", make_task("fast")))
+        engine.add_node(DAGNode("after_fast", make_task("after_fast"), dependencies=["fast"]))
+
+        finished = {}
+
+        async def watch():
+            while engine.nodes["after_fast"].status != NodeStatus.COMPLETED:
+                await asyncio.sleep(0.01)
+            finished["after_fast_done_while_slow_running"] = (
+                engine.nodes["slow"].status == NodeStatus.RUNNING
+            )
+
+        results, _ = await asyncio.gather(engine.execute(), watch())
+
+        assert results == {"slow": "slow", "fast": "fast", "after_fast": "after_fast"}
+        assert finished["after_fast_done_while_slow_running"]
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_transitive_dependents(self):
+        async def boom():
+            raise RuntimeError("boom")
+
+        engine = DAGEngine()
+        engine.add_node(DAGNode("a", boom))
+        engine.add_node(DAGNode("b", make_task("b"), dependencies=["a"]))
+        engine.add_node(DAGNode("c", make_task("c"), dependencies=["b"]))
+        engine.add_node(DAGNode("d", make_task("d")))
+
+        results = await engine.execute()
+
+        assert isinstance(results["a"], RuntimeError)
+        assert results["d"] == "d"
+        assert engine.nodes["b"].status == NodeStatus.SKIPPED
+        assert engine.nodes["c"].status == NodeStatus.SKIPPED
+
+    @pytest.mark.asyncio
+    async def test_missing_dependency_skips_node(self):
+        engine = DAGEngine()
+        engine.add_node(DAGNode("a", make_task("a"), dependencies=["ghost"]))
+
+        results = await engine.execute()
+
+        assert results == {}
+        assert engine.nodes["a"].status == NodeStatus.SKIPPED
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self):
+        running = 0
+        peak = 0
+
+        async def tracked():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        engine = DAGEngine(max_concurrency=3)
+        for i in range(12):
+            engine.add_node(DAGNode(f"n{i}", tracked))
+
+        await engine.execute()
+
+        assert peak == 3
+        assert all(n.status == NodeStatus.COMPLETED for n in engine.nodes.values())
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            DAGEngine(max_concurrency=0)
+
+    @pytest.mark.asyncio
+    async def test_add_node_while_running(self):
+        engine = DAGEngine()
+
+        async def spawner():
+            engine.add_node(DAGNode("child", make_task("child"), dependencies=["root"]))
+            engine.add_node(DAGNode("sibling", make_task("sibling")))
+            return "root"
+
+        engine.add_node(DAGNode("root", spawner))
+
+        results = await engine.execute()
+
+        assert results == {"root": "root", "sibling": "sibling", "child": "child"}
+        assert engine.nodes["child"].status == NodeStatus.COMPLETED
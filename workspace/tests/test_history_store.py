@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded, indexed execution history store
+"""
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.engine.action_executor import ActionExecutor
+from core.engine.function_calling import (
+    FunctionCallHandler,
+    FunctionCallStatus,
+    FunctionDefinition,
+)
+from core.engine.history_store import BoundedHistory
+from core.engine.tool_system import Tool, ToolCategory, ToolExecutor, ToolStatus
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclass
+class Item:
+    n: int
+    status: str
+    color: Color
+
+
+def make_history(capacity: int = 5, **kwargs) -> BoundedHistory:
+    return BoundedHistory(
+        capacity=capacity,
+        status_of=lambda i: i.status,
+        kind_of=lambda i: i.color,
+        **kwargs,
+    )
+
+
+class TestBoundedHistory:
+    """Ring buffer behaviour and indexes"""
+
+    def test_capacity_is_bounded(self):
+        history = make_history(capacity=5)
+        for n in range(12):
+            history.append(Item(n, "ok", Color.RED))
+
+        assert len(history) == 5
+        assert history.evicted == 7
+        assert [i.n for i in history] == [7, 8, 9, 10, 11]
+        assert [i.n for i in history.recent(2)] == [10, 11]
+        assert [i.n for i in history.recent(100)] == [7, 8, 9, 10, 11]
+        assert history.recent(0) == []
+        assert [i.n for i in history.recent()] == [7, 8, 9, 10, 11]
+
+    def test_query_by_status_and_kind(self):
+        history = make_history(capacity=6)
+        for n in range(10):
+            history.append(Item(n, "ok" if n % 2 else "err", Color.RED if n % 3 else Color.BLUE))
+
+        assert [i.n for i in history.query(status="err")] == [4, 6, 8]
+        assert [i.n for i in history.query(kind=Color.BLUE)] == [6, 9]
+        assert [i.n for i in history.query(status="ok", kind=Color.RED)] == [5, 7]
+        assert [i.n for i in history.query(status="ok", limit=1)] == [9]
+        assert history.query(status="missing") == []
+        assert history.count_by_status() == {"err": 3, "ok": 3}
+
+    def test_query_limit_zero(self):
+        history = make_history(capacity=4)
+        for n in range(3):
+            history.append(Item(n, "ok", Color.RED))
+
+        assert history.query(limit=0) == []
+        assert history.query(status="ok", limit=0) == []
+        assert history.query(kind=Color.RED, limit=-1) == []
+
+    def test_query_by_time_range(self):
+        history = make_history(capacity=10)
+        history.append(Item(0, "ok", Color.RED))
+        middle = datetime.now() + timedelta(milliseconds=1)
+        while datetime.now() <= middle:
+            pass
+        history.append(Item(1, "ok", Color.RED))
+
+        assert [i.n for i in history.query(since=middle)] == [1]
+        assert [i.n for i in history.query(until=middle)] == [0]
+        assert [i.n for i in history.query(status="ok", since=middle)] == [1]
+
+    def test_spill_to_disk(self, tmp_path):
+        spill = tmp_path / "history.jsonl"
+        history = make_history(capacity=2, spill_path=spill)
+        for n in range(5):
+            history.append(Item(n, "ok", Color.BLUE))
+
+        spilled = list(history.read_spilled())
+        history.close()
+
+        assert [r["item"]["n"] for r in spilled] == [0, 1, 2]
+        assert spilled[0]["kind"] == "blue"
+        assert spilled[0]["item"]["color"] == "blue"
+
+    def test_clear(self):
+        history = make_history(capacity=3)
+        for n in range(4):
+            history.append(Item(n, "ok", Color.RED))
+        history.clear()
+        history.append(Item(9, "ok", Color.RED))
+
+        assert [i.n for i in history] == [9]
+        assert [i.n for i in history.query(status="ok")] == [9]
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            BoundedHistory(capacity=0)
+
+
+class TestComponentHistories:
+    """Engine components keep bounded histories"""
+
+    @pytest.mark.asyncio
+    async def test_function_call_handler(self):
+        handler = FunctionCallHandler(history=BoundedHistory(
+            capacity=3, status_of=lambda r: r.status, kind_of=lambda r: r.function_name
+        ))
+        handler.register(FunctionDefinition(name="echo", description=""), lambda **kw: kw)
+        for _ in range(4):
+            await handler.handle_call("echo", {})
+        await handler.handle_call("missing", {})
+
+        assert len(handler.get_history()) == 3
+        assert len(handler.query_history(status=FunctionCallStatus.INVALID)) == 1
+        assert len(handler.query_history(function_name="echo")) == 2
+
+    @pytest.mark.asyncio
+    async def test_tool_executor(self):
+        executor = ToolExecutor()
+        executor.registry.register(Tool(
+            name="noop", description="", category=ToolCategory.CODE,
+            execute_fn=lambda params: "done",
+        ))
+        await executor.execute("noop", {})
+        await executor.execute("noop", {})
+
+        assert len(executor.get_history(limit=1)) == 1
+        assert len(executor.query_history(tool_name="noop")) == 2
+        assert executor.query_history(status=ToolStatus.FAILURE) == []
+        executor.clear_history()
+        assert executor.get_history() == []
+
+    @pytest.mark.asyncio
+    async def test_action_executor(self):
+        executor = ActionExecutor()
+
+        def fail(params, completed):
+            raise RuntimeError("boom")
+
+        executor.register_handler("fail", fail)
+        await executor.execute_plan(executor.create_plan("ok", [{"name": "noop"}]))
+        await executor.execute_plan(executor.create_plan("bad", [{"name": "fail", "max_retries": 0}]))
+
+        assert [p.name for p in executor.query_history(status="failed")] == ["bad"]
+        assert [p.name for p in executor.query_history(status="completed")] == ["ok"]
+        assert executor.query_history(limit=0) == []
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental KnowledgeEngine indexing and the embedding cache
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.island_ai_runtime.embedding_cache import EmbeddingCache, content_hash
+from core.island_ai_runtime.knowledge_engine import EmbeddingProvider, KnowledgeEngine
+
+
+class CountingProvider(EmbeddingProvider):
+    """Records every batched embedding request"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests: list[int] = []
+
+    async def _embed_request(self, texts):
+        self.requests.append(len(texts))
+        return await super()._embed_request(texts)
+
+
+def make_engine(**config) -> KnowledgeEngine:
+    engine = KnowledgeEngine({"vector_store": "memory", **config})
+    engine.embedding_provider = CountingProvider(
+        batch_size=config.get("embedding_batch_size", 64)
+    )
+    return engine
+
+
+def repo(n: int) -> dict[str, str]:
+    return {f"src/mod_{i}.py": f"def f{i}(): return {i}" for i in range(n)}
+
+
+class TestEmbeddingProvider:
+    """Batched, concurrent embedding"""
+
+    @pytest.mark.asyncio
+    async def test_embed_batch_chunks_and_preserves_order(self):
+        provider = CountingProvider(batch_size=3, max_concurrency=2)
+        texts = [f"text {i}" for i in range(8)]
+
+        vectors = await provider.embed_batch(texts)
+
+        assert provider.requests == [3, 3, 2]
+        assert vectors == [await provider.embed(t) for t in texts]
+        assert await provider.embed_batch([]) == []
+
+
+class TestIncrementalIndexing:
+    """Unchanged files are skipped; embeddings are reused"""
+
+    @pytest.mark.asyncio
+    async def test_reindex_skips_unchanged_files(self):
+        engine = make_engine(embedding_batch_size=4)
+        files = repo(10)
+
+        first = await engine.index_files(files)
+        assert first["indexed"] == 10
+        assert engine.embedding_provider.requests == [4, 4, 2]
+
+        files["src/mod_3.py"] = "def f3(): return 'changed'"
+        second = await engine.index_files(files)
+
+        assert second == {
+            "indexed": 1, "unchanged": 9, "embedded": 1, "cache_hits": 0, "removed": 0
+        }
+        assert engine.embedding_provider.requests[-1] == 1
+        node = engine.repo_graph.get_node(engine._generate_id("src/mod_3.py"))
+        assert node.metadata["content_hash"] == content_hash(files["src/mod_3.py"])
+
+    @pytest.mark.asyncio
+    async def test_index_file_returns_whether_updated(self):
+        engine = make_engine()
+        assert await engine.index_file("a.py", "x = 1") is True
+        assert await engine.index_file("a.py", "x = 1") is False
+        assert await engine.index_file("a.py", "x = 2") is True
+
+    @pytest.mark.asyncio
+    async def test_identical_content_embedded_once(self):
+        engine = make_engine()
+        stats = await engine.index_files({"a/__init__.py": "", "b/__init__.py": ""})
+
+        assert stats["indexed"] == 2
+        assert stats["embedded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reverting_content_hits_cache(self):
+        engine = make_engine()
+        await engine.index_file("a.py", "v1")
+        await engine.index_file("a.py", "v2")
+        stats = await engine.index_files({"a.py": "v1"})
+
+        assert stats["embedded"] == 0
+        assert stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_prune_removes_deleted_files(self):
+        engine = make_engine()
+        files = repo(3)
+        await engine.index_files(files)
+        del files["src/mod_0.py"]
+
+        stats = await engine.index_files(files, prune=True)
+        results = await engine.search("def f0(): return 0", top_k=5)
+
+        assert stats["removed"] == 1
+        assert "src/mod_0.py" not in {r.node.path for r in results}
+        assert engine.repo_graph.get_node(engine._generate_id("src/mod_0.py")) is None
+
+
+class TestEmbeddingCache:
+    """Persistent cache keyed by model and content hash"""
+
+    @pytest.mark.asyncio
+    async def test_cache_survives_restart(self, tmp_path):
+        cache_path = tmp_path / "embeddings.jsonl"
+        files = repo(5)
+
+        first = make_engine(embedding_cache_path=str(cache_path))
+        await first.index_files(files)
+
+        second = make_engine(embedding_cache_path=str(cache_path))
+        stats = await second.index_files(files)
+
+        assert stats["indexed"] == 5
+        assert stats["embedded"] == 0
+        assert stats["cache_hits"] == 5
+        assert second.embedding_provider.requests == []
+
+    def test_cache_is_keyed_by_model(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "cache.jsonl")
+        cache.put("model-a", "h1", [1.0])
+        cache.flush()
+
+        reloaded = EmbeddingCache(tmp_path / "cache.jsonl")
+        assert reloaded.get("model-a", "h1") == [1.0]
+        assert reloaded.get("model-b", "h1") is None
+        assert reloaded.get_stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    def test_corrupt_lines_are_skipped(self, tmp_path):
+        path = tmp_path / "cache.jsonl"
+        path.write_text('{"model": "m", "hash": "h", "vector": [0.5]}\n{"trunc', encoding="utf-8")
+
+        assert EmbeddingCache(path).get("m", "h") == [0.5]
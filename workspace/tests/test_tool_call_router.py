@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled ToolCallRouter routing table
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from core.engine.function_calling import RoutingRule, ToolCallRouter
+
+
+def build_router(compiled: bool = True) -> ToolCallRouter:
+    """Router with a mix of indexed and conditional rules"""
+    router = ToolCallRouter(compiled=compiled)
+    for executor_id in ("db", "api", "admin", "tagged", "default"):
+        router.register_executor(executor_id, lambda t, p, e=executor_id: e)
+    router.set_default_executor("default")
+
+    router.add_rule(RoutingRule(name="db", executor_id="db", tool_prefix="db_", priority=10))
+    router.add_rule(RoutingRule(
+        name="api", executor_id="api", tool_names=["fetch", "post"], priority=10
+    ))
+    router.add_rule(RoutingRule(
+        name="admin",
+        condition=lambda name, params: params.get("role") == "admin",
+        executor_id="admin",
+        priority=50,
+    ))
+    router.add_rule(RoutingRule(name="tagged", executor_id="tagged", tag="heavy", priority=5))
+    router.set_tool_tags("crunch", ["heavy"])
+    return router
+
+
+CASES = [
+    ("db_query", {}, "db"),
+    ("db_query", {"role": "admin"}, "admin"),
+    ("fetch", {}, "api"),
+    ("crunch", {}, "tagged"),
+    ("other", {}, "default"),
+]
+
+
+class TestCompiledRouting:
+    """Compiled routing must agree with the linear scan"""
+
+    @pytest.mark.parametrize("compiled", [True, False])
+    @pytest.mark.parametrize("tool_name,params,expected", CASES)
+    def test_route(self, compiled, tool_name, params, expected):
+        router = build_router(compiled)
+        assert router.route(tool_name, params)(tool_name, params) == expected
+
+    def test_legacy_positional_rule(self):
+        router = ToolCallRouter()
+        router.register_executor("db_exec", lambda t, p: "db_result")
+        router.add_rule(RoutingRule("db_rule", lambda tool, params: "database" in tool, "db_exec", 1))
+
+        assert router.route("database_query", {}) is not None
+        assert router.route("other", {}) is None
+
+    def test_rule_requires_executor(self):
+        with pytest.raises(ValueError):
+            RoutingRule(name="broken", tool_prefix="x")
+
+    def test_cache_invalidated_on_rule_changes(self):
+        router = build_router()
+        assert router.route("db_query", {})("db_query", {}) == "db"
+
+        router.remove_rule("db")
+        assert router.route("db_query", {})("db_query", {}) == "default"
+
+        router.add_rule(RoutingRule(name="db2", executor_id="api", tool_prefix="db", priority=1))
+        assert router.route("db_query", {})("db_query", {}) == "api"
+
+    def test_cache_invalidated_on_executor_changes(self):
+        router = build_router()
+        assert router.route("fetch", {})("fetch", {}) == "api"
+
+        router.unregister_executor("api")
+        assert router.route("fetch", {})("fetch", {}) == "default"
+
+        router.register_executor("api", lambda t, p: "api-v2")
+        assert router.route("fetch", {})("fetch", {}) == "api-v2"
+
+    def test_condition_combined_with_prefix(self):
+        router = ToolCallRouter()
+        router.register_executor("ro", lambda t, p: "ro")
+        router.register_executor("rw", lambda t, p: "rw")
+        router.add_rule(RoutingRule(
+            name="readonly",
+            condition=lambda name, params: params.get("readonly", False),
+            executor_id="ro",
+            tool_prefix="db_",
+            priority=10,
+        ))
+        router.add_rule(RoutingRule(name="db", executor_id="rw", tool_prefix="db_"))
+
+        assert router.route("db_query", {"readonly": True})("", {}) == "ro"
+        assert router.route("db_query", {})("", {}) == "rw"
+        assert router.route("api_call", {"readonly": True}) is None
+
+    @pytest.mark.asyncio
+    async def test_execute_sync_and_async_executors(self):
+        class AsyncExecutor:
+            async def execute(self, tool_name, params):
+                return f"async:{tool_name}"
+
+        router = ToolCallRouter()
+        router.register_executor("async", AsyncExecutor())
+        router.register_executor("sync", lambda t, p: f"sync:{t}")
+        router.add_rule(RoutingRule(name="a", executor_id="async", tool_prefix="a_"))
+        router.set_default_executor("sync")
+
+        assert await router.execute("a_tool", {}) == "async:a_tool"
+        assert await router.execute("b_tool", {}) == "sync:b_tool"
+
+    @pytest.mark.asyncio
+    async def test_execute_without_route(self):
+        router = ToolCallRouter()
+        with pytest.raises(ValueError):
+            await router.execute("anything", {})
+
+
+class TestRoutingLatencyBenchmark:
+    """Routing latency: compiled index vs linear scan"""
+
+    @staticmethod
+    def _populate(router: ToolCallRouter, num_rules: int) -> None:
+        router.register_executor("default", lambda t, p: None)
+        router.set_default_executor("default")
+        for i in range(num_rules):
+            router.register_executor(f"exec_{i}", lambda t, p: None)
+            router.add_rule(RoutingRule(
+                name=f"prefix_{i}",
+                condition=None,
+                executor_id=f"exec_{i}",
+                tool_prefix=f"svc{i}_",
+                priority=i % 10,
+            ))
+
+    @staticmethod
+    def _time_routes(router: ToolCallRouter, calls) -> float:
+        start = time.perf_counter()
+        for tool_name in calls:
+            router.route(tool_name, {})
+        return time.perf_counter() - start
+
+    def test_compiled_routing_faster_than_linear(self):
+        num_rules = 300
+        calls = [f"svc{i % num_rules}_op" for i in range(20000)]
+
+        linear = ToolCallRouter(compiled=False)
+        compiled = ToolCallRouter(compiled=True)
+        self._populate(linear, num_rules)
+        self._populate(compiled, num_rules)
+
+        linear_time = self._time_routes(linear, calls)
+        compiled_time = self._time_routes(compiled, calls)
+
+        print(f"\n  linear:   {linear_time * 1e6 / len(calls):.2f} us/route")
+        print(f"  compiled: {compiled_time * 1e6 / len(calls):.2f} us/route")
+        assert compiled_time < linear_time
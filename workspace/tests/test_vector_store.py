@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the NumPy-backed MatrixVectorStore
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.island_ai_runtime.knowledge_engine import KnowledgeEngine, VectorStore
+from core.island_ai_runtime.vector_store import MatrixVectorStore
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(42)
+    return rng.standard_normal((500, 32)).astype(np.float32)
+
+
+def fill(store, vectors):
+    for i, vector in enumerate(vectors):
+        store.upsert(f"v{i}", vector.tolist(), {"n": i})
+
+
+class TestMatrixVectorStore:
+    """Search results must match the pure-Python store"""
+
+    def test_matches_pure_python_store(self, vectors):
+        matrix, pure = MatrixVectorStore(), VectorStore()
+        fill(matrix, vectors)
+        fill(pure, vectors)
+        query = vectors[7] + 0.1
+
+        got = matrix.search(query.tolist(), top_k=10)
+        expected = pure.search(query.tolist(), top_k=10)
+
+        assert [i for i, _ in got] == [i for i, _ in expected]
+        assert got[0][1] == pytest.approx(expected[0][1], abs=1e-5)
+
+    def test_batch_search(self, vectors):
+        store = MatrixVectorStore()
+        store.upsert_batch([f"v{i}" for i in range(len(vectors))], vectors)
+
+        results = store.search_batch(vectors[:3], top_k=2)
+
+        assert [hits[0][0] for hits in results] == ["v0", "v1", "v2"]
+        assert all(hits[0][1] == pytest.approx(1.0, abs=1e-5) for hits in results)
+
+    def test_upsert_overwrites(self, vectors):
+        store = MatrixVectorStore()
+        fill(store, vectors[:10])
+        store.upsert("v0", vectors[5].tolist(), {"replaced": True})
+
+        assert len(store) == 10
+        assert {i for i, _ in store.search(vectors[5].tolist(), top_k=2)} == {"v0", "v5"}
+        assert store.metadata["v0"] == {"replaced": True}
+
+    def test_delete_and_compaction(self, vectors):
+        store = MatrixVectorStore(compaction_threshold=0.5)
+        fill(store, vectors[:100])
+        for i in range(40):
+            store.delete(f"v{i}")
+
+        assert len(store) == 60
+        assert store._deleted == 40
+        assert all(int(i[1:]) >= 40 for i, _ in store.search(vectors[0].tolist(), top_k=60))
+
+        for i in range(40, 60):
+            store.delete(f"v{i}")
+        # Compaction ran once the tombstone ratio crossed the threshold
+        assert len(store) == 40
+        assert store._size < 100
+        assert store.search(vectors[70].tolist(), top_k=1)[0][0] == "v70"
+
+    def test_top_k_larger_than_store(self, vectors):
+        store = MatrixVectorStore()
+        fill(store, vectors[:3])
+        assert len(store.search(vectors[0].tolist(), top_k=10)) == 3
+        assert MatrixVectorStore(dimension=32).search(vectors[0].tolist()) == []
+
+    def test_dimension_mismatch(self, vectors):
+        store = MatrixVectorStore(dimension=32)
+        with pytest.raises(ValueError):
+            store.upsert("bad", [1.0, 2.0])
+
+    def test_save_and_mmap_load(self, vectors, tmp_path):
+        store = MatrixVectorStore()
+        fill(store, vectors[:50])
+        store.delete("v3")
+        store.save(tmp_path / "index")
+
+        loaded = MatrixVectorStore.load(tmp_path / "index", mmap=True)
+
+        assert len(loaded) == 49
+        assert "v3" not in loaded
+        assert loaded.metadata["v10"] == {"n": 10}
+        assert loaded.search(vectors[10].tolist(), top_k=1)[0][0] == "v10"
+
+        # Writes after an mmap load copy the matrix instead of failing
+        loaded.upsert("new", vectors[60].tolist())
+        assert loaded.search(vectors[60].tolist(), top_k=1)[0][0] == "new"
+
+
+class TestKnowledgeEngineBackend:
+    """KnowledgeEngine uses the matrix store by default"""
+
+    @pytest.mark.asyncio
+    async def test_search_through_engine(self):
+        engine = KnowledgeEngine()
+        assert isinstance(engine.vector_store, MatrixVectorStore)
+
+        await engine.index_file("src/a.py", "def a(): pass")
+        await engine.index_file("src/b.py", "def b(): pass")
+        results = await engine.search("def a(): pass", top_k=1)
+
+        assert results[0].node.path == "src/a.py"
+
+    def test_memory_backend_option(self):
+        engine = KnowledgeEngine({"vector_store": "memory"})
+        assert isinstance(engine.vector_store, VectorStore)